@@ -7,10 +7,22 @@
 数据库引擎模块 - 最新架构
 
 核心组件：
-- UnifiedDatabase: 统一数据库操作类
+- StorageBackend: 存储后端接口（create_storage_backend 按 database.type 选择）
+- UnifiedDatabase: 统一数据库操作类（SQLite 后端）
+- PostgresDatabase: PostgreSQL 后端（连接池 + COPY 批量写入）
+- ShardedDatabase: 分片 SQLite 存储（共享词汇目录，查询时附加分片）
 - UnifiedDatabaseAdapter: 高级API适配器
 - DictionaryManager: 系统字典管理器
 - LinguisticAnalyzer: 语言学分析器（如果可用）
+- WordlistIndex: 词汇表成员位图索引
+- BatchCoverageEngine: 文档×词汇表覆盖度矩阵
+- ResultCache: 分析结果TTL缓存
+- CorpusSnapshot: 语料列式快照（Arrow）
+- SketchStore: 词频概率草图存储（草图模式）
+- NearDuplicateIndex: MinHash/LSH 近似重复文档索引
+- DocumentDeleter: 文档批量删除与孤立数据回收
+- DatabaseMaintenance: ANALYZE/VACUUM/完整性检查与空间报告
+- IngestQueue: 基于 documents.status 的可恢复入库任务队列
 
 特性：
 - 多词性字典支持
@@ -19,26 +31,64 @@
 - 完整的语言学分析
 """
 
+from .storage_backend import StorageBackend, create_storage_backend
 from .unified_database import UnifiedDatabase
+from .postgres_database import PostgresDatabase
+from .sharded_database import ShardedDatabase
 from .database_adapter import UnifiedDatabaseAdapter, unified_adapter
 from .dictionary_manager import DictionaryManager
+from .wordlist_index import WordlistIndex
+from .coverage_engine import BatchCoverageEngine
+from .result_cache import ResultCache
+from .corpus_snapshot import CorpusSnapshot
+from .sketch_store import SketchStore
+from .near_duplicate_index import NearDuplicateIndex
+from .document_deleter import DocumentDeleter
+from .database_maintenance import DatabaseMaintenance
+from .ingest_queue import IngestQueue
 
 # 尝试导入语言学分析器
 try:
     from .linguistic_analyzer import LinguisticAnalyzer
     __all__ = [
+        'StorageBackend',
+        'create_storage_backend',
         'UnifiedDatabase',
+        'PostgresDatabase',
+        'ShardedDatabase',
         'UnifiedDatabaseAdapter', 
         'unified_adapter',
         'DictionaryManager',
+        'WordlistIndex',
+        'BatchCoverageEngine',
+        'ResultCache',
+        'CorpusSnapshot',
+        'SketchStore',
+        'NearDuplicateIndex',
+        'DocumentDeleter',
+        'DatabaseMaintenance',
+        'IngestQueue',
         'LinguisticAnalyzer'
     ]
 except ImportError:
     __all__ = [
+        'StorageBackend',
+        'create_storage_backend',
         'UnifiedDatabase',
+        'PostgresDatabase',
+        'ShardedDatabase',
         'UnifiedDatabaseAdapter',
         'unified_adapter', 
-        'DictionaryManager'
+        'DictionaryManager',
+        'WordlistIndex',
+        'BatchCoverageEngine',
+        'ResultCache',
+        'CorpusSnapshot',
+        'SketchStore',
+        'NearDuplicateIndex',
+        'DocumentDeleter',
+        'DatabaseMaintenance',
+        'IngestQueue'
     ]
 
 # 版本信息
@@ -0,0 +1,354 @@
+# 语料列式快照
+# 路径: core/engines/database/corpus_snapshot.py
+# 项目名称: Word Frequency Analysis
+# 作者: Sherryyue
+
+"""
+语料列式快照 - 将 words / occurrences / documents / common_dictionary 物化为 Arrow IPC 文件
+
+设计：
+- 每张表一个 Arrow IPC 文件，读取时内存映射为 pyarrow.Table（pyarrow.memory_map），
+  不解析、不转换为 pandas；分析只把用到的数值列取为 NumPy 数组，字符串列留在 Arrow 中
+- linguistic_features 在快照时一次性拆分为类型化列（pos_tag、pos_type、morph_complexity 等），
+  分析时不再逐行 JSON_EXTRACT
+- occurrences 以整数行号（doc_index / word_index）关联，聚合全部是向量化 bincount / Arrow group_by
+- manifest.json 记录快照时的数据版本戳，数据变化后 is_stale() 返回 True
+
+分析方法的返回结构与 UnifiedDatabase 中对应的实时 SQL 查询一致，CLI 可直接替换。
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from core.models.schema import ModernSchema
+from .result_cache import ResultCache
+from .storage_backend import connect_corpus
+
+
+class CorpusSnapshot:
+    """语料列式快照（构建 + 向量化分析）"""
+
+    TABLES = ('documents', 'words', 'occurrences', 'common_dictionary')
+    VERSION_SCOPES = ('documents', 'words')
+    MANIFEST = 'manifest.json'
+
+    def __init__(self, snapshot_dir: Optional[str] = None, db_path: str = "data/databases/unified.db",
+                 storage=None):
+        from core.utils.config_manager import get_config
+
+        self.db_path = db_path
+        # 语料经由存储后端读取（分片模式下附加全部分片），未指定时按配置创建
+        self.storage = storage
+        self.snapshot_dir = Path(snapshot_dir or get_config().get('performance.snapshot_directory',
+                                                                  'data/snapshots/'))
+        self._tables: Dict = {}
+
+    # =================== 构建 ===================
+
+    def build(self, batch_size: int = 50000) -> Dict:
+        """从数据库构建快照，返回 manifest"""
+        pa, ipc = self._require_pyarrow()
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+
+        with connect_corpus(self.db_path, self.storage) as conn:
+            version = ResultCache(self.db_path).data_version(conn, self.VERSION_SCOPES)
+
+            documents = conn.execute(f"""
+                SELECT id, filename, document_type, created_at FROM documents
+                WHERE {ModernSchema.corpus_document_filter()}
+                ORDER BY created_at
+            """).fetchall()
+            doc_index = {row[0]: i for i, row in enumerate(documents)}
+            self._write_table('documents', pa.table({
+                'document_id': pa.array([row[0] for row in documents], pa.string()),
+                'filename': pa.array([row[1] for row in documents], pa.string()),
+                'document_type': pa.array([row[2] for row in documents], pa.string()),
+                'created_at': pa.array([row[3] for row in documents], pa.string()),
+            }))
+
+            # 词汇表：linguistic_features 拆分为类型化列
+            words = conn.execute("""
+                SELECT id, surface_form, lemma, dictionary_id, dictionary_rank, difficulty_level,
+                       COALESCE(personal_status, 'new'),
+                       linguistic_features IS NOT NULL,
+                       JSON_EXTRACT(linguistic_features, '$.pos_tag'),
+                       JSON_EXTRACT(linguistic_features, '$.pos_type'),
+                       JSON_EXTRACT(linguistic_features, '$.pos_description'),
+                       JSON_EXTRACT(linguistic_features, '$.morphology') IS NOT NULL,
+                       JSON_EXTRACT(linguistic_features, '$.morphology.complexity'),
+                       JSON_EXTRACT(linguistic_features, '$.morphology.prefix'),
+                       JSON_EXTRACT(linguistic_features, '$.morphology.suffix'),
+                       JSON_EXTRACT(linguistic_features, '$.morphology.suffix_meaning')
+                FROM words
+            """).fetchall()
+            word_index = {row[0]: i for i, row in enumerate(words)}
+            columns = list(zip(*words)) if words else [()] * 16
+            self._write_table('words', pa.table({
+                'word_id': pa.array(columns[0], pa.string()),
+                'surface_form': pa.array(columns[1], pa.string()),
+                'lemma': pa.array(columns[2], pa.string()),
+                'dictionary_id': pa.array(columns[3], pa.string()),
+                'dictionary_rank': pa.array(columns[4], pa.int32()),
+                'difficulty_level': pa.array(columns[5], pa.int8()),
+                'personal_status': pa.array(columns[6], pa.string()).dictionary_encode(),
+                'has_features': pa.array([bool(v) for v in columns[7]], pa.bool_()),
+                'pos_tag': pa.array(columns[8], pa.string()).dictionary_encode(),
+                'pos_type': pa.array(columns[9], pa.string()).dictionary_encode(),
+                'pos_description': pa.array(columns[10], pa.string()),
+                'has_morphology': pa.array([bool(v) for v in columns[11]], pa.bool_()),
+                'morph_complexity': pa.array(columns[12], pa.string()).dictionary_encode(),
+                'prefix': pa.array(columns[13], pa.string()),
+                'suffix': pa.array(columns[14], pa.string()),
+                'suffix_meaning': pa.array(columns[15], pa.string()),
+            }))
+
+            # 频率矩阵：按批次转换为整数行号
+            occurrence_schema = pa.schema([
+                ('doc_index', pa.int32()), ('word_index', pa.int32()),
+                ('frequency', pa.int32()), ('tf_score', pa.float32())
+            ])
+            occurrence_count = 0
+            with pa.OSFile(str(self._path('occurrences')), 'wb') as sink, \
+                    ipc.new_file(sink, occurrence_schema) as writer:
+                cursor = conn.execute("SELECT document_id, word_id, frequency, tf_score FROM occurrences")
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    rows = [row for row in rows if row[0] in doc_index and row[1] in word_index]
+                    writer.write_batch(pa.RecordBatch.from_arrays([
+                        pa.array([doc_index[row[0]] for row in rows], pa.int32()),
+                        pa.array([word_index[row[1]] for row in rows], pa.int32()),
+                        pa.array([row[2] or 0 for row in rows], pa.int32()),
+                        pa.array([row[3] or 0.0 for row in rows], pa.float32()),
+                    ], schema=occurrence_schema))
+                    occurrence_count += len(rows)
+
+            dictionary = conn.execute("""
+                SELECT id, word, pos_primary, frequency_rank, difficulty_level FROM common_dictionary
+            """).fetchall()
+            columns = list(zip(*dictionary)) if dictionary else [()] * 5
+            self._write_table('common_dictionary', pa.table({
+                'dictionary_id': pa.array(columns[0], pa.string()),
+                'word': pa.array(columns[1], pa.string()),
+                'pos_primary': pa.array(columns[2], pa.string()).dictionary_encode(),
+                'frequency_rank': pa.array(columns[3], pa.int32()),
+                'difficulty_level': pa.array(columns[4], pa.int8()),
+            }))
+
+        manifest = {
+            'data_version': version,
+            'created_at': datetime.now().isoformat(),
+            'db_path': str(self.db_path),
+            'rows': {
+                'documents': len(documents),
+                'words': len(words),
+                'occurrences': occurrence_count,
+                'common_dictionary': len(dictionary),
+            }
+        }
+        with open(self.snapshot_dir / self.MANIFEST, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+        self._tables = {}
+        return manifest
+
+    def _write_table(self, name: str, table):
+        pa, ipc = self._require_pyarrow()
+        with pa.OSFile(str(self._path(name)), 'wb') as sink, ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    # =================== 加载 ===================
+
+    def exists(self) -> bool:
+        return (self.snapshot_dir / self.MANIFEST).exists() and \
+            all(self._path(name).exists() for name in self.TABLES)
+
+    def manifest(self) -> Dict:
+        with open(self.snapshot_dir / self.MANIFEST, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def is_stale(self) -> bool:
+        """数据库中的文档或词汇是否已在快照后变化"""
+        with connect_corpus(self.db_path, self.storage) as conn:
+            current = ResultCache(self.db_path).data_version(conn, self.VERSION_SCOPES)
+        return current != self.manifest().get('data_version')
+
+    def table(self, name: str):
+        """内存映射读取快照表，返回 pyarrow.Table（零拷贝，同一实例内复用）"""
+        if name not in self._tables:
+            if not self.exists():
+                raise FileNotFoundError(f"快照不存在: {self.snapshot_dir}，请先运行 vocab snapshot")
+            pa, ipc = self._require_pyarrow()
+            # 表的缓冲区直接引用映射内存，映射随表一起保留
+            source = pa.memory_map(str(self._path(name)), 'r')
+            self._tables[name] = ipc.open_file(source).read_all()
+        return self._tables[name]
+
+    def _path(self, name: str) -> Path:
+        return self.snapshot_dir / f"{name}.arrow"
+
+    def _require_pyarrow(self):
+        try:
+            import pyarrow as pa
+            import pyarrow.ipc as ipc
+        except ImportError as e:
+            raise RuntimeError(f"列式快照需要安装 pyarrow: {e}")
+        return pa, ipc
+
+    # =================== 向量化分析 ===================
+
+    def _column(self, name: str, column: str) -> np.ndarray:
+        """数值列转为 NumPy 数组（单批次且无空值时零拷贝）"""
+        return self.table(name).column(column).to_numpy()
+
+    def _word_totals(self):
+        """每个词汇的总频率与出现文档数（按 word_index 对齐）"""
+        n_words = self.table('words').num_rows
+        word_index = self._column('occurrences', 'word_index')
+        totals = np.bincount(word_index, weights=self._column('occurrences', 'frequency'), minlength=n_words)
+        doc_counts = np.bincount(word_index, minlength=n_words)
+        return totals.astype(np.int64), doc_counts
+
+    def _words_with_totals(self, *columns: str):
+        """words 表的指定列加上 total_frequency / document_count"""
+        import pyarrow as pa
+
+        totals, doc_counts = self._word_totals()
+        words = self.table('words').select(list(columns))
+        return words.append_column('total_frequency', pa.array(totals)) \
+                    .append_column('document_count', pa.array(doc_counts))
+
+    def get_lemma_analysis(self, doc_id: str = None) -> Dict:
+        """词根级别分析，结构同 UnifiedDatabase.get_lemma_analysis"""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        words, documents = self.table('words'), self.table('documents')
+        doc_index = self._column('occurrences', 'doc_index')
+        word_index = self._column('occurrences', 'word_index')
+        frequency = self._column('occurrences', 'frequency')
+
+        if doc_id:
+            selected = np.flatnonzero(doc_index == pc.index(documents['document_id'], doc_id).as_py())
+            doc_index, word_index, frequency = doc_index[selected], word_index[selected], frequency[selected]
+
+        joined = pa.table({
+            'lemma': words['lemma'].take(word_index),
+            'surface_form': words['surface_form'].take(word_index),
+            'frequency': pa.array(frequency, pa.int64()),
+            'doc_index': pa.array(doc_index),
+        })
+        aggregations = [('surface_form', 'count_distinct'), ('frequency', 'sum')]
+        if doc_id:
+            aggregations += [('surface_form', 'list'), ('frequency', 'list')]
+        else:
+            aggregations.append(('doc_index', 'count_distinct'))
+        grouped = joined.group_by('lemma', use_threads=False).aggregate(aggregations)
+        grouped = grouped.sort_by([('frequency_sum', 'descending')])
+
+        lemmas = []
+        for row in grouped.to_pylist():
+            item = {
+                'lemma': row['lemma'],
+                'variant_count': row['surface_form_count_distinct'],
+                'total_frequency': row['frequency_sum'],
+            }
+            if doc_id:
+                item['variants_detail'] = ','.join(f"{surface_form}:{count}" for surface_form, count
+                                                   in zip(row['surface_form_list'], row['frequency_list']))
+            else:
+                item['document_count'] = row['doc_index_count_distinct']
+            lemmas.append(item)
+
+        return {
+            'document_id': doc_id,
+            'total_lemmas': len(lemmas),
+            'lemma_analysis': lemmas
+        }
+
+    def get_pos_distribution(self) -> Dict:
+        """词性分布统计，结构同 UnifiedDatabase.get_pos_distribution"""
+        words = self.table('words')
+        analyzed = words.filter(words['has_features'])
+
+        pos_type_distribution = self._value_counts(analyzed['pos_type'])
+
+        tags = analyzed.select(['pos_tag', 'pos_description']) \
+            .group_by('pos_tag', use_threads=False) \
+            .aggregate([('pos_description', 'first'), ([], 'count_all')]) \
+            .sort_by([('count_all', 'descending')]).slice(0, 20)
+        pos_tag_distribution = [{
+            'pos_tag': row['pos_tag'],
+            'description': row['pos_description_first'],
+            'count': row['count_all']
+        } for row in tags.to_pylist()]
+
+        morphology = analyzed.filter(analyzed['has_morphology'])
+        morphology_distribution = self._value_counts(morphology['morph_complexity'])
+
+        return {
+            'pos_type_distribution': pos_type_distribution,
+            'pos_tag_distribution': pos_tag_distribution,
+            'morphology_distribution': morphology_distribution,
+            'total_analyzed_words': sum(pos_type_distribution.values())
+        }
+
+    def get_complex_words_analysis(self, limit: int = 20) -> Dict:
+        """前缀/后缀词汇，结构同 UnifiedDatabase.get_complex_words_analysis"""
+        import pyarrow.compute as pc
+
+        words = self._words_with_totals('surface_form', 'lemma', 'has_features', 'prefix', 'suffix',
+                                        'suffix_meaning')
+
+        def top(column: str, fields: List[str]) -> List[Dict]:
+            mask = pc.and_(words['has_features'], pc.is_valid(words[column]))
+            subset = words.filter(mask).sort_by([('total_frequency', 'descending')]).slice(0, limit)
+            return subset.select(fields).to_pylist()
+
+        return {
+            'prefixed_words': top('prefix', ['surface_form', 'lemma', 'prefix', 'total_frequency']),
+            'suffixed_words': top('suffix', ['surface_form', 'lemma', 'suffix', 'suffix_meaning',
+                                             'total_frequency'])
+        }
+
+    def get_words_by_pos_type(self, pos_type: str, limit: int = 50) -> List[Dict]:
+        """按词性类型查询词汇，结构同 UnifiedDatabase.get_words_by_pos_type"""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        words = self._words_with_totals('surface_form', 'lemma', 'has_features', 'pos_tag', 'pos_type',
+                                        'pos_description', 'has_morphology', 'morph_complexity',
+                                        'prefix', 'suffix', 'suffix_meaning')
+        mask = pc.and_(words['has_features'], pc.equal(pc.cast(words['pos_type'], pa.string()), pos_type))
+        subset = words.filter(mask).sort_by([('total_frequency', 'descending')]).slice(0, limit)
+
+        return [{
+            'surface_form': row['surface_form'],
+            'lemma': row['lemma'],
+            'linguistic_features': {
+                'pos_tag': row['pos_tag'],
+                'pos_type': row['pos_type'],
+                'pos_description': row['pos_description'],
+                'morphology': {
+                    'complexity': row['morph_complexity'],
+                    'prefix': row['prefix'],
+                    'suffix': row['suffix'],
+                    'suffix_meaning': row['suffix_meaning']
+                } if row['has_morphology'] else {}
+            },
+            'document_count': row['document_count'],
+            'total_frequency': row['total_frequency']
+        } for row in subset.to_pylist()]
+
+    def _value_counts(self, column) -> Dict:
+        """取值计数（含空值，键为 None），按计数降序"""
+        import pyarrow as pa
+
+        counts = pa.table({'value': column}).group_by('value', use_threads=False) \
+            .aggregate([([], 'count_all')]).sort_by([('count_all', 'descending')])
+        return {row['value']: row['count_all'] for row in counts.to_pylist()}
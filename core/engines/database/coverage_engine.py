@@ -0,0 +1,189 @@
+# 批量词汇覆盖度引擎
+# 路径: core/engines/database/coverage_engine.py
+# 项目名称: Word Frequency Analysis
+# 作者: Sherryyue
+
+"""
+批量词汇覆盖度引擎 - 文档 × 词汇表 覆盖度矩阵
+
+与 UnifiedDatabase.get_vocabulary_coverage 的单文档查询口径一致，
+但一次分组扫描 occurrences 即得到所有文档对所有词汇表的覆盖情况：
+- covered_words: 文档中属于该词汇表的不同词汇数
+- frequency_coverage: 这些词汇的出现次数占文档总词频的比例
+- avg_difficulty: 覆盖词汇的平均难度
+
+结果通过 ResultCache 缓存到 analysis_results 表（带 expires_at），
+并可导出为 CSV/Parquet。
+"""
+
+import csv
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from core.models.schema import ModernSchema
+from .result_cache import ResultCache
+from .storage_backend import StorageBackend, create_storage_backend
+
+
+class BatchCoverageEngine:
+    """文档 × 词汇表 覆盖度矩阵计算器"""
+
+    ANALYSIS_TYPE = 'coverage_matrix'
+    CACHE_SCOPES = ('documents', 'wordlists', 'words')
+
+    EXPORT_COLUMNS = [
+        'document_id', 'filename', 'wordlist_name', 'covered_words',
+        'total_wordlist_words', 'coverage_percentage', 'document_unique_words',
+        'unique_coverage_percentage', 'covered_frequency', 'document_total_frequency',
+        'frequency_coverage_percentage', 'avg_difficulty_level'
+    ]
+
+    def __init__(self, db_path: str = "data/databases/unified.db", cache_ttl: Optional[int] = None,
+                 storage: Optional[StorageBackend] = None):
+        self.db_path = db_path
+        # 语料经由存储后端读取（分片模式下附加全部分片）
+        self.storage = storage or create_storage_backend(db_path)
+        # 缓存的数据版本戳按主库计算，只在单库 SQLite 下可靠
+        self.cache = ResultCache(db_path, ttl=cache_ttl,
+                                 enabled=None if self.storage.backend_name == 'sqlite' else False)
+
+    # =================== 矩阵计算 ===================
+
+    def compute(self) -> Dict:
+        """一次扫描计算完整覆盖度矩阵"""
+        with self.storage.connect_corpus() as conn:
+            # 文档维度：每个文档的总词频与独特词汇数
+            documents = []
+            for doc_id, filename, total_frequency, unique_words in conn.execute(f"""
+                SELECT d.id, d.filename,
+                       COALESCE(SUM(o.frequency), 0) as total_frequency,
+                       COUNT(o.word_id) as unique_words
+                FROM documents d
+                LEFT JOIN occurrences o ON d.id = o.document_id
+                WHERE d.document_type = 'text' AND {ModernSchema.corpus_document_filter('d')}
+                GROUP BY d.id
+                ORDER BY d.created_at
+            """):
+                documents.append({
+                    'document_id': doc_id,
+                    'filename': filename,
+                    'total_frequency': total_frequency,
+                    'unique_words': unique_words
+                })
+
+            # 词汇表维度
+            wordlists = [{'wordlist_id': wl_id, 'wordlist_name': name, 'word_count': word_count or 0}
+                         for wl_id, name, word_count in conn.execute("""
+                             SELECT id, name, word_count FROM wordlists ORDER BY name
+                         """)]
+
+            # 矩阵单元：一次分组扫描所有 (文档, 词汇表) 组合
+            cells = {}
+            for doc_id, wordlist_id, covered, covered_freq, avg_diff in conn.execute("""
+                SELECT o.document_id, m.wordlist_id,
+                       COUNT(DISTINCT w.id) as covered_words,
+                       SUM(o.frequency) as covered_frequency,
+                       AVG(w.difficulty_level) as avg_difficulty
+                FROM occurrences o
+                JOIN words w ON o.word_id = w.id
+                JOIN dictionary_wordlist_memberships m ON w.dictionary_id = m.dictionary_id
+                WHERE w.dictionary_found = TRUE
+                GROUP BY o.document_id, m.wordlist_id
+            """):
+                cells[(doc_id, wordlist_id)] = (covered, covered_freq, avg_diff)
+
+        rows = []
+        for doc in documents:
+            for wl in wordlists:
+                covered, covered_freq, avg_diff = cells.get(
+                    (doc['document_id'], wl['wordlist_id']), (0, 0, None))
+                rows.append({
+                    'document_id': doc['document_id'],
+                    'filename': doc['filename'],
+                    'wordlist_name': wl['wordlist_name'],
+                    'covered_words': covered,
+                    'total_wordlist_words': wl['word_count'],
+                    'coverage_percentage': self._percentage(covered, wl['word_count']),
+                    'document_unique_words': doc['unique_words'],
+                    'unique_coverage_percentage': self._percentage(covered, doc['unique_words']),
+                    'covered_frequency': covered_freq,
+                    'document_total_frequency': doc['total_frequency'],
+                    'frequency_coverage_percentage': self._percentage(covered_freq, doc['total_frequency']),
+                    'avg_difficulty_level': round(avg_diff, 2) if avg_diff is not None else None
+                })
+
+        return {
+            'documents_count': len(documents),
+            'wordlists_count': len(wordlists),
+            'wordlists': [wl['wordlist_name'] for wl in wordlists],
+            'computed_at': datetime.now().isoformat(),
+            'rows': rows
+        }
+
+    def _percentage(self, part: float, whole: float) -> float:
+        return round(part / whole * 100, 2) if whole else 0.0
+
+    # =================== 结果缓存 ===================
+
+    def get_matrix(self, refresh: bool = False) -> Dict:
+        """获取覆盖度矩阵，优先使用未过期且数据未变化的缓存结果"""
+        if not refresh:
+            hit, matrix = self.cache.get(self.ANALYSIS_TYPE, scopes=self.CACHE_SCOPES)
+            if hit:
+                matrix['cached'] = True
+                return matrix
+
+        matrix = self.compute()
+        self.cache.set(self.ANALYSIS_TYPE, matrix, scopes=self.CACHE_SCOPES)
+        matrix['cached'] = False
+        return matrix
+
+    # =================== 导出 ===================
+
+    def export(self, matrix: Dict, output_path: str, file_format: str = 'csv') -> str:
+        """导出覆盖度矩阵为 CSV 或 Parquet"""
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        if file_format == 'csv':
+            with open(output_path, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=self.EXPORT_COLUMNS)
+                writer.writeheader()
+                writer.writerows(matrix['rows'])
+        elif file_format == 'parquet':
+            import pandas as pd
+            df = pd.DataFrame(matrix['rows'], columns=self.EXPORT_COLUMNS)
+            try:
+                df.to_parquet(output_path, index=False)
+            except ImportError as e:
+                raise RuntimeError(f"Parquet导出需要安装 pyarrow: {e}")
+        else:
+            raise ValueError(f"不支持的导出格式: {file_format}")
+
+        return str(output_path)
+
+    def summarize(self, matrix: Dict) -> List[Dict]:
+        """按词汇表汇总矩阵：平均覆盖率与平均频率覆盖率"""
+        summary = {}
+        for row in matrix['rows']:
+            item = summary.setdefault(row['wordlist_name'], {
+                'wordlist_name': row['wordlist_name'],
+                'documents': 0,
+                'coverage_sum': 0.0,
+                'frequency_coverage_sum': 0.0
+            })
+            item['documents'] += 1
+            item['coverage_sum'] += row['coverage_percentage']
+            item['frequency_coverage_sum'] += row['frequency_coverage_percentage']
+
+        results = []
+        for item in summary.values():
+            count = item['documents']
+            results.append({
+                'wordlist_name': item['wordlist_name'],
+                'documents': count,
+                'avg_coverage_percentage': round(item['coverage_sum'] / count, 2) if count else 0,
+                'avg_frequency_coverage_percentage': round(item['frequency_coverage_sum'] / count, 2) if count else 0
+            })
+        return results
@@ -8,7 +8,11 @@ import json
 import sqlite3
 from pathlib import Path
 
-from .unified_database import UnifiedDatabase
+from .storage_backend import create_storage_backend
+from .result_cache import ResultCache
+from .sketch_store import SketchStore
+from .near_duplicate_index import NearDuplicateIndex
+from ..vocabulary.frequency_profile import FrequencyProfile
 
 class UnifiedDatabaseAdapter:
     """
@@ -17,15 +21,39 @@ class UnifiedDatabaseAdapter:
     """
     
     def __init__(self, db_path: str = "data/databases/unified.db"):
-        self.unified_db = UnifiedDatabase(db_path)
+        # 存储后端由配置 database.type 选择（sqlite / postgresql）
+        self.unified_db = create_storage_backend(db_path)
+        
+        # 缓存、草图与近似重复索引目前只支持单库 SQLite，其他后端上直接停用（按配置启用时为 None）
+        enabled = None if self.unified_db.backend_name == 'sqlite' else False
+        # 昂贵分析的结果缓存
+        self.result_cache = ResultCache(self.unified_db.db_path, enabled=enabled)
+        # 草图模式：长尾词频只保存在概率草图中
+        self.sketch_store = SketchStore(self.unified_db.db_path, enabled=enabled)
+        # MinHash/LSH 近似重复检测
+        self.duplicate_index = NearDuplicateIndex(self.unified_db.db_path, enabled=enabled)
+    
+    def _sqlite_db(self, feature: str):
+        """只有 SQLite 后端实现的查询：其他后端抛出 NotImplementedError"""
+        self.unified_db.require_local_sqlite(feature)
+        return self.unified_db
     
     # ================= 文档和分析管理 =================
     
     def store_analysis(self, content_hash: str, filename: str, basic_info: Dict, 
                       word_frequencies: Dict, process_duration: float, 
-                      original_text: str = None):
-        """存储文档分析结果"""
-        # 添加文档
+                      original_text: str = None, doc_id: str = None,
+                      frequency_vector: Tuple = None) -> str:
+        """存储文档分析结果，返回文档ID（跳过近似重复文档时返回已有文档的ID）
+        
+        doc_id 为入库队列中的任务文档时，结果写入该记录而不是新建文档；
+        frequency_vector 为 (词频向量, 驻留表) 时直接按向量写入词频，word_frequencies 可为 None
+        """
+        if word_frequencies is None and (self.duplicate_index.enabled or self.sketch_store.enabled):
+            # 近似重复签名与草图需要 {词汇: 频率}
+            counts, interner = frequency_vector
+            word_frequencies = interner.to_dict(counts)
+        
         metadata = {
             'total_words': basic_info.get('total_words', 0),
             'unique_words': basic_info.get('unique_words', 0),
@@ -33,19 +61,59 @@ class UnifiedDatabaseAdapter:
             'basic_info': basic_info
         }
         
-        doc_id = self.unified_db.add_document(
-            filename=filename,
-            content=content_hash,
-            document_type='text',
-            metadata=metadata
-        )
+        # 近似重复检测：在昂贵的词汇存储之前进行
+        signature = None
+        if self.duplicate_index.enabled:
+            signature = self.duplicate_index.signature(word_frequencies)
+            duplicates = self.duplicate_index.find_duplicates(signature)
+            if duplicates:
+                best = duplicates[0]
+                print(f"⚠️  疑似重复文档: {filename} ≈ {best['filename']} "
+                      f"(相似度 {best['similarity']:.2f})")
+                if self.duplicate_index.skip_duplicates:
+                    print("⏭️  已跳过存储（dedup.skip_near_duplicates）")
+                    if doc_id is not None:
+                        # 与内容相同的任务一样合并：源文件记入 duplicate_sources，任务记录删除
+                        return self.unified_db.merge_job(doc_id, best['document_id'])
+                    return best['document_id']
+                metadata['near_duplicate_of'] = best['document_id']
+        
+        # 添加文档（或填充已入队的任务文档）
+        if doc_id is not None:
+            job_id = doc_id
+            doc_id = self.unified_db.attach_content(job_id, content_hash)
+            if doc_id != job_id:
+                # 内容与已有文档相同：任务已合并到该文档，词频无需重复存储
+                return doc_id
+        else:
+            doc_id = self.unified_db.add_document(
+                filename=filename,
+                content=content_hash,
+                document_type='text',
+                metadata=metadata
+            )
+        if signature is not None:
+            self.duplicate_index.add(doc_id, signature)
+        
+        # 草图模式：完整分布写入文档/语料草图，只精确存储头部词汇
+        if self.sketch_store.enabled:
+            self.sketch_store.record_document(doc_id, word_frequencies)
+            word_frequencies = self.sketch_store.exact_head(word_frequencies)
+            frequency_vector = None
+            metadata['sketch_mode'] = True
+            metadata['exact_words_stored'] = len(word_frequencies)
         
         # 存储词频数据，包含上下文用于语言学分析
-        self.unified_db.store_word_frequencies(doc_id, word_frequencies, 
-                                              context_text=original_text)
+        if frequency_vector is not None:
+            counts, interner = frequency_vector
+            self.unified_db.store_frequency_vector(doc_id, counts, interner, context_text=original_text)
+        else:
+            self.unified_db.store_word_frequencies(doc_id, word_frequencies, 
+                                                  context_text=original_text)
         
         # 更新文档状态
         self.unified_db.update_document_status(doc_id, 'completed', metadata)
+        return doc_id
     
     def get_existing_analysis(self, content_hash: str) -> Optional[Tuple[dict, dict]]:
         """检查是否存在相同内容的分析结果"""
@@ -72,15 +140,27 @@ class UnifiedDatabaseAdapter:
     
     def _get_document_word_frequencies(self, doc_id: str) -> Dict[str, int]:
         """获取文档的词频数据"""
-        with sqlite3.connect(self.unified_db.db_path) as conn:
-            cursor = conn.execute("""
-                SELECT w.surface_form, o.frequency
-                FROM occurrences o
-                JOIN words w ON o.word_id = w.id
-                WHERE o.document_id = ?
-            """, (doc_id,))
-            
-            return dict(cursor.fetchall())
+        return self.unified_db.get_document_word_frequencies(doc_id)
+    
+    def resolve_document_id(self, text_id: str) -> Optional[str]:
+        """按ID前缀解析文档ID，未找到返回 None，匹配多个时抛出 ValueError"""
+        with self.unified_db.connect_corpus() as conn:
+            rows = conn.execute("""
+                SELECT id FROM documents WHERE id LIKE ? LIMIT 2
+            """, (f"{text_id}%",)).fetchall()
+        
+        if len(rows) > 1:
+            raise ValueError(f"ID前缀 {text_id} 匹配多个文档，请提供更长的前缀")
+        return rows[0][0] if rows else None
+    
+    def get_frequency_profile(self, text_id: str, top_n: int = 20) -> Optional[Tuple[Dict, FrequencyProfile]]:
+        """获取文档的词频概况（支持ID前缀），返回 (文档信息, 词频概况)"""
+        doc_id = self.resolve_document_id(text_id)
+        if doc_id is None:
+            return None
+        
+        doc = self.get_text_by_id(doc_id)
+        return doc, FrequencyProfile(self._get_document_word_frequencies(doc['id']), top_n=top_n)
     
     def get_all_analyses(self) -> List[Tuple]:
         """获取所有分析结果"""
@@ -120,7 +200,7 @@ class UnifiedDatabaseAdapter:
     
     def get_sepcific_analysis(self, text_id: str) -> List[Tuple]:
         """获取特定文本的词频统计"""
-        with sqlite3.connect(self.unified_db.db_path) as conn:
+        with self.unified_db.connect_corpus() as conn:
             cursor = conn.execute("""
                 SELECT w.surface_form, o.frequency
                 FROM occurrences o
@@ -132,18 +212,17 @@ class UnifiedDatabaseAdapter:
             return cursor.fetchall()
     
     def get_global_word_frequencies(self, min_frequency: int = 1, limit: int = 20) -> List[Tuple]:
-        """获取全局词频统计"""
-        with sqlite3.connect(self.unified_db.db_path) as conn:
+        """获取全局词频统计（读取语料汇总表，按索引范围扫描）"""
+        with self.unified_db.connect_corpus() as conn:
             cursor = conn.execute("""
                 SELECT 
                     w.surface_form,
-                    SUM(o.frequency) as total_frequency,
-                    COUNT(DISTINCT o.document_id) as document_count
-                FROM words w
-                JOIN occurrences o ON w.id = o.word_id
-                GROUP BY w.id
-                HAVING total_frequency >= ?
-                ORDER BY total_frequency DESC
+                    s.total_frequency,
+                    s.document_frequency as document_count
+                FROM corpus_word_stats s
+                JOIN words w ON w.id = s.word_id
+                WHERE s.total_frequency >= ?
+                ORDER BY s.total_frequency DESC
                 LIMIT ?
             """, (min_frequency, limit))
             
@@ -151,7 +230,7 @@ class UnifiedDatabaseAdapter:
     
     def get_text_by_id(self, text_id: str) -> Optional[Dict]:
         """根据ID获取文本信息"""
-        with sqlite3.connect(self.unified_db.db_path) as conn:
+        with self.unified_db.connect_corpus() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.execute("""
                 SELECT * FROM documents WHERE id = ?
@@ -175,9 +254,7 @@ class UnifiedDatabaseAdapter:
     def delete_all_texts(self) -> bool:
         """删除所有文本记录"""
         try:
-            with sqlite3.connect(self.unified_db.db_path) as conn:
-                cursor = conn.execute("DELETE FROM documents WHERE document_type = 'text'")
-                return cursor.rowcount > 0
+            return self.unified_db.delete_documents_by_type('text') > 0
         except Exception as e:
             print(f"删除失败: {e}")
             return False
@@ -198,12 +275,12 @@ class UnifiedDatabaseAdapter:
     
     def create_wordlist(self, name: str, description: str = None) -> str:
         """创建新的词汇表"""
-        return self.unified_db.create_wordlist(name, description)
+        return self._sqlite_db('词汇表管理').create_wordlist(name, description)
     
     def add_words_to_wordlist(self, wordlist_name: str, words: List[str]) -> Dict:
         """将词汇添加到词汇表（通过字典关联）"""
         # 先获取词汇表
-        wordlist = self.unified_db.get_wordlist_by_name(wordlist_name)
+        wordlist = self._sqlite_db('词汇表管理').get_wordlist_by_name(wordlist_name)
         if not wordlist:
             # 创建新词汇表
             wordlist_id = self.unified_db.create_wordlist(wordlist_name)
@@ -215,7 +292,7 @@ class UnifiedDatabaseAdapter:
     
     def get_all_wordlists(self) -> List[Dict]:
         """获取所有词汇表"""
-        with sqlite3.connect(self.unified_db.db_path) as conn:
+        with sqlite3.connect(self.unified_db.require_local_sqlite('词汇表管理')) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.execute("""
                 SELECT id, name, description, word_count, created_at
@@ -227,7 +304,7 @@ class UnifiedDatabaseAdapter:
     
     def get_wordlist_words(self, wordlist_name: str) -> List[str]:
         """获取词汇表中的词汇（通过字典关联）"""
-        with sqlite3.connect(self.unified_db.db_path) as conn:
+        with sqlite3.connect(self.unified_db.require_local_sqlite('词汇表管理')) as conn:
             cursor = conn.execute("""
                 SELECT DISTINCT d.word, d.pos_primary
                 FROM wordlists wl
@@ -267,49 +344,72 @@ class UnifiedDatabaseAdapter:
     
     def get_word_variants(self, word: str, doc_id: str = None) -> Dict:
         """获取词汇变形"""
-        return self.unified_db.get_word_variants_with_frequencies(word, doc_id)
+        return self._sqlite_db('词汇变形查询').get_word_variants_with_frequencies(word, doc_id)
     
     def get_lemma_statistics(self) -> Dict:
         """获取词根统计"""
-        return self.unified_db.get_unique_lemma_count()
+        return self._sqlite_db('词根统计').get_unique_lemma_count()
     
     def get_lemma_analysis_data(self, doc_id: str = None) -> Dict:
         """获取词根分析数据"""
-        return self.unified_db.get_lemma_analysis(doc_id)
+        return self.result_cache.get_or_compute(
+            'lemma_analysis',
+            lambda: self._sqlite_db('词根分析').get_lemma_analysis(doc_id),
+            params={'doc_id': doc_id},
+            scopes=('documents',),
+            document_id=doc_id
+        )
     
     def get_linguistic_features(self, word: str) -> List[Dict]:
         """获取词汇的语言学特征"""
-        return self.unified_db.get_word_linguistic_features(word)
+        return self._sqlite_db('语言学特征查询').get_word_linguistic_features(word)
     
     def get_words_by_pos(self, pos_type: str, limit: int = 50) -> List[Dict]:
         """根据词性获取词汇"""
-        return self.unified_db.get_words_by_pos_type(pos_type, limit)
+        return self._sqlite_db('词性查询').get_words_by_pos_type(pos_type, limit)
     
     def get_pos_statistics(self) -> Dict:
         """获取词性分布统计"""
-        return self.unified_db.get_pos_distribution()
+        return self._sqlite_db('词性统计').get_pos_distribution()
     
     def get_morphology_analysis(self) -> Dict:
         """获取形态学分析"""
-        return self.unified_db.get_complex_words_analysis()
+        return self._sqlite_db('形态学分析').get_complex_words_analysis()
     
     # ================= 高级分析功能 =================
     
     def get_vocabulary_coverage_analysis(self, doc_id: str) -> List[Dict]:
         """获取词汇覆盖度分析"""
-        return self.unified_db.get_vocabulary_coverage(doc_id)
+        return self.result_cache.get_or_compute(
+            'vocabulary_coverage',
+            lambda: self._sqlite_db('词汇覆盖度分析').get_vocabulary_coverage(doc_id),
+            params={'doc_id': doc_id},
+            scopes=('documents', 'wordlists', 'words'),
+            document_id=doc_id
+        )
+    
+    def get_coverage_matrix(self, refresh: bool = False) -> Dict:
+        """获取所有文档 × 所有词汇表的覆盖度矩阵（带缓存）"""
+        from .coverage_engine import BatchCoverageEngine
+        engine = BatchCoverageEngine(self.unified_db.require_local_sqlite('覆盖度矩阵'), storage=self.unified_db)
+        return engine.get_matrix(refresh=refresh)
     
     def analyze_document_similarity(self, doc_id1: str, doc_id2: str) -> Dict:
         """分析文档相似性"""
-        return self.unified_db.analyze_document_similarity(doc_id1, doc_id2)
+        return self.result_cache.get_or_compute(
+            'similarity',
+            lambda: self._sqlite_db('文档相似度分析').analyze_document_similarity(doc_id1, doc_id2),
+            params={'doc_ids': [doc_id1, doc_id2]},
+            scopes=('documents',)
+        )
     
     def get_word_usage_statistics(self, min_frequency: int = 1) -> List[Dict]:
         """获取词汇使用统计"""
-        return self.unified_db.get_word_usage_stats(min_frequency)
+        return self._sqlite_db('词汇使用统计').get_word_usage_stats(min_frequency)
     
     def search_words(self, search_term: str, detailed: bool = False) -> List[Tuple]:
         """搜索词汇"""
-        with sqlite3.connect(self.unified_db.db_path) as conn:
+        with self.unified_db.connect_corpus() as conn:
             if detailed:
                 # 详细模式：包含字典信息
                 cursor = conn.execute("""
@@ -351,51 +451,57 @@ class UnifiedDatabaseAdapter:
     def set_word_status(self, word: str, status: str) -> bool:
         """设置词汇学习状态"""
         from ..vocabulary.personal_status_manager import PersonalStatusManager
-        manager = PersonalStatusManager(self.unified_db.db_path)
+        manager = PersonalStatusManager(self.unified_db.require_local_sqlite('学习状态管理'), storage=self.unified_db)
         return manager.set_word_status(word, status)
     
     def get_personal_status_stats(self) -> Dict:
         """获取个人学习状态统计"""
         from ..vocabulary.personal_status_manager import PersonalStatusManager
-        manager = PersonalStatusManager(self.unified_db.db_path)
+        manager = PersonalStatusManager(self.unified_db.require_local_sqlite('学习状态管理'), storage=self.unified_db)
         return manager.get_status_statistics()
     
     def get_words_by_status(self, status: str, limit: int = None) -> List[Dict]:
         """获取特定状态的词汇"""
         from ..vocabulary.personal_status_manager import PersonalStatusManager
-        manager = PersonalStatusManager(self.unified_db.db_path)
+        manager = PersonalStatusManager(self.unified_db.require_local_sqlite('学习状态管理'), storage=self.unified_db)
         return manager.get_words_by_status(status, limit)
     
     def analyze_document_difficulty(self, doc_id: str) -> Dict:
         """分析文档难度"""
         from ..vocabulary.personal_status_manager import PersonalStatusManager
-        manager = PersonalStatusManager(self.unified_db.db_path)
-        return manager.analyze_document_difficulty(doc_id)
+        manager = PersonalStatusManager(self.unified_db.require_local_sqlite('学习状态管理'), storage=self.unified_db)
+        return self.result_cache.get_or_compute(
+            'difficulty',
+            lambda: manager.analyze_document_difficulty(doc_id),
+            params={'doc_id': doc_id},
+            scopes=('documents', 'words'),
+            document_id=doc_id
+        )
     
     # ================= 字典管理 =================
     
     def import_dictionary(self, file_path: str, max_words: int = None) -> Dict:
         """导入字典数据"""
         from .dictionary_manager import DictionaryManager
-        manager = DictionaryManager(self.unified_db.db_path)
+        manager = DictionaryManager(self.unified_db.require_local_sqlite('字典管理'))
         return manager.import_coca_dictionary(file_path, max_words)
     
     def get_dictionary_stats(self) -> Dict:
         """获取字典统计信息"""
         from .dictionary_manager import DictionaryManager
-        manager = DictionaryManager(self.unified_db.db_path)
+        manager = DictionaryManager(self.unified_db.require_local_sqlite('字典管理'))
         return manager.get_dictionary_stats()
     
     def query_dictionary_word(self, word: str) -> List[Dict]:
         """查询字典词汇"""
         from .dictionary_manager import DictionaryManager
-        manager = DictionaryManager(self.unified_db.db_path)
+        manager = DictionaryManager(self.unified_db.require_local_sqlite('字典管理'))
         return manager.query_word(word)
     
     def update_words_dictionary_mapping(self):
         """更新词汇的字典映射"""
         from .dictionary_manager import DictionaryManager
-        manager = DictionaryManager(self.unified_db.db_path)
+        manager = DictionaryManager(self.unified_db.require_local_sqlite('字典管理'))
         return manager.update_words_dictionary_mapping()
     
     # ================= 系统信息 =================
@@ -0,0 +1,180 @@
+# 数据库维护
+# 路径: core/engines/database/database_maintenance.py
+# 项目名称: Word Frequency Analysis
+# 作者: Sherryyue
+
+"""
+数据库维护 - 统计信息、空间回收、完整性检查与空间占用报告
+
+- analyze: ANALYZE + PRAGMA optimize，为查询规划器提供索引统计
+- vacuum: incremental 只释放空闲页（要求数据库已是 auto_vacuum = INCREMENTAL）；
+  full 重建整个数据库并切换为增量模式，旧数据库需显式执行一次
+- integrity: quick_check / integrity_check 与外键检查（发现孤立行）
+- size_report: 基于 dbstat 虚拟表的各表、各索引空间占用
+- index_advice: 标记低选择性或被其他索引覆盖的索引（每次写入都要维护，却帮不上查询）；
+  需要精确计数，maintain 只在 index_advice=True 时运行
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class DatabaseMaintenance:
+    """SQLite 数据库维护操作"""
+
+    # auto_vacuum 取值：0 = NONE, 1 = FULL, 2 = INCREMENTAL
+    AUTO_VACUUM_INCREMENTAL = 2
+
+    def __init__(self, db_path: str = "data/databases/unified.db"):
+        from core.utils.config_manager import get_config
+
+        config = get_config()
+        self.db_path = db_path
+        self.analysis_limit = config.get('database.analysis_limit', 1000)
+        # 首列非空取值数不超过此值的索引视为低选择性
+        self.max_distinct_for_advice = config.get('database.max_distinct_for_index_advice', 2)
+        self.min_rows_for_advice = config.get('database.min_rows_for_index_advice', 1000)
+
+    def _connect(self) -> sqlite3.Connection:
+        # 自动提交模式：VACUUM 不能在事务中执行
+        return sqlite3.connect(self.db_path, isolation_level=None)
+
+    # =================== 维护操作 ===================
+
+    def maintain(self, vacuum: str = 'none', full_check: bool = False,
+                 index_advice: bool = False) -> Dict:
+        """依次执行完整性检查、统计信息更新、空间回收，并生成空间报告（可选索引建议）"""
+        result = {'integrity': self.integrity(full=full_check)}
+        result['analyze'] = self.analyze()
+        if vacuum != 'none':
+            result['vacuum'] = self.vacuum(vacuum)
+        result['sizes'] = self.size_report()
+        if index_advice:
+            result['index_advice'] = self.index_advice()
+        return result
+
+    def analyze(self) -> Dict:
+        """更新查询规划器统计信息，返回有统计的索引数"""
+        with self._connect() as conn:
+            # analysis_limit 让 ANALYZE 在大表上只采样，耗时与库大小无关
+            conn.execute(f"PRAGMA analysis_limit = {int(self.analysis_limit)}")
+            conn.execute("ANALYZE")
+            conn.execute("PRAGMA optimize")
+            indexes = conn.execute("SELECT COUNT(*) FROM sqlite_stat1 WHERE idx IS NOT NULL").fetchone()[0]
+        return {'indexes': indexes}
+
+    def vacuum(self, mode: str = 'incremental') -> Dict:
+        """回收空闲页：incremental 只释放空闲页，full 重建整个数据库
+
+        数据库不是增量模式时 incremental 不做任何事（mode 返回 'none'），
+        切换模式需要重写整个文件，只在显式执行 full 时进行。
+        """
+        if mode not in ('incremental', 'full'):
+            raise ValueError(f"不支持的 VACUUM 模式: {mode}")
+
+        before = self.file_size()
+        conn = self._connect()
+        try:
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+            if mode == 'incremental':
+                if auto_vacuum == self.AUTO_VACUUM_INCREMENTAL:
+                    conn.execute("PRAGMA incremental_vacuum").fetchall()
+                else:
+                    mode = 'none'
+            else:
+                # 完整 VACUUM 时顺带切换为增量模式，之后的维护只需释放空闲页
+                if auto_vacuum != self.AUTO_VACUUM_INCREMENTAL:
+                    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+        finally:
+            conn.close()
+
+        return {'mode': mode, 'free_pages': free_pages,
+                'bytes_before': before, 'bytes_after': self.file_size()}
+
+    def integrity(self, full: bool = False) -> Dict:
+        """完整性检查（quick_check 跳过索引内容校验）与外键检查"""
+        with self._connect() as conn:
+            pragma = 'integrity_check' if full else 'quick_check'
+            messages = [row[0] for row in conn.execute(f"PRAGMA {pragma}")]
+            foreign_keys: Dict[str, int] = {}
+            for table, _, _, _ in conn.execute("PRAGMA foreign_key_check"):
+                foreign_keys[table] = foreign_keys.get(table, 0) + 1
+
+        return {
+            'ok': messages == ['ok'] and not foreign_keys,
+            'check': pragma,
+            'messages': [] if messages == ['ok'] else messages,
+            'foreign_key_violations': foreign_keys,
+        }
+
+    # =================== 报告 ===================
+
+    def file_size(self) -> int:
+        path = Path(self.db_path)
+        return path.stat().st_size if path.exists() else 0
+
+    def size_report(self) -> Optional[List[Dict]]:
+        """各表、各索引的空间占用（按大小降序）；SQLite 未编译 dbstat 时返回 None"""
+        with self._connect() as conn:
+            try:
+                rows = conn.execute("""
+                    SELECT s.name, COALESCE(m.type, 'table'), COALESCE(m.tbl_name, s.name),
+                           SUM(s.pgsize), SUM(s.unused), COUNT(*)
+                    FROM dbstat s
+                    LEFT JOIN sqlite_schema m ON m.name = s.name
+                    GROUP BY s.name
+                    ORDER BY SUM(s.pgsize) DESC
+                """).fetchall()
+            except sqlite3.OperationalError:
+                return None
+
+        return [{'name': name, 'type': kind, 'table': table, 'bytes': size,
+                 'unused_bytes': unused, 'pages': pages}
+                for name, kind, table, size, unused, pages in rows]
+
+    def index_advice(self) -> List[Dict]:
+        """标记可能无用的索引：首列几乎只有一个取值（低选择性），或是其他索引/唯一约束的前缀
+
+        低选择性判断对候选索引逐个执行 COUNT(DISTINCT)，需要扫描整个索引，因此只按需运行。
+        """
+        advice = []
+        with self._connect() as conn:
+            tables = [row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_schema WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+            )]
+            for table in tables:
+                indexes = {}
+                for _, name, unique, origin, partial in conn.execute(f"PRAGMA index_list('{table}')"):
+                    columns = [row[2] for row in conn.execute(f"PRAGMA index_info('{name}')")]
+                    indexes[name] = {'columns': columns, 'unique': unique, 'origin': origin, 'partial': partial}
+
+                row_count = None
+                for name, info in indexes.items():
+                    # 只评估手动创建的普通索引；唯一约束与主键索引承担约束职责
+                    if info['origin'] != 'c' or info['unique'] or info['partial']:
+                        continue
+
+                    covering = [other for other, other_info in indexes.items()
+                                if other != name and not other_info['partial']
+                                and len(other_info['columns']) > len(info['columns'])
+                                and other_info['columns'][:len(info['columns'])] == info['columns']]
+                    if covering:
+                        advice.append({'index': name, 'table': table, 'reason': 'redundant',
+                                       'detail': f"列 {info['columns']} 是 {covering[0]} 的前缀"})
+                        continue
+
+                    if row_count is None:
+                        row_count = conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+                    if row_count < self.min_rows_for_advice:
+                        continue
+                    # 按索引顺序扫描首列计数不同取值（ANALYZE 采样统计对此不可靠）
+                    column = info['columns'][0]
+                    distinct = conn.execute(f'SELECT COUNT(DISTINCT "{column}") FROM "{table}"').fetchone()[0]
+                    if distinct <= self.max_distinct_for_advice:
+                        advice.append({'index': name, 'table': table, 'reason': 'low_selectivity',
+                                       'detail': f"{row_count} 行，{column} 只有 {distinct} 个非空取值"})
+
+        return advice
@@ -0,0 +1,161 @@
+# 文档批量删除
+# 路径: core/engines/database/document_deleter.py
+# 项目名称: Word Frequency Analysis
+# 作者: Sherryyue
+
+"""
+文档批量删除 - 大规模删除时保持 words 与汇总数据一致
+
+SQLite 默认不启用外键约束，ON DELETE CASCADE 不会生效，直接删除 documents
+会留下孤立的 occurrences 行。删除流程：
+1. 连接启用 PRAGMA foreign_keys = ON（minhash、分析缓存等随文档级联删除）
+2. 按批删除 occurrences（每批单独提交，避免超大事务；触发器同步扣减语料汇总）
+3. 删除文档记录；文档草图在此之前删除，并从语料草图扣减 Count-Min 计数与总数
+   （HyperLogLog 与 top-k 摘要无法扣减，见 SketchStore）
+4. 可选（collect_garbage=True）回收孤立数据：无所属文档的 occurrences、没有任何出现且无个人学习状态的 words。
+   需要扫描全库，且入库时词汇先于其出现记录写入，与入库并发运行可能误删新词，因此默认关闭
+5. 可选 VACUUM / incremental_vacuum 回收磁盘空间（见 DatabaseMaintenance）；IDF 在查询时按文档数计算，不在删除时重算
+"""
+
+import sqlite3
+from typing import Callable, Dict, Iterable, List, Optional
+
+from core.models.schema import ModernSchema
+from .database_maintenance import DatabaseMaintenance
+from .sketch_store import SketchStore
+
+# 进度回调: (已处理行数, 总行数)
+ProgressCallback = Callable[[int, int], None]
+
+
+class DocumentDeleter:
+    """文档批量删除与孤立数据回收"""
+
+    VACUUM_MODES = ('none', 'incremental', 'full')
+
+    def __init__(self, db_path: str = "data/databases/unified.db", batch_size: int = None):
+        from core.utils.config_manager import get_config
+
+        self.db_path = db_path
+        self.batch_size = batch_size or get_config().get('database.delete_batch_size', 5000)
+        self.schema = ModernSchema(db_path)
+
+    @staticmethod
+    def connect(db_path: str) -> sqlite3.Connection:
+        """打开启用外键约束的连接"""
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    # =================== 删除 ===================
+
+    def delete_documents(self, doc_ids: Iterable[str], collect_garbage: bool = False,
+                         vacuum: str = 'none', progress: Optional[ProgressCallback] = None) -> Dict:
+        """删除文档及其词频数据，返回统计信息"""
+        if vacuum not in self.VACUUM_MODES:
+            raise ValueError(f"不支持的 VACUUM 模式: {vacuum}")
+
+        doc_ids = list(dict.fromkeys(doc_ids))
+        stats = {'documents': 0, 'occurrences': 0, 'orphan_occurrences': 0, 'words': 0}
+
+        conn = self.connect(self.db_path)
+        try:
+            # 草图：一次读写语料草图，扣减全部待删文档的贡献
+            conn.execute("BEGIN IMMEDIATE")
+            SketchStore(self.db_path).remove_documents(conn, doc_ids)
+            conn.commit()
+
+            total = self._count_occurrences(conn, doc_ids)
+            for doc_id in doc_ids:
+                stats['occurrences'] += self._delete_occurrences(
+                    conn, "document_id = ?", (doc_id,),
+                    progress=lambda done: progress(stats['occurrences'] + done, total) if progress else None
+                )
+                stats['documents'] += conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,)).rowcount
+                conn.commit()
+
+            if collect_garbage:
+                stats.update(self._collect_garbage(conn))
+            conn.commit()
+        finally:
+            conn.close()
+
+        if vacuum != 'none':
+            stats['vacuum'] = self.vacuum(vacuum)
+        return stats
+
+    def delete_by_type(self, document_type: str, **kwargs) -> Dict:
+        """按类型删除文档"""
+        with sqlite3.connect(self.db_path) as conn:
+            doc_ids = [row[0] for row in conn.execute(
+                "SELECT id FROM documents WHERE document_type = ?", (document_type,)
+            )]
+        return self.delete_documents(doc_ids, **kwargs)
+
+    def collect_garbage(self, words: bool = True) -> Dict:
+        """回收孤立的 occurrences 与 words（分片数据库没有 words 表，words=False）"""
+        conn = self.connect(self.db_path)
+        try:
+            stats = self._collect_garbage(conn, words=words)
+            conn.commit()
+            return stats
+        finally:
+            conn.close()
+
+    def vacuum(self, mode: str = 'full') -> str:
+        """回收空闲页，返回实际执行的模式"""
+        return DatabaseMaintenance(self.db_path).vacuum(mode)['mode']
+
+    # =================== 内部实现 ===================
+
+    def _count_occurrences(self, conn, doc_ids: List[str]) -> int:
+        total = 0
+        for start in range(0, len(doc_ids), 500):
+            chunk = doc_ids[start:start + 500]
+            placeholders = ', '.join('?' for _ in chunk)
+            total += conn.execute(
+                f"SELECT COUNT(*) FROM occurrences WHERE document_id IN ({placeholders})", chunk
+            ).fetchone()[0]
+        return total
+
+    def _delete_occurrences(self, conn, condition: str, params: tuple,
+                            progress: Callable[[int], None] = None) -> int:
+        """按批删除满足条件的 occurrences，每批提交一次"""
+        deleted = 0
+        while True:
+            cursor = conn.execute(f"""
+                DELETE FROM occurrences WHERE rowid IN (
+                    SELECT rowid FROM occurrences WHERE {condition} LIMIT ?
+                )
+            """, params + (self.batch_size,))
+            conn.commit()
+            if cursor.rowcount <= 0:
+                return deleted
+            deleted += cursor.rowcount
+            if progress:
+                progress(deleted)
+
+    def _collect_garbage(self, conn, words: bool = True) -> Dict:
+        # 外键未启用时遗留的孤立词频记录
+        orphan_occurrences = self._delete_occurrences(
+            conn, "NOT EXISTS (SELECT 1 FROM documents d WHERE d.id = occurrences.document_id)", ()
+        )
+        return {'orphan_occurrences': orphan_occurrences,
+                'words': self.collect_orphan_words(conn) if words else 0}
+
+    def collect_orphan_words(self, conn) -> int:
+        """删除没有任何出现、且未设置个人学习状态/笔记的词汇，返回删除数
+
+        conn 上的 occurrences 可以是跨分片的临时视图（见 ShardedDatabase.connect_corpus）
+        """
+        word_ids = [row[0] for row in conn.execute("""
+            SELECT w.id FROM words w
+            WHERE COALESCE(w.personal_status, 'new') = 'new'
+              AND w.personal_notes IS NULL
+              AND NOT EXISTS (SELECT 1 FROM occurrences o WHERE o.word_id = w.id)
+        """)]
+        for start in range(0, len(word_ids), self.batch_size):
+            chunk = word_ids[start:start + self.batch_size]
+            conn.executemany("DELETE FROM words WHERE id = ?", [(word_id,) for word_id in chunk])
+            conn.commit()
+        return len(word_ids)
@@ -0,0 +1,375 @@
+# 入库任务队列
+# 路径: core/engines/database/ingest_queue.py
+# 项目名称: Word Frequency Analysis
+# 作者: Sherryyue
+
+"""
+入库任务队列 - 基于 documents.status 的可恢复批量处理
+
+- enqueue: 目录中的文件作为 pending 文档入队（占位内容哈希 job:<source_key>），
+  source_key 由路径、大小、修改时间计算，未变化的文件不会重复入队或重复处理
+- claim: 单条 UPDATE ... RETURNING 原子领取最早的可处理任务（pending → processing），多个工作进程可同时领取
+- heartbeat / keep_alive: 处理期间定期刷新心跳；心跳超时的 processing 任务视为崩溃遗留，重新排队
+- fail: 按指数退避安排重试，超过最大次数标记为 failed
+- finish: 处理成功后清理任务字段（内容已写入时占位哈希已被替换为真实哈希）
+- 内容与已有文档相同的任务合并到该文档（UnifiedDatabase.attach_content），源文件标识记录在
+  duplicate_sources 表中，同样视为已完成，不会再次入队
+- ShardedIngestQueue: 分片存储时每个分片一个队列，任务按源文件标识分配到分片，
+  工作进程可以只领取某一个分片的任务（text process/resume --shard）
+"""
+
+import hashlib
+import os
+import socket
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from core.utils.helpers import split_archive_member
+
+
+class IngestQueue:
+    """持久化入库任务队列"""
+
+    # 入队文档的占位内容哈希前缀（处理完成后替换为真实内容哈希）
+    PLACEHOLDER_PREFIX = 'job:'
+
+    def __init__(self, db_path: str = "data/databases/unified.db", worker_id: str = None):
+        from core.utils.config_manager import get_config
+
+        config = get_config()
+        self.db_path = db_path
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.max_attempts = config.get('ingest.max_attempts', 3)
+        self.backoff_seconds = config.get('ingest.retry_backoff_seconds', 30)
+        self.backoff_max_seconds = config.get('ingest.retry_backoff_max_seconds', 3600)
+        self.heartbeat_interval = config.get('ingest.heartbeat_interval', 30)
+        self.stale_after = config.get('ingest.stale_after_seconds', 300)
+
+    def _connect(self) -> sqlite3.Connection:
+        # 多个工作进程同时领取任务时等待写锁
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    @staticmethod
+    def source_key(file_path) -> str:
+        """源文件标识：绝对路径 + 大小 + 修改时间（文件被修改后视为新任务）
+
+        归档成员（<归档>!/<成员>）按归档文件计算，再加上成员名
+        """
+        archive, member = split_archive_member(file_path)
+        path = Path(archive).resolve()
+        stat = path.stat()
+        identity = f"{path}|{stat.st_size}|{stat.st_mtime_ns}"
+        if member is not None:
+            identity += f"|{member}"
+        return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+    # =================== 入队与领取 ===================
+
+    def enqueue(self, file_paths: Iterable, document_type: str = 'text') -> Dict:
+        """文件入队，已入队或已处理过的文件跳过，返回 {'queued', 'skipped'}"""
+        rows = []
+        for file_path in file_paths:
+            path = Path(file_path)
+            key = self.source_key(path)
+            # 归档成员的大小在处理时由读取器写入元数据
+            size = None if split_archive_member(path)[1] is not None else path.stat().st_size
+            rows.append((str(uuid.uuid4()), path.name, str(path), self.PLACEHOLDER_PREFIX + key,
+                         size, document_type, key))
+
+        with self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany("""
+                INSERT OR IGNORE INTO documents
+                (id, filename, file_path, content_hash, file_size, status, document_type, source_key)
+                SELECT ?, ?, ?, ?, ?, 'pending', ?, ?7
+                WHERE NOT EXISTS (SELECT 1 FROM duplicate_sources WHERE source_key = ?7)
+            """, rows)
+            queued = conn.total_changes - before
+
+        return {'queued': queued, 'skipped': len(rows) - queued}
+
+    def claim(self) -> Optional[Dict]:
+        """原子领取一个可处理的任务，没有任务时返回 None"""
+        with self._connect() as conn:
+            self._requeue_stale(conn, self.stale_after)
+            rows = conn.execute("""
+                UPDATE documents
+                SET status = 'processing', worker_id = ?, attempts = attempts + 1,
+                    heartbeat_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+                WHERE id = (
+                    SELECT id FROM documents
+                    WHERE status = 'pending' AND source_key IS NOT NULL
+                      AND (next_attempt_at IS NULL OR next_attempt_at <= CURRENT_TIMESTAMP)
+                    ORDER BY created_at, rowid
+                    LIMIT 1
+                )
+                RETURNING id, filename, file_path, attempts
+            """, (self.worker_id,)).fetchall()
+
+        if not rows:
+            return None
+        doc_id, filename, file_path, attempts = rows[0]
+        return {'id': doc_id, 'filename': filename, 'file_path': file_path, 'attempts': attempts}
+
+    def heartbeat(self, doc_id: str):
+        with self._connect() as conn:
+            conn.execute("""
+                UPDATE documents SET heartbeat_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND worker_id = ? AND status = 'processing'
+            """, (doc_id, self.worker_id))
+
+    @contextmanager
+    def keep_alive(self, doc_id: str):
+        """处理期间在后台线程定期发送心跳"""
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(self.heartbeat_interval):
+                try:
+                    self.heartbeat(doc_id)
+                except sqlite3.Error:
+                    pass
+
+        thread = threading.Thread(target=beat, name='ingest-heartbeat', daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    # =================== 完成与失败 ===================
+
+    def finish(self, doc_id: str):
+        """处理成功：清理任务字段"""
+        with self._connect() as conn:
+            conn.execute("""
+                UPDATE documents
+                SET status = 'completed', worker_id = NULL, heartbeat_at = NULL,
+                    next_attempt_at = NULL, last_error = NULL, updated_at = CURRENT_TIMESTAMP,
+                    processed_at = COALESCE(processed_at, CURRENT_TIMESTAMP)
+                WHERE id = ?
+            """, (doc_id,))
+
+    def fail(self, doc_id: str, error: str) -> str:
+        """处理失败：指数退避后重试，超过最大次数标记为 failed，返回新状态"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT attempts FROM documents WHERE id = ?", (doc_id,)).fetchone()
+            attempts = row[0] if row else self.max_attempts
+            if attempts >= self.max_attempts:
+                status, delay = 'failed', None
+            else:
+                status = 'pending'
+                delay = min(self.backoff_max_seconds, self.backoff_seconds * 2 ** (attempts - 1))
+            conn.execute("""
+                UPDATE documents
+                SET status = ?, last_error = ?, worker_id = NULL, heartbeat_at = NULL,
+                    next_attempt_at = CASE WHEN ? IS NULL THEN NULL
+                                           ELSE datetime('now', '+' || ? || ' seconds') END,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (status, str(error)[:1000], delay, delay, doc_id))
+        return status
+
+    def release(self, doc_id: str):
+        """放回队列（被中断时），不计入尝试次数"""
+        with self._connect() as conn:
+            conn.execute("""
+                UPDATE documents
+                SET status = 'pending', attempts = MAX(attempts - 1, 0),
+                    worker_id = NULL, heartbeat_at = NULL
+                WHERE id = ? AND status = 'processing'
+            """, (doc_id,))
+
+    # =================== 恢复与状态 ===================
+
+    def _requeue_stale(self, conn, stale_after: int) -> int:
+        return conn.execute("""
+            UPDATE documents
+            SET status = 'pending', worker_id = NULL, heartbeat_at = NULL
+            WHERE status = 'processing' AND source_key IS NOT NULL
+              AND heartbeat_at <= datetime('now', '-' || ? || ' seconds')
+        """, (int(stale_after),)).rowcount
+
+    def requeue_stale(self, stale_after: int = None) -> int:
+        """心跳超时的处理中任务重新排队（stale_after=0 时回收全部处理中任务）"""
+        with self._connect() as conn:
+            return self._requeue_stale(conn, self.stale_after if stale_after is None else stale_after)
+
+    def retry_failed(self) -> int:
+        """已放弃的失败任务重新排队并重置尝试次数"""
+        with self._connect() as conn:
+            return conn.execute("""
+                UPDATE documents
+                SET status = 'pending', attempts = 0, next_attempt_at = NULL
+                WHERE status = 'failed' AND source_key IS NOT NULL
+            """).rowcount
+
+    def seconds_until_retry(self) -> Optional[float]:
+        """最早一个等待重试的任务还需等待的秒数，没有等待中的任务时返回 None"""
+        with self._connect() as conn:
+            row = conn.execute("""
+                SELECT (julianday(MIN(next_attempt_at)) - julianday('now')) * 86400
+                FROM documents
+                WHERE status = 'pending' AND source_key IS NOT NULL AND next_attempt_at IS NOT NULL
+            """).fetchone()
+        return None if row[0] is None else max(row[0], 0.0)
+
+    def all_completed(self, file_paths: Iterable) -> bool:
+        """给定文件对应的任务是否都已完成"""
+        keys = [self.source_key(path) for path in file_paths]
+        completed = 0
+        with self._connect() as conn:
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ', '.join('?' for _ in batch)
+                completed += conn.execute(f"""
+                    SELECT (SELECT COUNT(*) FROM documents
+                            WHERE source_key IN ({placeholders}) AND status = 'completed')
+                         + (SELECT COUNT(*) FROM duplicate_sources WHERE source_key IN ({placeholders}))
+                """, batch + batch).fetchone()[0]
+        return completed == len(keys)
+
+    def status(self) -> Dict:
+        """各状态的任务数（合并到已有文档的重复内容任务计为已完成）"""
+        with self._connect() as conn:
+            counts = dict(conn.execute("""
+                SELECT status, COUNT(*) FROM documents
+                WHERE source_key IS NOT NULL
+                GROUP BY status
+            """).fetchall())
+            counts['completed'] = counts.get('completed', 0) + conn.execute(
+                "SELECT COUNT(*) FROM duplicate_sources"
+            ).fetchone()[0]
+        return {status: counts.get(status, 0) for status in ('pending', 'processing', 'completed', 'failed')}
+
+    def failed_jobs(self, limit: int = 20) -> List[Dict]:
+        with self._connect() as conn:
+            rows = conn.execute("""
+                SELECT id, file_path, attempts, last_error FROM documents
+                WHERE status = 'failed' AND source_key IS NOT NULL
+                ORDER BY updated_at DESC
+                LIMIT ?
+            """, (limit,)).fetchall()
+        return [{'id': doc_id, 'file_path': file_path, 'attempts': attempts, 'last_error': error}
+                for doc_id, file_path, attempts, error in rows]
+
+
+class ShardedIngestQueue:
+    """分片存储的入库队列：每个分片一个 IngestQueue，任务按源文件标识分配到分片
+
+    任务文档留在所在分片（内容写入后不再按内容哈希迁移），只处理一个分片的工作进程只写该分片，
+    多个工作进程按分片并行处理时分片之间没有写锁竞争（见 ShardedDatabase）。
+    接口与 IngestQueue 相同；shard 为 None 时领取全部分片的任务。
+    """
+
+    def __init__(self, shard_paths: List[str], worker_id: str = None, shard: int = None):
+        if shard is not None and not 0 <= shard < len(shard_paths):
+            raise ValueError(f"分片序号必须在 0 到 {len(shard_paths) - 1} 之间: {shard}")
+        self.queues = [IngestQueue(path, worker_id) for path in shard_paths]
+        self.shard = shard
+        # 本进程领取的任务 -> 所在分片队列
+        self._claimed: Dict[str, IngestQueue] = {}
+        self._next = 0
+
+    @property
+    def owned(self) -> List[IngestQueue]:
+        """本工作进程负责的分片队列"""
+        return self.queues if self.shard is None else [self.queues[self.shard]]
+
+    def shard_of(self, file_path) -> int:
+        """源文件所在的分片序号（与 ShardedDatabase.shard_index 相同，按源文件标识取模）"""
+        return int(IngestQueue.source_key(file_path)[:8], 16) % len(self.queues)
+
+    def _group(self, file_paths: Iterable) -> Dict[int, List]:
+        groups: Dict[int, List] = {}
+        for file_path in file_paths:
+            groups.setdefault(self.shard_of(file_path), []).append(file_path)
+        return groups
+
+    def _queue_of(self, doc_id: str) -> IngestQueue:
+        queue = self._claimed.get(doc_id)
+        if queue is not None:
+            return queue
+        for queue in self.queues:
+            with queue._connect() as conn:
+                if conn.execute("SELECT 1 FROM documents WHERE id = ?", (doc_id,)).fetchone():
+                    return queue
+        raise ValueError(f"任务不存在: {doc_id}")
+
+    # =================== 入队与领取 ===================
+
+    def enqueue(self, file_paths: Iterable, document_type: str = 'text') -> Dict:
+        """文件按源文件标识分配到各分片入队（不限于本进程负责的分片）"""
+        result = {'queued': 0, 'skipped': 0}
+        for index, paths in self._group(file_paths).items():
+            counts = self.queues[index].enqueue(paths, document_type)
+            result['queued'] += counts['queued']
+            result['skipped'] += counts['skipped']
+        return result
+
+    def claim(self) -> Optional[Dict]:
+        """从负责的分片中轮流领取任务，返回的任务带有分片序号 shard"""
+        owned = self.owned
+        for offset in range(len(owned)):
+            position = (self._next + offset) % len(owned)
+            job = owned[position].claim()
+            if job is not None:
+                self._next = position + 1
+                self._claimed[job['id']] = owned[position]
+                job['shard'] = self.queues.index(owned[position])
+                return job
+        return None
+
+    def keep_alive(self, doc_id: str):
+        return self._queue_of(doc_id).keep_alive(doc_id)
+
+    # =================== 完成与失败 ===================
+
+    def finish(self, doc_id: str):
+        self._queue_of(doc_id).finish(doc_id)
+        self._claimed.pop(doc_id, None)
+
+    def fail(self, doc_id: str, error: str) -> str:
+        status = self._queue_of(doc_id).fail(doc_id, error)
+        self._claimed.pop(doc_id, None)
+        return status
+
+    def release(self, doc_id: str):
+        self._queue_of(doc_id).release(doc_id)
+        self._claimed.pop(doc_id, None)
+
+    # =================== 恢复与状态（只涉及负责的分片） ===================
+
+    def requeue_stale(self, stale_after: int = None) -> int:
+        return sum(queue.requeue_stale(stale_after) for queue in self.owned)
+
+    def retry_failed(self) -> int:
+        return sum(queue.retry_failed() for queue in self.owned)
+
+    def seconds_until_retry(self) -> Optional[float]:
+        delays = [delay for delay in (queue.seconds_until_retry() for queue in self.owned) if delay is not None]
+        return min(delays) if delays else None
+
+    def all_completed(self, file_paths: Iterable) -> bool:
+        """给定文件对应的任务是否都已完成（文件可能分布在任意分片）"""
+        return all(self.queues[index].all_completed(paths) for index, paths in self._group(file_paths).items())
+
+    def status(self) -> Dict:
+        counts = {'pending': 0, 'processing': 0, 'completed': 0, 'failed': 0}
+        for queue in self.owned:
+            for status, count in queue.status().items():
+                counts[status] += count
+        return counts
+
+    def failed_jobs(self, limit: int = 20) -> List[Dict]:
+        jobs = []
+        for queue in self.owned:
+            jobs.extend(queue.failed_jobs(limit - len(jobs)))
+            if len(jobs) >= limit:
+                break
+        return jobs
@@ -0,0 +1,167 @@
+# 近似重复文档索引
+# 路径: core/engines/database/near_duplicate_index.py
+# 项目名称: Word Frequency Analysis
+# 作者: Sherryyue
+
+"""
+近似重复文档索引 - MinHash 签名 + LSH 分段
+
+内容哈希只能识别逐字节相同的文档；同一本书的 PDF/DOCX 版本或重新排版的副本
+会被重复存储、重复计数。入库前用 LSH 查找候选，签名相似度达到阈值即标记为
+近似重复（可配置为直接跳过存储）。
+"""
+
+import sqlite3
+from typing import Dict, List, Mapping, Optional
+
+import numpy as np
+
+from core.engines.vocabulary.minhash import MinHasher
+
+
+class NearDuplicateIndex:
+    """文档 MinHash 签名与 LSH 分段索引"""
+
+    def __init__(self, db_path: str = "data/databases/unified.db", threshold: float = None,
+                 num_perm: int = None, bands: int = None, enabled: Optional[bool] = None):
+        from core.utils.config_manager import get_config
+
+        config = get_config()
+        self.db_path = db_path
+        self.enabled = enabled if enabled is not None else bool(config.get('dedup.enabled', True))
+        self.skip_duplicates = bool(config.get('dedup.skip_near_duplicates', False))
+        self.threshold = threshold or config.get('dedup.threshold', 0.8)
+        self.bands = bands or config.get('dedup.bands', 32)
+        self.hasher = MinHasher(num_perm or config.get('dedup.num_perm', 128))
+
+        if self.hasher.num_perm % self.bands:
+            raise ValueError(f"签名长度 {self.hasher.num_perm} 不能被分段数 {self.bands} 整除")
+
+    def signature(self, word_frequencies: Mapping[str, int]) -> np.ndarray:
+        return self.hasher.signature(word_frequencies)
+
+    # =================== 入库 ===================
+
+    def add(self, doc_id: str, signature: np.ndarray, conn: sqlite3.Connection = None):
+        """保存文档签名及其 LSH 分段"""
+        if conn is None:
+            with sqlite3.connect(self.db_path) as conn:
+                return self.add(doc_id, signature, conn)
+
+        conn.execute("DELETE FROM minhash_bands WHERE document_id = ?", (doc_id,))
+        conn.execute("""
+            INSERT OR REPLACE INTO document_minhash (document_id, signature, num_perm)
+            VALUES (?, ?, ?)
+        """, (doc_id, MinHasher.to_bytes(signature), len(signature)))
+        conn.executemany("""
+            INSERT OR IGNORE INTO minhash_bands (band, bucket, document_id) VALUES (?, ?, ?)
+        """, [(band, key, doc_id) for band, key in enumerate(MinHasher.band_keys(signature, self.bands))])
+
+    def backfill(self) -> int:
+        """为尚无签名的已有文档计算签名（基于存储的词频），返回处理的文档数"""
+        with sqlite3.connect(self.db_path) as conn:
+            doc_ids = [row[0] for row in conn.execute("""
+                SELECT d.id FROM documents d
+                WHERE NOT EXISTS (SELECT 1 FROM document_minhash m WHERE m.document_id = d.id)
+                  AND EXISTS (SELECT 1 FROM occurrences o WHERE o.document_id = d.id)
+            """)]
+
+            for doc_id in doc_ids:
+                frequencies = dict(conn.execute("""
+                    SELECT w.surface_form, o.frequency
+                    FROM occurrences o JOIN words w ON o.word_id = w.id
+                    WHERE o.document_id = ?
+                """, (doc_id,)).fetchall())
+                self.add(doc_id, self.signature(frequencies), conn)
+
+        return len(doc_ids)
+
+    # =================== 查询 ===================
+
+    def find_duplicates(self, signature: np.ndarray, exclude: str = None) -> List[Dict]:
+        """查找与签名近似重复的已入库文档，按相似度降序"""
+        keys = MinHasher.band_keys(signature, self.bands)
+        pairs = ', '.join('(?, ?)' for _ in keys)
+        params = [value for band, key in enumerate(keys) for value in (band, key)]
+
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(f"""
+                SELECT m.document_id, m.signature, d.filename
+                FROM document_minhash m
+                JOIN documents d ON d.id = m.document_id
+                WHERE m.document_id IN (
+                    SELECT document_id FROM minhash_bands WHERE (band, bucket) IN (VALUES {pairs})
+                )
+            """, params).fetchall()
+
+        duplicates = []
+        for doc_id, data, filename in rows:
+            if doc_id == exclude:
+                continue
+            similarity = MinHasher.jaccard(signature, MinHasher.from_bytes(data))
+            if similarity >= self.threshold:
+                duplicates.append({'document_id': doc_id, 'filename': filename, 'similarity': similarity})
+
+        return sorted(duplicates, key=lambda item: item['similarity'], reverse=True)
+
+    def clusters(self) -> List[List[Dict]]:
+        """对整个语料做近似重复聚类（LSH 同桶候选 + 签名复核 + 并查集）"""
+        with sqlite3.connect(self.db_path) as conn:
+            buckets = conn.execute("""
+                SELECT GROUP_CONCAT(document_id, ' ')
+                FROM minhash_bands
+                GROUP BY band, bucket
+                HAVING COUNT(*) > 1
+            """).fetchall()
+
+            candidates = {doc_id for (members,) in buckets for doc_id in members.split(' ')}
+            if not candidates:
+                return []
+
+            placeholders = ', '.join('?' for _ in candidates)
+            info = {
+                doc_id: (MinHasher.from_bytes(data), filename)
+                for doc_id, data, filename in conn.execute(f"""
+                    SELECT m.document_id, m.signature, d.filename
+                    FROM document_minhash m JOIN documents d ON d.id = m.document_id
+                    WHERE m.document_id IN ({placeholders})
+                """, list(candidates))
+            }
+
+        parent = {doc_id: doc_id for doc_id in info}
+
+        def find(doc_id):
+            while parent[doc_id] != doc_id:
+                parent[doc_id] = parent[parent[doc_id]]
+                doc_id = parent[doc_id]
+            return doc_id
+
+        checked = set()
+        for (members,) in buckets:
+            members = [doc_id for doc_id in members.split(' ') if doc_id in info]
+            for i, first in enumerate(members):
+                for second in members[i + 1:]:
+                    pair = (first, second) if first < second else (second, first)
+                    if pair in checked:
+                        continue
+                    checked.add(pair)
+                    if MinHasher.jaccard(info[first][0], info[second][0]) >= self.threshold:
+                        parent[find(first)] = find(second)
+
+        groups: Dict[str, List[str]] = {}
+        for doc_id in info:
+            groups.setdefault(find(doc_id), []).append(doc_id)
+
+        clusters = []
+        for members in groups.values():
+            if len(members) < 2:
+                continue
+            members.sort(key=lambda doc_id: info[doc_id][1])
+            representative = info[members[0]][0]
+            clusters.append([
+                {'document_id': doc_id, 'filename': info[doc_id][1],
+                 'similarity': MinHasher.jaccard(representative, info[doc_id][0])}
+                for doc_id in members
+            ])
+
+        return sorted(clusters, key=len, reverse=True)
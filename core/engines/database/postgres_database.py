@@ -0,0 +1,512 @@
+# PostgreSQL 存储后端
+# 路径: core/engines/database/postgres_database.py
+# 项目名称: Word Frequency Analysis
+# 作者: Sherryyue
+
+"""
+PostgreSQL 存储后端 - 多写入者并发入库
+
+与 SQLite 实现（UnifiedDatabase）的差异：
+- 连接池（psycopg_pool）：多个线程/进程同时入库，不受 SQLite 单写入者锁限制
+- COPY 批量写入 words 与 occurrences：新词先 COPY 进临时表，再按词根排序
+  INSERT ... ON CONFLICT (lemma) DO NOTHING，并发写入者插入相同词汇时不会互相死锁
+- words 以 lemma 唯一（SQLite 版本按词根查找去重，这里由唯一约束保证）
+- corpus_word_stats 为物化视图：写入时不维护热点汇总行，写入后标记过期，
+  查询前（或显式调用 refresh_corpus_stats）并发刷新
+
+依赖 psycopg 3（pip install "psycopg[binary,pool]"），未安装时构造时报错。
+"""
+
+import json
+import os
+from typing import Dict, List, Optional
+
+from .storage_backend import StorageBackend
+
+
+class PostgresDatabase(StorageBackend):
+    """PostgreSQL 存储后端"""
+
+    backend_name = 'postgresql'
+
+    VACUUM_MODES = ('none', 'incremental', 'full')
+
+    # 建表时持有的咨询锁，避免多个进程同时初始化架构
+    SCHEMA_LOCK_ID = 7_301_045
+
+    # words 表写入列（COPY 顺序）
+    WORD_COLUMNS = ('id', 'surface_form', 'lemma', 'normalized_form', 'linguistic_features',
+                    'pos_tag', 'pos_type', 'morph_complexity', 'morph_prefix', 'morph_suffix',
+                    'dictionary_id', 'dictionary_found', 'dictionary_rank', 'difficulty_level')
+
+    OCCURRENCE_COLUMNS = ('document_id', 'word_id', 'frequency', 'tf_score',
+                          'positions', 'first_position', 'last_position')
+
+    # 与 SQLite 返回格式一致：元数据为 JSON 字符串，时间为文本
+    DOCUMENT_COLUMNS = """
+        id, filename, file_path, content_hash, file_size, status, document_type,
+        metadata::text AS metadata, processed_at::text AS processed_at,
+        created_at::text AS created_at, updated_at::text AS updated_at
+    """
+
+    def __init__(self, dsn: str, schema: str = None, min_size: int = 1, max_size: int = 8):
+        try:
+            import psycopg
+            from psycopg_pool import ConnectionPool
+        except ImportError as e:
+            raise RuntimeError(f"PostgreSQL 后端需要安装 psycopg[binary,pool]: {e}")
+
+        self._psycopg = psycopg
+        self.dsn = dsn
+        self.schema = schema
+        # SQLite 专用组件（草图、近似重复索引等）按路径定位数据库，这里没有对应文件
+        self.db_path = None
+        self._stats_stale = True
+
+        connect_kwargs = {}
+        if schema:
+            self._create_schema(schema)
+            connect_kwargs['options'] = f"-c search_path={schema}"
+        self.pool = ConnectionPool(dsn, min_size=min_size, max_size=max_size,
+                                   kwargs=connect_kwargs, open=True)
+        self.create_tables()
+
+    @classmethod
+    def from_config(cls) -> 'PostgresDatabase':
+        """按配置创建：database.dsn / DATABASE_URL 优先，否则由 host/port/username/password/database 组装"""
+        from core.utils.config_manager import get_config
+
+        config = get_config()
+        return cls(
+            cls.build_dsn(config.get('database', {})),
+            schema=config.get('database.postgresql.schema') or None,
+            min_size=config.get('database.postgresql.pool_min_size', 1),
+            max_size=config.get('database.postgresql.pool_max_size', 8),
+        )
+
+    @staticmethod
+    def build_dsn(settings: Dict) -> str:
+        """由数据库配置组装 libpq 连接串"""
+        dsn = settings.get('dsn') or os.environ.get('DATABASE_URL')
+        if dsn:
+            return dsn
+
+        keys = {'host': 'host', 'port': 'port', 'user': 'username',
+                'password': 'password', 'dbname': 'database'}
+        parts = []
+        for key, setting in keys.items():
+            value = settings.get(setting)
+            # 未展开的 ${VAR} 占位符视为未配置
+            if value in (None, '') or str(value).startswith('${'):
+                continue
+            value = str(value).replace('\\', '\\\\').replace("'", "\\'")
+            parts.append(f"{key}='{value}'")
+        return ' '.join(parts)
+
+    def close(self):
+        self.pool.close()
+
+    # =================== 架构 ===================
+
+    def _create_schema(self, schema: str):
+        from psycopg import sql
+
+        with self._psycopg.connect(self.dsn, autocommit=True) as conn:
+            conn.execute(sql.SQL("CREATE SCHEMA IF NOT EXISTS {}").format(sql.Identifier(schema)))
+
+    def create_tables(self):
+        with self.pool.connection() as conn:
+            conn.execute("SELECT pg_advisory_xact_lock(%s)", (self.SCHEMA_LOCK_ID,))
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    id TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL,
+                    file_path TEXT,
+                    content_hash TEXT UNIQUE NOT NULL,
+                    file_size BIGINT,
+                    status TEXT DEFAULT 'pending',
+                    document_type TEXT DEFAULT 'text',
+                    metadata JSONB,
+                    processed_at TIMESTAMPTZ,
+                    created_at TIMESTAMPTZ DEFAULT now(),
+                    updated_at TIMESTAMPTZ DEFAULT now()
+                )
+            """)
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS common_dictionary (
+                    id TEXT PRIMARY KEY,
+                    word TEXT NOT NULL,
+                    lemma TEXT NOT NULL,
+                    pos_primary TEXT NOT NULL,
+                    definition TEXT,
+                    frequency_rank INTEGER,
+                    difficulty_level INTEGER,
+                    common_forms TEXT,
+                    source_data JSONB,
+                    created_at TIMESTAMPTZ DEFAULT now(),
+                    UNIQUE (word, pos_primary)
+                )
+            """)
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS words (
+                    id TEXT PRIMARY KEY,
+                    surface_form TEXT NOT NULL,
+                    lemma TEXT NOT NULL UNIQUE,             -- 按词根去重（并发插入的冲突目标）
+                    stem TEXT,
+                    normalized_form TEXT,
+                    idf_score DOUBLE PRECISION DEFAULT 0.0,
+                    linguistic_features JSONB,
+                    pos_tag TEXT,
+                    pos_type TEXT,
+                    morph_complexity TEXT,
+                    morph_prefix TEXT,
+                    morph_suffix TEXT,
+                    dictionary_id TEXT REFERENCES common_dictionary(id) ON DELETE SET NULL,
+                    dictionary_found BOOLEAN DEFAULT FALSE,
+                    dictionary_rank INTEGER,
+                    difficulty_level INTEGER,
+                    personal_status TEXT CHECK (personal_status IN ('new', 'learn', 'know', 'master')) DEFAULT 'new',
+                    personal_notes TEXT,
+                    status_updated_at TIMESTAMPTZ,
+                    created_at TIMESTAMPTZ DEFAULT now()
+                )
+            """)
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS occurrences (
+                    document_id TEXT REFERENCES documents(id) ON DELETE CASCADE,
+                    word_id TEXT REFERENCES words(id) ON DELETE CASCADE,
+                    frequency INTEGER NOT NULL DEFAULT 1,
+                    tf_score DOUBLE PRECISION DEFAULT 0.0,
+                    positions JSONB,
+                    first_position INTEGER,
+                    last_position INTEGER,
+                    indexed_at TIMESTAMPTZ DEFAULT now(),
+                    PRIMARY KEY (document_id, word_id)
+                )
+            """)
+
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_occurrences_word ON occurrences(word_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_type ON documents(document_type)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_common_dictionary_lemma ON common_dictionary(lemma)")
+
+            # 语料级汇总：物化视图，避免每次写入都更新同一批热点汇总行
+            # IDF 的文档总数只计已完成的文档，与 SQLite 后端（CORPUS_DOCUMENT_FILTER）一致；
+            # 旧版视图按全部文档计数，定义不同时重建
+            definition = conn.execute(
+                "SELECT definition FROM pg_matviews WHERE matviewname = 'corpus_word_stats' "
+                "AND schemaname = current_schema()"
+            ).fetchone()
+            if definition and 'completed' not in definition[0]:
+                conn.execute("DROP MATERIALIZED VIEW corpus_word_stats")
+            conn.execute("""
+                CREATE MATERIALIZED VIEW IF NOT EXISTS corpus_word_stats AS
+                SELECT o.word_id,
+                       SUM(o.frequency)::BIGINT AS total_frequency,
+                       COUNT(*)::BIGINT AS document_frequency,
+                       LN(GREATEST(d.total, COUNT(*))::DOUBLE PRECISION / COUNT(*)) AS idf
+                FROM occurrences o
+                CROSS JOIN (SELECT COUNT(*) AS total FROM documents WHERE status = 'completed') d
+                GROUP BY o.word_id, d.total
+            """)
+            # 唯一索引是 REFRESH ... CONCURRENTLY 的前提（刷新时不阻塞读取）
+            conn.execute("""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_corpus_word_stats_word
+                ON corpus_word_stats(word_id)
+            """)
+
+    # =================== 文档管理 ===================
+
+    def add_document(self, filename: str, content: str, file_path: str = None,
+                     document_type: str = 'text', metadata: Dict = None) -> str:
+        """添加文档到数据库"""
+        doc_id = self._generate_uuid()
+        content_hash = self._calculate_content_hash(content)
+        file_size = len(content.encode('utf-8'))
+
+        doc_metadata = metadata or {}
+        doc_metadata.update({
+            'file_size': file_size,
+            'word_count': len(content.split()) if document_type == 'text' else 0
+        })
+
+        with self.pool.connection() as conn:
+            # 唯一约束判重：并发添加相同内容时只有一个写入者成功
+            row = conn.execute("""
+                INSERT INTO documents
+                (id, filename, file_path, content_hash, file_size, status, document_type, metadata)
+                VALUES (%s, %s, %s, %s, %s, 'pending', %s, %s::jsonb)
+                ON CONFLICT (content_hash) DO NOTHING
+                RETURNING id
+            """, (doc_id, filename, file_path, content_hash, file_size,
+                  document_type, json.dumps(doc_metadata))).fetchone()
+
+            if row is None:
+                existing_id, existing_name = conn.execute(
+                    "SELECT id, filename FROM documents WHERE content_hash = %s", (content_hash,)
+                ).fetchone()
+                print(f"文档已存在: {existing_name}")
+                return existing_id
+
+        self._stats_stale = True
+        print(f"✅ 文档已添加: {filename} (ID: {doc_id[:8]}...)")
+        return doc_id
+
+    def update_document_status(self, doc_id: str, status: str, metadata: Dict = None):
+        """更新文档状态和元数据"""
+        with self.pool.connection() as conn:
+            conn.execute("""
+                UPDATE documents
+                SET status = %s, metadata = COALESCE(%s::jsonb, metadata), updated_at = now(),
+                    processed_at = CASE WHEN %s = 'completed' THEN now() ELSE processed_at END
+                WHERE id = %s
+            """, (status, json.dumps(metadata) if metadata else None, status, doc_id))
+        # IDF 的文档总数随完成状态变化
+        self._stats_stale = True
+
+    def get_document_by_hash(self, content_hash: str) -> Optional[Dict]:
+        """根据内容哈希获取文档"""
+        from psycopg.rows import dict_row
+
+        with self.pool.connection() as conn:
+            cursor = conn.cursor(row_factory=dict_row)
+            return cursor.execute(
+                f"SELECT {self.DOCUMENT_COLUMNS} FROM documents WHERE content_hash = %s", (content_hash,)
+            ).fetchone()
+
+    def get_all_documents(self, document_type: str = None) -> List[Dict]:
+        """获取所有文档"""
+        from psycopg.rows import dict_row
+
+        with self.pool.connection() as conn:
+            cursor = conn.cursor(row_factory=dict_row)
+            if document_type:
+                cursor.execute(f"""
+                    SELECT {self.DOCUMENT_COLUMNS} FROM documents WHERE document_type = %s
+                    ORDER BY created_at DESC
+                """, (document_type,))
+            else:
+                cursor.execute(f"SELECT {self.DOCUMENT_COLUMNS} FROM documents ORDER BY created_at DESC")
+            return cursor.fetchall()
+
+    def delete_documents(self, doc_ids: List[str], collect_garbage: bool = False,
+                         vacuum: str = 'none', progress=None) -> Dict:
+        """批量删除文档（occurrences 由外键级联删除），返回统计信息"""
+        if vacuum not in self.VACUUM_MODES:
+            raise ValueError(f"不支持的 VACUUM 模式: {vacuum}")
+
+        doc_ids = list(dict.fromkeys(doc_ids))
+        stats = {'documents': 0, 'occurrences': 0, 'orphan_occurrences': 0, 'words': 0}
+
+        with self.pool.connection() as conn:
+            total = conn.execute(
+                "SELECT COUNT(*) FROM occurrences WHERE document_id = ANY(%s)", (doc_ids,)
+            ).fetchone()[0]
+            # 每个文档单独提交，避免超大事务
+            for doc_id in doc_ids:
+                stats['occurrences'] += conn.execute(
+                    "DELETE FROM occurrences WHERE document_id = %s", (doc_id,)
+                ).rowcount
+                stats['documents'] += conn.execute(
+                    "DELETE FROM documents WHERE id = %s", (doc_id,)
+                ).rowcount
+                conn.commit()
+                if progress:
+                    progress(stats['occurrences'], total)
+
+            if collect_garbage:
+                stats['words'] = conn.execute("""
+                    DELETE FROM words w
+                    WHERE COALESCE(w.personal_status, 'new') = 'new'
+                      AND w.personal_notes IS NULL
+                      AND NOT EXISTS (SELECT 1 FROM occurrences o WHERE o.word_id = w.id)
+                """).rowcount
+
+        self._stats_stale = True
+        if vacuum != 'none':
+            stats['vacuum'] = self.vacuum(vacuum)
+        return stats
+
+    def vacuum(self, mode: str = 'incremental') -> str:
+        """incremental 执行普通 VACUUM（回收死元组供复用），full 执行 VACUUM FULL（重写表并归还磁盘）"""
+        statement = 'VACUUM (ANALYZE)' if mode == 'incremental' else 'VACUUM (FULL, ANALYZE)'
+        with self.pool.connection() as conn:
+            # VACUUM 不能在事务中执行
+            conn.autocommit = True
+            try:
+                for table in ('occurrences', 'words', 'documents'):
+                    conn.execute(f"{statement} {table}")
+            finally:
+                conn.autocommit = False
+        return mode
+
+    # =================== 词频管理 ===================
+
+    def store_word_frequencies(self, doc_id: str, word_frequencies: Dict[str, int],
+                               word_positions: Dict[str, List[int]] = None,
+                               context_text: str = None):
+        """存储文档词频：同一词根的表面形式合并为一条词汇记录，COPY 批量写入"""
+        if not word_frequencies:
+            return
+
+        records = {}
+        for word, frequency in word_frequencies.items():
+            lemma = self._get_word_lemma(word)
+            record = records.get(lemma)
+            if record is None:
+                record = records[lemma] = {'surface_form': word, 'frequency': 0, 'positions': set()}
+            elif word.lower() == lemma and record['surface_form'].lower() != lemma:
+                # 优先使用与词根一致的表面形式
+                record['surface_form'] = word
+            record['frequency'] += frequency
+            if word_positions:
+                record['positions'].update(word_positions.get(word, []))
+
+        total_words = sum(record['frequency'] for record in records.values())
+
+        with self.pool.connection() as conn:
+            word_ids = self._ensure_words(conn, records, context_text)
+
+            with conn.cursor() as cursor:
+                # 替换该文档已有的词频数据
+                cursor.execute("DELETE FROM occurrences WHERE document_id = %s", (doc_id,))
+                with cursor.copy(f"COPY occurrences ({', '.join(self.OCCURRENCE_COLUMNS)}) FROM STDIN") as copy:
+                    for lemma, record in records.items():
+                        positions = sorted(record['positions'])
+                        copy.write_row((
+                            doc_id, word_ids[lemma], record['frequency'],
+                            record['frequency'] / total_words,
+                            json.dumps(positions) if positions else None,
+                            positions[0] if positions else None,
+                            positions[-1] if positions else None
+                        ))
+
+        self._stats_stale = True
+        print(f"✅ 存储了 {len(word_frequencies)} 个原始词汇的频率数据")
+
+    def _ensure_words(self, conn, records: Dict[str, Dict], context_text: str = None) -> Dict[str, str]:
+        """返回 {词根: 词汇ID}，缺失的词汇经临时表 COPY 后批量插入"""
+        lemmas = list(records)
+        word_ids = dict(conn.execute(
+            "SELECT lemma, id FROM words WHERE lemma = ANY(%s)", (lemmas,)
+        ).fetchall())
+
+        missing = [lemma for lemma in lemmas if lemma not in word_ids]
+        if not missing:
+            return word_ids
+
+        from core.models.schema import ModernSchema
+
+        surfaces = {lemma: records[lemma]['surface_form'] for lemma in missing}
+        matches = self._match_dictionary_words(conn, set(missing) | {s.lower() for s in surfaces.values()})
+
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS words_staging
+                (LIKE words INCLUDING DEFAULTS) ON COMMIT DELETE ROWS
+            """)
+            with cursor.copy(f"COPY words_staging ({', '.join(self.WORD_COLUMNS)}) FROM STDIN") as copy:
+                for lemma, surface_form in surfaces.items():
+                    features = self._analyze_linguistic_features(surface_form, context_text)
+                    match = matches.get(lemma) or matches.get(surface_form.lower())
+                    copy.write_row((
+                        self._generate_uuid(), surface_form, lemma, self._normalize_word(surface_form),
+                        json.dumps(features) if features else None,
+                        *ModernSchema.linguistic_column_values(features),
+                        match['id'] if match else None,
+                        bool(match),
+                        match['frequency_rank'] if match else None,
+                        match['difficulty_level'] if match else None
+                    ))
+
+            # 按词根排序插入：并发写入者以相同顺序等待唯一索引冲突，不会形成死锁
+            cursor.execute(f"""
+                INSERT INTO words ({', '.join(self.WORD_COLUMNS)})
+                SELECT {', '.join(self.WORD_COLUMNS)} FROM words_staging ORDER BY lemma
+                ON CONFLICT (lemma) DO NOTHING
+            """)
+
+        # 其他写入者可能先插入了相同词根，重新读取实际ID
+        word_ids.update(conn.execute(
+            "SELECT lemma, id FROM words WHERE lemma = ANY(%s)", (missing,)
+        ).fetchall())
+        return word_ids
+
+    def _match_dictionary_words(self, conn, keys) -> Dict[str, Dict]:
+        """批量字典匹配：按词形或词根匹配，取词频排名最高的词条"""
+        keys = list(keys)
+        rows = conn.execute("""
+            SELECT DISTINCT ON (m.key) m.key, m.id, m.frequency_rank, m.difficulty_level
+            FROM (
+                SELECT word AS key, id, frequency_rank, difficulty_level
+                FROM common_dictionary WHERE word = ANY(%s)
+                UNION ALL
+                SELECT lemma AS key, id, frequency_rank, difficulty_level
+                FROM common_dictionary WHERE lemma = ANY(%s)
+            ) m
+            ORDER BY m.key, m.frequency_rank ASC NULLS LAST
+        """, (keys, keys)).fetchall()
+        return {key: {'id': dict_id, 'frequency_rank': rank, 'difficulty_level': level}
+                for key, dict_id, rank, level in rows}
+
+    def get_document_word_frequencies(self, doc_id: str) -> Dict[str, int]:
+        """获取文档词频 {表面形式: 频率}"""
+        with self.pool.connection() as conn:
+            return dict(conn.execute("""
+                SELECT w.surface_form, o.frequency
+                FROM occurrences o
+                JOIN words w ON w.id = o.word_id
+                WHERE o.document_id = %s
+            """, (doc_id,)).fetchall())
+
+    # =================== 语料查询 ===================
+
+    def refresh_corpus_stats(self):
+        """并发刷新语料汇总物化视图（刷新期间读取不受影响）"""
+        with self.pool.connection() as conn:
+            conn.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY corpus_word_stats")
+        self._stats_stale = False
+
+    def get_corpus_top_words(self, limit: int = 20, min_frequency: int = 1,
+                             order_by: str = 'total_frequency') -> List[Dict]:
+        """从语料汇总视图读取全局高频词（含文档频率与IDF）"""
+        from psycopg.rows import dict_row
+
+        if order_by not in ('total_frequency', 'document_frequency'):
+            raise ValueError(f"不支持的排序字段: {order_by}")
+
+        # 本实例写入过数据时先刷新；其他进程的写入在下次刷新后可见
+        if self._stats_stale:
+            self.refresh_corpus_stats()
+
+        with self.pool.connection() as conn:
+            cursor = conn.cursor(row_factory=dict_row)
+            return cursor.execute(f"""
+                SELECT w.surface_form, w.lemma, s.total_frequency, s.document_frequency, s.idf
+                FROM corpus_word_stats s
+                JOIN words w ON w.id = s.word_id
+                WHERE s.total_frequency >= %s
+                ORDER BY s.{order_by} DESC
+                LIMIT %s
+            """, (min_frequency, limit)).fetchall()
+
+    def get_database_stats(self) -> Dict:
+        """获取数据库统计信息"""
+        stats = {}
+        with self.pool.connection() as conn:
+            for table in ('documents', 'common_dictionary', 'words', 'occurrences'):
+                stats[f'{table}_count'] = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            stats['wordlists_count'] = 0
+            stats['dictionary_count'] = stats['common_dictionary_count']
+            stats['dictionary_matched_words'] = conn.execute(
+                "SELECT COUNT(*) FROM words WHERE dictionary_found"
+            ).fetchone()[0]
+            stats['personal_status'] = dict(conn.execute("""
+                SELECT personal_status, COUNT(*) FROM words
+                WHERE personal_status IS NOT NULL
+                GROUP BY personal_status
+            """).fetchall())
+        return stats
@@ -0,0 +1,212 @@
+# 分析结果缓存
+# 路径: core/engines/database/result_cache.py
+# 项目名称: Word Frequency Analysis
+# 作者: Sherryyue
+
+"""
+分析结果缓存 - 基于 analysis_results 表的通用记忆化层
+
+缓存条目以 (分析类型, 参数) 的哈希为键，并记录计算时的数据版本戳：
+- 数据版本戳按依赖范围计算（documents / wordlists / words），
+  底层文档、词汇表或学习状态变化后，旧条目自动失效
+- 条目带 TTL（performance.cache_ttl），过期后不再命中
+- 条目总数超过 performance.cache_max_entries 时按最近访问时间淘汰
+"""
+
+import hashlib
+import json
+import sqlite3
+import uuid
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+# 各依赖范围的版本戳查询：数量 + 最大rowid + 最近修改时间
+_SCOPE_QUERIES = {
+    'documents': """
+        SELECT COUNT(*), MAX(rowid), MAX(updated_at) FROM documents
+    """,
+    'wordlists': """
+        SELECT (SELECT COUNT(*) FROM wordlists),
+               (SELECT SUM(word_count) FROM wordlists),
+               (SELECT COUNT(*) FROM dictionary_wordlist_memberships),
+               (SELECT MAX(added_at) FROM dictionary_wordlist_memberships),
+               (SELECT COUNT(*) FROM common_dictionary)
+    """,
+    'words': """
+        SELECT COUNT(*), MAX(rowid), MAX(status_updated_at),
+               SUM(CASE WHEN dictionary_found THEN 1 ELSE 0 END)
+        FROM words
+    """,
+}
+
+# 存放在 vocabulary_coverage 列中的分析类型，其余存放在 metrics 列
+_COVERAGE_TYPES = {'vocabulary_coverage', 'coverage_matrix'}
+
+
+class ResultCache:
+    """基于 analysis_results 表的 TTL + LRU 结果缓存"""
+
+    def __init__(self, db_path: str = "data/databases/unified.db",
+                 ttl: Optional[int] = None, max_entries: Optional[int] = None,
+                 enabled: Optional[bool] = None):
+        from core.utils.config_manager import get_config
+        config = get_config()
+
+        self.db_path = db_path
+        self.ttl = int(ttl if ttl is not None else config.get('performance.cache_ttl', 3600))
+        self.max_entries = int(max_entries if max_entries is not None
+                               else config.get('performance.cache_max_entries', 1000))
+        self.enabled = enabled if enabled is not None else bool(config.get('performance.enable_caching', True))
+
+    # =================== 键与版本 ===================
+
+    def make_key(self, analysis_type: str, params: Dict = None) -> str:
+        """根据分析类型和参数生成缓存键"""
+        payload = json.dumps({'type': analysis_type, 'params': params or {}},
+                             sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def data_version(self, conn, scopes: Iterable[str]) -> str:
+        """计算指定依赖范围的数据版本戳"""
+        parts = []
+        for scope in sorted(scopes):
+            row = conn.execute(_SCOPE_QUERIES[scope]).fetchone()
+            parts.append(f"{scope}:{'|'.join(str(value) for value in row)}")
+        return hashlib.sha256(';'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+    # =================== 读写 ===================
+
+    def get(self, analysis_type: str, params: Dict = None,
+            scopes: Iterable[str] = ('documents',)) -> Tuple[bool, Any]:
+        """查询缓存，返回 (是否命中, 结果)"""
+        if not self.enabled:
+            return False, None
+
+        cache_key = self.make_key(analysis_type, params)
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute("""
+                SELECT id, metrics, vocabulary_coverage, data_version
+                FROM analysis_results
+                WHERE cache_key = ?
+                  AND (expires_at IS NULL OR expires_at >= CURRENT_TIMESTAMP)
+                ORDER BY computed_at DESC
+                LIMIT 1
+            """, (cache_key,)).fetchone()
+
+            if not row:
+                return False, None
+
+            entry_id, metrics, coverage, version = row
+            if version != self.data_version(conn, scopes):
+                # 底层数据已变化，条目失效
+                conn.execute("DELETE FROM analysis_results WHERE cache_key = ?", (cache_key,))
+                return False, None
+
+            conn.execute("""
+                UPDATE analysis_results
+                SET last_accessed = strftime('%Y-%m-%d %H:%M:%f', 'now'),
+                    hit_count = COALESCE(hit_count, 0) + 1
+                WHERE id = ?
+            """, (entry_id,))
+
+        payload = coverage if analysis_type in _COVERAGE_TYPES else metrics
+        return True, json.loads(payload) if payload else None
+
+    def set(self, analysis_type: str, value: Any, params: Dict = None,
+            scopes: Iterable[str] = ('documents',), document_id: str = None,
+            ttl: Optional[int] = None):
+        """写入缓存条目，替换相同键的旧条目"""
+        if not self.enabled:
+            return
+
+        cache_key = self.make_key(analysis_type, params)
+        payload = json.dumps(value, ensure_ascii=False, default=str)
+        metrics, coverage = (None, payload) if analysis_type in _COVERAGE_TYPES else (payload, None)
+        ttl = self.ttl if ttl is None else int(ttl)
+
+        with sqlite3.connect(self.db_path) as conn:
+            version = self.data_version(conn, scopes)
+            conn.execute("DELETE FROM analysis_results WHERE cache_key = ?", (cache_key,))
+            conn.execute("""
+                INSERT INTO analysis_results
+                (id, document_id, analysis_type, metrics, vocabulary_coverage,
+                 computed_at, expires_at, cache_key, parameters, data_version,
+                 last_accessed, hit_count)
+                VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP, datetime('now', ?), ?, ?, ?,
+                        strftime('%Y-%m-%d %H:%M:%f', 'now'), 0)
+            """, (str(uuid.uuid4()), document_id, analysis_type, metrics, coverage,
+                  f'{ttl:+d} seconds', cache_key,
+                  json.dumps(params or {}, ensure_ascii=False, default=str), version))
+            self._evict(conn)
+
+    def get_or_compute(self, analysis_type: str, compute: Callable[[], Any],
+                       params: Dict = None, scopes: Iterable[str] = ('documents',),
+                       document_id: str = None, ttl: Optional[int] = None,
+                       refresh: bool = False) -> Any:
+        """命中则返回缓存结果，否则计算并写入缓存"""
+        if not refresh:
+            hit, value = self.get(analysis_type, params, scopes)
+            if hit:
+                return value
+
+        value = compute()
+        self.set(analysis_type, value, params, scopes, document_id, ttl)
+        return value
+
+    # =================== 失效与淘汰 ===================
+
+    def invalidate(self, analysis_type: str = None, document_id: str = None) -> int:
+        """手动失效缓存条目，返回删除数量"""
+        conditions, args = ["cache_key IS NOT NULL"], []
+        if analysis_type:
+            conditions.append("analysis_type = ?")
+            args.append(analysis_type)
+        if document_id:
+            conditions.append("document_id = ?")
+            args.append(document_id)
+
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute(f"DELETE FROM analysis_results WHERE {' AND '.join(conditions)}", args)
+            return cursor.rowcount
+
+    def _evict(self, conn):
+        """删除过期条目，并按最近访问时间淘汰超出上限的条目"""
+        conn.execute("""
+            DELETE FROM analysis_results
+            WHERE cache_key IS NOT NULL AND expires_at < CURRENT_TIMESTAMP
+        """)
+        count = conn.execute("""
+            SELECT COUNT(*) FROM analysis_results WHERE cache_key IS NOT NULL
+        """).fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            conn.execute("""
+                DELETE FROM analysis_results
+                WHERE id IN (
+                    SELECT id FROM analysis_results
+                    WHERE cache_key IS NOT NULL
+                    ORDER BY last_accessed ASC
+                    LIMIT ?
+                )
+            """, (overflow,))
+
+    def get_stats(self) -> Dict:
+        """缓存统计：条目数、按类型分布、累计命中数"""
+        with sqlite3.connect(self.db_path) as conn:
+            by_type = dict(conn.execute("""
+                SELECT analysis_type, COUNT(*) FROM analysis_results
+                WHERE cache_key IS NOT NULL
+                GROUP BY analysis_type
+            """).fetchall())
+            hits = conn.execute("""
+                SELECT COALESCE(SUM(hit_count), 0) FROM analysis_results
+                WHERE cache_key IS NOT NULL
+            """).fetchone()[0]
+
+        return {
+            'entries': sum(by_type.values()),
+            'by_type': by_type,
+            'total_hits': hits,
+            'ttl': self.ttl,
+            'max_entries': self.max_entries,
+            'enabled': self.enabled
+        }
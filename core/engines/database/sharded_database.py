@@ -0,0 +1,261 @@
+# 分片 SQLite 存储
+# 路径: core/engines/database/sharded_database.py
+# 项目名称: Word Frequency Analysis
+# 作者: Sherryyue
+
+"""
+分片 SQLite 存储 - 超大语料的文档与词频分布到多个数据库文件
+
+布局：
+- 主库（unified.db）: words / common_dictionary / wordlists 等目录表，所有分片共享
+- 分片（shards/shard_XX.db）: documents / occurrences / corpus_word_stats（分片内汇总）/ duplicate_sources
+
+写入：直接添加的文档按内容哈希落到固定分片；经入库队列处理的文件按源文件标识分配到分片
+（ShardedIngestQueue），任务文档及其词频留在该分片。每个工作进程可以只领取一个分片的任务
+（text process/resume --shard N），分片之间没有写锁竞争，只有新词写入主库。
+
+去重：相同内容的文档可能位于任意分片，get_document_by_hash 先查内容哈希对应的分片再查其余分片；
+attach_content 在主库写锁内完成查重与写入，不同分片的工作进程同时处理相同内容时不会各自入库。
+
+读取：connect_corpus 在主库连接上附加全部分片，并创建同名临时视图
+（documents / occurrences 为各分片 UNION ALL，corpus_word_stats 跨分片合并并按全局文档数计算 IDF），
+UnifiedDatabase 中的分析查询无需修改即可跨分片执行。
+"""
+
+import re
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from core.models.schema import ModernSchema
+from .database_maintenance import DatabaseMaintenance
+from .document_deleter import DocumentDeleter
+from .sketch_store import SketchStore
+from .unified_database import UnifiedDatabase
+
+
+class ShardedDatabase(UnifiedDatabase):
+    """分片 SQLite 存储"""
+
+    backend_name = 'sqlite_sharded'
+
+    # SQLite 默认最多附加 10 个数据库（SQLITE_MAX_ATTACHED），查询时需要附加全部分片
+    MAX_SHARDS = 10
+
+    def __init__(self, db_path: str = "data/databases/unified.db", shard_count: int = None,
+                 shard_dir: str = None):
+        from core.utils.config_manager import get_config
+
+        config = get_config()
+        shard_count = int(shard_count or config.get('database.sharding.shard_count', 4))
+        if not 1 <= shard_count <= self.MAX_SHARDS:
+            raise ValueError(f"分片数必须在 1 到 {self.MAX_SHARDS} 之间: {shard_count}")
+
+        super().__init__(db_path)
+        self.shard_count = shard_count
+        self._check_layout()
+
+        shard_dir = Path(shard_dir or config.get('database.sharding.directory') or Path(db_path).parent / 'shards')
+        shard_dir.mkdir(parents=True, exist_ok=True)
+        self.shard_paths = [str(shard_dir / f"shard_{index:02d}.db") for index in range(shard_count)]
+        for path in self.shard_paths:
+            ModernSchema(path).create_shard_tables()
+
+        # 文档ID -> 分片序号
+        self._document_shards: Dict[str, int] = {}
+
+    def _check_layout(self):
+        """记录分片数；文档按哈希取模分布，分片数变化后已有文档将无法定位"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS shard_layout (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    shard_count INTEGER NOT NULL
+                )
+            """)
+            conn.execute("INSERT OR IGNORE INTO shard_layout (id, shard_count) VALUES (1, ?)",
+                         (self.shard_count,))
+            stored = conn.execute("SELECT shard_count FROM shard_layout").fetchone()[0]
+        if stored != self.shard_count:
+            raise ValueError(f"分片数 {self.shard_count} 与已有布局 ({stored} 个分片) 不一致，"
+                             f"更改分片数需要重新导入文档")
+
+    # =================== 分片定位 ===================
+
+    def shard_index(self, content_hash: str) -> int:
+        """内容哈希（SHA256 十六进制）对应的分片序号"""
+        return int(content_hash[:8], 16) % self.shard_count
+
+    def _locate_document(self, doc_id: str) -> Optional[int]:
+        if doc_id in self._document_shards:
+            return self._document_shards[doc_id]
+        for index, path in enumerate(self.shard_paths):
+            with sqlite3.connect(path) as conn:
+                if conn.execute("SELECT 1 FROM documents WHERE id = ?", (doc_id,)).fetchone():
+                    self._document_shards[doc_id] = index
+                    return index
+        return None
+
+    def _document_store_path(self, doc_id: str = None, content_hash: str = None) -> str:
+        if content_hash is not None:
+            return self.shard_paths[self.shard_index(content_hash)]
+        index = self._locate_document(doc_id)
+        if index is None:
+            raise ValueError(f"文档不存在: {doc_id}")
+        return self.shard_paths[index]
+
+    def connect_corpus(self) -> sqlite3.Connection:
+        """主库连接，附加全部分片并以临时视图合并文档与词频数据"""
+        conn = sqlite3.connect(self.db_path)
+        for index, path in enumerate(self.shard_paths):
+            conn.execute(f"ATTACH DATABASE ? AS shard_{index}", (path,))
+
+        def union(table: str) -> str:
+            return ' UNION ALL '.join(f"SELECT * FROM shard_{index}.{table}"
+                                      for index in range(self.shard_count))
+
+        # 临时视图优先于主库同名表被解析
+        conn.execute(f"CREATE TEMP VIEW documents AS {union('documents')}")
+        conn.execute(f"CREATE TEMP VIEW occurrences AS {union('occurrences')}")
+        conn.execute(f"""
+            CREATE TEMP VIEW corpus_word_stats AS
+            SELECT word_id,
+                   SUM(total_frequency) AS total_frequency,
+                   SUM(document_frequency) AS document_frequency,
+                   LN(MAX((SELECT COUNT(*) FROM temp.documents
+                           WHERE {ModernSchema.corpus_document_filter()}), SUM(document_frequency)) * 1.0
+                      / SUM(document_frequency)) AS idf
+            FROM ({union('corpus_word_stats')})
+            GROUP BY word_id
+        """)
+
+        # 主库视图只能引用主库表，复制为临时视图后读取分片数据
+        views = conn.execute("SELECT sql FROM main.sqlite_master WHERE type = 'view'").fetchall()
+        for (sql,) in views:
+            conn.execute(re.sub(r'^\s*CREATE VIEW (IF NOT EXISTS )?', 'CREATE TEMP VIEW ', sql))
+        return conn
+
+    # =================== 文档管理 ===================
+
+    def get_document_by_hash(self, content_hash: str) -> Optional[Dict]:
+        """根据内容哈希获取文档（入库任务不按内容哈希分布，依次查找全部分片）"""
+        home = self.shard_index(content_hash)
+        for index in [home] + [i for i in range(self.shard_count) if i != home]:
+            with sqlite3.connect(self.shard_paths[index]) as conn:
+                conn.row_factory = sqlite3.Row
+                row = conn.execute("SELECT * FROM documents WHERE content_hash = ?", (content_hash,)).fetchone()
+            if row:
+                self._document_shards[row['id']] = index
+                return dict(row)
+        return None
+
+    def attach_content(self, doc_id: str, content: str) -> str:
+        """查重与写入内容哈希在主库写锁内完成，避免不同分片的工作进程同时写入相同内容"""
+        lock = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            lock.execute("BEGIN IMMEDIATE")
+            return super().attach_content(doc_id, content)
+        finally:
+            lock.rollback()
+            lock.close()
+
+    def add_document(self, filename: str, content: str, file_path: str = None,
+                     document_type: str = 'text', metadata: Dict = None) -> str:
+        doc_id = super().add_document(filename, content, file_path, document_type, metadata)
+        self._document_shards[doc_id] = self.shard_index(self._calculate_content_hash(content))
+        return doc_id
+
+    def delete_documents(self, doc_ids: List[str], collect_garbage: bool = False,
+                         vacuum: str = 'none', progress=None) -> Dict:
+        """按分片批量删除文档，再回收主库中不再出现于任何分片的词汇"""
+        if vacuum not in DocumentDeleter.VACUUM_MODES:
+            raise ValueError(f"不支持的 VACUUM 模式: {vacuum}")
+
+        groups: Dict[int, List[str]] = {}
+        for doc_id in dict.fromkeys(doc_ids):
+            index = self._locate_document(doc_id)
+            if index is not None:
+                groups.setdefault(index, []).append(doc_id)
+
+        total = 0
+        for index, ids in groups.items():
+            with sqlite3.connect(self.shard_paths[index]) as conn:
+                placeholders = ', '.join('?' for _ in ids)
+                total += conn.execute(
+                    f"SELECT COUNT(*) FROM occurrences WHERE document_id IN ({placeholders})", ids
+                ).fetchone()[0]
+
+        stats = {'documents': 0, 'occurrences': 0, 'orphan_occurrences': 0, 'words': 0}
+        for index, ids in groups.items():
+            offset = stats['occurrences']
+            deleter = DocumentDeleter(self.shard_paths[index])
+            shard_stats = deleter.delete_documents(
+                ids, collect_garbage=False,
+                progress=(lambda done, _, offset=offset: progress(offset + done, total)) if progress else None
+            )
+            stats['documents'] += shard_stats['documents']
+            stats['occurrences'] += shard_stats['occurrences']
+            for doc_id in ids:
+                self._document_shards.pop(doc_id, None)
+
+        # 其他分片中合并到这些文档的源文件记录（分片之间没有外键级联）
+        deleted = [doc_id for ids in groups.values() for doc_id in ids]
+        for path in self.shard_paths:
+            with sqlite3.connect(path) as conn:
+                for start in range(0, len(deleted), 500):
+                    batch = deleted[start:start + 500]
+                    placeholders = ', '.join('?' for _ in batch)
+                    conn.execute(f"DELETE FROM duplicate_sources WHERE document_id IN ({placeholders})", batch)
+
+        # 草图存储在主库（见 SketchStore），分片删除不涉及
+        conn = DocumentDeleter.connect(self.db_path)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            SketchStore(self.db_path).remove_documents(conn, deleted)
+            conn.commit()
+        finally:
+            conn.close()
+
+        if collect_garbage:
+            stats.update(self.collect_garbage())
+
+        if vacuum != 'none':
+            for path in [self.db_path] + self.shard_paths:
+                stats['vacuum'] = DatabaseMaintenance(path).vacuum(vacuum)['mode']
+        return stats
+
+    def delete_documents_by_type(self, document_type: str) -> int:
+        """按类型批量删除文档"""
+        try:
+            with self.connect_corpus() as conn:
+                doc_ids = [row[0] for row in conn.execute(
+                    "SELECT id FROM documents WHERE document_type = ?", (document_type,)
+                )]
+            deleted_count = self.delete_documents(doc_ids)['documents']
+            if deleted_count > 0:
+                print(f"✅ 删除了 {deleted_count} 个 {document_type} 类型的文档")
+            return deleted_count
+        except Exception as e:
+            print(f"❌ 批量删除失败: {e}")
+            return 0
+
+    def collect_garbage(self) -> Dict:
+        """回收各分片的孤立词频记录，以及主库中不再出现于任何分片的词汇"""
+        orphan_occurrences = sum(DocumentDeleter(path).collect_garbage(words=False)['orphan_occurrences']
+                                 for path in self.shard_paths)
+        conn = self.connect_corpus()
+        try:
+            words = DocumentDeleter(self.db_path).collect_orphan_words(conn)
+        finally:
+            conn.close()
+        return {'orphan_occurrences': orphan_occurrences, 'words': words}
+
+    # =================== 语料查询 ===================
+
+    def refresh_corpus_stats(self):
+        """IDF 由跨分片汇总视图按全局文档数实时计算，无需刷新"""
+
+    def get_database_stats(self) -> Dict:
+        stats = super().get_database_stats()
+        stats['shard_count'] = self.shard_count
+        return stats
@@ -0,0 +1,133 @@
+# 词频草图存储
+# 路径: core/engines/database/sketch_store.py
+# 项目名称: Word Frequency Analysis
+# 作者: Sherryyue
+
+"""
+词频草图存储 - 草图模式下文档与语料级概率草图的持久化
+
+草图模式（analysis.sketch.enabled）下每篇文档的完整词频分布写入：
+- 文档草图 (scope = 文档ID)
+- 语料草图 (scope = 'corpus')，内存与存储大小固定，不随文档数增长
+
+occurrences 中只精确存储频率 ≥ exact_min_frequency 的头部词汇，
+长尾（大量只出现一次的词）只保留在草图中。
+
+删除文档时按文档草图记录的 corpus_cells 从语料草图扣减 Count-Min 计数、总词数与文档数；
+HyperLogLog 与 Space-Saving 无法扣减，语料的不同词汇数与 top-k 仍包含已删除文档。
+"""
+
+import sqlite3
+from typing import Dict, List, Optional
+
+from core.engines.vocabulary.frequency_sketch import FrequencySketch
+
+
+class SketchStore:
+    """文档/语料概率草图的读写"""
+
+    CORPUS_SCOPE = 'corpus'
+
+    def __init__(self, db_path: str = "data/databases/unified.db", enabled: Optional[bool] = None):
+        from core.utils.config_manager import get_config
+
+        config = get_config()
+        self.db_path = db_path
+        self.enabled = enabled if enabled is not None else bool(config.get('analysis.sketch.enabled', False))
+        self.exact_min_frequency = int(config.get('analysis.sketch.exact_min_frequency', 2))
+        self.document_params = {
+            'width': config.get('analysis.sketch.document_width', 2048),
+            'depth': config.get('analysis.sketch.depth', 4),
+            'precision': config.get('analysis.sketch.precision', 12),
+            'top_k': config.get('analysis.sketch.top_k', 200),
+        }
+        self.corpus_params = dict(self.document_params,
+                                  width=config.get('analysis.sketch.corpus_width', 65536),
+                                  precision=config.get('analysis.sketch.corpus_precision', 14))
+
+    def record_document(self, doc_id: str, word_frequencies: Dict[str, int]) -> FrequencySketch:
+        """写入文档草图，并把同一分布累加到语料草图（同一事务）"""
+        document_sketch = FrequencySketch(**self.document_params)
+        document_sketch.update(word_frequencies)
+
+        with sqlite3.connect(self.db_path) as conn:
+            # 读取前即取得写锁：并行入库时其他写入者等待提交后再读取，累加不会相互覆盖
+            conn.execute("BEGIN IMMEDIATE")
+            corpus_sketch = self._load(conn, self.CORPUS_SCOPE) or FrequencySketch(**self.corpus_params)
+            corpus_sketch.update(word_frequencies)
+            corpus_cells = corpus_sketch.contribution(word_frequencies) if word_frequencies else None
+            self._save(conn, doc_id, document_sketch, corpus_cells)
+            self._save(conn, self.CORPUS_SCOPE, corpus_sketch)
+
+        return document_sketch
+
+    def remove_documents(self, conn, doc_ids: List[str]) -> int:
+        """删除文档草图并从语料草图扣减（在调用方的写事务中执行），返回删除的草图数"""
+        corpus_sketch = None
+        removed = 0
+        for doc_id in doc_ids:
+            row = conn.execute(
+                "SELECT corpus_cells, total FROM frequency_sketches WHERE scope = ?", (doc_id,)
+            ).fetchone()
+            if row is None:
+                continue
+            conn.execute("DELETE FROM frequency_sketches WHERE scope = ?", (doc_id,))
+            removed += 1
+            # 没有 corpus_cells 的草图（空文档或旧版本写入）不扣减
+            if row[0] is None:
+                continue
+            if corpus_sketch is None:
+                corpus_sketch = self._load(conn, self.CORPUS_SCOPE)
+                if corpus_sketch is None:
+                    continue
+            corpus_sketch.subtract(row[0], row[1])
+
+        if corpus_sketch is not None:
+            self._save(conn, self.CORPUS_SCOPE, corpus_sketch)
+        return removed
+
+    def exact_head(self, word_frequencies: Dict[str, int]) -> Dict[str, int]:
+        """需要精确存储的头部词汇"""
+        return {word: count for word, count in word_frequencies.items()
+                if count >= self.exact_min_frequency}
+
+    def load(self, scope: str = CORPUS_SCOPE) -> Optional[FrequencySketch]:
+        with sqlite3.connect(self.db_path) as conn:
+            return self._load(conn, scope)
+
+    def load_merged(self, scopes: List[str]) -> Optional[FrequencySketch]:
+        """合并多篇文档的草图（参数相同）"""
+        merged = None
+        with sqlite3.connect(self.db_path) as conn:
+            for scope in scopes:
+                sketch = self._load(conn, scope)
+                if sketch is None:
+                    continue
+                if merged is None:
+                    merged = sketch
+                else:
+                    merged.merge(sketch)
+        return merged
+
+    def delete(self, scope: str) -> bool:
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute("DELETE FROM frequency_sketches WHERE scope = ?", (scope,))
+            return cursor.rowcount > 0
+
+    def _load(self, conn, scope: str) -> Optional[FrequencySketch]:
+        conn.row_factory = sqlite3.Row
+        row = conn.execute("""
+            SELECT params, count_min, hll, top_k, total, documents
+            FROM frequency_sketches WHERE scope = ?
+        """, (scope,)).fetchone()
+        conn.row_factory = None
+        return FrequencySketch.from_record(row) if row else None
+
+    def _save(self, conn, scope: str, sketch: FrequencySketch, corpus_cells: bytes = None):
+        record = sketch.to_record()
+        conn.execute("""
+            INSERT OR REPLACE INTO frequency_sketches
+            (scope, params, count_min, hll, top_k, total, documents, corpus_cells, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """, (scope, record['params'], record['count_min'], record['hll'],
+              record['top_k'], record['total'], record['documents'], corpus_cells))
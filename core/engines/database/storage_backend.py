@@ -0,0 +1,248 @@
+# 存储后端接口
+# 路径: core/engines/database/storage_backend.py
+# 项目名称: Word Frequency Analysis
+# 作者: Sherryyue
+
+"""
+存储后端接口 - 文档入库与核心查询的统一契约
+
+- StorageBackend: 抽象基类，定义入库流程（文档、词汇、词频）与语料级查询，
+  并提供与存储无关的词汇标准化工具（词根、标准化形式、语言学特征）
+- UnifiedDatabase: SQLite 实现（默认，单文件、单写入者）
+- ShardedDatabase: 分片 SQLite 实现（database.sharding.enabled，文档分布到多个文件，可按分片并行入库）
+- PostgresDatabase: PostgreSQL 实现（连接池 + COPY 批量写入，支持多进程并发入库）
+- create_storage_backend: 按配置 database.type 选择后端
+
+近似重复索引、草图、结果缓存目前只支持单库 SQLite；词汇表、字典、学习状态、覆盖度矩阵
+与语料 SQL 查询直接访问 SQLite 数据库文件，其他后端调用时抛出 NotImplementedError（见 require_local_sqlite）。
+"""
+
+import hashlib
+import re
+import uuid
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+# 词汇处理改进 - 添加NLTK支持
+try:
+    import nltk
+    from nltk.stem import PorterStemmer
+    
+    # 确保必要数据可用
+    try:
+        nltk.data.find('tokenizers/punkt')
+    except LookupError:
+        print("📥 首次使用，正在下载NLTK数据包...")
+        nltk.download('punkt', quiet=True)
+    
+    # 创建全局stemmer实例
+    stemmer = PorterStemmer()
+    NLTK_AVAILABLE = True
+    print("✅ NLTK词干提取器已加载")
+    
+except ImportError:
+    stemmer = None
+    NLTK_AVAILABLE = False
+    print("⚠️  NLTK未安装，使用简单词汇标准化")
+
+
+class StorageBackend(ABC):
+    """存储后端抽象基类"""
+
+    # 后端名称（与配置 database.type 对应）
+    backend_name = ''
+    # 是否以本地 SQLite 文件存储（db_path 为可直接连接的主库）
+    local_sqlite = False
+
+    def require_local_sqlite(self, feature: str) -> str:
+        """功能需要直接访问 SQLite 主库时调用：返回主库路径，其他后端抛出 NotImplementedError"""
+        if not self.local_sqlite:
+            raise NotImplementedError(f"{feature}暂不支持 {self.backend_name} 存储后端")
+        return self.db_path
+
+    def connect_corpus(self):
+        """可查询全部文档与词频的 SQLite 连接（由 SQLite 后端实现）"""
+        raise NotImplementedError(f"语料查询暂不支持 {self.backend_name} 存储后端")
+
+    # =================== 文档管理 ===================
+
+    @abstractmethod
+    def add_document(self, filename: str, content: str, file_path: str = None,
+                     document_type: str = 'text', metadata: Dict = None) -> str:
+        """添加文档（相同内容哈希的文档已存在时返回其ID）"""
+
+    @abstractmethod
+    def update_document_status(self, doc_id: str, status: str, metadata: Dict = None):
+        """更新文档状态和元数据"""
+
+    @abstractmethod
+    def get_document_by_hash(self, content_hash: str) -> Optional[Dict]:
+        """根据内容哈希获取文档"""
+
+    @abstractmethod
+    def get_all_documents(self, document_type: str = None) -> List[Dict]:
+        """获取所有文档（按创建时间降序）"""
+
+    @abstractmethod
+    def delete_documents(self, doc_ids: List[str], collect_garbage: bool = False,
+                         vacuum: str = 'none', progress=None) -> Dict:
+        """批量删除文档，返回统计信息"""
+
+    def delete_document(self, doc_id: str) -> bool:
+        """删除单个文档"""
+        return self.delete_documents([doc_id])['documents'] > 0
+
+    def delete_documents_by_type(self, document_type: str) -> int:
+        """按类型批量删除文档，返回删除的文档数"""
+        doc_ids = [doc['id'] for doc in self.get_all_documents(document_type=document_type)]
+        return self.delete_documents(doc_ids)['documents']
+
+    # =================== 词频管理 ===================
+
+    @abstractmethod
+    def store_word_frequencies(self, doc_id: str, word_frequencies: Dict[str, int],
+                               word_positions: Dict[str, List[int]] = None,
+                               context_text: str = None):
+        """存储文档词频（替换该文档已有的词频数据）"""
+
+    def store_frequency_vector(self, doc_id: str, counts, interner,
+                               word_positions: Dict[str, List[int]] = None,
+                               context_text: str = None):
+        """存储以驻留表ID为下标的词频向量（默认转换为字典后调用 store_word_frequencies）"""
+        self.store_word_frequencies(doc_id, interner.to_dict(counts), word_positions=word_positions,
+                                    context_text=context_text)
+
+    @abstractmethod
+    def get_document_word_frequencies(self, doc_id: str) -> Dict[str, int]:
+        """获取文档词频 {表面形式: 频率}"""
+
+    # =================== 语料查询 ===================
+
+    @abstractmethod
+    def get_corpus_top_words(self, limit: int = 20, min_frequency: int = 1,
+                             order_by: str = 'total_frequency') -> List[Dict]:
+        """全局高频词（含文档频率与IDF）"""
+
+    @abstractmethod
+    def refresh_corpus_stats(self):
+        """刷新语料级统计（IDF 等依赖文档总数的数据）"""
+
+    @abstractmethod
+    def get_database_stats(self) -> Dict:
+        """获取数据库统计信息"""
+
+    # =================== 词汇标准化工具 ===================
+
+    def _generate_uuid(self) -> str:
+        """生成UUID字符串"""
+        return str(uuid.uuid4())
+    
+    def _calculate_content_hash(self, content: str) -> str:
+        """计算内容的SHA256哈希"""
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def _get_word_lemma(self, word: str) -> str:
+        """获取词汇的词根形式 - 使用NLTK改进"""
+        word_clean = re.sub(r'[^\w]', '', word.lower())
+        
+        if NLTK_AVAILABLE and stemmer:
+            # 使用NLTK Porter Stemmer
+            try:
+                lemma = stemmer.stem(word_clean)
+                
+                # 处理一些常见的过度词干化问题
+                corrections = {
+                    'studi': 'study',
+                    'fli': 'fly', 
+                    'happi': 'happy',
+                    'univers': 'university'
+                }
+                
+                lemma = corrections.get(lemma, lemma)
+                return lemma
+                
+            except Exception as e:
+                print(f"⚠️  NLTK处理失败 {word}: {e}")
+                
+        # 备用：简单规则化处理
+        return self._simple_lemmatize(word_clean)
+    
+    def _simple_lemmatize(self, word: str) -> str:
+        """简单的词汇标准化 - 备用方案"""
+        word = word.lower()
+        
+        # 基本复数处理
+        if word.endswith('ies') and len(word) > 4:
+            return word[:-3] + 'y'  # flies → fly
+        elif word.endswith('es') and len(word) > 3:
+            return word[:-2]  # boxes → box
+        elif word.endswith('s') and len(word) > 2 and not word.endswith('ss'):
+            return word[:-1]  # cats → cat
+        
+        # 基本动词处理
+        if word.endswith('ing') and len(word) > 4:
+            base = word[:-3]
+            # 处理双写字母: running → run
+            if len(base) > 2 and base[-1] == base[-2] and base[-1] in 'bdfglmnprt':
+                return base[:-1]
+            return base
+        
+        elif word.endswith('ed') and len(word) > 3:
+            return word[:-2]
+        
+        return word
+
+    def _normalize_word(self, word: str) -> str:
+        """标准化词汇处理"""
+        # 转小写，移除标点
+        normalized = re.sub(r'[^\w]', '', word.lower())
+        return normalized
+
+    def _analyze_linguistic_features(self, word: str, context_words: List[str] = None) -> dict:
+        """分析词汇的语言学特征"""
+        try:
+            from .linguistic_analyzer import linguistic_analyzer
+            
+            # 如果有上下文，提取相关词汇作为上下文
+            if context_words:
+                # 找到目标词汇周围的词汇
+                try:
+                    word_index = context_words.index(word.lower())
+                    start = max(0, word_index - 3)
+                    end = min(len(context_words), word_index + 4)
+                    context_words = context_words[start:end]
+                except ValueError:
+                    # 词汇不在上下文中，使用整个上下文的前几个词
+                    context_words = context_words[:7]
+            
+            features = linguistic_analyzer.analyze_word(word, context_words)
+            return features
+            
+        except ImportError:
+            print(f"⚠️  语言学分析器不可用，跳过词汇 {word} 的分析")
+            return {}
+        except Exception as e:
+            print(f"⚠️  语言学分析失败 {word}: {e}")
+            return {}
+
+
+def create_storage_backend(db_path: str = None) -> StorageBackend:
+    """按配置 database.type 创建存储后端（sqlite / postgresql）"""
+    from core.utils.config_manager import get_config
+
+    backend_type = str(get_config().get('database.type', 'sqlite')).lower()
+    if backend_type == 'sqlite':
+        if get_config().get('database.sharding.enabled', False):
+            from .sharded_database import ShardedDatabase
+            return ShardedDatabase(db_path or "data/databases/unified.db")
+        from .unified_database import UnifiedDatabase
+        return UnifiedDatabase(db_path or "data/databases/unified.db")
+    if backend_type in ('postgresql', 'postgres'):
+        from .postgres_database import PostgresDatabase
+        return PostgresDatabase.from_config()
+    raise ValueError(f"不支持的数据库类型: {backend_type}")
+
+
+def connect_corpus(db_path: str = None, storage: StorageBackend = None):
+    """语料读取连接：使用给定的存储后端，或按配置为 db_path 创建（分片模式下附加全部分片）"""
+    return (storage or create_storage_backend(db_path)).connect_corpus()
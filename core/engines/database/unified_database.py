@@ -3,58 +3,41 @@
 # 项目名称: Word Frequency Analysis
 # 作者: Sherryyue
 
-import uuid
 import sqlite3
 import json
-import hashlib
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
 from pathlib import Path
-import re
 
-# 词汇处理改进 - 添加NLTK支持
-try:
-    import nltk
-    from nltk.stem import PorterStemmer
-    
-    # 确保必要数据可用
-    try:
-        nltk.data.find('tokenizers/punkt')
-    except LookupError:
-        print("📥 首次使用，正在下载NLTK数据包...")
-        nltk.download('punkt', quiet=True)
-    
-    # 创建全局stemmer实例
-    stemmer = PorterStemmer()
-    NLTK_AVAILABLE = True
-    print("✅ NLTK词干提取器已加载")
-    
-except ImportError:
-    stemmer = None
-    NLTK_AVAILABLE = False
-    print("⚠️  NLTK未安装，使用简单词汇标准化")
+import numpy as np
 
 from core.models.schema import ModernSchema
+from .document_deleter import DocumentDeleter
+from .storage_backend import StorageBackend
+from core.engines.vocabulary.vocabulary_interner import VocabularyInterner, get_interner
 
-class UnifiedDatabase:
-    """统一的数据库操作类 - 实现现代化架构"""
+class UnifiedDatabase(StorageBackend):
+    """统一的数据库操作类 - 实现现代化架构（SQLite 存储后端）"""
+    
+    backend_name = 'sqlite'
+    local_sqlite = True
     
     def __init__(self, db_path: str = "data/databases/unified.db"):
         self.db_path = db_path
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
         
         # 确保数据库架构存在
-        schema = ModernSchema(db_path)
-        schema.create_tables()
-        schema.create_views()
+        self.schema = ModernSchema(db_path)
+        self.schema.create_tables()
+        self.schema.create_views()
     
-    def _generate_uuid(self) -> str:
-        """生成UUID字符串"""
-        return str(uuid.uuid4())
+    def connect_corpus(self) -> sqlite3.Connection:
+        """打开读取文档与词频数据的连接（分片存储时在此附加各分片）"""
+        return sqlite3.connect(self.db_path)
     
-    def _calculate_content_hash(self, content: str) -> str:
-        """计算内容的SHA256哈希"""
-        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+    def _document_store_path(self, doc_id: str = None, content_hash: str = None) -> str:
+        """文档及其词频所在的数据库文件（分片存储时按内容哈希定位分片）"""
+        return self.db_path
     
     # =================== 文档管理 ===================
     
@@ -76,7 +59,7 @@ class UnifiedDatabase:
             'word_count': len(content.split()) if document_type == 'text' else 0
         })
         
-        with sqlite3.connect(self.db_path) as conn:
+        with sqlite3.connect(self._document_store_path(content_hash=content_hash)) as conn:
             conn.execute("""
                 INSERT INTO documents 
                 (id, filename, file_path, content_hash, file_size, status, 
@@ -88,9 +71,39 @@ class UnifiedDatabase:
         print(f"✅ 文档已添加: {filename} (ID: {doc_id[:8]}...)")
         return doc_id
     
+    def attach_content(self, doc_id: str, content: str) -> str:
+        """为已入队的文档记录写入内容哈希，返回实际文档ID
+        
+        相同内容的文档已存在时，入队记录合并到已有文档：源文件标识转入 duplicate_sources
+        （同一文件不会再次入队），任务记录删除，返回已有文档ID
+        """
+        content_hash = self._calculate_content_hash(content)
+        existing_doc = self.get_document_by_hash(content_hash)
+        if existing_doc and existing_doc['id'] != doc_id:
+            print(f"文档已存在: {existing_doc['filename']}")
+            return self.merge_job(doc_id, existing_doc['id'])
+        
+        with sqlite3.connect(self._document_store_path(doc_id=doc_id)) as conn:
+            conn.execute("""
+                UPDATE documents SET content_hash = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?
+            """, (content_hash, doc_id))
+        return doc_id
+    
+    def merge_job(self, job_id: str, doc_id: str) -> str:
+        """入队记录合并到已有文档（内容相同或跳过的近似重复）：源文件标识转入 duplicate_sources，
+        任务记录删除，返回已有文档ID"""
+        with sqlite3.connect(self._document_store_path(doc_id=job_id)) as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO duplicate_sources (source_key, document_id, file_path)
+                SELECT source_key, ?, file_path FROM documents
+                WHERE id = ? AND source_key IS NOT NULL
+            """, (doc_id, job_id))
+            conn.execute("DELETE FROM documents WHERE id = ?", (job_id,))
+        return doc_id
+    
     def update_document_status(self, doc_id: str, status: str, metadata: Dict = None):
         """更新文档状态和元数据"""
-        with sqlite3.connect(self.db_path) as conn:
+        with sqlite3.connect(self._document_store_path(doc_id=doc_id)) as conn:
             if metadata:
                 conn.execute("""
                     UPDATE documents 
@@ -108,7 +121,7 @@ class UnifiedDatabase:
     
     def get_document_by_hash(self, content_hash: str) -> Optional[Dict]:
         """根据内容哈希获取文档"""
-        with sqlite3.connect(self.db_path) as conn:
+        with sqlite3.connect(self._document_store_path(content_hash=content_hash)) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.execute("""
                 SELECT * FROM documents WHERE content_hash = ?
@@ -120,18 +133,19 @@ class UnifiedDatabase:
         return None
     
     def get_all_documents(self, document_type: str = None) -> List[Dict]:
-        """获取所有文档"""
-        with sqlite3.connect(self.db_path) as conn:
+        """获取所有已入库的文档（不含入库队列中未完成或失败的任务）"""
+        with self.connect_corpus() as conn:
             conn.row_factory = sqlite3.Row
             
             if document_type:
-                cursor = conn.execute("""
-                    SELECT * FROM documents WHERE document_type = ? 
+                cursor = conn.execute(f"""
+                    SELECT * FROM documents WHERE document_type = ? AND {ModernSchema.corpus_document_filter()}
                     ORDER BY created_at DESC
                 """, (document_type,))
             else:
-                cursor = conn.execute("""
-                    SELECT * FROM documents ORDER BY created_at DESC
+                cursor = conn.execute(f"""
+                    SELECT * FROM documents WHERE {ModernSchema.corpus_document_filter()}
+                    ORDER BY created_at DESC
                 """)
             
             return [dict(row) for row in cursor.fetchall()]
@@ -167,63 +181,14 @@ class UnifiedDatabase:
             
             conn.execute("""
                 INSERT INTO words 
-                (id, surface_form, lemma, normalized_form, linguistic_features)
-                VALUES (?, ?, ?, ?, ?)
-            """, (word_id, surface_form, lemma, normalized_form, features))
+                (id, surface_form, lemma, normalized_form, linguistic_features,
+                 pos_tag, pos_type, morph_complexity, morph_prefix, morph_suffix)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (word_id, surface_form, lemma, normalized_form, features,
+                  *ModernSchema.linguistic_column_values(linguistic_features)))
             
             return word_id
     
-    def _get_word_lemma(self, word: str) -> str:
-        """获取词汇的词根形式 - 使用NLTK改进"""
-        word_clean = re.sub(r'[^\w]', '', word.lower())
-        
-        if NLTK_AVAILABLE and stemmer:
-            # 使用NLTK Porter Stemmer
-            try:
-                lemma = stemmer.stem(word_clean)
-                
-                # 处理一些常见的过度词干化问题
-                corrections = {
-                    'studi': 'study',
-                    'fli': 'fly', 
-                    'happi': 'happy',
-                    'univers': 'university'
-                }
-                
-                lemma = corrections.get(lemma, lemma)
-                return lemma
-                
-            except Exception as e:
-                print(f"⚠️  NLTK处理失败 {word}: {e}")
-                
-        # 备用：简单规则化处理
-        return self._simple_lemmatize(word_clean)
-    
-    def _simple_lemmatize(self, word: str) -> str:
-        """简单的词汇标准化 - 备用方案"""
-        word = word.lower()
-        
-        # 基本复数处理
-        if word.endswith('ies') and len(word) > 4:
-            return word[:-3] + 'y'  # flies → fly
-        elif word.endswith('es') and len(word) > 3:
-            return word[:-2]  # boxes → box
-        elif word.endswith('s') and len(word) > 2 and not word.endswith('ss'):
-            return word[:-1]  # cats → cat
-        
-        # 基本动词处理
-        if word.endswith('ing') and len(word) > 4:
-            base = word[:-3]
-            # 处理双写字母: running → run
-            if len(base) > 2 and base[-1] == base[-2] and base[-1] in 'bdfglmnprt':
-                return base[:-1]
-            return base
-        
-        elif word.endswith('ed') and len(word) > 3:
-            return word[:-2]
-        
-        return word
-    
     def _update_word_surface_form(self, conn, word_id: str, new_surface: str, lemma: str):
         """更新词汇的表面形式（选择更标准的形式）"""
         try:
@@ -244,12 +209,6 @@ class UnifiedDatabase:
             # 更新失败不影响主流程
             pass
     
-    def _normalize_word(self, word: str) -> str:
-        """标准化词汇处理"""
-        # 转小写，移除标点
-        normalized = re.sub(r'[^\w]', '', word.lower())
-        return normalized
-    
     def batch_add_words(self, words: List[str]) -> Dict[str, str]:
         """批量添加词汇，返回词汇到ID的映射"""
         word_ids = {}
@@ -268,42 +227,77 @@ class UnifiedDatabase:
         if not word_frequencies:
             return
         
+        # 临时驻留表：字典入口不向进程级驻留表添加词汇
+        interner = VocabularyInterner()
+        self.store_frequency_vector(doc_id, interner.vector(word_frequencies), interner,
+                                    word_positions=word_positions, context_text=context_text)
+    
+    def get_document_word_frequencies(self, doc_id: str) -> Dict[str, int]:
+        """获取文档词频 {表面形式: 频率}"""
+        with self.connect_corpus() as conn:
+            cursor = conn.execute("""
+                SELECT w.surface_form, o.frequency
+                FROM occurrences o
+                JOIN words w ON w.id = o.word_id
+                WHERE o.document_id = ?
+            """, (doc_id,))
+            return dict(cursor.fetchall())
+    
+    def store_frequency_vector(self, doc_id: str, counts: np.ndarray, interner: VocabularyInterner = None,
+                               word_positions: Dict[str, List[int]] = None,
+                               context_text: str = None):
+        """存储以驻留表ID为下标的词频向量
+        
+        不同表面形式可能按词根对应同一条词汇记录，频率按词汇记录合并后写入
+        """
+        interner = interner or get_interner()
+        counts = np.asarray(counts)
+        ids = np.flatnonzero(counts)
+        if not len(ids):
+            return
+        
         # 批量获取词汇ID - 为每个原始词汇形式创建独立记录
-        word_ids = self.batch_add_words_detailed(list(word_frequencies.keys()), context_text)
+        words = interner.lookup(ids)
+        word_ids = self.batch_add_words_detailed(words, context_text)
+        
+        # 按词汇记录合并频率
+        record_ids, inverse = np.unique(np.array([word_ids[w] for w in words], dtype=object),
+                                        return_inverse=True)
+        frequencies = np.bincount(inverse, weights=counts[ids], minlength=len(record_ids))
         
         # 计算总词数用于TF计算
-        total_words = sum(word_frequencies.values())
+        total_words = frequencies.sum()
         
-        with sqlite3.connect(self.db_path) as conn:
-            # 清除可能存在的旧数据
+        # 处理位置信息（同一词汇记录的位置取并集）
+        record_positions = [set() for _ in record_ids]
+        if word_positions:
+            for word, index in zip(words, inverse):
+                record_positions[index].update(word_positions.get(word, []))
+        
+        occurrence_data = []
+        for word_id, frequency, positions in zip(record_ids, frequencies.tolist(), record_positions):
+            positions = sorted(positions)
+            occurrence_data.append((
+                doc_id, word_id, int(frequency), frequency / total_words,
+                json.dumps(positions) if positions else None,
+                positions[0] if positions else None,
+                positions[-1] if positions else None
+            ))
+        
+        self._write_occurrences(doc_id, occurrence_data)
+        print(f"✅ 存储了 {len(ids)} 个原始词汇的频率数据")
+    
+    def _write_occurrences(self, doc_id: str, occurrence_data: List[tuple]):
+        """替换文档的词频记录"""
+        with sqlite3.connect(self._document_store_path(doc_id=doc_id)) as conn:
+            # 清除可能存在的旧数据（触发器同步扣减语料汇总）
             conn.execute("DELETE FROM occurrences WHERE document_id = ?", (doc_id,))
-            
-            # 为每个原始词汇形式创建独立的词频记录
-            occurrence_data = []
-            for word, frequency in word_frequencies.items():
-                word_id = word_ids[word]
-                tf_score = frequency / total_words  # 计算TF分数
-                
-                # 处理位置信息
-                positions = word_positions.get(word, []) if word_positions else []
-                positions = sorted(list(set(positions))) if positions else []
-                positions_json = json.dumps(positions) if positions else None
-                first_pos = min(positions) if positions else None
-                last_pos = max(positions) if positions else None
-                
-                occurrence_data.append((
-                    doc_id, word_id, frequency, tf_score, 
-                    positions_json, first_pos, last_pos
-                ))
-            
             conn.executemany("""
                 INSERT INTO occurrences 
                 (document_id, word_id, frequency, tf_score, positions, first_position, last_position)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
             """, occurrence_data)
         
-        print(f"✅ 存储了 {len(word_frequencies)} 个原始词汇的频率数据")
-        
     def batch_add_words_detailed(self, words: List[str], context_text: str = None) -> Dict[str, str]:
         """批量添加词汇，为每个原始形式创建独立记录"""
         word_ids = {}
@@ -347,10 +341,12 @@ class UnifiedDatabase:
             conn.execute("""
                 INSERT INTO words 
                 (id, surface_form, lemma, normalized_form, linguistic_features,
+                 pos_tag, pos_type, morph_complexity, morph_prefix, morph_suffix,
                  dictionary_id, dictionary_found, dictionary_rank, difficulty_level)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (word_id, surface_form, lemma, normalized_form,
                   json.dumps(linguistic_features) if linguistic_features else None,
+                  *ModernSchema.linguistic_column_values(linguistic_features),
                   dict_match['dictionary_id'],
                   dict_match['dictionary_found'],
                   dict_match['dictionary_rank'],
@@ -358,33 +354,6 @@ class UnifiedDatabase:
             
             return word_id
     
-    def _analyze_linguistic_features(self, word: str, context_words: List[str] = None) -> dict:
-        """分析词汇的语言学特征"""
-        try:
-            from .linguistic_analyzer import linguistic_analyzer
-            
-            # 如果有上下文，提取相关词汇作为上下文
-            if context_words:
-                # 找到目标词汇周围的词汇
-                try:
-                    word_index = context_words.index(word.lower())
-                    start = max(0, word_index - 3)
-                    end = min(len(context_words), word_index + 4)
-                    context_words = context_words[start:end]
-                except ValueError:
-                    # 词汇不在上下文中，使用整个上下文的前几个词
-                    context_words = context_words[:7]
-            
-            features = linguistic_analyzer.analyze_word(word, context_words)
-            return features
-            
-        except ImportError:
-            print(f"⚠️  语言学分析器不可用，跳过词汇 {word} 的分析")
-            return {}
-        except Exception as e:
-            print(f"⚠️  语言学分析失败 {word}: {e}")
-            return {}
-    
     def _match_dictionary_word(self, surface_form: str, lemma: str) -> Dict:
         """匹配字典词汇 - 最新版本使用dictionary_id"""
         try:
@@ -455,16 +424,15 @@ class UnifiedDatabase:
             return results
     
     def get_words_by_pos_type(self, pos_type: str, limit: int = 50) -> List[Dict]:
-        """根据词性类型查询词汇"""
-        with sqlite3.connect(self.db_path) as conn:
+        """根据词性类型查询词汇（使用 pos_type 索引列）"""
+        with self.connect_corpus() as conn:
             cursor = conn.execute("""
                 SELECT w.surface_form, w.lemma, w.linguistic_features,
                        COUNT(o.frequency) as document_count,
                        SUM(o.frequency) as total_frequency
                 FROM words w
                 LEFT JOIN occurrences o ON w.id = o.word_id
-                WHERE w.linguistic_features IS NOT NULL
-                  AND JSON_EXTRACT(w.linguistic_features, '$.pos_type') = ?
+                WHERE w.pos_type = ?
                 GROUP BY w.id
                 ORDER BY total_frequency DESC
                 LIMIT ?
@@ -484,12 +452,15 @@ class UnifiedDatabase:
             return results
     
     def get_pos_distribution(self) -> Dict:
-        """获取词性分布统计"""
+        """获取词性分布统计（基于类型化索引列，不解析JSON）
+        
+        统计范围仍是有语言学特征的词汇（linguistic_features IS NOT NULL），
+        特征中缺少 pos_type 的词汇计入 None 键
+        """
         with sqlite3.connect(self.db_path) as conn:
             # 词性类型分布
             cursor = conn.execute("""
-                SELECT JSON_EXTRACT(linguistic_features, '$.pos_type') as pos_type,
-                       COUNT(*) as count
+                SELECT pos_type, COUNT(*) as count
                 FROM words 
                 WHERE linguistic_features IS NOT NULL
                 GROUP BY pos_type
@@ -498,16 +469,21 @@ class UnifiedDatabase:
             
             pos_type_distribution = dict(cursor.fetchall())
             
-            # 详细词性标签分布
+            # 详细词性标签分布（描述只对前20个标签各取一次）
             cursor = conn.execute("""
-                SELECT JSON_EXTRACT(linguistic_features, '$.pos_tag') as pos_tag,
-                       JSON_EXTRACT(linguistic_features, '$.pos_description') as description,
-                       COUNT(*) as count
-                FROM words 
-                WHERE linguistic_features IS NOT NULL
-                GROUP BY pos_tag
-                ORDER BY count DESC
-                LIMIT 20
+                SELECT t.pos_tag,
+                       (SELECT JSON_EXTRACT(w.linguistic_features, '$.pos_description')
+                        FROM words w WHERE w.pos_tag = t.pos_tag LIMIT 1) as description,
+                       t.count
+                FROM (
+                    SELECT pos_tag, COUNT(*) as count
+                    FROM words 
+                    WHERE linguistic_features IS NOT NULL
+                    GROUP BY pos_tag
+                    ORDER BY count DESC
+                    LIMIT 20
+                ) t
+                ORDER BY t.count DESC
             """)
             
             pos_tag_distribution = []
@@ -518,14 +494,12 @@ class UnifiedDatabase:
                     'count': count
                 })
             
-            # 形态学复杂度分布
+            # 形态学复杂度分布（分析器为每个 morphology 都写入 complexity）
             cursor = conn.execute("""
-                SELECT JSON_EXTRACT(linguistic_features, '$.morphology.complexity') as complexity,
-                       COUNT(*) as count
+                SELECT morph_complexity as complexity, COUNT(*) as count
                 FROM words 
-                WHERE linguistic_features IS NOT NULL
-                  AND JSON_EXTRACT(linguistic_features, '$.morphology') IS NOT NULL
-                GROUP BY complexity
+                WHERE morph_complexity IS NOT NULL
+                GROUP BY morph_complexity
                 ORDER BY count DESC
             """)
             
@@ -539,17 +513,15 @@ class UnifiedDatabase:
             }
     
     def get_complex_words_analysis(self) -> Dict:
-        """分析词汇的复杂度"""
-        with sqlite3.connect(self.db_path) as conn:
+        """分析词汇的复杂度（基于 morph_prefix / morph_suffix 索引列）"""
+        with self.connect_corpus() as conn:
             # 有前缀的词汇
             cursor = conn.execute("""
-                SELECT w.surface_form, w.lemma,
-                       JSON_EXTRACT(w.linguistic_features, '$.morphology.prefix') as prefix,
+                SELECT w.surface_form, w.lemma, w.morph_prefix as prefix,
                        SUM(o.frequency) as total_frequency
                 FROM words w
                 LEFT JOIN occurrences o ON w.id = o.word_id
-                WHERE w.linguistic_features IS NOT NULL
-                  AND JSON_EXTRACT(w.linguistic_features, '$.morphology.prefix') IS NOT NULL
+                WHERE w.morph_prefix IS NOT NULL
                 GROUP BY w.id
                 ORDER BY total_frequency DESC
                 LIMIT 20
@@ -564,19 +536,23 @@ class UnifiedDatabase:
                     'total_frequency': freq or 0
                 })
             
-            # 有后缀的词汇
+            # 有后缀的词汇（后缀含义只对结果中的20个词汇解析）
             cursor = conn.execute("""
-                SELECT w.surface_form, w.lemma,
-                       JSON_EXTRACT(w.linguistic_features, '$.morphology.suffix') as suffix,
+                SELECT t.surface_form, t.lemma, t.suffix,
                        JSON_EXTRACT(w.linguistic_features, '$.morphology.suffix_meaning') as suffix_meaning,
-                       SUM(o.frequency) as total_frequency
-                FROM words w
-                LEFT JOIN occurrences o ON w.id = o.word_id
-                WHERE w.linguistic_features IS NOT NULL
-                  AND JSON_EXTRACT(w.linguistic_features, '$.morphology.suffix') IS NOT NULL
-                GROUP BY w.id
-                ORDER BY total_frequency DESC
-                LIMIT 20
+                       t.total_frequency
+                FROM (
+                    SELECT w.id, w.surface_form, w.lemma, w.morph_suffix as suffix,
+                           SUM(o.frequency) as total_frequency
+                    FROM words w
+                    LEFT JOIN occurrences o ON w.id = o.word_id
+                    WHERE w.morph_suffix IS NOT NULL
+                    GROUP BY w.id
+                    ORDER BY total_frequency DESC
+                    LIMIT 20
+                ) t
+                JOIN words w ON w.id = t.id
+                ORDER BY t.total_frequency DESC
             """)
             
             suffixed_words = []
@@ -600,7 +576,7 @@ class UnifiedDatabase:
         """获取指定词汇的所有变形及其频率信息"""
         lemma = self._get_word_lemma(word)
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connect_corpus() as conn:
             if doc_id:
                 # 查询特定文档中的词汇变形
                 cursor = conn.execute("""
@@ -673,7 +649,7 @@ class UnifiedDatabase:
     
     def get_lemma_analysis(self, doc_id: str = None) -> Dict:
         """获取词根级别的分析，支持按文档筛选"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connect_corpus() as conn:
             if doc_id:
                 # 特定文档的词根分析
                 cursor = conn.execute("""
@@ -806,7 +782,7 @@ class UnifiedDatabase:
     
     def get_vocabulary_coverage(self, doc_id: str) -> List[Dict]:
         """获取文档的词汇表覆盖度分析 - 使用dictionary_id关联"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connect_corpus() as conn:
             cursor = conn.execute("""
                 SELECT 
                     wl.name as wordlist_name,
@@ -847,7 +823,7 @@ class UnifiedDatabase:
     
     def get_word_usage_stats(self, min_frequency: int = 1) -> List[Dict]:
         """获取词汇使用统计"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connect_corpus() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.execute("""
                 SELECT * FROM word_usage_stats 
@@ -856,11 +832,43 @@ class UnifiedDatabase:
             """, (min_frequency,))
             
             return [dict(row) for row in cursor.fetchall()]
-    
+
+    def get_corpus_top_words(self, limit: int = 20, min_frequency: int = 1,
+                             order_by: str = 'total_frequency') -> List[Dict]:
+        """从语料汇总表读取全局高频词（含文档频率与IDF）
+        
+        IDF 按查询时的语料文档数计算，只涉及返回的行；写入时不重算整张汇总表
+        """
+        if order_by not in ('total_frequency', 'document_frequency'):
+            raise ValueError(f"不支持的排序字段: {order_by}")
+
+        with self.connect_corpus() as conn:
+            conn.row_factory = sqlite3.Row
+            document_count = conn.execute(
+                f"SELECT COUNT(*) FROM documents WHERE {ModernSchema.corpus_document_filter()}"
+            ).fetchone()[0]
+            cursor = conn.execute(f"""
+                SELECT w.surface_form, w.lemma, s.total_frequency, s.document_frequency,
+                       LN(MAX(?, s.document_frequency) * 1.0 / s.document_frequency) AS idf
+                FROM corpus_word_stats s
+                JOIN words w ON w.id = s.word_id
+                WHERE s.total_frequency >= ?
+                ORDER BY s.{order_by} DESC
+                LIMIT ?
+            """, (document_count, min_frequency, limit))
+
+            return [dict(row) for row in cursor.fetchall()]
+
+    def refresh_corpus_stats(self):
+        """重算汇总表中存储的 IDF 列（文档频率与总频率由触发器实时维护；
+        get_corpus_top_words 按查询时的文档数计算 IDF，不依赖该列）"""
+        with sqlite3.connect(self.db_path) as conn:
+            self.schema.refresh_corpus_idf(conn)
+
     def analyze_document_similarity(self, doc_id1: str, doc_id2: str) -> Dict:
         """分析两个文档的相似度"""
         # 获取两个文档的词汇集合
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connect_corpus() as conn:
             # 文档1的词汇
             cursor1 = conn.execute("""
                 SELECT w.lemma, o.tf_score
@@ -925,7 +933,7 @@ class UnifiedDatabase:
     
     def get_database_stats(self) -> Dict:
         """获取数据库统计信息"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connect_corpus() as conn:
             stats = {}
             
             # 核心表统计
@@ -945,7 +953,10 @@ class UnifiedDatabase:
             
             # 重命名以保持向后兼容
             stats['words_count'] = stats.get('words_count', 0)
-            stats['documents_count'] = stats.get('documents_count', 0)
+            # 文档数只计入语料中的文档（入库队列中的任务不计入）
+            stats['documents_count'] = conn.execute(
+                f"SELECT COUNT(*) FROM documents WHERE {ModernSchema.corpus_document_filter()}"
+            ).fetchone()[0]
             stats['wordlists_count'] = stats.get('wordlists_count', 0)
             stats['occurrences_count'] = stats.get('occurrences_count', 0)
             stats['dictionary_count'] = stats.get('common_dictionary_count', 0)
@@ -991,32 +1002,29 @@ class UnifiedDatabase:
     def delete_document(self, doc_id: str) -> bool:
         """删除单个文档及其相关数据"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                # 外键约束会自动级联删除相关记录
-                cursor = conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
-                deleted = cursor.rowcount > 0
-                
-                if deleted:
-                    print(f"✅ 已删除文档: {doc_id[:8]}...")
-                
-                return deleted
+            stats = self.delete_documents([doc_id])
+            deleted = stats['documents'] > 0
+            if deleted:
+                print(f"✅ 已删除文档: {doc_id[:8]}...")
+            return deleted
         except Exception as e:
             print(f"❌ 删除文档失败 {doc_id}: {e}")
             return False
     
+    def delete_documents(self, doc_ids: List[str], collect_garbage: bool = False,
+                         vacuum: str = 'none', progress=None) -> Dict:
+        """批量删除文档（启用外键、分批删除词频、回收孤立词汇），返回统计信息"""
+        return DocumentDeleter(self.db_path).delete_documents(
+            doc_ids, collect_garbage=collect_garbage, vacuum=vacuum, progress=progress
+        )
+    
     def delete_documents_by_type(self, document_type: str) -> int:
         """按类型批量删除文档"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute("""
-                    DELETE FROM documents WHERE document_type = ?
-                """, (document_type,))
-                deleted_count = cursor.rowcount
-                
-                if deleted_count > 0:
-                    print(f"✅ 删除了 {deleted_count} 个 {document_type} 类型的文档")
-                
-                return deleted_count
+            deleted_count = DocumentDeleter(self.db_path).delete_by_type(document_type)['documents']
+            if deleted_count > 0:
+                print(f"✅ 删除了 {deleted_count} 个 {document_type} 类型的文档")
+            return deleted_count
         except Exception as e:
             print(f"❌ 批量删除失败: {e}")
             return 0 
\ No newline at end of file
@@ -0,0 +1,142 @@
+# 词汇表成员位图索引
+# 路径: core/engines/database/wordlist_index.py
+# 项目名称: Word Frequency Analysis
+# 作者: Sherryyue
+
+"""
+词汇表成员位图索引 - 内存中的词汇表覆盖度计算
+
+设计：
+- 字典词汇映射为连续整数ID（按字母序）
+- 每个词汇表存储为一行打包位图（numpy.packbits，每词1 bit）
+- 文档覆盖度 = 文档词汇ID在位图中的取位 + 一次矩阵乘法
+
+一个索引实例可在批量处理中复用，数据变化时通过 is_stale() 检测并重建。
+"""
+
+import sqlite3
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+class WordlistIndex:
+    """词汇表成员位图索引"""
+
+    def __init__(self, db_path: str = "data/databases/unified.db"):
+        self.db_path = db_path
+        self.vocabulary: Dict[str, int] = {}     # 字典词汇 -> 整数ID
+        self.wordlists: List[Dict] = []           # 与位图行顺序一致的词汇表信息
+        self.bitmaps = np.zeros((0, 0), dtype=np.uint8)
+        self.version: Tuple = ()
+        self.load()
+
+    # =================== 索引构建 ===================
+
+    def load(self):
+        """从数据库构建词汇ID映射和词汇表位图"""
+        with sqlite3.connect(self.db_path) as conn:
+            self.version = self._read_version(conn)
+
+            words = [row[0] for row in conn.execute("""
+                SELECT DISTINCT word FROM common_dictionary ORDER BY word
+            """)]
+            self.vocabulary = {word: i for i, word in enumerate(words)}
+
+            conn.row_factory = sqlite3.Row
+            self.wordlists = [dict(row) for row in conn.execute("""
+                SELECT id, name, description, word_count
+                FROM wordlists
+                ORDER BY name
+            """)]
+            row_of = {wl['id']: i for i, wl in enumerate(self.wordlists)}
+
+            members = np.zeros((len(self.wordlists), len(words)), dtype=bool)
+            cursor = conn.execute("""
+                SELECT m.wordlist_id, d.word
+                FROM dictionary_wordlist_memberships m
+                JOIN common_dictionary d ON m.dictionary_id = d.id
+            """)
+            for wordlist_id, word in cursor:
+                members[row_of[wordlist_id], self.vocabulary[word]] = True
+
+        # 每个词汇表一行位图，宽度为 ceil(词汇数 / 8) 字节
+        self.bitmaps = np.packbits(members, axis=1)
+
+    def _read_version(self, conn) -> Tuple:
+        """读取决定索引内容的数据版本戳"""
+        memberships = conn.execute("""
+            SELECT COUNT(*), MAX(added_at) FROM dictionary_wordlist_memberships
+        """).fetchone()
+        wordlists = conn.execute("SELECT COUNT(*) FROM wordlists").fetchone()
+        dictionary = conn.execute("SELECT COUNT(*) FROM common_dictionary").fetchone()
+        return tuple(memberships) + tuple(wordlists) + tuple(dictionary)
+
+    def is_stale(self) -> bool:
+        """检查数据库中的词汇表或字典是否已变化"""
+        with sqlite3.connect(self.db_path) as conn:
+            return self._read_version(conn) != self.version
+
+    def refresh_if_stale(self) -> bool:
+        """数据变化时重建索引，返回是否重建"""
+        if self.is_stale():
+            self.load()
+            return True
+        return False
+
+    # =================== 覆盖度计算 ===================
+
+    def encode(self, word_frequencies: Dict[str, int]) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+        """将文档词频转换为 (词汇ID数组, 频率数组, 词汇列表)，只保留字典内词汇"""
+        vocabulary = self.vocabulary
+        words = [word for word in word_frequencies if word in vocabulary]
+        ids = np.fromiter((vocabulary[word] for word in words), dtype=np.int64, count=len(words))
+        freqs = np.fromiter((word_frequencies[word] for word in words), dtype=np.int64, count=len(words))
+        return ids, freqs, words
+
+    def membership(self, ids: np.ndarray) -> np.ndarray:
+        """取出每个词汇表对给定词汇ID的成员位，返回 (词汇表数, 词汇数) 布尔矩阵"""
+        if len(ids) == 0 or self.bitmaps.size == 0:
+            return np.zeros((len(self.wordlists), len(ids)), dtype=bool)
+        byte_cols = self.bitmaps[:, ids >> 3]
+        shifts = (7 - (ids & 7)).astype(np.uint8)
+        return ((byte_cols >> shifts) & 1).astype(bool)
+
+    def coverage(self, word_frequencies: Dict[str, int], sample_size: int = 10) -> List[Dict]:
+        """计算文档对所有词汇表的覆盖度
+
+        Args:
+            word_frequencies: 文档词频 {word: frequency}
+            sample_size: 每个词汇表返回的高频匹配示例数量
+
+        Returns:
+            每个词汇表的匹配统计，顺序与 self.wordlists 一致
+        """
+        unique_words = len(word_frequencies)
+        total_words = sum(word_frequencies.values())
+
+        ids, freqs, words = self.encode(word_frequencies)
+        # 按频率降序排列，使匹配示例直接取前N个
+        order = np.argsort(-freqs, kind='stable')
+        ids, freqs = ids[order], freqs[order]
+
+        members = self.membership(ids)
+        match_counts = members.sum(axis=1)
+        matched_frequencies = members.astype(np.int64) @ freqs
+
+        results = []
+        for row, wl in enumerate(self.wordlists):
+            match_count = int(match_counts[row])
+            matched_frequency = int(matched_frequencies[row])
+            sample_positions = np.flatnonzero(members[row])[:sample_size]
+            results.append({
+                'wordlist_name': wl['name'],
+                'word_count': wl['word_count'],
+                'match_count': match_count,
+                'coverage_percentage': (match_count / unique_words * 100) if unique_words > 0 else 0,
+                'matched_frequency': matched_frequency,
+                'frequency_percentage': (matched_frequency / total_words * 100) if total_words > 0 else 0,
+                'sample_words': [words[order[i]] for i in sample_positions]
+            })
+
+        return results
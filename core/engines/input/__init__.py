@@ -9,6 +9,10 @@
 核心组件：
 - FileProcessor: 文件处理器
 - FileReader: 文件读取器
+- ArchiveReader: 压缩文件与归档成员读取器
+- DirectoryWatcher: 目录监听器（text watch）
+- MappedTextCounter: 内存映射纯文本词频统计器
+- StreamingTextCounter: DOCX/CSV 流式词频统计器
 - ModernWordlistImport: 现代词汇表导入器
 - PersonalWordlistImport: 个人词汇表导入器
 
@@ -21,12 +25,20 @@
 
 from .file_processor import FileProcessor
 from .file_reader import TextReader
+from .archive_reader import ArchiveReader
+from .directory_watcher import DirectoryWatcher
+from .mmap_counter import MappedTextCounter
+from .stream_counter import StreamingTextCounter
 from .modern_wordlist_import import import_wordlist_from_file
 from .personal_wordlist_import import PersonalWordlistImporter
 
 __all__ = [
     'FileProcessor',
     'TextReader', 
+    'ArchiveReader',
+    'DirectoryWatcher',
+    'MappedTextCounter',
+    'StreamingTextCounter',
     'import_wordlist_from_file',
     'PersonalWordlistImporter'
 ]
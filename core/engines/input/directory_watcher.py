@@ -0,0 +1,276 @@
+# 目录监听器
+# 路径: core/engines/input/directory_watcher.py
+# 项目名称: Word Frequency Analysis
+# 作者: Sherryyue
+
+"""
+目录监听器 - 持续发现新增与修改的待处理文件
+
+- Linux 下通过 inotify（ctypes 调用 libc，无需额外依赖）接收文件事件，
+  其他平台或 inotify 不可用时退化为定期扫描目录
+- 去抖：文件大小与修改时间在 settle_seconds 内保持不变才视为写入完成，避免读取写了一半的文件
+- 微批：就绪文件在 batch_window 秒内累积，或达到 batch_size 个后作为一批交给入库流程
+- 支持格式的压缩文件（a.txt.gz）与归档文件同样被发现，归档由入库流程展开为成员
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set
+
+from ...utils.helpers import document_suffix, get_supported_files, is_archive
+
+
+class InotifyBackend:
+    """inotify 事件源（仅 Linux）"""
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+
+    WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+    # struct inotify_event: int wd; uint32_t mask, cookie, len; char name[]
+    _EVENT = struct.Struct('iIII')
+
+    name = 'inotify'
+
+    def __init__(self, directory: str, recursive: bool = True):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError("当前平台不支持 inotify")
+        self._libc = libc
+        self.recursive = recursive
+        # 事件队列溢出时丢失了事件，需要调用方重新扫描目录
+        self.overflowed = False
+
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify 初始化失败: {os.strerror(errno)}")
+        self._watches: Dict[int, str] = {}
+        self._add_tree(directory)
+
+    def _add_watch(self, directory: str):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"无法监听目录 {directory}: {os.strerror(errno)}")
+        self._watches[wd] = directory
+
+    def _add_tree(self, directory: str) -> Set[str]:
+        """监听目录（递归时包括子目录），返回其中已存在的文件"""
+        files = set()
+        walker = os.walk(directory) if self.recursive else [(directory, [], os.listdir(directory))]
+        for root, _, names in walker:
+            self._add_watch(root)
+            files.update(os.path.join(root, name) for name in names)
+        return files
+
+    def poll(self, timeout: float) -> Set[str]:
+        """等待最多 timeout 秒，返回有变化的文件路径"""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset + self._EVENT.size <= len(data):
+            wd, mask, _, length = self._EVENT.unpack_from(data, offset)
+            name = data[offset + self._EVENT.size:offset + self._EVENT.size + length].rstrip(b'\0')
+            offset += self._EVENT.size + length
+
+            if mask & self.IN_Q_OVERFLOW:
+                self.overflowed = True
+                continue
+            if mask & self.IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            directory = self._watches.get(wd)
+            if directory is None or not name:
+                continue
+
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & self.IN_ISDIR:
+                # 新建或移入的子目录：加入监听，目录内已有的文件一并处理
+                if self.recursive and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    try:
+                        changed.update(self._add_tree(path))
+                    except OSError:
+                        pass
+            else:
+                changed.add(path)
+        return changed
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingBackend:
+    """定期扫描目录的事件源（按大小与修改时间比较快照）"""
+
+    name = 'polling'
+
+    def __init__(self, directory: str, recursive: bool = True, interval: float = 2.0):
+        self.directory = directory
+        self.recursive = recursive
+        self.interval = interval
+        self.overflowed = False
+        self._snapshot = self._scan()
+        self._last_scan = time.monotonic()
+
+    def _scan(self) -> Dict[str, tuple]:
+        snapshot = {}
+        walker = os.walk(self.directory) if self.recursive else [(self.directory, [], os.listdir(self.directory))]
+        for root, _, names in walker:
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def poll(self, timeout: float) -> Set[str]:
+        remaining = self._last_scan + self.interval - time.monotonic()
+        if remaining > timeout:
+            time.sleep(timeout)
+            return set()
+        time.sleep(max(remaining, 0))
+
+        snapshot = self._scan()
+        self._last_scan = time.monotonic()
+        changed = {path for path, signature in snapshot.items() if self._snapshot.get(path) != signature}
+        self._snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+
+class DirectoryWatcher:
+    """监听目录并按微批产出写入完成的文件"""
+
+    BACKENDS = ('auto', 'inotify', 'polling')
+
+    def __init__(self, directory: str, recursive: bool = True, supported_formats=None,
+                 ignore_dirs=None, backend: str = None):
+        from ...utils.config_manager import get_config
+
+        config = get_config()
+        self.directory = os.path.abspath(directory)
+        self.recursive = recursive
+        self.extensions = {ext.lower() for ext in supported_formats} if supported_formats else {'.txt', '.pdf'}
+        # 不处理的目录名（如 processed），匹配任意层级
+        self.ignore_dirs = set(ignore_dirs or [])
+
+        self.poll_interval = float(config.get('watch.poll_interval', 2))
+        self.settle_seconds = float(config.get('watch.settle_seconds', 2))
+        self.batch_size = int(config.get('watch.batch_size', 100))
+        self.batch_window = float(config.get('watch.batch_window', 5))
+
+        backend = backend or config.get('watch.backend', 'auto')
+        if backend not in self.BACKENDS:
+            raise ValueError(f"不支持的监听方式: {backend}")
+        self._backend = self._create_backend(backend)
+
+    @property
+    def backend_name(self) -> str:
+        return self._backend.name
+
+    def _create_backend(self, backend: str):
+        if backend in ('auto', 'inotify'):
+            try:
+                return InotifyBackend(self.directory, self.recursive)
+            except (OSError, AttributeError, TypeError) as e:
+                if backend == 'inotify':
+                    raise RuntimeError(f"inotify 不可用: {e}")
+                print(f"⚠️  inotify 不可用，改为每 {self.poll_interval:g} 秒扫描目录: {e}")
+        return PollingBackend(self.directory, self.recursive, self.poll_interval)
+
+    def _accepts(self, path: str) -> bool:
+        if document_suffix(path) not in self.extensions and not is_archive(path):
+            return False
+        parts = Path(os.path.relpath(path, self.directory)).parts[:-1]
+        return not self.ignore_dirs.intersection(parts)
+
+    def _existing_files(self) -> List[str]:
+        return get_supported_files(self.directory, self.recursive, supported_formats=self.extensions)
+
+    @staticmethod
+    def _signature(path: str) -> Optional[tuple]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def batches(self, stop_event=None, idle_interval: float = None) -> Iterator[List[str]]:
+        """持续产出文件批次，直到 stop_event 被设置；启动时目录中已有的文件作为第一批候选
+        
+        idle_interval: 超过该秒数没有新批次时产出空列表，调用方可借此处理定时任务（如到期的重试）
+        """
+        # 候选文件 -> (大小与修改时间, 最近一次变化的时间)
+        candidates: Dict[str, tuple] = {}
+        ready: List[str] = []
+        ready_since = None
+        last_yield = time.monotonic()
+        tick = max(min(self.settle_seconds, self.batch_window, 1.0), 0.05)
+
+        def track(paths):
+            for path in paths:
+                path = os.path.abspath(path)
+                if self._accepts(path):
+                    candidates[path] = (None, None)
+
+        track(self._existing_files())
+        try:
+            while not (stop_event and stop_event.is_set()):
+                track(self._backend.poll(tick))
+                if self._backend.overflowed:
+                    self._backend.overflowed = False
+                    track(self._existing_files())
+
+                now = time.monotonic()
+                for path, (signature, changed_at) in list(candidates.items()):
+                    current = self._signature(path)
+                    if current is None:
+                        # 文件已被删除或移走
+                        del candidates[path]
+                    elif current != signature:
+                        candidates[path] = (current, now)
+                    elif now - changed_at >= self.settle_seconds:
+                        del candidates[path]
+                        if path not in ready:
+                            ready.append(path)
+                            ready_since = ready_since or now
+
+                if ready and (len(ready) >= self.batch_size or now - ready_since >= self.batch_window):
+                    batch, ready = ready[:self.batch_size], ready[self.batch_size:]
+                    ready_since = now if ready else None
+                    last_yield = now
+                    yield sorted(batch)
+                elif idle_interval is not None and now - last_yield >= idle_interval:
+                    last_yield = now
+                    yield []
+        finally:
+            self.close()
+
+    def close(self):
+        self._backend.close()
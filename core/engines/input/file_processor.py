@@ -5,23 +5,35 @@
 
 from pathlib import Path
 from datetime import datetime
-from ..vocabulary.word_analyzer import analyze_text
+from ..vocabulary.vocabulary_interner import reset_interner
+from ..vocabulary.word_analyzer import analyze_document
 from .file_reader import TextReader
+from .mmap_counter import MappedTextCounter
+from .stream_counter import StreamingTextCounter
 from ..database.database_adapter import unified_adapter
-from ...utils.helpers import get_supported_files
+from ...utils.helpers import get_supported_files, is_archive, split_archive_member
 import os
 import time
 import shutil
-from collections import Counter
 
 class TextProcessor:
     """负责处理新文本文件的类 - 现已使用统一架构"""
-    def __init__(self, storage_manager=None, move_processed=True):
+    def __init__(self, storage_manager=None, move_processed=True, generate_reports=None, shard=None):
         self.reader = TextReader()  # 组合关系
         # 使用传入的存储管理器或默认的统一适配器
         self.storage_manager = storage_manager or unified_adapter
         # 是否在处理完成后移动文件到processed目录
         self.move_processed = move_processed
+        # 是否生成分析报告（默认读取 reports.enabled）
+        if generate_reports is None:
+            from ...utils.config_manager import get_config
+            generate_reports = bool(get_config().get('reports.enabled', True))
+        self.generate_reports = generate_reports
+        # 分片存储时只领取该分片的入库任务（None 时处理全部分片）
+        self.shard = shard
+        # 报告渲染器与批量处理期间的后台队列
+        self._report_writer = None
+        self._report_queue = None
     
     def process_new_texts(self, directory_path, scan_subdirs=True):
         """处理指定目录下的新文本文件"""
@@ -30,14 +42,195 @@ class TextProcessor:
                                            supported_formats=self.reader.supported_formats.keys())
             if not self._validate_files(file_paths, directory_path):
                 return
-                
-            self._process_files(file_paths, directory_path)
+            
+            self._ingest(file_paths, directory_path)
             # 统一架构下不需要手动更新词频统计
             print("✅ 所有文件处理完成")
             
         except Exception as e:
             print(f"处理文本时发生错误: {str(e)}")
     
+    def watch(self, directory_path, scan_subdirs=True, backend=None, stop_event=None):
+        """持续监听目录，新增或修改的文件写入完成后按微批入库（Ctrl+C 或 stop_event 结束）
+        
+        常驻进程只加载一次 NLTK 与词典数据，避免每次运行 text process 的启动开销
+        """
+        from .directory_watcher import DirectoryWatcher
+        
+        # 处理后文件移入同级 processed 目录，不再重复处理
+        ignore_dirs = ['processed'] if self.move_processed else []
+        watcher = DirectoryWatcher(directory_path, recursive=scan_subdirs,
+                                   supported_formats=self.reader.supported_formats.keys(),
+                                   ignore_dirs=ignore_dirs, backend=backend)
+        print(f"👀 正在监听目录 {directory_path}（{watcher.backend_name}），按 Ctrl+C 停止")
+        
+        ingest_queue = self._get_ingest_queue()
+        batches = 0
+        try:
+            # 空闲时定期检查到期的失败重试，重试等待不阻塞新文件的处理
+            for file_paths in watcher.batches(stop_event, idle_interval=watcher.batch_window):
+                if not file_paths:
+                    if ingest_queue is None or ingest_queue.seconds_until_retry() != 0:
+                        continue
+                else:
+                    batches += 1
+                    print(f"\n📥 第 {batches} 批: {len(file_paths)} 个文件")
+                try:
+                    self._ingest(file_paths, directory_path, wait_for_retries=False)
+                except KeyboardInterrupt:
+                    raise
+                except Exception as e:
+                    print(f"处理批次时发生错误: {str(e)}")
+        except KeyboardInterrupt:
+            print("\n⏹️  停止监听")
+        finally:
+            watcher.close()
+        return batches
+    
+    def _ingest(self, file_paths, directory_path, wait_for_retries=True):
+        """入库一批文件：SQLite（单库或分片）经入库队列处理，其他存储后端直接处理"""
+        file_paths, archives = self._expand_archives(file_paths)
+        
+        # 入库队列：文件先作为 pending 文档入队，中断后可用 text resume 继续
+        ingest_queue = self._get_ingest_queue()
+        if ingest_queue is not None and file_paths:
+            result = ingest_queue.enqueue(file_paths)
+            if result['skipped']:
+                print(f"⏭️  {result['skipped']} 个文件已在队列中或已处理完成")
+        
+        self._start_reports()
+        try:
+            if ingest_queue is not None:
+                stats = self._drain_queue(ingest_queue, wait_for_retries=wait_for_retries)
+                self._move_finished_archives(archives, ingest_queue)
+                return stats
+            self._process_files(file_paths, directory_path)
+        finally:
+            self._finish_reports()
+            self.reader.archive_reader.close()
+            # 驻留表只增不减：每批结束后换用新表，常驻监听时内存不随累计词汇量增长
+            reset_interner()
+    
+    def _expand_archives(self, file_paths):
+        """归档展开为成员虚拟路径，每个成员作为一个文档；返回 (文件列表, {归档: 成员列表})"""
+        expanded, archives = [], {}
+        for file_path in file_paths:
+            if not is_archive(file_path):
+                expanded.append(file_path)
+                continue
+            try:
+                members = self.reader.archive_reader.list_members(file_path, self.reader.supported_formats)
+            except Exception as e:
+                print(f"⚠️  无法读取归档 {Path(file_path).name}: {e}")
+                continue
+            print(f"📦 {Path(file_path).name}: {len(members)} 个文档")
+            archives[file_path] = members
+            expanded.extend(members)
+        return expanded, archives
+    
+    def _move_finished_archives(self, archives, ingest_queue):
+        """归档的全部成员处理完成后再移动归档文件"""
+        if not self.move_processed:
+            return
+        for archive_path, members in archives.items():
+            if ingest_queue.all_completed(members):
+                self._move_to_processed(archive_path)
+    
+    def resume(self, retry_failed=False, reclaim=False, wait_for_retries=True):
+        """继续处理入库队列中未完成的任务，返回处理统计"""
+        ingest_queue = self._get_ingest_queue()
+        if ingest_queue is None:
+            raise RuntimeError("入库队列目前只支持 SQLite 存储（单库或分片）")
+        
+        if reclaim:
+            # 立即回收全部处理中的任务（确认没有其他工作进程运行时使用）
+            reclaimed = ingest_queue.requeue_stale(0)
+            if reclaimed:
+                print(f"♻️  回收了 {reclaimed} 个中断的任务")
+        if retry_failed:
+            retried = ingest_queue.retry_failed()
+            if retried:
+                print(f"🔁 {retried} 个失败任务重新排队")
+        
+        self._start_reports()
+        try:
+            return self._drain_queue(ingest_queue, wait_for_retries=wait_for_retries)
+        finally:
+            self._finish_reports()
+    
+    def _get_ingest_queue(self):
+        """入库队列（分片存储时为各分片队列，存储后端不是 SQLite 时返回 None）"""
+        unified_db = self.storage_manager.unified_db
+        backend_name = getattr(unified_db, 'backend_name', 'sqlite')
+        if backend_name == 'sqlite_sharded':
+            from ..database.ingest_queue import ShardedIngestQueue
+            return ShardedIngestQueue(unified_db.shard_paths, shard=self.shard)
+        if self.shard is not None:
+            raise ValueError("只有分片存储支持按分片处理")
+        if backend_name != 'sqlite':
+            return None
+        from ..database.ingest_queue import IngestQueue
+        return IngestQueue(unified_db.db_path)
+    
+    def _drain_queue(self, ingest_queue, wait_for_retries=True):
+        """逐个领取并处理队列任务，直到没有可处理的任务"""
+        stats = {'completed': 0, 'retrying': 0, 'failed': 0}
+        total = ingest_queue.status()['pending']
+        print("\n开始处理文件...")
+        
+        index = 0
+        while True:
+            job = ingest_queue.claim()
+            if job is None:
+                delay = ingest_queue.seconds_until_retry() if wait_for_retries else None
+                if delay is None:
+                    break
+                print(f"⏳ 等待 {delay:.0f} 秒后重试失败的任务...")
+                time.sleep(delay + 0.5)
+                continue
+            
+            index += 1
+            attempt = f" (第 {job['attempts']} 次尝试)" if job['attempts'] > 1 else ""
+            print(f"\n[{index}/{max(total, index)}] 处理文件: {job['filename']}{attempt}")
+            try:
+                with ingest_queue.keep_alive(job['id']):
+                    result = self._process_single_file(job['file_path'], doc_id=job['id'])
+                ingest_queue.finish(job['id'])
+                stats['completed'] += 1
+                if result and self.move_processed:
+                    self._move_to_processed(job['file_path'])
+            except KeyboardInterrupt:
+                ingest_queue.release(job['id'])
+                raise
+            except Exception as e:
+                status = ingest_queue.fail(job['id'], e)
+                if status == 'failed':
+                    stats['failed'] += 1
+                    print(f"处理文件失败，已放弃: {str(e)}")
+                else:
+                    stats['retrying'] += 1
+                    print(f"处理文件失败，稍后重试: {str(e)}")
+        
+        return stats
+    
+    def _start_reports(self):
+        if self.generate_reports:
+            from ...services.report_service import ReportQueue
+            # 新建渲染器，批量汇总只覆盖本次处理的文件
+            self._report_writer = None
+            self._report_queue = ReportQueue(self._get_report_writer())
+    
+    def _finish_reports(self):
+        """等待后台报告全部生成"""
+        if self._report_queue is None:
+            return
+        report_queue, self._report_queue = self._report_queue, None
+        if report_queue.pending():
+            print(f"\n⏳ 等待 {report_queue.pending()} 份分析报告生成...")
+        result = report_queue.close()
+        if result['reports']:
+            print(f"📄 已生成 {len(result['reports'])} 份分析报告")
+
     def _validate_files(self, file_paths, directory_path):
         """验证找到的文件"""
         if not file_paths:
@@ -64,12 +257,21 @@ class TextProcessor:
                 print(f"处理文件失败: {str(e)}")
                 continue
    
-    def _process_single_file(self, file_path):
-        """处理单个文件"""
+    def _process_single_file(self, file_path, doc_id=None):
+        """处理单个文件：UTF-8 纯文本走 mmap 零拷贝路径，DOCX/CSV 流式统计，其余格式常规读取"""
+        if MappedTextCounter.supports(file_path):
+            try:
+                return self._process_mapped_file(file_path, doc_id)
+            except UnicodeDecodeError:
+                print("⚠️  文件不是UTF-8编码，改用常规读取")
+        
+        if StreamingTextCounter.supports(file_path):
+            return self._process_streamed_file(file_path, doc_id)
+        
         # 使用TextReader读取和预处理文本
         text = self.reader.read_file(file_path)
-        text = self.reader.preprocess_text(text)
-        content_hash = self.storage_manager.calculate_text_hash(text)
+        processed_text = self.reader.preprocess_text(text)
+        content_hash = self.storage_manager.calculate_text_hash(processed_text)
         
         # 检查缓存
         cached_result = self.storage_manager.get_existing_analysis(content_hash)
@@ -77,39 +279,97 @@ class TextProcessor:
             print("找到缓存的分析结果")
             return cached_result, content_hash
         
-        # 新分析
+        # 新分析（句子、段落需要在未预处理的原文上统计）
         print("没有缓存，进行分析")
         start_time = time.time()  # 开始计时
+        basic_info, word_frequencies = analyze_document(text, self.reader)
         
-        basic_info, word_frequencies = analyze_text(text, self.reader)
+        # 文件元数据（词数直接取分析结果，避免重复分词）
+        metadata = dict(self.reader.metadata)
+        metadata['word_count'] = basic_info['total_words']
+        metadata['char_count'] = len(text)
+        basic_info.update(metadata)
         
+        return self._store_result(file_path, basic_info, word_frequencies, content_hash,
+                                  start_time, original_text=processed_text, doc_id=doc_id)
+    
+    def _process_mapped_file(self, file_path, doc_id=None):
+        """mmap 路径：在映射缓冲区上直接分词计数，不构造整个文本字符串"""
+        counter = MappedTextCounter(self.reader)
+        content_hash = counter.content_hash(file_path)
+        
+        cached_result = self.storage_manager.get_existing_analysis(content_hash)
+        if cached_result:
+            print("找到缓存的分析结果")
+            return cached_result, content_hash
+        
+        print("没有缓存，进行分析（内存映射）")
+        start_time = time.time()
+        basic_info, counts = counter.count_vector(file_path)
+        basic_info['file_name'] = Path(file_path).name
+        basic_info['word_count'] = basic_info['total_words']
+        
+        # 词频向量直接入库，不转换为字典
+        return self._store_result(file_path, basic_info, None, content_hash, start_time,
+                                  doc_id=doc_id, frequency_vector=(counts, counter.interner))
+    
+    def _process_streamed_file(self, file_path, doc_id=None):
+        """流式路径：逐段落 / 逐行读取并计数，内存占用与文件大小无关"""
+        counter = StreamingTextCounter(self.reader)
+        start_time = time.time()
+        # 只读取（解压）一次：计数的同时计算内容哈希，之后再检查缓存
+        print("边读取边分析（流式读取）")
+        basic_info, word_frequencies, content_hash = counter.count_and_hash(file_path)
+        
+        cached_result = self.storage_manager.get_existing_analysis(content_hash)
+        if cached_result:
+            print("找到缓存的分析结果")
+            return cached_result, content_hash
+        
+        basic_info.update(self.reader.metadata)
+        basic_info['word_count'] = basic_info['total_words']
+        
+        return self._store_result(file_path, basic_info, word_frequencies, content_hash, start_time,
+                                  doc_id=doc_id)
+    
+    def _store_result(self, file_path, basic_info, word_frequencies, content_hash,
+                      start_time, original_text=None, doc_id=None, frequency_vector=None):
+        """保存分析结果并生成报告（frequency_vector 为 (词频向量, 驻留表) 时 word_frequencies 可为 None）"""
         # 计算处理时长（秒）
         process_duration = time.time() - start_time
         
-        # 获取文件元数据
-        metadata = self.reader.get_metadata()
-        basic_info.update(metadata)
         basic_info['filename'] = Path(file_path).name
         basic_info['analysis_date'] = datetime.now().isoformat()
         basic_info['process_duration'] = process_duration  # 添加处理时长到基本信息中
         
+        # 入库队列任务：结果写入已入队的文档记录
+        job_kwargs = {'doc_id': doc_id} if doc_id is not None else {}
+        if frequency_vector is not None:
+            job_kwargs['frequency_vector'] = frequency_vector
         self.storage_manager.store_analysis(
             content_hash=content_hash,
             filename=basic_info['filename'],
             basic_info=basic_info,
             word_frequencies=word_frequencies,
             process_duration=process_duration,
-            original_text=text
+            original_text=original_text,
+            **job_kwargs
         )
         
-        # 生成分析报告
-        self.save_analysis_report(file_path, basic_info, word_frequencies, content_hash)
+        # 生成分析报告（报告需要 {词汇: 频率}）
+        if word_frequencies is None and self.generate_reports:
+            counts, interner = frequency_vector
+            word_frequencies = interner.to_dict(counts)
+        self._submit_report(file_path, basic_info, word_frequencies, content_hash)
         
         print(f"分析完成并保存到数据库，处理时长：{process_duration:.4f}秒")
         return (basic_info, word_frequencies), content_hash
 
     def _move_to_processed(self, file_path):
         """将处理完的文件移动到processed目录"""
+        if split_archive_member(file_path)[1] is not None:
+            # 归档成员随归档整体移动
+            return
         try:
             file_path = Path(file_path)
             
@@ -142,6 +402,25 @@ class TextProcessor:
             print(f"⚠️  文件移动失败 {file_path}: {e}")
             # 移动失败不影响主流程，继续处理其他文件
 
+    def _get_report_writer(self):
+        if self._report_writer is None:
+            # 延迟导入：报告服务依赖 core.engines，顶层导入会形成循环
+            from ...services.report_service import AnalysisReportWriter
+            # 词汇表匹配分析直接读取 SQLite 主库，其他存储后端的报告省略该部分
+            unified_db = self.storage_manager.unified_db
+            self._report_writer = AnalysisReportWriter(unified_db.db_path if unified_db.local_sqlite else None)
+        return self._report_writer
+
+    def _submit_report(self, file_path, basic_info, word_frequencies, content_hash):
+        """生成分析报告：批量处理中交给后台队列，否则同步生成"""
+        if not self.generate_reports:
+            return
+        if self._report_queue is None:
+            self.save_analysis_report(file_path, basic_info, word_frequencies, content_hash)
+            return
+        # 文件随后可能被移动，提交时即读取文件大小
+        self._report_queue.submit(self._get_report_writer().make_job(file_path, basic_info, word_frequencies, content_hash))
+
     def organize_existing_files(self):
         """整理已处理的文件：将数据库中已存在的文件移动到processed目录"""
         try:
@@ -193,204 +472,11 @@ class TextProcessor:
             traceback.print_exc()
 
     def save_analysis_report(self, filepath: str, basic_info: dict, word_frequencies: dict, content_hash: str, generate_report: bool = True):
-        """保存文本分析报告到文件"""
+        """保存文本分析报告到文件（同步生成）"""
         if not generate_report:
             return
-            
-        try:
-            # 确保exports目录存在
-            exports_dir = Path("data/exports")
-            exports_dir.mkdir(parents=True, exist_ok=True)
-            
-            # 生成报告文件名：文件名_分析报告_时间戳.txt
-            filename = Path(filepath).stem
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            report_filename = f"{filename}_analysis_report_{timestamp}.txt"
-            report_file = exports_dir / report_filename
-            
-            # 计算统计信息
-            total_words = basic_info.get('total_words', 0)
-            unique_words = basic_info.get('unique_words', 0)
-            total_sentences = basic_info.get('sentences', 0)
-            total_paragraphs = basic_info.get('paragraphs', 0)
-            file_size = os.path.getsize(filepath) if os.path.exists(filepath) else 0
-            
-            # 词频分析
-            sorted_words = sorted(word_frequencies.items(), key=lambda x: x[1], reverse=True)
-            most_frequent = sorted_words[:20]  # 前20个高频词
-            
-            # 词长分析
-            word_lengths = [len(word) for word in word_frequencies.keys()]
-            avg_word_length = sum(word_lengths) / len(word_lengths) if word_lengths else 0
-            length_counter = Counter(word_lengths)
-            
-            # 频率分析
-            freq_values = list(word_frequencies.values())
-            freq_counter = Counter(freq_values)
-            single_occurrence = freq_counter.get(1, 0)
-            
-            with open(report_file, 'w', encoding='utf-8') as f:
-                # 报告头部
-                f.write("=" * 60 + "\n")
-                f.write("          文本分析报告\n")
-                f.write("=" * 60 + "\n")
-                f.write(f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"源文件: {filepath}\n")
-                f.write(f"文件名: {basic_info.get('filename', 'Unknown')}\n")
-                f.write(f"文件大小: {file_size} bytes\n")
-                f.write(f"内容哈希: {content_hash[:16]}...\n")
-                f.write(f"分析时间: {basic_info.get('analysis_date', 'Unknown')}\n")
-                f.write(f"处理时长: {basic_info.get('process_duration', 0):.4f} 秒\n")
-                f.write("-" * 60 + "\n\n")
-                
-                # 基本统计信息
-                f.write("📊 基本统计信息\n")
-                f.write("-" * 30 + "\n")
-                f.write(f"总词数: {total_words}\n")
-                f.write(f"独特词汇数: {unique_words}\n")
-                f.write(f"句子数: {total_sentences}\n")
-                f.write(f"段落数: {total_paragraphs}\n")
-                f.write(f"词汇复用率: {((total_words - unique_words) / total_words * 100):.1f}%\n")
-                f.write(f"平均词长: {avg_word_length:.1f} 字符\n")
-                if total_sentences > 0:
-                    f.write(f"平均句长: {total_words / total_sentences:.1f} 词\n")
-                f.write("\n")
-                
-                # 词频分析
-                f.write("🔢 词频分析\n")
-                f.write("-" * 30 + "\n")
-                f.write(f"单次出现词汇: {single_occurrence} 个 ({(single_occurrence/unique_words*100):.1f}%)\n")
-                f.write(f"最高频率: {max(freq_values) if freq_values else 0}\n")
-                f.write(f"平均频率: {sum(freq_values)/len(freq_values):.2f}\n")
-                f.write("\n")
-                
-                # 高频词汇
-                if most_frequent:
-                    f.write("📈 高频词汇 (Top 20)\n")
-                    f.write("-" * 30 + "\n")
-                    for i, (word, freq) in enumerate(most_frequent, 1):
-                        percentage = (freq / total_words) * 100
-                        f.write(f"{i:2d}. {word:<15} {freq:>4} 次 ({percentage:.2f}%)\n")
-                    f.write("\n")
-                
-                # 词长分布
-                f.write("📏 词长分布\n")
-                f.write("-" * 30 + "\n")
-                for length in sorted(length_counter.keys())[:15]:  # 显示前15种词长
-                    count = length_counter[length]
-                    percentage = (count / unique_words) * 100
-                    f.write(f"{length:2d} 字符: {count:>4} 词 ({percentage:.1f}%)\n")
-                f.write("\n")
-                
-                # 频率分布
-                f.write("📊 频率分布\n")
-                f.write("-" * 30 + "\n")
-                freq_ranges = [(1, 1), (2, 5), (6, 10), (11, 20), (21, 50), (51, float('inf'))]
-                for min_freq, max_freq in freq_ranges:
-                    if max_freq == float('inf'):
-                        count = sum(1 for f in freq_values if f >= min_freq)
-                        label = f"{min_freq}+ 次"
-                    else:
-                        count = sum(1 for f in freq_values if min_freq <= f <= max_freq)
-                        if min_freq == max_freq:
-                            label = f"{min_freq} 次"
-                        else:
-                            label = f"{min_freq}-{max_freq} 次"
-                    
-                    percentage = (count / unique_words) * 100 if unique_words > 0 else 0
-                    f.write(f"{label:<10}: {count:>4} 词 ({percentage:.1f}%)\n")
-                f.write("\n")
-                
-                # 词汇表匹配分析
-                f.write("📚 词汇表匹配分析\n")
-                f.write("-" * 30 + "\n")
-                # 获取所有词汇表
-                try:
-                    wordlists = unified_adapter.get_all_wordlists()
-                    if wordlists:
-                        text_words = set(word_frequencies.keys())
-                        for wl in wordlists:
-                            wordlist_name = wl['name']
-                            
-                            # 获取词汇表中的所有词汇
-                            wordlist_words = unified_adapter.get_wordlist_words(wordlist_name)
-                            wordlist_word_set = set(word.lower() for word in wordlist_words)
-                            
-                            # 计算匹配
-                            matched_words = text_words.intersection(wordlist_word_set)
-                            match_count = len(matched_words)
-                            coverage_percentage = (match_count / unique_words * 100) if unique_words > 0 else 0
-                            
-                            # 计算匹配词汇的总频率
-                            matched_frequency = sum(word_frequencies[word] for word in matched_words)
-                            frequency_percentage = (matched_frequency / total_words * 100) if total_words > 0 else 0
-                            
-                            f.write(f"📖 {wordlist_name}:\n")
-                            f.write(f"   匹配词汇: {match_count}/{wl['word_count']} 个\n")
-                            f.write(f"   覆盖率: {coverage_percentage:.1f}% (文本独特词汇)\n")
-                            f.write(f"   频率覆盖: {frequency_percentage:.1f}% (总词频)\n")
-                            if match_count > 0:
-                                # 显示前10个匹配的高频词
-                                matched_sorted = sorted(matched_words, key=lambda x: word_frequencies[x], reverse=True)
-                                sample_words = matched_sorted[:10]
-                                f.write(f"   匹配示例: {', '.join(sample_words)}\n")
-                            f.write("\n")
-                    else:
-                        f.write("暂无加载的词汇表\n")
-                except Exception as e:
-                    f.write(f"获取词汇表信息失败: {e}\n")
-                f.write("\n")
-                
-                # 单次出现词汇
-                f.write("🔍 单次出现词汇列举\n")
-                f.write("-" * 30 + "\n")
-                
-                # 获取只出现一次的词汇
-                single_words = [word for word, freq in word_frequencies.items() if freq == 1]
-                
-                if single_words:
-                    f.write(f"共有 {len(single_words)} 个词汇只出现过一次，占独特词汇的 {len(single_words)/unique_words*100:.1f}%\n\n")
-                    
-                    # 按字母顺序排列显示
-                    sorted_single_words = sorted(single_words)
-                    
-                    # 分页显示，每行10个词，最多显示100个
-                    display_count = min(len(sorted_single_words), 100)
-                    for i in range(0, display_count, 10):
-                        line_words = sorted_single_words[i:i+10]
-                        f.write(f"  {', '.join(line_words)}\n")
-                    
-                    if len(sorted_single_words) > 100:
-                        f.write(f"  ... 还有 {len(sorted_single_words) - 100} 个单次出现词汇\n")
-                    f.write("\n")
-                    
-                    # 单次出现词汇的词长分析
-                    single_word_lengths = [len(word) for word in single_words]
-                    if single_word_lengths:
-                        avg_single_length = sum(single_word_lengths) / len(single_word_lengths)
-                        max_single_length = max(single_word_lengths)
-                        min_single_length = min(single_word_lengths)
-                        f.write(f"单次词汇统计: 平均长度 {avg_single_length:.1f} 字符，最长 {max_single_length} 字符，最短 {min_single_length} 字符\n")
-                        
-                        # 显示最长的单次出现词汇
-                        longest_singles = [word for word in single_words if len(word) == max_single_length]
-                        if longest_singles:
-                            f.write(f"最长单次词汇: {', '.join(longest_singles[:5])}\n")
-                else:
-                    f.write("没有只出现一次的词汇\n")
-                f.write("\n")
-                
-                # 报告尾部
-                f.write("=" * 60 + "\n")
-                f.write("分析报告生成完成\n")
-                f.write("=" * 60 + "\n")
-            
-            print(f"📄 分析报告已保存到: {report_file}")
-            return str(report_file)
-            
-        except Exception as e:
-            print(f"❌ 生成分析报告失败: {e}")
-            return None
+        writer = self._get_report_writer()
+        return writer.write_document_report(writer.make_job(filepath, basic_info, word_frequencies, content_hash))
 
 # 向后兼容别名
 FileProcessor = TextProcessor
@@ -1,15 +1,80 @@
+import codecs
+import csv
+import io
 import os
+import zipfile
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Dict, Union, Optional
+from typing import List, Dict, Iterator, Union, Optional, Tuple
 import chardet
-import pandas as pd
-import docx
+import hashlib
 import PyPDF2
 import re
+from .archive_reader import ArchiveReader, PrefixedStream
+from ...utils.helpers import document_suffix, is_compressed_input, split_archive_member
+
+class TextDigest:
+    """增量计算预处理后文本的内容哈希
+    
+    依次传入文本片段（片段之间视为空白分隔），结果与
+    sha256(TextReader.preprocess_text(整段文本)) 相同，文档内容哈希在所有读取路径上含义一致
+    """
+    
+    WHITESPACE_PATTERN = re.compile(r'\s+')
+    
+    def __init__(self):
+        self._digest = hashlib.sha256()
+        self._started = False
+        # 上一片段以空白结尾：下一段内容之前需要补一个空格
+        self._pending_space = False
+    
+    def update(self, text: str):
+        text = self.WHITESPACE_PATTERN.sub(' ', text.lower())
+        body = text.strip(' ')
+        if not body:
+            self._pending_space = self._pending_space or bool(text)
+            return
+        if self._started and (self._pending_space or text[0] == ' '):
+            self._digest.update(b' ')
+        self._digest.update(body.encode('utf-8'))
+        self._started = True
+        self._pending_space = text[-1] == ' '
+    
+    def separator(self):
+        """片段之间的分隔（相当于一个换行）"""
+        self._pending_space = True
+    
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
+
 
 class TextReader:
     """文本读取器类，支持多种格式的文本读取和预处理"""
     
+    # BOM -> 编码（UTF-32 必须先于 UTF-16 检测，两者 BOM 前缀相同）
+    BOMS = (
+        (codecs.BOM_UTF8, 'utf-8-sig'),
+        (codecs.BOM_UTF32_LE, 'utf-32'),
+        (codecs.BOM_UTF32_BE, 'utf-32'),
+        (codecs.BOM_UTF16_LE, 'utf-16'),
+        (codecs.BOM_UTF16_BE, 'utf-16'),
+    )
+    
+    # 编码检测采样：文件开头一段 + 若干内部窗口
+    SAMPLE_PREFIX_BYTES = 64 * 1024
+    SAMPLE_WINDOW_BYTES = 16 * 1024
+    SAMPLE_WINDOWS = 3
+    
+    # 文件指纹 (路径, 大小, 修改时间) -> 检测到的编码，进程内共享
+    _encoding_cache: Dict[Tuple, str] = {}
+    
+    # WordprocessingML 命名空间（word/document.xml）
+    W_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+    
+    # 单元格上限：社交媒体导出中的长文本字段可能超过 csv 模块默认的 128KB
+    CSV_FIELD_SIZE_LIMIT = 2 ** 31 - 1
+    
     def __init__(self):
         self.supported_formats = {
             '.txt': self._read_txt,
@@ -21,6 +86,8 @@ class TextReader:
         self.current_text = ""
         # 存储文本的元数据
         self.metadata = {}
+        # 压缩文件与归档成员（<归档>!/<成员>）的流式读取
+        self.archive_reader = ArchiveReader()
 
     def read_file(self, file_path: Union[str, Path], **kwargs) -> str:
         """
@@ -37,6 +104,10 @@ class TextReader:
             FileNotFoundError: 文件不存在
             ValueError: 不支持的文件格式
         """
+        if is_compressed_input(file_path):
+            self.current_text = '\n'.join(self.iter_text(file_path, **kwargs))
+            return self.current_text
+        
         file_path = Path(file_path)
         
         if not file_path.exists():
@@ -53,46 +124,293 @@ class TextReader:
         
         return self.current_text
 
+    def iter_text(self, file_path: Union[str, Path], **kwargs) -> Iterator[str]:
+        """
+        逐段读取文件文本，不在内存中保留整个文档
+        
+        DOCX 按段落、CSV 按行产出，各段以换行连接即为 read_file 的结果；
+        压缩文件与归档成员边解压边读取（纯文本按行产出）；其他格式整体读取后一次产出
+        
+        Args:
+            file_path: 文件路径（归档成员为 <归档路径>!/<成员名>）
+            **kwargs: 额外的读取参数（如 CSV 的 text_column）
+        
+        Yields:
+            str: 文本片段
+        """
+        if is_compressed_input(file_path):
+            yield from self._iter_compressed(str(file_path), **kwargs)
+            return
+        
+        file_path = Path(file_path)
+        
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        file_extension = file_path.suffix.lower()
+        self.metadata = {'file_name': file_path.name, 'file_size': os.path.getsize(file_path)}
+        
+        if file_extension == '.docx':
+            yield from self._iter_docx(file_path)
+        elif file_extension == '.csv':
+            yield from self._iter_csv(file_path, **kwargs)
+        else:
+            yield self.read_file(file_path, **kwargs)
+
+    @contextmanager
+    def open_binary(self, file_path: Union[str, Path]):
+        """以二进制流打开文件（压缩文件与归档成员边读边解压）"""
+        if is_compressed_input(file_path):
+            with self.archive_reader.open(str(file_path)) as stream:
+                yield stream
+        else:
+            with open(file_path, 'rb') as stream:
+                yield stream
+
+    def _iter_compressed(self, file_path: str, **kwargs) -> Iterator[str]:
+        """逐段读取压缩文件或归档成员，格式由内层后缀决定"""
+        file_extension = document_suffix(file_path)
+        if file_extension not in self.supported_formats:
+            raise ValueError(f"Unsupported file format: {file_extension}")
+        
+        _, member = split_archive_member(file_path)
+        self.metadata = {'file_name': Path(member or file_path).name,
+                         'file_size': self.archive_reader.size(file_path)}
+        
+        with self.archive_reader.open(file_path) as stream:
+            if file_extension == '.txt':
+                yield from self._iter_txt_stream(stream, **kwargs)
+            elif file_extension == '.csv':
+                yield from self._iter_csv_stream(stream, **kwargs)
+            else:
+                # DOCX / PDF 需要随机访问，解压到内存后读取
+                buffer = io.BytesIO(stream.read())
+                if file_extension == '.docx':
+                    yield from self._iter_docx(buffer)
+                else:
+                    yield self._extract_pdf(buffer)
+
+    def _iter_txt_stream(self, stream, encoding: Optional[str] = None) -> Iterator[str]:
+        """逐行读取纯文本流，产出的各行以换行连接即为原文"""
+        if encoding is None:
+            stream, encoding = self._detect_stream_encoding(stream)
+        self.metadata['encoding'] = encoding
+        
+        line = None
+        for line in io.TextIOWrapper(stream, encoding=encoding, errors='replace', newline=''):
+            yield line[:-1] if line.endswith('\n') else line
+        if line is not None and line.endswith('\n'):
+            yield ''
+
     def _read_txt(self, file_path: Path, encoding: Optional[str] = None) -> str:
         """
         读取txt文件，自动检测编码
+        
+        文件只读取一次，解码直接基于已读取的字节
         """
+        raw_data = file_path.read_bytes()
+        
         if encoding is None:
-            # 自动检测文件编码
-            with open(file_path, 'rb') as file:
-                raw_data = file.read()
-                result = chardet.detect(raw_data)
-                encoding = result['encoding']
+            text, encoding = self.decode_bytes(raw_data, file_path)
+        else:
+            text = raw_data.decode(encoding)
+        
+        self.metadata['encoding'] = encoding
+        return text
+
+    def decode_bytes(self, raw_data: bytes, file_path: Optional[Path] = None) -> Tuple[str, str]:
+        """
+        分级解码字节内容
+        
+        1. BOM 嗅探
+        2. 文件指纹缓存中的已知编码
+        3. 严格 UTF-8 解码
+        4. 对采样片段运行 chardet，而非整个文件
+        
+        Returns:
+            (文本, 编码)
+        """
+        for bom, bom_encoding in self.BOMS:
+            if raw_data.startswith(bom):
+                return raw_data.decode(bom_encoding), bom_encoding
+        
+        fingerprint = self._fingerprint(file_path)
+        cached = self._encoding_cache.get(fingerprint) if fingerprint else None
+        if cached:
+            try:
+                return raw_data.decode(cached), cached
+            except UnicodeDecodeError:
+                pass
+        
+        try:
+            text, encoding = raw_data.decode('utf-8'), 'utf-8'
+        except UnicodeDecodeError:
+            encoding = self._detect_sampled_encoding(raw_data)
+            try:
+                text = raw_data.decode(encoding)
+            except (UnicodeDecodeError, LookupError):
+                # 采样未覆盖到的字节无法解码时，保留可读部分
+                encoding = encoding if self._is_known_codec(encoding) else 'cp1252'
+                text = raw_data.decode(encoding, errors='replace')
+        
+        if fingerprint:
+            self._encoding_cache[fingerprint] = encoding
+        return text, encoding
+
+    def _detect_sampled_encoding(self, raw_data: bytes) -> str:
+        """对开头片段和若干均匀分布的内部窗口运行 chardet"""
+        size = len(raw_data)
+        sample_budget = self.SAMPLE_PREFIX_BYTES + self.SAMPLE_WINDOWS * self.SAMPLE_WINDOW_BYTES
+        
+        if size <= sample_budget:
+            sample = raw_data
+        else:
+            parts = [raw_data[:self.SAMPLE_PREFIX_BYTES]]
+            for i in range(1, self.SAMPLE_WINDOWS + 1):
+                start = size * i // (self.SAMPLE_WINDOWS + 1)
+                parts.append(raw_data[start:start + self.SAMPLE_WINDOW_BYTES])
+            sample = b'\n'.join(parts)
+        
+        encoding = chardet.detect(sample)['encoding']
+        # 严格 UTF-8 已失败，采样判定为 ascii/utf-8 说明非ASCII字节落在采样之外
+        if not encoding or encoding.lower() in ('ascii', 'utf-8'):
+            return 'cp1252'
+        return encoding
+
+    def _fingerprint(self, file_path: Optional[Path]) -> Optional[Tuple]:
+        if file_path is None:
+            return None
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return (str(Path(file_path).resolve()), stat.st_size, stat.st_mtime_ns)
 
-        with open(file_path, 'r', encoding=encoding) as file:
-            return file.read()
+    def _is_known_codec(self, encoding: str) -> bool:
+        try:
+            codecs.lookup(encoding)
+            return True
+        except LookupError:
+            return False
 
     def _read_pdf(self, file_path: Path) -> str:
         """
         读取PDF文件
         """
-        text = []
         with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page in pdf_reader.pages:
-                text.append(page.extract_text())
+            return self._extract_pdf(file)
+
+    def _extract_pdf(self, stream) -> str:
+        text = []
+        pdf_reader = PyPDF2.PdfReader(stream)
+        for page in pdf_reader.pages:
+            text.append(page.extract_text())
         return '\n'.join(text)
 
     def _read_docx(self, file_path: Path) -> str:
         """
         读取Word文档
         """
-        doc = docx.Document(file_path)
-        return '\n'.join([paragraph.text for paragraph in doc.paragraphs])
+        return '\n'.join(self._iter_docx(file_path))
+
+    def _iter_docx(self, file_path: Path) -> Iterator[str]:
+        """
+        逐段落读取Word文档
+        
+        直接对 word/document.xml 做 iterparse，不构建完整文档对象；
+        正文、表格单元格和文本框中的段落按文档顺序产出，已处理的元素随即释放
+        """
+        w = self.W_NAMESPACE
+        breaks = {w + 'br', w + 'cr'}
+        # 文本框中的段落嵌套在外层段落内，外层段落的文本在栈中继续累积
+        stack: List[List[str]] = []
+        body = None
+        
+        with zipfile.ZipFile(file_path) as archive, archive.open('word/document.xml') as document:
+            for event, element in ET.iterparse(document, events=('start', 'end')):
+                tag = element.tag
+                if event == 'start':
+                    if tag == w + 'p':
+                        stack.append([])
+                    elif tag == w + 'body':
+                        body = element
+                    continue
+                
+                if tag == w + 't':
+                    if stack:
+                        stack[-1].append(element.text or '')
+                elif tag == w + 'tab':
+                    if stack:
+                        stack[-1].append('\t')
+                elif tag in breaks:
+                    if stack:
+                        stack[-1].append('\n')
+                elif tag == w + 'p':
+                    yield ''.join(stack.pop())
+                    if not stack and body is not None:
+                        # 释放已产出的正文元素，内存占用与文档长度无关
+                        body.clear()
 
     def _read_csv(self, file_path: Path, text_column: str = 'text') -> str:
         """
         读取CSV文件中的文本列
         """
-        df = pd.read_csv(file_path)
-        if text_column not in df.columns:
+        return '\n'.join(self._iter_csv(file_path, text_column))
+
+    def _iter_csv(self, file_path: Path, text_column: str = 'text') -> Iterator[str]:
+        """
+        逐行读取CSV文件中的文本列（空单元格跳过）
+        
+        编码由文件开头的采样判断，之后按行流式解码
+        """
+        with open(file_path, 'rb') as f:
+            yield from self._iter_csv_stream(f, text_column, self._fingerprint(file_path))
+
+    def _iter_csv_stream(self, stream, text_column: str = 'text',
+                         fingerprint: Optional[Tuple] = None) -> Iterator[str]:
+        stream, encoding = self._detect_stream_encoding(stream, fingerprint)
+        self.metadata['encoding'] = encoding
+        csv.field_size_limit(max(csv.field_size_limit(), self.CSV_FIELD_SIZE_LIMIT))
+        
+        rows = csv.reader(io.TextIOWrapper(stream, encoding=encoding, errors='replace', newline=''))
+        header = next(rows, [])
+        if text_column not in header:
             raise ValueError(f"Column '{text_column}' not found in CSV file")
-        return '\n'.join(df[text_column].astype(str).tolist())
+        index = header.index(text_column)
+        
+        for row in rows:
+            if index < len(row) and row[index]:
+                yield row[index]
+
+    def _detect_stream_encoding(self, stream, fingerprint: Optional[Tuple] = None):
+        """
+        流式读取前判断编码：BOM、文件指纹缓存、开头片段的严格 UTF-8 解码，最后对片段运行 chardet
+        
+        Returns:
+            (从头读取的流, 编码)：采样片段不回退读取位置，拼接在返回的流之前
+        """
+        sample = stream.read(self.SAMPLE_PREFIX_BYTES)
+        stream = io.BufferedReader(PrefixedStream(sample, stream))
+        
+        for bom, bom_encoding in self.BOMS:
+            if sample.startswith(bom):
+                return stream, bom_encoding
+        
+        if fingerprint in self._encoding_cache:
+            return stream, self._encoding_cache[fingerprint]
+        
+        try:
+            # 片段末尾可能截断多字节字符，增量解码不要求结尾完整
+            codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+            encoding = 'utf-8'
+        except UnicodeDecodeError:
+            encoding = chardet.detect(sample)['encoding'] or 'cp1252'
+            if encoding.lower() in ('ascii', 'utf-8') or not self._is_known_codec(encoding):
+                encoding = 'cp1252'
+        
+        if fingerprint:
+            self._encoding_cache[fingerprint] = encoding
+        return stream, encoding
 
     def preprocess_text(self, text: Optional[str] = None) -> str:
         """
@@ -0,0 +1,265 @@
+# 内存映射词频统计器
+# 路径: core/engines/input/mmap_counter.py
+# 项目名称: Word Frequency Analysis
+# 作者: Sherryyue
+
+"""
+内存映射词频统计器 - 纯文本语料的零拷贝读取
+
+对 UTF-8 / ASCII 的 .txt 文件，直接在 mmap 缓冲区上用字节级正则分词，
+不把整个文件解码成 str、也不生成预处理后的文本副本：
+- 按约 8MB 的块扫描，块边界对齐到"空白 → 非空白"处，词和空白段都不会被切断
+- 原始字节词先用 Counter 计数，每个不同的词只解码、小写、校验一次，
+  然后驻留为 int32 ID，计数结果是 NumPy 词频向量
+- 含非 ASCII 字节的词按 UTF-8 严格解码后再用 TextReader 的分词规则拆分，
+  结果与 TextReader.get_word_list 一致；解码失败说明文件不是 UTF-8，
+  抛出 UnicodeDecodeError 由调用方回退到常规读取
+- 句子数、段落数同样在字节上统计，与 WordAnalyzer.analyze_document 口径一致
+  （空白按 str.isspace 判断，UTF-8 编码的不间断空格等 Unicode 空白也视为空白）
+- 内容哈希与常规读取路径相同（预处理后文本的 SHA-256，见 TextDigest），
+  按块解码计算，重复入库的文件仍能按哈希去重
+- 超过 file_processing.parallel_threshold_mb 的文件按同样的边界切成 N 段，
+  由进程池分别计数后按词频向量合并；空白段不跨段，句子/段落计数与串行结果一致
+"""
+
+import codecs
+import mmap
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .file_reader import TextDigest, TextReader
+from ..vocabulary.vocabulary_interner import get_interner
+
+
+class MappedTextCounter:
+    """基于 mmap 的纯文本词频统计器"""
+
+    # 原始词：ASCII 单词字符或任意非 ASCII 字节，可由撇号/连字符连接
+    TOKEN_PATTERN = re.compile(rb"(?:[A-Za-z0-9_]|[\x80-\xff])+(?:['\-](?:[A-Za-z0-9_]|[\x80-\xff])+)*")
+    SENTENCE_PATTERN = re.compile(rb'[.!?]+')
+    # 换行以外的空白字符（与 str.isspace 相同：ASCII 空白、\x1c-\x1f 及 UTF-8 编码的 Unicode 空白），
+    # 字节正则的 \s 只匹配 ASCII 空白，不间断空格等组成的"空行"会被误判为内容
+    SPACE = (rb'[\t\x0b\x0c\r \x1c-\x1f]|\xc2[\x85\xa0]|\xe1\x9a\x80'
+             rb'|\xe2\x80[\x80-\x8a\xa8\xa9\xaf]|\xe2\x81\x9f|\xe3\x80\x80')
+    WHITESPACE = rb'(?:\n|' + SPACE + rb')'
+    # 包含至少两个换行的空白段（即空行分隔），每段只匹配一次
+    PARAGRAPH_BREAK_PATTERN = re.compile(rb'\n(?:' + SPACE + rb')*\n' + WHITESPACE + rb'*')
+    # 块边界：空白段之后的第一个非空白字符
+    BOUNDARY_PATTERN = re.compile(WHITESPACE + rb'+(?!' + WHITESPACE + rb')')
+    LEADING_SPACE_PATTERN = re.compile(WHITESPACE + rb'*')
+
+    CHUNK_BYTES = 8 * 1024 * 1024
+    TAIL_BYTES = 64 * 1024
+
+    # 带 BOM 的 UTF-16/UTF-32 文件无法按字节分词
+    UNSUPPORTED_BOMS = (codecs.BOM_UTF32_LE, codecs.BOM_UTF32_BE,
+                        codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)
+
+    def __init__(self, reader: Optional[TextReader] = None, chunk_bytes: Optional[int] = None,
+                 parallel_threshold: Optional[int] = None, workers: Optional[int] = None):
+        from core.utils.config_manager import get_config
+
+        config = get_config()
+        self.reader = reader or TextReader()
+        self.interner = get_interner()
+        self.chunk_bytes = chunk_bytes or self.CHUNK_BYTES
+        if parallel_threshold is None:
+            parallel_threshold = int(config.get('file_processing.parallel_threshold_mb', 64) * 1024 * 1024)
+        self.parallel_threshold = parallel_threshold
+        self.workers = workers or config.get('performance.max_concurrent_processes') or os.cpu_count() or 1
+
+    @classmethod
+    def supports(cls, file_path: Union[str, Path]) -> bool:
+        """是否可以走 mmap 路径：非空 .txt 文件且没有 UTF-16/32 BOM"""
+        file_path = Path(file_path)
+        if file_path.suffix.lower() != '.txt' or not file_path.is_file():
+            return False
+        if file_path.stat().st_size == 0:
+            return False
+        with open(file_path, 'rb') as f:
+            head = f.read(4)
+        return not any(head.startswith(bom) for bom in cls.UNSUPPORTED_BOMS)
+
+    def content_hash(self, file_path: Union[str, Path]) -> str:
+        """预处理后文本的内容哈希（见 TextDigest），按块边界逐块解码，不构造整个文本
+
+        Raises:
+            UnicodeDecodeError: 文件不是 UTF-8 编码
+        """
+        digest = TextDigest()
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = len(codecs.BOM_UTF8) if mm[:3] == codecs.BOM_UTF8 else 0
+            size = len(mm)
+            while start < size:
+                # 块边界位于 ASCII 空白之后，不会切断多字节字符
+                end = self._chunk_end(mm, start, size)
+                digest.update(mm[start:end].decode('utf-8'))
+                start = end
+        return digest.hexdigest()
+
+    def count(self, file_path: Union[str, Path]) -> Tuple[Dict, Dict[str, int]]:
+        """统计文件词频
+
+        Returns:
+            (basic_info, word_frequencies)，basic_info 的键与
+            WordAnalyzer.analyze_document 相同，另含 encoding / file_size
+
+        Raises:
+            UnicodeDecodeError: 文件不是 UTF-8 编码
+        """
+        basic_info, counts = self.count_vector(file_path)
+        return basic_info, self.interner.to_dict(counts)
+
+    def count_vector(self, file_path: Union[str, Path]) -> Tuple[Dict, np.ndarray]:
+        """统计文件词频，返回以驻留表ID为下标的词频向量"""
+        file_path = Path(file_path)
+
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            start = len(codecs.BOM_UTF8) if mm[:3] == codecs.BOM_UTF8 else 0
+            encoding = 'utf-8-sig' if start else 'utf-8'
+
+            if self.workers > 1 and size >= self.parallel_threshold:
+                ranges = self._split_ranges(mm, start, size, self.workers)
+                counts, sentences, breaks = self._count_parallel(file_path, ranges)
+            else:
+                counts, sentences, breaks = self._count_range(mm, start, size)
+
+            paragraphs = self._count_paragraphs(mm, breaks)
+
+        basic_info = self._basic_info(counts, sentences, paragraphs)
+        basic_info['encoding'] = encoding
+        basic_info['file_size'] = size
+        return basic_info, counts
+
+    def _count_range(self, mm, start: int, end: int) -> Tuple[np.ndarray, int, int]:
+        """统计 [start, end) 范围：返回 (词频向量, 句子数, 空行分隔数)"""
+        raw_counts = Counter()
+        sentences = 0
+        breaks = 0
+
+        while start < end:
+            chunk_end = self._chunk_end(mm, start, end)
+            raw_counts.update(self.TOKEN_PATTERN.findall(mm, start, chunk_end))
+            sentences += sum(1 for _ in self.SENTENCE_PATTERN.finditer(mm, start, chunk_end))
+            breaks += sum(1 for _ in self.PARAGRAPH_BREAK_PATTERN.finditer(mm, start, chunk_end))
+            start = chunk_end
+
+        return self._decode_counts(raw_counts), sentences, breaks
+
+    def _split_ranges(self, mm, start: int, size: int, parts: int) -> List[Tuple[int, int]]:
+        """按"空白 → 非空白"边界把文件切成不超过 parts 段"""
+        step = max((size - start) // parts, 1)
+        ranges = []
+        while start < size:
+            target = start + step
+            if target >= size or len(ranges) == parts - 1:
+                end = size
+            else:
+                match = self.BOUNDARY_PATTERN.search(mm, target)
+                end = match.end() if match else size
+            ranges.append((start, end))
+            start = end
+        return ranges
+
+    def _count_parallel(self, file_path: Path, ranges: List[Tuple[int, int]]) -> Tuple[np.ndarray, int, int]:
+        """进程池分段计数并合并，每个进程自行映射文件，不传输文本
+
+        各进程的驻留表ID互不相同，返回 (词表, 计数) 后在本进程 remap 再做向量相加
+        """
+        counts = self.interner.empty_vector()
+        sentences = 0
+        breaks = 0
+
+        with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+            futures = [
+                executor.submit(_count_file_range, str(file_path), start, end, self.chunk_bytes)
+                for start, end in ranges
+            ]
+            for future in futures:
+                (part_words, part_counts), part_sentences, part_breaks = future.result()
+                counts = self.interner.merge(counts, part_words, part_counts)
+                sentences += part_sentences
+                breaks += part_breaks
+
+        return counts, sentences, breaks
+
+    def _chunk_end(self, mm, start: int, size: int) -> int:
+        """块结束位置：目标位置之后第一个"空白 → 非空白"边界"""
+        target = start + self.chunk_bytes
+        if target >= size:
+            return size
+        match = self.BOUNDARY_PATTERN.search(mm, target, size)
+        return match.end() if match else size
+
+    def _count_paragraphs(self, mm, breaks: int) -> int:
+        """段落数 = 空行分隔数 + 1，扣除文件首尾的空行段"""
+        first = self.LEADING_SPACE_PATTERN.match(mm).end()
+        if first == len(mm):
+            return 0
+
+        paragraphs = breaks + 1
+        if self.PARAGRAPH_BREAK_PATTERN.search(mm, 0, first):
+            paragraphs -= 1
+
+        # 末尾空白按 str.rstrip 判断（含 Unicode 空白）；开头可能切断的多字节字符忽略
+        tail = mm[-self.TAIL_BYTES:].decode('utf-8', errors='ignore')
+        trailing = tail[len(tail.rstrip()):]
+        if trailing.count('\n') >= 2:
+            paragraphs -= 1
+        return paragraphs
+
+    def _decode_counts(self, raw_counts: Counter) -> np.ndarray:
+        """每个不同的原始词只解码一次并驻留为ID，大小写变体在向量中合并"""
+        intern = self.interner.intern
+        ids, weights = [], []
+        for raw, count in raw_counts.items():
+            if raw.isascii():
+                word = raw.decode('ascii').lower()
+                if self.reader._is_valid_word(word):
+                    ids.append(intern(word))
+                    weights.append(count)
+            else:
+                # 严格解码：非 UTF-8 文件在此失败，由调用方回退
+                for word in self.reader.get_word_list(raw.decode('utf-8')):
+                    ids.append(intern(word))
+                    weights.append(count)
+        return self.interner.count_ids(np.array(ids, dtype=self.interner.DTYPE),
+                                       np.array(weights, dtype=np.float64))
+
+    def _basic_info(self, counts: np.ndarray, sentences: int, paragraphs: int) -> Dict:
+        ids = np.flatnonzero(counts)
+        total_words = int(counts.sum())
+        if len(ids):
+            words = self.interner.lookup(ids)
+            lengths = np.fromiter((len(w) for w in words), dtype=np.int64, count=len(words))
+            top = int(np.argmax(counts[ids]))
+            longest_word = words[int(np.argmax(lengths))]
+            most_common = (words[top], int(counts[ids[top]]))
+            avg_length = float(lengths @ counts[ids]) / total_words
+        else:
+            longest_word, most_common, avg_length = '', ('', 0), 0
+
+        return {
+            'total_words': total_words,
+            'unique_words': len(ids),
+            'avg_word_length': avg_length,
+            'longest_word': longest_word,
+            'most_common_word': most_common,
+            'sentences': sentences,
+            'paragraphs': paragraphs
+        }
+
+
+def _count_file_range(file_path: str, start: int, end: int, chunk_bytes: int) -> Tuple[Tuple[List[str], np.ndarray], int, int]:
+    """进程池任务：映射文件并统计 [start, end) 范围"""
+    counter = MappedTextCounter(chunk_bytes=chunk_bytes, workers=1)
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        counts, sentences, breaks = counter._count_range(mm, start, end)
+    return counter.interner.export(counts), sentences, breaks
@@ -27,21 +27,39 @@ class PersonalWordlistImporter:
     def __init__(self, db_path: str = "data/databases/unified.db"):
         self.db_path = db_path
     
-    def import_from_file(self, file_path: str, file_format: str = 'auto') -> Dict:
-        """从文件导入个人词汇表"""
+    def import_from_file(self, file_path: str, file_format: str = 'auto',
+                         default_status: str = 'new') -> Dict:
+        """从文件导入个人词汇表
+        
+        先解析全部条目，再通过 PersonalStatusManager.batch_set_status 单事务写入。
+        """
         
         # 自动检测格式
         if file_format == 'auto':
             file_format = self._detect_format(file_path)
         
         if file_format == 'csv':
-            return self._import_csv(file_path)
+            entries, stats = self._read_csv(file_path, default_status)
         elif file_format == 'json':
-            return self._import_json(file_path)
+            entries, stats = self._read_json(file_path, default_status)
         elif file_format == 'txt':
-            return self._import_txt(file_path)
+            entries, stats = self._read_txt(file_path, default_status)
         else:
             raise ValueError(f"不支持的文件格式: {file_format}")
+        
+        from ..vocabulary.personal_status_manager import PersonalStatusManager
+        manager = PersonalStatusManager(self.db_path)
+        result = manager.batch_set_status(entries, create_if_missing=True)
+        
+        stats['updated'] = result['updated']
+        stats['created'] = result['created']
+        stats['duplicates'] = result['duplicates']
+        stats['imported'] = result['updated'] + result['created']
+        stats['errors'] += result['failed']
+        
+        print(f"📥 导入完成: 更新 {stats['updated']}，新建 {stats['created']}，"
+              f"重复 {stats['duplicates']}，失败 {stats['errors']}，无效状态 {stats['invalid_status']}")
+        return stats
     
     def _detect_format(self, file_path: str) -> str:
         """自动检测文件格式"""
@@ -55,88 +73,68 @@ class PersonalWordlistImporter:
         else:
             return 'txt'  # 默认为txt
     
-    def _import_csv(self, file_path: str) -> Dict:
-        """导入CSV格式文件"""
-        stats = {'imported': 0, 'errors': 0, 'invalid_status': 0}
+    def _new_stats(self) -> Dict:
+        return {'imported': 0, 'errors': 0, 'invalid_status': 0}
+    
+    def _collect(self, entries: List[Tuple], stats: Dict, word: str, status: str,
+                 notes: str, default_status: str):
+        """校验单个条目并加入待写入列表"""
+        if not word:
+            stats['errors'] += 1
+            return
+        
+        if status not in self.VALID_STATUSES:
+            stats['invalid_status'] += 1
+            status = default_status
+        
+        entries.append((word, status, notes or None))
+    
+    def _read_csv(self, file_path: str, default_status: str) -> Tuple[List[Tuple], Dict]:
+        """读取CSV格式文件"""
+        entries, stats = [], self._new_stats()
         
         with open(file_path, 'r', encoding='utf-8') as f:
             reader = csv.DictReader(f)
             for row in reader:
-                word = row.get('word', '').strip()
-                status = row.get('status', 'new').strip().lower()
-                notes = row.get('notes', '').strip()
-                
-                if not word:
-                    stats['errors'] += 1
-                    continue
-                
-                if status not in self.VALID_STATUSES:
-                    stats['invalid_status'] += 1
-                    status = 'new'
-                
-                if self._set_word_status(word, status, notes):
-                    stats['imported'] += 1
-                else:
-                    stats['errors'] += 1
+                self._collect(entries, stats,
+                              (row.get('word') or '').strip(),
+                              (row.get('status') or default_status).strip().lower(),
+                              (row.get('notes') or '').strip(),
+                              default_status)
         
-        return stats
+        return entries, stats
     
-    def _import_json(self, file_path: str) -> Dict:
-        """导入JSON格式文件"""
-        stats = {'imported': 0, 'errors': 0, 'invalid_status': 0}
+    def _read_json(self, file_path: str, default_status: str) -> Tuple[List[Tuple], Dict]:
+        """读取JSON格式文件"""
+        entries, stats = [], self._new_stats()
         
         with open(file_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
             
-            if not isinstance(data, list):
-                raise ValueError("JSON文件必须包含词汇对象数组")
-            
-            for item in data:
-                word = item.get('word', '').strip()
-                status = item.get('status', 'new').strip().lower()
-                notes = item.get('notes', '').strip()
-                
-                if not word:
-                    stats['errors'] += 1
-                    continue
-                
-                if status not in self.VALID_STATUSES:
-                    stats['invalid_status'] += 1
-                    status = 'new'
-                
-                if self._set_word_status(word, status, notes):
-                    stats['imported'] += 1
-                else:
-                    stats['errors'] += 1
+        if not isinstance(data, list):
+            raise ValueError("JSON文件必须包含词汇对象数组")
         
-        return stats
+        for item in data:
+            self._collect(entries, stats,
+                          (item.get('word') or '').strip(),
+                          (item.get('status') or default_status).strip().lower(),
+                          (item.get('notes') or '').strip(),
+                          default_status)
+        
+        return entries, stats
     
-    def _import_txt(self, file_path: str) -> Dict:
-        """导入TXT格式文件（每行一个词汇）"""
-        stats = {'imported': 0, 'errors': 0, 'invalid_status': 0}
+    def _read_txt(self, file_path: str, default_status: str) -> Tuple[List[Tuple], Dict]:
+        """读取TXT格式文件（每行一个词汇）"""
+        entries, stats = [], self._new_stats()
         
         with open(file_path, 'r', encoding='utf-8') as f:
             for line in f:
                 word = line.strip()
                 if not word or word.startswith('#'):  # 跳过空行和注释
                     continue
-                
-                if self._set_word_status(word, 'new'):
-                    stats['imported'] += 1
-                else:
-                    stats['errors'] += 1
+                entries.append((word, default_status, None))
         
-        return stats
-    
-    def _set_word_status(self, word: str, status: str, notes: str = None) -> bool:
-        """设置词汇状态"""
-        try:
-            from ..vocabulary.personal_status_manager import PersonalStatusManager
-            manager = PersonalStatusManager(self.db_path)
-            return manager.set_word_status(word, status, create_if_missing=True)
-        except Exception as e:
-            print(f"设置词汇状态失败 {word}: {e}")
-            return False
+        return entries, stats
     
     def export_to_file(self, file_path: str, status_filter: str = None) -> Dict:
         """导出个人词汇表到文件"""
@@ -196,10 +194,11 @@ class PersonalWordlistImporter:
                 f.write(f"{word_info.get('surface_form', '')}\n")
 
 # 兼容函数
-def import_personal_wordlist(file_path: str, file_format: str = 'auto') -> Dict:
+def import_personal_wordlist(file_path: str, file_format: str = 'auto',
+                             default_status: str = 'new') -> Dict:
     """导入个人词汇表（兼容函数）"""
     importer = PersonalWordlistImporter()
-    return importer.import_from_file(file_path, file_format)
+    return importer.import_from_file(file_path, file_format, default_status)
 
 def export_personal_wordlist(file_path: str, status_filter: str = None) -> Dict:
     """导出个人词汇表（兼容函数）"""
@@ -0,0 +1,144 @@
+# 流式词频统计器
+# 路径: core/engines/input/stream_counter.py
+# 项目名称: Word Frequency Analysis
+# 作者: Sherryyue
+
+"""
+流式词频统计器 - DOCX / CSV 的常量内存分析
+
+TextReader.iter_text 逐段落 / 逐行产出文本，统计器把片段攒成约 1MB 的批次后分词计数，
+整个文档不会以字符串形式出现在内存中，内存占用只与词汇量有关：
+- 每批先对原始词计数，每个不同的词只校验一次，无效词（数字、链接等）不进入累计结果
+- 片段之间按换行连接，分词、句子、段落口径与 WordAnalyzer.analyze_document 对整段文本的结果一致
+- 内容哈希（TextDigest，预处理后文本的 SHA-256）在计数的同一遍读取中计算，与常规读取路径一致；
+  压缩文件与归档成员只解压一次，哈希与未压缩的同一文件相同
+"""
+
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from .file_reader import TextDigest, TextReader
+from ...utils.helpers import is_compressed_input
+
+
+class StreamingTextCounter:
+    """基于 TextReader.iter_text 的流式词频统计器"""
+
+    # 与 TextReader.get_word_list 相同的分词规则
+    TOKEN_PATTERN = re.compile(r"\b\w+(?:[-']\w+)*\b")
+    SENTENCE_PATTERN = re.compile(r'[.!?]+')
+    # 包含至少两个换行的空白段（即空行分隔），每段只匹配一次
+    PARAGRAPH_BREAK_PATTERN = re.compile(r'\n[^\S\n]*\n\s*')
+
+    BATCH_CHARS = 1024 * 1024
+
+    SUPPORTED_FORMATS = ('.docx', '.csv')
+
+    def __init__(self, reader: Optional[TextReader] = None, batch_chars: Optional[int] = None):
+        self.reader = reader or TextReader()
+        self.batch_chars = batch_chars or self.BATCH_CHARS
+
+    @classmethod
+    def supports(cls, file_path: Union[str, Path]) -> bool:
+        """是否可以走流式路径（DOCX / CSV，以及所有压缩文件与归档成员）"""
+        return is_compressed_input(file_path) or Path(file_path).suffix.lower() in cls.SUPPORTED_FORMATS
+
+    def content_hash(self, file_path: Union[str, Path], **kwargs) -> str:
+        """预处理后文本的内容哈希（逐段读取，见 TextDigest）"""
+        digest = TextDigest()
+        for chunk in self.reader.iter_text(file_path, **kwargs):
+            digest.separator()
+            digest.update(chunk)
+        return digest.hexdigest()
+
+    def count(self, file_path: Union[str, Path], **kwargs) -> Tuple[Dict, Dict[str, int]]:
+        """流式统计文件词频
+
+        Returns:
+            (basic_info, word_frequencies)，basic_info 的键与
+            WordAnalyzer.analyze_document 相同，另含 char_count
+        """
+        return self.count_chunks(self.reader.iter_text(file_path, **kwargs))
+
+    def count_and_hash(self, file_path: Union[str, Path], **kwargs) -> Tuple[Dict, Dict[str, int], str]:
+        """一次读取同时完成计数与内容哈希，返回 (basic_info, word_frequencies, content_hash)"""
+        digest = TextDigest()
+        basic_info, word_frequencies = self.count_chunks(self.reader.iter_text(file_path, **kwargs), digest)
+        return basic_info, word_frequencies, digest.hexdigest()
+
+    def count_chunks(self, chunks: Iterable[str], digest: Optional[TextDigest] = None) -> Tuple[Dict, Dict[str, int]]:
+        """统计以换行连接的文本片段（给出 digest 时同时更新内容哈希）"""
+        self._counts = Counter()
+        self._sentences = 0
+        self._paragraphs = 0
+        self._chars = 0
+        self._batches = 0
+        # 段落状态：是否已出现内容、当前末尾空白段中的换行数
+        self._seen_content = False
+        self._pending_newlines = 0
+
+        batch, size = [], 0
+        for chunk in chunks:
+            if digest is not None:
+                digest.separator()
+                digest.update(chunk)
+            batch.append(chunk)
+            size += len(chunk) + 1
+            if size >= self.batch_chars:
+                self._count_batch('\n'.join(batch))
+                batch, size = [], 0
+        if batch:
+            self._count_batch('\n'.join(batch))
+
+        return self._basic_info(), dict(self._counts)
+
+    def _count_batch(self, text: str):
+        if self._batches:
+            # 批次之间的连接换行
+            self._pending_newlines += 1
+            self._chars += 1
+        self._batches += 1
+        self._chars += len(text)
+        self._sentences += sum(1 for _ in self.SENTENCE_PATTERN.finditer(text))
+        self._count_paragraphs(text)
+
+        is_valid = self.reader._is_valid_word
+        batch_counts = Counter(self.TOKEN_PATTERN.findall(text.lower()))
+        self._counts.update({word: count for word, count in batch_counts.items() if is_valid(word)})
+
+    def _count_paragraphs(self, text: str):
+        """段落数 = 有内容的空行分隔段数；首尾空白段跨批次累计"""
+        stripped = text.lstrip()
+        self._pending_newlines += text.count('\n', 0, len(text) - len(stripped))
+        if not stripped:
+            return
+
+        body = stripped.rstrip()
+        if not self._seen_content or self._pending_newlines >= 2:
+            self._paragraphs += 1
+        self._paragraphs += sum(1 for _ in self.PARAGRAPH_BREAK_PATTERN.finditer(body))
+        self._seen_content = True
+        self._pending_newlines = stripped.count('\n', len(body))
+
+    def _basic_info(self) -> Dict:
+        counts = self._counts
+        total_words = sum(counts.values())
+        if counts:
+            longest_word = max(counts, key=len)
+            most_common = counts.most_common(1)[0]
+            avg_length = sum(len(word) * count for word, count in counts.items()) / total_words
+        else:
+            longest_word, most_common, avg_length = '', ('', 0), 0
+
+        return {
+            'total_words': total_words,
+            'unique_words': len(counts),
+            'avg_word_length': avg_length,
+            'longest_word': longest_word,
+            'most_common_word': most_common,
+            'sentences': self._sentences,
+            'paragraphs': self._paragraphs,
+            'char_count': self._chars
+        }
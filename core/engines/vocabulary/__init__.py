@@ -9,6 +9,10 @@
 核心组件：
 - WordAnalyzer: 词汇分析器
 - PersonalStatusManager: 个人学习状态管理器
+- VocabularyInterner: 词汇驻留表（表面形式 -> int32 ID）
+- FrequencySketch: 词频概率草图（Count-Min / HyperLogLog / Space-Saving）
+- MinHasher: 词频分布 MinHash 签名（近似重复检测）
+- FrequencyProfile: 词频概况（一次遍历的 top-N、分布与单次词汇）
 
 特性：
 - 精确的字典关联（dictionary_id）
@@ -19,10 +23,20 @@
 
 from .word_analyzer import WordAnalyzer
 from .personal_status_manager import PersonalStatusManager
+from .vocabulary_interner import VocabularyInterner, get_interner, reset_interner
+from .frequency_sketch import FrequencySketch
+from .minhash import MinHasher
+from .frequency_profile import FrequencyProfile
 
 __all__ = [
     'WordAnalyzer',
-    'PersonalStatusManager'
+    'PersonalStatusManager',
+    'VocabularyInterner',
+    'get_interner',
+    'reset_interner',
+    'FrequencySketch',
+    'MinHasher',
+    'FrequencyProfile'
 ]
 
 # 版本信息
@@ -0,0 +1,136 @@
+# 词频概况
+# 路径: core/engines/vocabulary/frequency_profile.py
+# 项目名称: Word Frequency Analysis
+# 作者: Sherryyue
+
+"""
+词频概况 - 一次遍历得到报告所需的全部统计
+
+一趟遍历词频字典同时得到：
+- 高频词 top-N（固定大小的最小堆，不对全部词汇排序）
+- 词长分布、频率分布
+- 单次出现词汇 (hapax) 列表
+- 频率区间计数
+
+文本报告、批量汇总、JSON 输出和 CLI 均基于同一对象渲染。
+"""
+
+import heapq
+from bisect import bisect_right
+from typing import Dict, List, Mapping, Optional, Tuple
+
+
+class FrequencyProfile:
+    """文档（或一批文档）的词频概况"""
+
+    # 频率区间 (下限, 上限)，上限 None 表示不设上限
+    FREQUENCY_BUCKETS = ((1, 1), (2, 5), (6, 10), (11, 20), (21, 50), (51, None))
+
+    def __init__(self, word_frequencies: Mapping[str, int], top_n: int = 20):
+        self.top_n = top_n
+        self.total = 0
+        self.unique = 0
+        self.max_frequency = 0
+        self.length_histogram: Dict[int, int] = {}
+        self.frequency_histogram: Dict[int, int] = {}
+        self.hapaxes: List[str] = []
+        self.bucket_counts = [0] * len(self.FREQUENCY_BUCKETS)
+
+        lower_bounds = [low for low, _ in self.FREQUENCY_BUCKETS]
+        length_sum = 0
+        # 最小堆 (频率, -序号, 词汇)：同频率时保留先出现的词，与稳定排序结果一致
+        heap: List[Tuple[int, int, str]] = []
+
+        for index, (word, count) in enumerate(word_frequencies.items()):
+            if count <= 0:
+                continue
+            length = len(word)
+            self.total += count
+            self.unique += 1
+            length_sum += length
+            if count > self.max_frequency:
+                self.max_frequency = count
+
+            self.length_histogram[length] = self.length_histogram.get(length, 0) + 1
+            self.frequency_histogram[count] = self.frequency_histogram.get(count, 0) + 1
+            if count == 1:
+                self.hapaxes.append(word)
+
+            bucket = bisect_right(lower_bounds, count) - 1
+            self.bucket_counts[bucket] += 1
+
+            if top_n:
+                item = (count, -index, word)
+                if len(heap) < top_n:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+
+        self.avg_word_length = length_sum / self.unique if self.unique else 0
+        self.top_words: List[Tuple[str, int]] = [
+            (word, count) for count, _, word in sorted(heap, reverse=True)
+        ]
+
+    @property
+    def hapax_count(self) -> int:
+        return len(self.hapaxes)
+
+    @property
+    def avg_frequency(self) -> float:
+        return self.total / self.unique if self.unique else 0
+
+    @property
+    def top_word(self) -> Tuple[str, int]:
+        return self.top_words[0] if self.top_words else ('', 0)
+
+    def buckets(self) -> List[Dict]:
+        """频率区间计数 [{'label', 'min', 'max', 'count', 'percentage'}]"""
+        result = []
+        for (low, high), count in zip(self.FREQUENCY_BUCKETS, self.bucket_counts):
+            if high is None:
+                label = f"{low}+ 次"
+            elif low == high:
+                label = f"{low} 次"
+            else:
+                label = f"{low}-{high} 次"
+            result.append({
+                'label': label,
+                'min': low,
+                'max': high,
+                'count': count,
+                'percentage': count / self.unique * 100 if self.unique else 0,
+            })
+        return result
+
+    def hapax_sample(self, limit: int = 100) -> List[str]:
+        """按字母顺序的前 limit 个单次词汇（不对全部单次词汇排序）"""
+        return heapq.nsmallest(limit, self.hapaxes)
+
+    def hapax_lengths(self) -> Optional[Dict]:
+        """单次词汇的词长统计及最长的单次词汇"""
+        if not self.hapaxes:
+            return None
+        lengths = [len(word) for word in self.hapaxes]
+        longest = max(lengths)
+        return {
+            'average': sum(lengths) / len(lengths),
+            'max': longest,
+            'min': min(lengths),
+            'longest': [word for word in self.hapaxes if len(word) == longest][:5],
+        }
+
+    def to_dict(self, hapax_limit: Optional[int] = 50) -> Dict:
+        """转为可 JSON 序列化的字典"""
+        return {
+            'total_words': self.total,
+            'unique_words': self.unique,
+            'max_frequency': self.max_frequency,
+            'avg_frequency': round(self.avg_frequency, 4),
+            'avg_word_length': round(self.avg_word_length, 4),
+            'top_words': [{'word': word, 'frequency': count} for word, count in self.top_words],
+            'length_histogram': {str(length): count for length, count in sorted(self.length_histogram.items())},
+            'frequency_histogram': {str(freq): count for freq, count in sorted(self.frequency_histogram.items())},
+            'frequency_buckets': self.buckets(),
+            'hapax_count': self.hapax_count,
+            'hapaxes': self.hapaxes[:hapax_limit] if hapax_limit is not None else list(self.hapaxes),
+        }
@@ -0,0 +1,255 @@
+# 词频概率草图
+# 路径: core/engines/vocabulary/frequency_sketch.py
+# 项目名称: Word Frequency Analysis
+# 作者: Sherryyue
+
+"""
+词频概率草图 - 固定内存的流式语料统计
+
+- CountMinSketch: 任意词汇的频率估计（只会高估，误差 ≈ 总词数 × e / 宽度）
+- HyperLogLog: 不同词汇数估计（相对误差 ≈ 1.04 / √寄存器数）
+- SpaceSaving: 高频词 top-k 及其误差上界
+- FrequencySketch: 三者组合，按文档词频字典批量更新，同参数草图可合并；
+  Count-Min 计数与总数可按文档扣减（删除文档），HyperLogLog 与 Space-Saving 不可扣减
+
+每个不同的词汇只计算一次 128 位哈希，草图更新均为 NumPy 向量操作。
+"""
+
+import hashlib
+import heapq
+import json
+import zlib
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+
+def hash_words(words: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """每个词汇计算一对 64 位哈希 (h1, h2)"""
+    h1, h2 = [], []
+    for word in words:
+        digest = hashlib.blake2b(word.encode('utf-8'), digest_size=16).digest()
+        h1.append(int.from_bytes(digest[:8], 'little'))
+        h2.append(int.from_bytes(digest[8:], 'little') | 1)
+    return np.array(h1, dtype=np.uint64), np.array(h2, dtype=np.uint64)
+
+
+class CountMinSketch:
+    """Count-Min 草图：depth 行 × width 列计数器"""
+
+    def __init__(self, width: int = 2048, depth: int = 4, table: np.ndarray = None):
+        self.width = width
+        self.depth = depth
+        self.table = table if table is not None else np.zeros((depth, width), dtype=np.int64)
+
+    def _columns(self, h1: np.ndarray, h2: np.ndarray, row: int) -> np.ndarray:
+        # 双重哈希生成各行列号: (h1 + row * h2) mod width
+        return ((h1 + np.uint64(row) * h2) % np.uint64(self.width)).astype(np.intp)
+
+    def update(self, h1: np.ndarray, h2: np.ndarray, counts: np.ndarray):
+        for row in range(self.depth):
+            np.add.at(self.table[row], self._columns(h1, h2, row), counts)
+
+    def columns(self, h1: np.ndarray, h2: np.ndarray) -> np.ndarray:
+        """各行列号，形状 (depth, 词汇数)"""
+        return np.stack([self._columns(h1, h2, row) for row in range(self.depth)])
+
+    def subtract(self, columns: np.ndarray, counts: np.ndarray):
+        """扣减此前按 columns 计入的计数"""
+        for row in range(self.depth):
+            np.subtract.at(self.table[row], columns[row], counts)
+
+    def estimate(self, h1: np.ndarray, h2: np.ndarray) -> np.ndarray:
+        rows = [self.table[row][self._columns(h1, h2, row)] for row in range(self.depth)]
+        return np.min(rows, axis=0)
+
+    def merge(self, other: 'CountMinSketch'):
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("Count-Min 草图尺寸不同，无法合并")
+        self.table += other.table
+
+
+class HyperLogLog:
+    """HyperLogLog 基数估计，2^precision 个寄存器"""
+
+    def __init__(self, precision: int = 12, registers: np.ndarray = None):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = registers if registers is not None else np.zeros(self.size, dtype=np.uint8)
+
+    def update(self, h1: np.ndarray):
+        p = np.uint64(self.precision)
+        index = (h1 >> np.uint64(64 - self.precision)).astype(np.intp)
+        remainder = h1 << p
+
+        # 向量化计算前导零个数（二分移位）
+        zeros = np.zeros(len(h1), dtype=np.uint8)
+        value = remainder.copy()
+        for shift in (32, 16, 8, 4, 2, 1):
+            empty = value < np.uint64(1 << (64 - shift))
+            zeros[empty] += shift
+            value[empty] <<= np.uint64(shift)
+        max_rank = 64 - self.precision + 1
+        ranks = np.where(remainder == 0, max_rank, np.minimum(zeros + 1, max_rank)).astype(np.uint8)
+
+        np.maximum.at(self.registers, index, ranks)
+
+    def estimate(self) -> int:
+        m = self.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        empty = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and empty:
+            # 小基数区间使用线性计数
+            raw = m * np.log(m / empty)
+        return int(round(raw))
+
+    def merge(self, other: 'HyperLogLog'):
+        if self.precision != other.precision:
+            raise ValueError("HyperLogLog 精度不同，无法合并")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+
+class SpaceSaving:
+    """Space-Saving 高频词摘要：最多保留 k 个计数器 {词汇: (计数, 误差上界)}"""
+
+    def __init__(self, k: int = 200, counters: Dict[str, Tuple[int, int]] = None):
+        self.k = k
+        self.counters = counters or {}
+
+    def _floor(self) -> int:
+        """摘要已满时，未被跟踪的词汇计数不超过最小计数器"""
+        if len(self.counters) < self.k:
+            return 0
+        return min(count for count, _ in self.counters.values())
+
+    def update(self, word_frequencies: Mapping[str, int]):
+        """批量加入精确计数（等价于与一个无误差摘要合并）"""
+        self._merge({word: (count, 0) for word, count in word_frequencies.items()}, 0)
+
+    def merge(self, other: 'SpaceSaving'):
+        self._merge(other.counters, other._floor())
+
+    def _merge(self, counters: Dict[str, Tuple[int, int]], other_floor: int):
+        own_floor = self._floor()
+        combined = {}
+        for word, (count, error) in self.counters.items():
+            other_count, other_error = counters.get(word, (other_floor, other_floor))
+            combined[word] = (count + other_count, error + other_error)
+        for word, (count, error) in counters.items():
+            if word not in combined:
+                combined[word] = (count + own_floor, error + own_floor)
+
+        if len(combined) > self.k:
+            combined = dict(heapq.nlargest(self.k, combined.items(), key=lambda item: item[1][0]))
+        self.counters = combined
+
+    def top(self, n: int = None) -> List[Tuple[str, int, int]]:
+        """按计数降序返回 [(词汇, 计数, 误差上界)]"""
+        items = sorted(self.counters.items(), key=lambda item: (-item[1][0], item[0]))
+        return [(word, count, error) for word, (count, error) in items[:n]]
+
+
+class FrequencySketch:
+    """组合草图：频率估计 + 不同词汇数 + top-k"""
+
+    DEFAULT_PARAMS = {'width': 2048, 'depth': 4, 'precision': 12, 'top_k': 200}
+
+    def __init__(self, width: int = None, depth: int = None, precision: int = None, top_k: int = None):
+        params = self.DEFAULT_PARAMS
+        self.params = {
+            'width': width or params['width'],
+            'depth': depth or params['depth'],
+            'precision': precision or params['precision'],
+            'top_k': top_k or params['top_k'],
+        }
+        self.count_min = CountMinSketch(self.params['width'], self.params['depth'])
+        self.hll = HyperLogLog(self.params['precision'])
+        self.top_k = SpaceSaving(self.params['top_k'])
+        self.total = 0
+        self.documents = 0
+
+    def update(self, word_frequencies: Mapping[str, int]):
+        """加入一篇文档的词频"""
+        if not word_frequencies:
+            return
+        h1, h2 = hash_words(word_frequencies.keys())
+        counts = np.fromiter(word_frequencies.values(), dtype=np.int64, count=len(h1))
+
+        self.count_min.update(h1, h2, counts)
+        self.hll.update(h1)
+        self.top_k.update(word_frequencies)
+        self.total += int(counts.sum())
+        self.documents += 1
+
+    def merge(self, other: 'FrequencySketch'):
+        """合并同参数草图"""
+        if self.params != other.params:
+            raise ValueError("草图参数不同，无法合并")
+        self.count_min.merge(other.count_min)
+        self.hll.merge(other.hll)
+        self.top_k.merge(other.top_k)
+        self.total += other.total
+        self.documents += other.documents
+
+    def contribution(self, word_frequencies: Mapping[str, int]) -> bytes:
+        """一篇文档在本草图 Count-Min 表中计入的单元格（zlib），删除文档时用于 subtract"""
+        h1, h2 = hash_words(word_frequencies.keys())
+        counts = np.fromiter(word_frequencies.values(), dtype=np.int64, count=len(h1))
+        columns = self.count_min.columns(h1, h2).astype('<u4')
+        return zlib.compress(columns.tobytes() + counts.astype('<i8').tobytes())
+
+    def subtract(self, contribution: bytes, total: int):
+        """移除一篇文档：扣减其 Count-Min 计数、总词数与文档数
+
+        HyperLogLog 寄存器与 Space-Saving 摘要无法扣减，仍保留该文档的贡献
+        （不同词汇数与 top-k 只会偏高，直到草图重建）
+        """
+        data = zlib.decompress(contribution)
+        depth = self.params['depth']
+        size = len(data) // (4 * depth + 8)
+        columns = np.frombuffer(data, dtype='<u4', count=depth * size).reshape(depth, size).astype(np.intp)
+        counts = np.frombuffer(data, dtype='<i8', offset=4 * depth * size).astype(np.int64)
+        self.count_min.subtract(columns, counts)
+        self.total -= total
+        self.documents -= 1
+
+    def estimate(self, words: List[str]) -> Dict[str, int]:
+        """估计词汇频率（不低于真实值）"""
+        if not words:
+            return {}
+        h1, h2 = hash_words(words)
+        return dict(zip(words, self.count_min.estimate(h1, h2).tolist()))
+
+    def distinct(self) -> int:
+        """估计不同词汇数"""
+        return self.hll.estimate()
+
+    def top(self, n: int = None) -> List[Tuple[str, int, int]]:
+        return self.top_k.top(n)
+
+    # =================== 序列化 ===================
+
+    def to_record(self) -> Dict:
+        """转为可存储的记录（数组 zlib 压缩）"""
+        return {
+            'params': json.dumps(self.params),
+            'count_min': zlib.compress(self.count_min.table.tobytes()),
+            'hll': zlib.compress(self.hll.registers.tobytes()),
+            'top_k': json.dumps(self.top()),
+            'total': self.total,
+            'documents': self.documents,
+        }
+
+    @classmethod
+    def from_record(cls, record: Mapping) -> 'FrequencySketch':
+        sketch = cls(**json.loads(record['params']))
+        params = sketch.params
+        sketch.count_min.table = np.frombuffer(
+            zlib.decompress(record['count_min']), dtype=np.int64
+        ).reshape(params['depth'], params['width']).copy()
+        sketch.hll.registers = np.frombuffer(zlib.decompress(record['hll']), dtype=np.uint8).copy()
+        sketch.top_k.counters = {word: (count, error) for word, count, error in json.loads(record['top_k'])}
+        sketch.total = record['total']
+        sketch.documents = record['documents']
+        return sketch
@@ -3,11 +3,15 @@
 # 项目名称: Word Frequency Analysis
 # 作者: Sherryyue
 
+import re
 import sqlite3
+import uuid
 from typing import Dict, List, Optional, Set, Tuple
 from datetime import datetime
 import logging
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 class PersonalStatusManager:
@@ -24,9 +28,16 @@ class PersonalStatusManager:
     STATUS_MASTER = 'master'
     
     VALID_STATUSES = {STATUS_NEW, STATUS_LEARN, STATUS_KNOW, STATUS_MASTER}
+    STATUS_ORDER = (STATUS_NEW, STATUS_LEARN, STATUS_KNOW, STATUS_MASTER)
+    
+    # 批量加载 occurrences 时每次读取的行数
+    FETCH_BATCH = 50000
+    OCCURRENCE_DTYPE = np.dtype([('doc', np.int64), ('word', np.int64), ('freq', np.int64)])
     
-    def __init__(self, db_path: str = "data/databases/unified.db"):
+    def __init__(self, db_path: str = "data/databases/unified.db", storage=None):
         self.db_path = db_path
+        # 文档词频经由存储后端读取（分片模式下附加全部分片），未指定时按配置创建
+        self.storage = storage
     
     def set_word_status(self, 
                        word_surface_form: str, 
@@ -100,22 +111,109 @@ class PersonalStatusManager:
             return False
     
     def batch_set_status(self, 
-                        word_status_pairs: List[Tuple[str, str]]) -> Dict[str, int]:
-        """批量设置词汇状态
+                        word_status_pairs: List[Tuple],
+                        create_if_missing: bool = True) -> Dict[str, int]:
+        """批量设置词汇状态（单事务）
+        
+        词汇先写入临时表，通过一次关联解析 surface_form/lemma，
+        批量创建缺失词汇后一次性更新所有状态。同一词汇多次出现时以最后一次为准。
         
         Args:
-            word_status_pairs: [(word, status), ...] 列表
+            word_status_pairs: [(word, status), ...] 或 [(word, status, notes), ...] 列表
+            create_if_missing: 词汇不存在时是否创建
             
         Returns:
-            统计结果 {'updated': n, 'created': n, 'failed': n}
+            统计结果 {'updated': n, 'created': n, 'failed': n, 'duplicates': n}
         """
-        stats = {'updated': 0, 'created': 0, 'failed': 0}
+        stats = {'updated': 0, 'created': 0, 'failed': 0, 'duplicates': 0}
         
-        for word, status in word_status_pairs:
-            if self.set_word_status(word, status):
-                stats['updated'] += 1
-            else:
+        # 校验并去重（保留最后一次出现的状态）
+        staged = {}
+        for item in word_status_pairs:
+            word, status = (item[0] or '').strip(), (item[1] or '').strip().lower()
+            notes = item[2] if len(item) > 2 and item[2] else None
+            if not word or status not in self.VALID_STATUSES:
                 stats['failed'] += 1
+                continue
+            if word in staged:
+                stats['duplicates'] += 1
+                del staged[word]
+            staged[word] = (status, notes)
+        
+        if not staged:
+            logger.info(f"📊 批量状态设置完成: {stats}")
+            return stats
+        
+        now = datetime.now().isoformat()
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute("DROP TABLE IF EXISTS temp.staged_status")
+                conn.execute("""
+                    CREATE TEMP TABLE staged_status (
+                        seq INTEGER PRIMARY KEY,
+                        word TEXT NOT NULL,
+                        status TEXT NOT NULL,
+                        notes TEXT,
+                        word_id TEXT,
+                        created BOOLEAN DEFAULT FALSE
+                    )
+                """)
+                conn.executemany("""
+                    INSERT INTO staged_status (word, status, notes) VALUES (?, ?, ?)
+                """, [(word, status, notes) for word, (status, notes) in staged.items()])
+                
+                # 一次关联解析词汇：优先匹配 surface_form，其次 lemma
+                conn.execute("""
+                    UPDATE staged_status
+                    SET word_id = COALESCE(
+                        (SELECT id FROM words WHERE surface_form = staged_status.word LIMIT 1),
+                        (SELECT id FROM words WHERE lemma = staged_status.word LIMIT 1)
+                    )
+                """)
+                
+                missing = conn.execute("""
+                    SELECT seq, word FROM staged_status WHERE word_id IS NULL ORDER BY seq
+                """).fetchall()
+                
+                if missing and create_if_missing:
+                    # 批量创建缺失词汇（与 set_word_status 一致：lemma 取表面形式）
+                    new_words = [(str(uuid.uuid4()), seq, word) for seq, word in missing]
+                    conn.executemany("""
+                        INSERT INTO words (id, surface_form, lemma, normalized_form)
+                        VALUES (?, ?, ?, ?)
+                    """, [(word_id, word, word, re.sub(r'[^\w]', '', word.lower()))
+                          for word_id, _, word in new_words])
+                    conn.executemany("""
+                        UPDATE staged_status SET word_id = ?, created = TRUE WHERE seq = ?
+                    """, [(word_id, seq) for word_id, seq, _ in new_words])
+                    stats['created'] = len(new_words)
+                else:
+                    stats['failed'] += len(missing)
+                
+                stats['updated'] = conn.execute("""
+                    SELECT COUNT(*) FROM staged_status WHERE word_id IS NOT NULL AND NOT created
+                """).fetchone()[0]
+                
+                # 一次性应用所有状态（多个输入解析到同一词汇时以最后一个为准）
+                conn.execute("CREATE INDEX temp.idx_staged_status_word_id ON staged_status(word_id, seq)")
+                conn.execute("""
+                    UPDATE words
+                    SET personal_status = (
+                            SELECT status FROM staged_status s
+                            WHERE s.word_id = words.id ORDER BY s.seq DESC LIMIT 1),
+                        personal_notes = COALESCE((
+                            SELECT notes FROM staged_status s
+                            WHERE s.word_id = words.id ORDER BY s.seq DESC LIMIT 1), personal_notes),
+                        status_updated_at = ?
+                    WHERE id IN (SELECT word_id FROM staged_status WHERE word_id IS NOT NULL)
+                """, (now,))
+                
+                conn.execute("DROP TABLE temp.staged_status")
+                
+        except Exception as e:
+            logger.error(f"❌ 批量设置词汇状态失败: {e}")
+            return {'updated': 0, 'created': 0, 'duplicates': stats['duplicates'],
+                    'failed': stats['failed'] + len(staged)}
         
         logger.info(f"📊 批量状态设置完成: {stats}")
         return stats
@@ -221,7 +319,7 @@ class PersonalStatusManager:
             难度分析结果
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect_corpus() as conn:
                 # 获取文档中的所有词汇及其状态
                 cursor = conn.execute("""
                     SELECT w.personal_status, w.dictionary_rank, w.difficulty_level,
@@ -238,6 +336,7 @@ class PersonalStatusManager:
                 
                 for row in cursor.fetchall():
                     status, rank, difficulty, frequency, surface_form = row
+                    status = status or self.STATUS_NEW  # NULL状态视为'new'
                     status_counts[status] += frequency  # 按出现次数计算
                     total_word_instances += frequency
                     
@@ -277,6 +376,162 @@ class PersonalStatusManager:
             logger.error(f"❌ 分析文档难度失败: {e}")
             return {}
     
+    def analyze_library_difficulty(self,
+                                   document_ids: Optional[List[str]] = None,
+                                   top_words: int = 20,
+                                   min_frequency: int = 3) -> List[Dict]:
+        """批量分析文档库的个人难度情况
+
+        一次加载个人状态向量和 occurrences 矩阵，用 NumPy 计算所有文档的
+        状态分布、难度评分和推荐词汇，口径与 analyze_document_difficulty 一致。
+
+        Args:
+            document_ids: 只分析指定文档，None 表示语料中的全部文档（没有词频的文档同样返回）
+            top_words: 每个文档返回的推荐词汇数量
+            min_frequency: 推荐词汇的最低出现次数
+
+        Returns:
+            每个文档的难度分析结果，按难度评分升序排列
+        """
+        try:
+            with self._connect_corpus() as conn:
+                words, occurrences, filenames = self._load_status_matrix(conn, document_ids)
+        except Exception as e:
+            logger.error(f"❌ 加载文档词汇矩阵失败: {e}")
+            return []
+
+        doc_ids, occ_doc, occ_word, occ_freq = occurrences
+        if not doc_ids:
+            return []
+
+        status_codes, surface_forms, ranks, difficulties = words
+        occ_status = status_codes[occ_word]
+        n_docs, n_status = len(doc_ids), len(self.STATUS_ORDER)
+
+        # 文档 × 状态 的出现次数矩阵
+        counts = np.bincount(occ_doc * n_status + occ_status, weights=occ_freq,
+                             minlength=n_docs * n_status).reshape(n_docs, n_status).astype(np.int64)
+        totals = counts.sum(axis=1)
+        safe_totals = np.maximum(totals, 1)
+        percentages = np.round(counts / safe_totals[:, None] * 100, 2)
+        scores = np.round((counts[:, 0] + counts[:, 1]) / safe_totals * 100, 1)
+
+        # 推荐词汇：未掌握(new/learn)且高频，按 (文档, 频率降序) 排序后按文档切片
+        candidates = np.flatnonzero((occ_status <= 1) & (occ_freq >= min_frequency))
+        order = candidates[np.lexsort((-occ_freq[candidates], occ_doc[candidates]))]
+        bounds = np.searchsorted(occ_doc[order], np.arange(n_docs + 1))
+
+        results = []
+        for d in np.argsort(scores, kind='stable'):
+            picked = order[bounds[d]:bounds[d + 1]][:top_words]
+            results.append({
+                'document_id': doc_ids[d],
+                'filename': filenames.get(doc_ids[d]),
+                'total_word_instances': int(totals[d]),
+                'status_distribution': {status: int(counts[d, i])
+                                        for i, status in enumerate(self.STATUS_ORDER)},
+                'difficulty_percentage': {status: float(percentages[d, i])
+                                          for i, status in enumerate(self.STATUS_ORDER)}
+                                         if totals[d] > 0 else {},
+                'overall_difficulty_score': float(scores[d]),
+                'known_percentage': float(np.round((counts[d, 2] + counts[d, 3]) / safe_totals[d] * 100, 2)),
+                'recommended_words': [{
+                    'word': surface_forms[occ_word[i]],
+                    'frequency': int(occ_freq[i]),
+                    'rank': ranks[occ_word[i]],
+                    'difficulty': difficulties[occ_word[i]],
+                    'status': self.STATUS_ORDER[occ_status[i]]
+                } for i in picked]
+            })
+
+        return results
+
+    def recommend_next_documents(self, count: int = 10,
+                                 target_known: float = 95.0,
+                                 top_words: int = 20) -> List[Dict]:
+        """推荐最适合接下来阅读的文档
+
+        以已掌握(know/master)词汇的出现比例衡量可读性，选择最接近目标比例的文档：
+        低于目标的文档生词过多，远高于目标的文档学习价值有限。
+
+        Args:
+            count: 推荐文档数量
+            target_known: 目标已掌握比例 (%)
+            top_words: 每个文档返回的推荐词汇数量
+
+        Returns:
+            推荐文档列表，按与目标比例的距离升序排列
+        """
+        analyses = [a for a in self.analyze_library_difficulty(top_words=top_words)
+                    if a['total_word_instances'] > 0]
+        if not analyses:
+            return []
+
+        known = np.array([a['known_percentage'] for a in analyses])
+        # 距离相同时优先已掌握比例更高（更易读）的文档
+        order = np.lexsort((-known, np.abs(known - target_known)))
+        return [analyses[i] for i in order[:count]]
+
+    def _connect_corpus(self):
+        from ..database.storage_backend import connect_corpus
+        return connect_corpus(self.db_path, self.storage)
+
+    def _load_status_matrix(self, conn, document_ids: Optional[List[str]] = None) -> Tuple:
+        """加载个人状态向量和 occurrences 稀疏矩阵
+
+        occurrences 按 FETCH_BATCH 分批读取，每批直接转换为 NumPy 结构化数组
+
+        Returns:
+            ((状态编码, 表面形式, 词典排名, 难度), (文档ID列表, 文档行号, 词汇行号, 频率), {文档ID: 文件名})
+        """
+        from core.models.schema import ModernSchema
+
+        status_index = {status: i for i, status in enumerate(self.STATUS_ORDER)}
+
+        word_rows = conn.execute("""
+            SELECT id, personal_status, surface_form, dictionary_rank, difficulty_level
+            FROM words
+        """).fetchall()
+        word_index = {row[0]: i for i, row in enumerate(word_rows)}
+        status_codes = np.fromiter((status_index.get(row[1], 0) for row in word_rows),
+                                   dtype=np.int64, count=len(word_rows))
+        surface_forms = [row[2] for row in word_rows]
+        ranks = [row[3] for row in word_rows]
+        difficulties = [row[4] for row in word_rows]
+
+        # 文档维度来自 documents 表：没有任何词频的文档也参与分析
+        document_filter = ModernSchema.corpus_document_filter()
+        params: Tuple = ()
+        if document_ids:
+            document_filter += f" AND id IN ({','.join('?' * len(document_ids))})"
+            params = tuple(document_ids)
+        filenames = dict(conn.execute(
+            f"SELECT id, filename FROM documents WHERE {document_filter} ORDER BY created_at", params
+        ).fetchall())
+        doc_ids = list(filenames)
+        doc_index = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+
+        cursor = conn.execute(f"""
+            SELECT document_id, word_id, frequency FROM occurrences
+            WHERE document_id IN (SELECT id FROM documents WHERE {document_filter})
+        """, params)
+        parts = []
+        while True:
+            rows = cursor.fetchmany(self.FETCH_BATCH)
+            if not rows:
+                break
+            parts.append(np.fromiter(
+                ((doc_index[doc_id], word_index.get(word_id, -1), frequency or 0)
+                 for doc_id, word_id, frequency in rows),
+                dtype=self.OCCURRENCE_DTYPE, count=len(rows)
+            ))
+        occ = np.concatenate(parts) if parts else np.empty(0, dtype=self.OCCURRENCE_DTYPE)
+        occ = occ[occ['word'] >= 0]
+
+        return ((status_codes, surface_forms, ranks, difficulties),
+                (doc_ids, occ['doc'], occ['word'], occ['freq']),
+                filenames)
+
     def import_personal_wordlist(self, 
                                 word_status_file: str, 
                                 file_format: str = 'csv') -> Dict[str, int]:
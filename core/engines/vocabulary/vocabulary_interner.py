@@ -0,0 +1,113 @@
+# 词汇驻留表
+# 路径: core/engines/vocabulary/vocabulary_interner.py
+# 项目名称: Word Frequency Analysis
+# 作者: Sherryyue
+
+"""
+词汇驻留表 - 表面形式到紧凑 int32 ID 的映射
+
+每个进程维护一张表（get_interner），词汇只在第一次出现时分配 ID，
+之后计数都在 NumPy 向量上进行：
+- 驻留表只增不减，常驻进程（text watch）每处理完一批文件调用 reset_interner 换用新表，
+  已有的词频向量仍与创建它们的驻留表配对使用
+- 词频向量下标即词汇ID，合并多个部分计数就是向量相加
+- 不同进程的 ID 空间互不相同，跨进程合并时传 (词表, 计数) 再 remap
+- 数据库层 UnifiedDatabase.store_frequency_vector 直接接收词频向量
+"""
+
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+import numpy as np
+
+
+class VocabularyInterner:
+    """表面形式 <-> 稠密 int32 ID"""
+
+    DTYPE = np.int32
+    COUNT_DTYPE = np.int64
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._words: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._ids
+
+    def intern(self, word: str) -> int:
+        """获取词汇ID，未见过的词汇分配新ID"""
+        word_id = self._ids.get(word)
+        if word_id is None:
+            word_id = len(self._words)
+            self._ids[word] = word_id
+            self._words.append(word)
+        return word_id
+
+    def intern_many(self, words: Iterable[str]) -> np.ndarray:
+        """批量获取词汇ID"""
+        intern = self.intern
+        return np.fromiter((intern(word) for word in words), dtype=self.DTYPE)
+
+    def lookup(self, ids: Iterable[int]) -> List[str]:
+        """ID -> 表面形式"""
+        words = self._words
+        return [words[i] for i in ids]
+
+    # =================== 词频向量 ===================
+
+    def empty_vector(self) -> np.ndarray:
+        return np.zeros(len(self), dtype=self.COUNT_DTYPE)
+
+    def count_ids(self, ids: np.ndarray, weights: np.ndarray = None) -> np.ndarray:
+        """对ID序列计数（可带权重），返回覆盖当前整个词表的词频向量"""
+        counts = np.bincount(ids, weights=weights, minlength=len(self))
+        return counts.astype(self.COUNT_DTYPE, copy=False)
+
+    def vector(self, word_frequencies: Mapping[str, int]) -> np.ndarray:
+        """{词汇: 频率} -> 词频向量"""
+        ids = self.intern_many(word_frequencies.keys())
+        weights = np.fromiter(word_frequencies.values(), dtype=np.float64, count=len(ids))
+        return self.count_ids(ids, weights)
+
+    def to_dict(self, counts: np.ndarray) -> Dict[str, int]:
+        """词频向量 -> {词汇: 频率}，只包含非零项"""
+        ids = np.flatnonzero(counts)
+        return dict(zip(self.lookup(ids), counts[ids].tolist()))
+
+    def export(self, counts: np.ndarray) -> Tuple[List[str], np.ndarray]:
+        """压缩为 (词表, 计数)，用于跨进程传输"""
+        ids = np.flatnonzero(counts)
+        return self.lookup(ids), counts[ids]
+
+    def merge(self, total: np.ndarray, words: List[str], counts: np.ndarray) -> np.ndarray:
+        """把其他进程导出的 (词表, 计数) 累加到本进程的词频向量"""
+        remapped = self.count_ids(self.intern_many(words), counts)
+        return self.add(total, remapped)
+
+    @staticmethod
+    def add(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """词频向量相加，长度不同时按较长者补零"""
+        if len(a) < len(b):
+            a, b = b, a
+        result = a.copy()
+        result[:len(b)] += b
+        return result
+
+
+_interner = None
+
+
+def get_interner() -> VocabularyInterner:
+    """获取进程级词汇驻留表"""
+    global _interner
+    if _interner is None:
+        _interner = VocabularyInterner()
+    return _interner
+
+
+def reset_interner():
+    """丢弃进程级词汇驻留表，之后的 get_interner 返回新表"""
+    global _interner
+    _interner = None
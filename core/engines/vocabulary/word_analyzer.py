@@ -43,6 +43,31 @@ class WordAnalyzer:
             'vocabulary': list(word_frequencies.keys())
         }
     
+    def analyze_document(self, text: str, reader=None) -> Tuple[Dict, Dict[str, int]]:
+        """分析原始文档文本，返回 (basic_info, word_frequencies)
+
+        分词使用 TextReader 的规则；句子、段落在未预处理的原文上统计，
+        预处理会合并空白、丢失段落信息。
+        """
+        if reader is None:
+            from ..input.file_reader import TextReader
+            reader = TextReader()
+
+        words = reader.get_word_list(text)
+        word_frequencies = Counter(words)
+
+        basic_info = {
+            'total_words': len(words),
+            'unique_words': len(word_frequencies),
+            'avg_word_length': sum(len(word) for word in words) / len(words) if words else 0,
+            'longest_word': max(words, key=len) if words else '',
+            'most_common_word': word_frequencies.most_common(1)[0] if word_frequencies else ('', 0),
+            'sentences': len(re.findall(r'[.!?]+', text)),
+            'paragraphs': len([p for p in re.split(r'\n\s*\n', text) if p.strip()])
+        }
+
+        return basic_info, dict(word_frequencies)
+
     def extract_words(self, text: str) -> List[str]:
         """从文本中提取词汇"""
         # 简单的词汇提取：只保留字母，转为小写
@@ -93,6 +118,11 @@ def analyze_text(text: str) -> Dict:
     analyzer = WordAnalyzer()
     return analyzer.analyze_text(text)
 
+def analyze_document(text: str, reader=None) -> Tuple[Dict, Dict[str, int]]:
+    """分析原始文档文本，返回 (basic_info, word_frequencies)（兼容函数）"""
+    analyzer = WordAnalyzer()
+    return analyzer.analyze_document(text, reader)
+
 def analyze_text_words(text: str) -> List[str]:
     """提取文本中的词汇（兼容函数）"""
     analyzer = WordAnalyzer()
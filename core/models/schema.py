@@ -13,31 +13,62 @@ import json
 class ModernSchema:
     """现代化的数据库架构设计 - 最新版本"""
     
+    # words 表中由 linguistic_features 拆分出的类型化列: 列名 -> JSON路径
+    LINGUISTIC_COLUMNS = {
+        'pos_tag': '$.pos_tag',
+        'pos_type': '$.pos_type',
+        'morph_complexity': '$.morphology.complexity',
+        'morph_prefix': '$.morphology.prefix',
+        'morph_suffix': '$.morphology.suffix',
+    }
+    
+    # documents 表中入库任务队列使用的列（旧数据库建表时补齐）
+    JOB_COLUMNS = {
+        'source_key': 'TEXT',
+        'attempts': 'INTEGER DEFAULT 0',
+        'worker_id': 'TEXT',
+        'heartbeat_at': 'TIMESTAMP',
+        'next_attempt_at': 'TIMESTAMP',
+        'last_error': 'TEXT',
+    }
+    
+    # 计入语料的文档：已完成且内容已写入，排除入库队列中未完成或失败的任务
+    # （占位内容哈希前缀见 IngestQueue.PLACEHOLDER_PREFIX）
+    CORPUS_DOCUMENT_FILTER = "{prefix}status = 'completed' AND {prefix}content_hash NOT LIKE 'job:%'"
+    
+    # 分片数据库的索引（文档与词频部分）
+    SHARD_INDEXES = (
+        "CREATE INDEX IF NOT EXISTS idx_documents_content_hash ON documents(content_hash)",
+        "CREATE INDEX IF NOT EXISTS idx_documents_status ON documents(status)",
+        "CREATE INDEX IF NOT EXISTS idx_documents_type ON documents(document_type)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_documents_source_key ON documents(source_key) WHERE source_key IS NOT NULL",
+        "CREATE INDEX IF NOT EXISTS idx_duplicate_sources_document ON duplicate_sources(document_id)",
+        "CREATE INDEX IF NOT EXISTS idx_occurrences_word ON occurrences(word_id)",
+        "CREATE INDEX IF NOT EXISTS idx_corpus_stats_total ON corpus_word_stats(total_frequency)",
+        "CREATE INDEX IF NOT EXISTS idx_corpus_stats_df ON corpus_word_stats(document_frequency)",
+    )
+    
+    # 已停用的索引（已有数据库在建表时删除）
+    RETIRED_INDEXES = ('idx_occurrences_tf_score', 'idx_words_idf_score')
+    
     def __init__(self, db_path: str = "data/databases/unified.db"):
         self.db_path = db_path
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
     
+    @classmethod
+    def corpus_document_filter(cls, alias: str = None) -> str:
+        """计入语料的文档的 WHERE 条件（alias 为 documents 表在查询中的别名）"""
+        return cls.CORPUS_DOCUMENT_FILTER.format(prefix=f"{alias}." if alias else '')
+    
     def create_tables(self):
         with sqlite3.connect(self.db_path) as conn:
+            # 新数据库使用增量 VACUUM 模式（只在建表前设置有效），删除后可廉价回收空间
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
             # 启用外键约束
             conn.execute("PRAGMA foreign_keys = ON")
             
             # 1. 文档表 - 统一文件管理
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS documents (
-                    id TEXT PRIMARY KEY,                    -- UUID
-                    filename TEXT NOT NULL,
-                    file_path TEXT,
-                    content_hash TEXT UNIQUE NOT NULL,      -- SHA256内容哈希
-                    file_size INTEGER,
-                    status TEXT DEFAULT 'pending',          -- pending/processing/completed/failed
-                    document_type TEXT DEFAULT 'text',      -- text/vocabulary_list
-                    metadata JSON,                          -- 灵活的元数据存储
-                    processed_at TIMESTAMP,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
+            self._create_documents_table(conn)
             
             # 2. 系统词典表 - 支持多词性独立词条
             conn.execute("""
@@ -67,6 +98,13 @@ class ModernSchema:
                     idf_score REAL DEFAULT 0.0,            -- 逆文档频率
                     linguistic_features JSON,               -- 词性、语义特征等
                     
+                    -- 语言学特征类型化列 (由 linguistic_features 拆分，可索引)
+                    pos_tag TEXT,                           -- 词性标签 "VBG"
+                    pos_type TEXT,                          -- 词性类型 "verb"
+                    morph_complexity TEXT,                  -- 形态复杂度 simple/prefixed/suffixed/complex
+                    morph_prefix TEXT,                      -- 前缀
+                    morph_suffix TEXT,                      -- 后缀
+                    
                     -- 字典关联字段 (最新版本：使用dictionary_id精确关联)
                     dictionary_id TEXT,                     -- 关联到字典表的UUID
                     dictionary_found BOOLEAN DEFAULT FALSE, -- 是否在字典中找到
@@ -139,15 +177,180 @@ class ModernSchema:
                     vocabulary_coverage JSON,               -- 词汇覆盖度详情
                     computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     expires_at TIMESTAMP,                   -- 缓存过期时间
+                    cache_key TEXT,                         -- 分析类型+参数的哈希
+                    parameters JSON,                        -- 分析参数
+                    data_version TEXT,                      -- 计算时的数据版本戳
+                    last_accessed TIMESTAMP,                -- 最近命中时间 (LRU淘汰)
+                    hit_count INTEGER DEFAULT 0,            -- 命中次数
+                    FOREIGN KEY (document_id) REFERENCES documents(id) ON DELETE CASCADE
+                )
+            """)
+            
+            # 旧数据库补齐新增列
+            added = self._add_missing_columns(conn, 'words', {
+                column: 'TEXT' for column in self.LINGUISTIC_COLUMNS
+            })
+            if added:
+                self.backfill_linguistic_columns(conn)
+            
+            self._add_missing_columns(conn, 'documents', self.JOB_COLUMNS)
+            
+            # 内容与已有文档相同的入库任务合并为来源记录（文档表中不保留重复任务）
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS duplicate_sources (
+                    source_key TEXT PRIMARY KEY,            -- 源文件标识 (见 IngestQueue.source_key)
+                    document_id TEXT NOT NULL,              -- 内容相同的已有文档
+                    file_path TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (document_id) REFERENCES documents(id) ON DELETE CASCADE
+                )
+            """)
+            
+            self._add_missing_columns(conn, 'analysis_results', {
+                'cache_key': 'TEXT',
+                'parameters': 'JSON',
+                'data_version': 'TEXT',
+                'last_accessed': 'TIMESTAMP',
+                'hit_count': 'INTEGER DEFAULT 0'
+            })
+            
+            # 8. 语料级词频汇总 - 由 occurrences 触发器增量维护
+            rollup_exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'corpus_word_stats'"
+            ).fetchone()
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS corpus_word_stats (
+                    word_id TEXT PRIMARY KEY,
+                    total_frequency INTEGER NOT NULL DEFAULT 0,     -- 全语料出现次数
+                    document_frequency INTEGER NOT NULL DEFAULT 0,  -- 出现该词的文档数
+                    idf REAL,                                       -- ln(文档总数 / 文档频率)，refresh_corpus_stats 时重算
+                    FOREIGN KEY (word_id) REFERENCES words(id) ON DELETE CASCADE
+                )
+            """)
+            if not rollup_exists:
+                self.rebuild_corpus_rollup(conn)
+            self._create_rollup_triggers(conn)
+            
+            # 9. 词频概率草图 - 每个文档一条，另有 scope='corpus' 的语料级草图
+            self._create_sketch_table(conn)
+            
+            # 10. 近似重复检测 - MinHash 签名与 LSH 分段
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS document_minhash (
+                    document_id TEXT PRIMARY KEY,
+                    signature BLOB NOT NULL,                -- num_perm 个 uint64 (小端)
+                    num_perm INTEGER NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     FOREIGN KEY (document_id) REFERENCES documents(id) ON DELETE CASCADE
                 )
             """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS minhash_bands (
+                    band INTEGER NOT NULL,
+                    bucket INTEGER NOT NULL,                -- 该段签名值的哈希
+                    document_id TEXT NOT NULL,
+                    PRIMARY KEY (band, bucket, document_id),
+                    FOREIGN KEY (document_id) REFERENCES documents(id) ON DELETE CASCADE
+                ) WITHOUT ROWID
+            """)
             
-            # 8. 创建索引提升查询性能
+            # 11. 创建索引提升查询性能
             self._create_indexes(conn)
             
             conn.commit()
     
+    def _create_documents_table(self, conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                id TEXT PRIMARY KEY,                    -- UUID
+                filename TEXT NOT NULL,
+                file_path TEXT,
+                content_hash TEXT UNIQUE NOT NULL,      -- SHA256内容哈希
+                file_size INTEGER,
+                status TEXT DEFAULT 'pending',          -- pending/processing/completed/failed
+                document_type TEXT DEFAULT 'text',      -- text/vocabulary_list
+                metadata JSON,                          -- 灵活的元数据存储
+                processed_at TIMESTAMP,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                
+                -- 入库任务队列 (见 IngestQueue)
+                source_key TEXT,                        -- 源文件标识: 路径+大小+修改时间的哈希
+                attempts INTEGER DEFAULT 0,             -- 已尝试处理次数
+                worker_id TEXT,                         -- 当前处理该任务的工作进程
+                heartbeat_at TIMESTAMP,                 -- 工作进程最近心跳
+                next_attempt_at TIMESTAMP,              -- 失败重试的最早时间
+                last_error TEXT                         -- 最近一次失败原因
+            )
+        """)
+
+    def _create_sketch_table(self, conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS frequency_sketches (
+                scope TEXT PRIMARY KEY,                 -- 文档ID 或 'corpus'
+                params JSON NOT NULL,                   -- 草图参数 (宽度/深度/精度/top_k)
+                count_min BLOB NOT NULL,                -- Count-Min 计数表 (zlib)
+                hll BLOB NOT NULL,                      -- HyperLogLog 寄存器 (zlib)
+                top_k JSON,                             -- Space-Saving 摘要 [[词, 计数, 误差]]
+                total INTEGER DEFAULT 0,                -- 已计入的总词数
+                documents INTEGER DEFAULT 0,            -- 已计入的文档数
+                corpus_cells BLOB,                      -- 文档计入语料 Count-Min 表的单元格 (zlib，删除时扣减)
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        self._add_missing_columns(conn, 'frequency_sketches', {'corpus_cells': 'BLOB'})
+
+    def create_shard_tables(self):
+        """分片数据库：只包含文档与词频数据
+
+        words / common_dictionary / wordlists 等目录表只存在于主库，查询时把分片附加到主库连接上；
+        word_id 引用主库中的词汇，跨数据库文件无法声明外键。
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("PRAGMA foreign_keys = ON")
+
+            self._create_documents_table(conn)
+            self._add_missing_columns(conn, 'documents', self.JOB_COLUMNS)
+            # 分片内的入库任务合并记录；内容相同的已有文档可能在其他分片，不声明外键
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS duplicate_sources (
+                    source_key TEXT PRIMARY KEY,
+                    document_id TEXT NOT NULL,
+                    file_path TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS occurrences (
+                    document_id TEXT,
+                    word_id TEXT,                           -- 主库 words.id
+                    frequency INTEGER NOT NULL DEFAULT 1,
+                    tf_score REAL DEFAULT 0.0,
+                    positions JSON,
+                    first_position INTEGER,
+                    last_position INTEGER,
+                    indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (document_id, word_id),
+                    FOREIGN KEY (document_id) REFERENCES documents(id) ON DELETE CASCADE
+                )
+            """)
+            # 分片内的语料汇总；跨分片合并时按全局文档数计算 IDF
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS corpus_word_stats (
+                    word_id TEXT PRIMARY KEY,
+                    total_frequency INTEGER NOT NULL DEFAULT 0,
+                    document_frequency INTEGER NOT NULL DEFAULT 0,
+                    idf REAL
+                )
+            """)
+            self._create_rollup_triggers(conn)
+            self._create_sketch_table(conn)
+
+            for index_sql in self.SHARD_INDEXES:
+                conn.execute(index_sql)
+            conn.commit()
+
     def _create_indexes(self, conn):
         """创建优化查询的索引"""
         indexes = [
@@ -155,6 +358,9 @@ class ModernSchema:
             "CREATE INDEX IF NOT EXISTS idx_documents_content_hash ON documents(content_hash)",
             "CREATE INDEX IF NOT EXISTS idx_documents_status ON documents(status)",
             "CREATE INDEX IF NOT EXISTS idx_documents_type ON documents(document_type)",
+            # 同一源文件只入队一次
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_documents_source_key ON documents(source_key) WHERE source_key IS NOT NULL",
+            "CREATE INDEX IF NOT EXISTS idx_duplicate_sources_document ON duplicate_sources(document_id)",
             
             # 字典表索引
             "CREATE INDEX IF NOT EXISTS idx_dictionary_word ON common_dictionary(word)",
@@ -166,19 +372,28 @@ class ModernSchema:
             # 用户词汇表索引
             "CREATE INDEX IF NOT EXISTS idx_words_surface_form ON words(surface_form)",
             "CREATE INDEX IF NOT EXISTS idx_words_lemma ON words(lemma)",
-            "CREATE INDEX IF NOT EXISTS idx_words_idf_score ON words(idf_score)",
             "CREATE INDEX IF NOT EXISTS idx_words_dictionary_id ON words(dictionary_id)",
             "CREATE INDEX IF NOT EXISTS idx_words_dictionary_found ON words(dictionary_found)",
             "CREATE INDEX IF NOT EXISTS idx_words_dictionary_rank ON words(dictionary_rank)",
             "CREATE INDEX IF NOT EXISTS idx_words_personal_status ON words(personal_status)",
             "CREATE INDEX IF NOT EXISTS idx_words_difficulty ON words(difficulty_level)",
+            "CREATE INDEX IF NOT EXISTS idx_words_pos_tag ON words(pos_tag)",
+            "CREATE INDEX IF NOT EXISTS idx_words_pos_type ON words(pos_type)",
+            "CREATE INDEX IF NOT EXISTS idx_words_morph_complexity ON words(morph_complexity)",
+            "CREATE INDEX IF NOT EXISTS idx_words_morph_prefix ON words(morph_prefix) WHERE morph_prefix IS NOT NULL",
+            "CREATE INDEX IF NOT EXISTS idx_words_morph_suffix ON words(morph_suffix) WHERE morph_suffix IS NOT NULL",
             
             # 词汇表索引
             "CREATE INDEX IF NOT EXISTS idx_wordlists_name ON wordlists(name)",
             
             # 词频关联索引
             "CREATE INDEX IF NOT EXISTS idx_occurrences_frequency ON occurrences(frequency)",
-            "CREATE INDEX IF NOT EXISTS idx_occurrences_tf_score ON occurrences(tf_score)",
+            # 按词汇反查（外键级联删除 words 与孤立词汇回收依赖此索引）
+            "CREATE INDEX IF NOT EXISTS idx_occurrences_word ON occurrences(word_id)",
+            
+            # 语料汇总索引 (全局 top-N 直接按索引范围扫描)
+            "CREATE INDEX IF NOT EXISTS idx_corpus_stats_total ON corpus_word_stats(total_frequency)",
+            "CREATE INDEX IF NOT EXISTS idx_corpus_stats_df ON corpus_word_stats(document_frequency)",
             
             # 字典-词汇表关联索引
             "CREATE INDEX IF NOT EXISTS idx_dict_memberships_dict ON dictionary_wordlist_memberships(dictionary_id)",
@@ -186,11 +401,116 @@ class ModernSchema:
             
             # 分析结果索引
             "CREATE INDEX IF NOT EXISTS idx_analysis_type ON analysis_results(analysis_type)",
-            "CREATE INDEX IF NOT EXISTS idx_analysis_expires ON analysis_results(expires_at)"
+            "CREATE INDEX IF NOT EXISTS idx_analysis_expires ON analysis_results(expires_at)",
+            "CREATE INDEX IF NOT EXISTS idx_analysis_cache_key ON analysis_results(cache_key)",
+            "CREATE INDEX IF NOT EXISTS idx_analysis_last_accessed ON analysis_results(last_accessed)"
         ]
         
         for index_sql in indexes:
             conn.execute(index_sql)
+        
+        # 没有查询按这些列过滤或排序，只增加每次写入的维护开销
+        for index_name in self.RETIRED_INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {index_name}")
+    
+    def _add_missing_columns(self, conn, table: str, columns: Dict[str, str]) -> List[str]:
+        """为已存在的表补齐新增列（架构升级），返回实际新增的列名"""
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        added = []
+        for column, definition in columns.items():
+            if column not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+                added.append(column)
+        return added
+
+    def backfill_linguistic_columns(self, conn) -> int:
+        """从 linguistic_features JSON 回填类型化列（架构升级时执行一次），返回更新行数"""
+        assignments = ', '.join(f"{column} = JSON_EXTRACT(linguistic_features, '{path}')"
+                                for column, path in self.LINGUISTIC_COLUMNS.items())
+        cursor = conn.execute(f"""
+            UPDATE words SET {assignments}
+            WHERE linguistic_features IS NOT NULL
+        """)
+        return cursor.rowcount
+
+    def _create_rollup_triggers(self, conn):
+        """occurrences 的增删改同步到 corpus_word_stats（含外键级联删除）"""
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_occurrences_rollup_insert
+            AFTER INSERT ON occurrences
+            BEGIN
+                INSERT INTO corpus_word_stats (word_id, total_frequency, document_frequency)
+                VALUES (NEW.word_id, NEW.frequency, 1)
+                ON CONFLICT(word_id) DO UPDATE SET
+                    total_frequency = total_frequency + excluded.total_frequency,
+                    document_frequency = document_frequency + 1;
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_occurrences_rollup_delete
+            AFTER DELETE ON occurrences
+            BEGIN
+                UPDATE corpus_word_stats
+                SET total_frequency = total_frequency - OLD.frequency,
+                    document_frequency = document_frequency - 1
+                WHERE word_id = OLD.word_id;
+                DELETE FROM corpus_word_stats
+                WHERE word_id = OLD.word_id AND document_frequency <= 0;
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_occurrences_rollup_update
+            AFTER UPDATE OF frequency, word_id ON occurrences
+            BEGIN
+                UPDATE corpus_word_stats
+                SET total_frequency = total_frequency - OLD.frequency,
+                    document_frequency = document_frequency - 1
+                WHERE word_id = OLD.word_id;
+                INSERT INTO corpus_word_stats (word_id, total_frequency, document_frequency)
+                VALUES (NEW.word_id, NEW.frequency, 1)
+                ON CONFLICT(word_id) DO UPDATE SET
+                    total_frequency = total_frequency + excluded.total_frequency,
+                    document_frequency = document_frequency + 1;
+                DELETE FROM corpus_word_stats
+                WHERE word_id = OLD.word_id AND document_frequency <= 0;
+            END
+        """)
+
+    def rebuild_corpus_rollup(self, conn):
+        """从 occurrences 全量重建语料汇总（架构升级或校正时执行）"""
+        conn.execute("DELETE FROM corpus_word_stats")
+        conn.execute("""
+            INSERT INTO corpus_word_stats (word_id, total_frequency, document_frequency)
+            SELECT word_id, SUM(frequency), COUNT(*)
+            FROM occurrences
+            GROUP BY word_id
+        """)
+        self.refresh_corpus_idf(conn)
+
+    def refresh_corpus_idf(self, conn) -> int:
+        """按当前文档总数重算 IDF 列（文档数变化后执行），返回更新行数"""
+        document_count = conn.execute(
+            f"SELECT COUNT(*) FROM documents WHERE {self.corpus_document_filter()}"
+        ).fetchone()[0]
+        cursor = conn.execute("""
+            UPDATE corpus_word_stats
+            SET idf = LN(MAX(?, document_frequency) * 1.0 / document_frequency)
+            WHERE document_frequency > 0
+        """, (document_count,))
+        return cursor.rowcount
+
+    @classmethod
+    def linguistic_column_values(cls, features: Optional[Dict]) -> tuple:
+        """按 LINGUISTIC_COLUMNS 顺序从特征字典取出类型化列的值（插入时使用）"""
+        features = features or {}
+        morphology = features.get('morphology') or {}
+        return (
+            features.get('pos_tag'),
+            features.get('pos_type'),
+            morphology.get('complexity'),
+            morphology.get('prefix'),
+            morphology.get('suffix'),
+        )
 
     def create_views(self):
         """创建便于查询的视图"""
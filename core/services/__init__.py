@@ -10,7 +10,15 @@
 - 分析服务: 文本分析、批量处理、结果管理
 - 词汇服务: 词汇查询、标签管理、词表管理  
 - 导出服务: 数据导出、报告生成、格式转换
+- 报告服务: 文档分析报告与批量汇总报告的后台生成
 - 配置服务: 系统配置、用户偏好管理
 """
 
-# 服务模块将在后续实现时导入
+from .export_service import FrequencyExporter
+from .report_service import AnalysisReportWriter, ReportQueue
+
+__all__ = [
+    'FrequencyExporter',
+    'AnalysisReportWriter',
+    'ReportQueue'
+]
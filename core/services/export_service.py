@@ -0,0 +1,303 @@
+# 词频数据导出服务
+# 路径: core/services/export_service.py
+# 项目名称: Word Frequency Analysis
+# 作者: Sherryyue
+
+"""
+词频数据导出服务 - 文档 × 词汇 频率数据的流式导出
+
+按批次（fetchmany）遍历 occurrences 查询游标，逐批写出，内存占用与数据量无关
+（按主键顺序输出，避免整表排序）：
+- 文本格式: txt(制表符分隔) / csv / jsonl / json，可选 gzip/bz2/xz 实时压缩
+- Excel: openpyxl 只写模式，超过单表行数上限时自动分表
+- 列式格式: parquet / arrow(IPC)，每批写出一个 RecordBatch，支持列内压缩
+
+支持按文档、词汇表、最低频率过滤。
+"""
+
+import bz2
+import csv
+import gzip
+import json
+import lzma
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from core.engines.database.storage_backend import connect_corpus
+from core.models.schema import ModernSchema
+
+
+class FrequencyExporter:
+    """文档词频流式导出器"""
+
+    COLUMNS = [
+        'document_id', 'filename', 'word', 'lemma', 'frequency', 'tf_score',
+        'dictionary_rank', 'difficulty_level', 'personal_status'
+    ]
+
+    FORMATS = ('txt', 'csv', 'jsonl', 'json', 'excel', 'parquet', 'arrow')
+    TEXT_FORMATS = ('txt', 'csv', 'jsonl', 'json')
+
+    FILE_EXTENSIONS = {
+        'txt': '.txt', 'csv': '.csv', 'jsonl': '.jsonl', 'json': '.json',
+        'excel': '.xlsx', 'parquet': '.parquet', 'arrow': '.arrow'
+    }
+
+    # 文本格式的流式压缩: 名称 -> (文件后缀, 打开函数)
+    STREAM_COMPRESSION = {
+        'gzip': ('.gz', gzip.open),
+        'bz2': ('.bz2', bz2.open),
+        'xz': ('.xz', lzma.open),
+    }
+
+    # 列式格式支持的列内压缩编码
+    COLUMNAR_COMPRESSION = {
+        'parquet': {'snappy', 'gzip', 'zstd', 'lz4', 'brotli'},
+        'arrow': {'zstd', 'lz4'},
+    }
+
+    EXCEL_MAX_ROWS = 1048576
+
+    def __init__(self, db_path: str = "data/databases/unified.db", batch_size: Optional[int] = None,
+                 storage=None):
+        from core.utils.config_manager import get_config
+
+        self.db_path = db_path
+        # 语料经由存储后端读取（分片模式下附加全部分片），未指定时按配置创建
+        self.storage = storage
+        self.batch_size = int(batch_size or get_config().get('export.batch_size', 5000))
+
+    # =================== 查询 ===================
+
+    def build_query(self, document_id: str = None, wordlist: str = None,
+                    min_frequency: int = None) -> Tuple[str, List]:
+        """构建带过滤条件的导出查询"""
+        # 只导出语料中的文档（入库队列中未完成的任务可能只写入了部分词频）
+        conditions, params = [ModernSchema.corpus_document_filter('d')], []
+
+        if document_id:
+            # 完整文档ID（短ID前缀先用 resolve_document_id 解析），按 occurrences 的文档索引查找
+            conditions.append("o.document_id = ?")
+            params.append(document_id)
+
+        if min_frequency:
+            conditions.append("o.frequency >= ?")
+            params.append(min_frequency)
+
+        if wordlist:
+            conditions.append("""
+                EXISTS (
+                    SELECT 1 FROM dictionary_wordlist_memberships m
+                    JOIN wordlists wl ON m.wordlist_id = wl.id
+                    WHERE m.dictionary_id = w.dictionary_id AND wl.name = ?
+                )
+            """)
+            params.append(wordlist)
+
+        where = f"WHERE {' AND '.join(conditions)}"
+        query = f"""
+            SELECT d.id, d.filename, w.surface_form, w.lemma, o.frequency, o.tf_score,
+                   w.dictionary_rank, w.difficulty_level, COALESCE(w.personal_status, 'new')
+            FROM occurrences o
+            JOIN documents d ON o.document_id = d.id
+            JOIN words w ON o.word_id = w.id
+            {where}
+            ORDER BY o.document_id
+        """
+        return query, params
+
+    def iter_batches(self, document_id: str = None, wordlist: str = None,
+                     min_frequency: int = None) -> Iterator[List[Tuple]]:
+        """按批次遍历导出数据，不一次性加载全部结果"""
+        query, params = self.build_query(document_id, wordlist, min_frequency)
+
+        with connect_corpus(self.db_path, self.storage) as conn:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(self.batch_size)
+                if not rows:
+                    break
+                yield rows
+
+    # =================== 导出 ===================
+
+    def export(self, output_path: str, file_format: str = 'csv', document_id: str = None,
+               wordlist: str = None, min_frequency: int = None,
+               compression: str = None) -> Dict:
+        """流式导出词频数据
+
+        Args:
+            output_path: 输出文件路径
+            file_format: 导出格式，见 FORMATS
+            document_id: 只导出指定文档（完整ID）
+            wordlist: 只导出属于该词汇表的词汇
+            min_frequency: 最低出现次数
+            compression: 压缩方式（文本格式: gzip/bz2/xz；parquet/arrow: 列内压缩编码）
+
+        Returns:
+            导出统计 {'output': 路径, 'format': 格式, 'rows': 行数, 'compression': 压缩方式}
+        """
+        if file_format not in self.FORMATS:
+            raise ValueError(f"不支持的导出格式: {file_format}")
+
+        output_path = Path(self.resolve_output_path(output_path, file_format, compression))
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        batches = self.iter_batches(document_id, wordlist, min_frequency)
+
+        if file_format == 'excel':
+            if compression:
+                raise ValueError("Excel文件本身已压缩，不支持额外压缩")
+            rows = self._write_excel(batches, output_path)
+        elif file_format in self.COLUMNAR_COMPRESSION:
+            if compression and compression not in self.COLUMNAR_COMPRESSION[file_format]:
+                supported = ', '.join(sorted(self.COLUMNAR_COMPRESSION[file_format]))
+                raise ValueError(f"{file_format} 支持的压缩方式: {supported}")
+            writer = self._write_parquet if file_format == 'parquet' else self._write_arrow
+            rows = writer(batches, output_path, compression)
+        else:
+            if compression and compression not in self.STREAM_COMPRESSION:
+                supported = ', '.join(self.STREAM_COMPRESSION)
+                raise ValueError(f"{file_format} 支持的压缩方式: {supported}")
+            opener = self.STREAM_COMPRESSION[compression][1] if compression else open
+            with opener(output_path, 'wt', encoding='utf-8', newline='') as f:
+                rows = getattr(self, f'_write_{file_format}')(batches, f)
+
+        return {
+            'output': str(output_path),
+            'format': file_format,
+            'rows': rows,
+            'compression': compression
+        }
+
+    def resolve_output_path(self, output_path: str, file_format: str, compression: str = None) -> str:
+        """补全文件扩展名（含流式压缩后缀）"""
+        path = str(output_path)
+        extension = self.FILE_EXTENSIONS[file_format]
+        suffix = ''
+        if file_format in self.TEXT_FORMATS and compression in self.STREAM_COMPRESSION:
+            suffix = self.STREAM_COMPRESSION[compression][0]
+
+        if suffix and path.endswith(suffix):
+            return path
+        if not path.endswith(extension):
+            path += extension
+        return path + suffix
+
+    # =================== 文本格式 ===================
+
+    def _write_txt(self, batches, f) -> int:
+        return self._write_delimited(batches, f, '\t')
+
+    def _write_csv(self, batches, f) -> int:
+        return self._write_delimited(batches, f, ',')
+
+    def _write_delimited(self, batches, f, delimiter: str) -> int:
+        writer = csv.writer(f, delimiter=delimiter)
+        writer.writerow(self.COLUMNS)
+        rows = 0
+        for batch in batches:
+            writer.writerows(batch)
+            rows += len(batch)
+        return rows
+
+    def _write_jsonl(self, batches, f) -> int:
+        rows = 0
+        for batch in batches:
+            f.writelines(json.dumps(dict(zip(self.COLUMNS, row)), ensure_ascii=False) + '\n'
+                         for row in batch)
+            rows += len(batch)
+        return rows
+
+    def _write_json(self, batches, f) -> int:
+        """逐条写出 JSON 数组，不在内存中构造完整列表"""
+        rows = 0
+        f.write('[')
+        for batch in batches:
+            for row in batch:
+                f.write(',\n' if rows else '\n')
+                f.write(json.dumps(dict(zip(self.COLUMNS, row)), ensure_ascii=False))
+                rows += 1
+        f.write('\n]\n' if rows else ']\n')
+        return rows
+
+    # =================== Excel ===================
+
+    def _write_excel(self, batches, output_path: Path) -> int:
+        try:
+            from openpyxl import Workbook
+        except ImportError as e:
+            raise RuntimeError(f"Excel导出需要安装 openpyxl: {e}")
+
+        workbook = Workbook(write_only=True)
+        sheet, sheet_rows, sheet_index, rows = None, 0, 0, 0
+
+        for batch in batches:
+            for row in batch:
+                if sheet is None or sheet_rows >= self.EXCEL_MAX_ROWS:
+                    sheet_index += 1
+                    sheet = workbook.create_sheet(f"frequencies_{sheet_index}")
+                    sheet.append(self.COLUMNS)
+                    sheet_rows = 1
+                sheet.append(row)
+                sheet_rows += 1
+                rows += 1
+
+        if sheet is None:
+            workbook.create_sheet("frequencies_1").append(self.COLUMNS)
+
+        workbook.save(output_path)
+        return rows
+
+    # =================== 列式格式 ===================
+
+    def _arrow_schema(self):
+        import pyarrow as pa
+        return pa.schema([
+            ('document_id', pa.string()),
+            ('filename', pa.string()),
+            ('word', pa.string()),
+            ('lemma', pa.string()),
+            ('frequency', pa.int64()),
+            ('tf_score', pa.float64()),
+            ('dictionary_rank', pa.int64()),
+            ('difficulty_level', pa.int64()),
+            ('personal_status', pa.string()),
+        ])
+
+    def _to_record_batch(self, batch: List[Tuple], schema):
+        import pyarrow as pa
+        columns = list(zip(*batch))
+        return pa.RecordBatch.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+            schema=schema
+        )
+
+    def _write_parquet(self, batches, output_path: Path, compression: str = None) -> int:
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError(f"Parquet导出需要安装 pyarrow: {e}")
+
+        schema = self._arrow_schema()
+        rows = 0
+        with pq.ParquetWriter(str(output_path), schema, compression=compression or 'snappy') as writer:
+            for batch in batches:
+                writer.write_batch(self._to_record_batch(batch, schema))
+                rows += len(batch)
+        return rows
+
+    def _write_arrow(self, batches, output_path: Path, compression: str = None) -> int:
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise RuntimeError(f"Arrow导出需要安装 pyarrow: {e}")
+
+        schema = self._arrow_schema()
+        options = pa.ipc.IpcWriteOptions(compression=compression)
+        rows = 0
+        with pa.OSFile(str(output_path), 'wb') as sink:
+            with pa.ipc.new_file(sink, schema, options=options) as writer:
+                for batch in batches:
+                    writer.write_batch(self._to_record_batch(batch, schema))
+                    rows += len(batch)
+        return rows
@@ -0,0 +1,331 @@
+# 分析报告服务
+# 路径: core/services/report_service.py
+# 项目名称: Word Frequency Analysis
+# 作者: Sherryyue
+
+"""
+分析报告服务 - 文档报告与批量汇总报告的后台生成
+
+报告渲染不再阻塞处理循环：
+- 处理循环只把 (文件路径, 基本信息, 词频, 哈希) 打包成任务放入队列
+- 后台线程逐个渲染文档报告，同时累计批量汇总所需的数据
+- 处理结束后生成一份覆盖本批全部文档的汇总报告
+
+队列有容量上限（reports.queue_size），渲染跟不上时处理循环会短暂等待，
+不会无限堆积词频字典。
+"""
+
+import os
+import queue
+import threading
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from core.engines.database.wordlist_index import WordlistIndex
+from core.engines.vocabulary.frequency_profile import FrequencyProfile
+
+
+class AnalysisReportWriter:
+    """渲染文档分析报告与批量汇总报告"""
+
+    def __init__(self, db_path: str = "data/databases/unified.db", exports_dir: str = None):
+        from core.utils.config_manager import get_config
+
+        self.db_path = db_path
+        self.exports_dir = Path(exports_dir or get_config().get('reports.output_directory', 'data/exports'))
+        # 词汇表位图索引，在渲染线程中首次使用时构建
+        self._wordlist_index = None
+        # 批量汇总
+        self._documents: List[Dict] = []
+        self._batch_totals = Counter()
+
+    @staticmethod
+    def make_job(filepath: str, basic_info: Dict, word_frequencies: Dict[str, int], content_hash: str) -> Dict:
+        """打包报告任务（文件大小在提交时读取，渲染时文件可能已被移动）"""
+        return {
+            'filepath': str(filepath),
+            'file_size': os.path.getsize(filepath) if os.path.exists(filepath) else 0,
+            'basic_info': basic_info,
+            'word_frequencies': word_frequencies,
+            'content_hash': content_hash,
+        }
+
+    def _get_wordlist_index(self) -> WordlistIndex:
+        """获取词汇表位图索引：首次使用时构建，词汇表变化时重建"""
+        if self._wordlist_index is None:
+            self._wordlist_index = WordlistIndex(self.db_path)
+        else:
+            self._wordlist_index.refresh_if_stale()
+        return self._wordlist_index
+
+    # =================== 文档报告 ===================
+
+    def write_document_report(self, job: Dict, verbose: bool = True,
+                              profile: FrequencyProfile = None) -> Optional[str]:
+        """保存单个文本的分析报告到文件"""
+        try:
+            profile = profile or FrequencyProfile(job['word_frequencies'])
+            report_file = self._write_document_report(job, profile)
+            if verbose:
+                print(f"📄 分析报告已保存到: {report_file}")
+            return report_file
+        except Exception as e:
+            print(f"❌ 生成分析报告失败: {e}")
+            return None
+
+    def _write_document_report(self, job: Dict, profile: FrequencyProfile) -> str:
+        basic_info = job['basic_info']
+        word_frequencies = job['word_frequencies']
+        content_hash = job['content_hash']
+        file_size = job['file_size']
+
+        self.exports_dir.mkdir(parents=True, exist_ok=True)
+
+        # 生成报告文件名：文件名_分析报告_时间戳.txt
+        filename = Path(job['filepath']).stem
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        report_file = self.exports_dir / f"{filename}_analysis_report_{timestamp}.txt"
+
+        # 计算统计信息
+        total_words = basic_info.get('total_words', 0)
+        unique_words = basic_info.get('unique_words', 0)
+        total_sentences = basic_info.get('sentences', 0)
+        total_paragraphs = basic_info.get('paragraphs', 0)
+
+        single_occurrence = profile.hapax_count
+
+        with open(report_file, 'w', encoding='utf-8') as f:
+            # 报告头部
+            f.write("=" * 60 + "\n")
+            f.write("          文本分析报告\n")
+            f.write("=" * 60 + "\n")
+            f.write(f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.write(f"源文件: {job['filepath']}\n")
+            f.write(f"文件名: {basic_info.get('filename', 'Unknown')}\n")
+            f.write(f"文件大小: {file_size} bytes\n")
+            f.write(f"内容哈希: {content_hash[:16]}...\n")
+            f.write(f"分析时间: {basic_info.get('analysis_date', 'Unknown')}\n")
+            f.write(f"处理时长: {basic_info.get('process_duration', 0):.4f} 秒\n")
+            f.write("-" * 60 + "\n\n")
+            
+            # 基本统计信息
+            f.write("📊 基本统计信息\n")
+            f.write("-" * 30 + "\n")
+            f.write(f"总词数: {total_words}\n")
+            f.write(f"独特词汇数: {unique_words}\n")
+            f.write(f"句子数: {total_sentences}\n")
+            f.write(f"段落数: {total_paragraphs}\n")
+            f.write(f"词汇复用率: {((total_words - unique_words) / total_words * 100):.1f}%\n")
+            f.write(f"平均词长: {profile.avg_word_length:.1f} 字符\n")
+            if total_sentences > 0:
+                f.write(f"平均句长: {total_words / total_sentences:.1f} 词\n")
+            f.write("\n")
+            
+            # 词频分析
+            f.write("🔢 词频分析\n")
+            f.write("-" * 30 + "\n")
+            f.write(f"单次出现词汇: {single_occurrence} 个 ({(single_occurrence/unique_words*100):.1f}%)\n")
+            f.write(f"最高频率: {profile.max_frequency}\n")
+            f.write(f"平均频率: {profile.avg_frequency:.2f}\n")
+            f.write("\n")
+            
+            # 高频词汇
+            if profile.top_words:
+                f.write(f"📈 高频词汇 (Top {profile.top_n})\n")
+                f.write("-" * 30 + "\n")
+                for i, (word, freq) in enumerate(profile.top_words, 1):
+                    percentage = (freq / total_words) * 100
+                    f.write(f"{i:2d}. {word:<15} {freq:>4} 次 ({percentage:.2f}%)\n")
+                f.write("\n")
+            
+            # 词长分布
+            f.write("📏 词长分布\n")
+            f.write("-" * 30 + "\n")
+            for length in sorted(profile.length_histogram)[:15]:  # 显示前15种词长
+                count = profile.length_histogram[length]
+                percentage = (count / unique_words) * 100
+                f.write(f"{length:2d} 字符: {count:>4} 词 ({percentage:.1f}%)\n")
+            f.write("\n")
+            
+            # 频率分布
+            f.write("📊 频率分布\n")
+            f.write("-" * 30 + "\n")
+            for bucket in profile.buckets():
+                f.write(f"{bucket['label']:<10}: {bucket['count']:>4} 词 ({bucket['percentage']:.1f}%)\n")
+            f.write("\n")
+            
+            # 词汇表匹配分析
+            f.write("📚 词汇表匹配分析\n")
+            f.write("-" * 30 + "\n")
+            # 基于位图索引一次性计算所有词汇表的覆盖度
+            try:
+                # db_path 为 None：存储后端不是 SQLite，没有可直接读取的词汇表
+                coverage = self._get_wordlist_index().coverage(word_frequencies) if self.db_path else None
+                if coverage:
+                    for wl in coverage:
+                        f.write(f"📖 {wl['wordlist_name']}:\n")
+                        f.write(f"   匹配词汇: {wl['match_count']}/{wl['word_count']} 个\n")
+                        f.write(f"   覆盖率: {wl['coverage_percentage']:.1f}% (文本独特词汇)\n")
+                        f.write(f"   频率覆盖: {wl['frequency_percentage']:.1f}% (总词频)\n")
+                        if wl['match_count'] > 0:
+                            # 显示前10个匹配的高频词
+                            f.write(f"   匹配示例: {', '.join(wl['sample_words'])}\n")
+                        f.write("\n")
+                elif self.db_path is None:
+                    f.write("当前存储后端不支持词汇表匹配分析\n")
+                else:
+                    f.write("暂无加载的词汇表\n")
+            except Exception as e:
+                f.write(f"获取词汇表信息失败: {e}\n")
+            f.write("\n")
+            
+            # 单次出现词汇
+            f.write("🔍 单次出现词汇列举\n")
+            f.write("-" * 30 + "\n")
+            
+            if single_occurrence:
+                f.write(f"共有 {single_occurrence} 个词汇只出现过一次，占独特词汇的 {single_occurrence/unique_words*100:.1f}%\n\n")
+                
+                # 按字母顺序分页显示，每行10个词，最多显示100个
+                sample = profile.hapax_sample(100)
+                for i in range(0, len(sample), 10):
+                    f.write(f"  {', '.join(sample[i:i+10])}\n")
+                
+                if single_occurrence > 100:
+                    f.write(f"  ... 还有 {single_occurrence - 100} 个单次出现词汇\n")
+                f.write("\n")
+                
+                # 单次出现词汇的词长分析
+                lengths = profile.hapax_lengths()
+                f.write(f"单次词汇统计: 平均长度 {lengths['average']:.1f} 字符，最长 {lengths['max']} 字符，最短 {lengths['min']} 字符\n")
+                # 显示最长的单次出现词汇
+                f.write(f"最长单次词汇: {', '.join(lengths['longest'])}\n")
+            else:
+                f.write("没有只出现一次的词汇\n")
+            f.write("\n")
+            
+            # 报告尾部
+            f.write("=" * 60 + "\n")
+            f.write("分析报告生成完成\n")
+            f.write("=" * 60 + "\n")
+        
+        return str(report_file)
+
+    # =================== 批量汇总 ===================
+
+    def add_to_summary(self, job: Dict, profile: FrequencyProfile = None):
+        """累计批量汇总数据"""
+        basic_info = job['basic_info']
+        word_frequencies = job['word_frequencies']
+        profile = profile or FrequencyProfile(word_frequencies, top_n=1)
+
+        self._documents.append({
+            'filename': basic_info.get('filename') or Path(job['filepath']).name,
+            'total_words': basic_info.get('total_words', 0),
+            'unique_words': basic_info.get('unique_words', profile.unique),
+            'hapax': profile.hapax_count,
+            'top_word': profile.top_word,
+            'process_duration': basic_info.get('process_duration', 0),
+        })
+        self._batch_totals.update(word_frequencies)
+
+    def write_batch_summary(self, top_n: int = 20) -> Optional[str]:
+        """生成覆盖本批全部文档的汇总报告"""
+        if not self._documents:
+            return None
+
+        try:
+            self.exports_dir.mkdir(parents=True, exist_ok=True)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            report_file = self.exports_dir / f"batch_summary_{timestamp}.txt"
+
+            documents = self._documents
+            total_words = sum(doc['total_words'] for doc in documents)
+            batch_profile = FrequencyProfile(self._batch_totals, top_n=top_n)
+            batch_total = batch_profile.total
+
+            with open(report_file, 'w', encoding='utf-8') as f:
+                f.write("=" * 60 + "\n")
+                f.write("          批量分析汇总报告\n")
+                f.write("=" * 60 + "\n")
+                f.write(f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+                f.write(f"文档数: {len(documents)}\n")
+                f.write(f"总词数: {total_words}\n")
+                f.write(f"本批独特词汇数: {len(self._batch_totals)}\n")
+                f.write(f"总处理时长: {sum(doc['process_duration'] for doc in documents):.2f} 秒\n")
+                f.write("-" * 60 + "\n\n")
+
+                f.write(f"📈 本批高频词汇 (Top {top_n})\n")
+                f.write("-" * 30 + "\n")
+                for i, (word, freq) in enumerate(batch_profile.top_words, 1):
+                    percentage = freq / batch_total * 100 if batch_total else 0
+                    f.write(f"{i:2d}. {word:<15} {freq:>6} 次 ({percentage:.2f}%)\n")
+                f.write("\n")
+
+                f.write("📄 文档列表\n")
+                f.write("-" * 30 + "\n")
+                f.write(f"{'文件名':<30} {'总词数':>8} {'独特词':>8} {'单次词':>8}  最高频词\n")
+                for doc in documents:
+                    word, freq = doc['top_word']
+                    hapax_rate = doc['hapax'] / doc['unique_words'] * 100 if doc['unique_words'] else 0
+                    f.write(f"{doc['filename'][:30]:<30} {doc['total_words']:>8} {doc['unique_words']:>8} "
+                            f"{hapax_rate:>7.1f}%  {word} ({freq})\n")
+                f.write("\n")
+
+                f.write("=" * 60 + "\n")
+                f.write("汇总报告生成完成\n")
+                f.write("=" * 60 + "\n")
+
+            print(f"📑 批量汇总报告已保存到: {report_file}")
+            return str(report_file)
+
+        except Exception as e:
+            print(f"❌ 生成批量汇总报告失败: {e}")
+            return None
+
+
+class ReportQueue:
+    """后台报告生成队列：单个渲染线程依次处理提交的任务"""
+
+    def __init__(self, writer: AnalysisReportWriter, queue_size: int = None, batch_summary: bool = True):
+        from core.utils.config_manager import get_config
+
+        self.writer = writer
+        self.batch_summary = batch_summary
+        self.reports: List[str] = []
+        self._queue = queue.Queue(maxsize=queue_size or get_config().get('reports.queue_size', 32))
+        self._thread = threading.Thread(target=self._run, name='report-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, job: Dict):
+        """提交报告任务（队列已满时等待）"""
+        self._queue.put(job)
+
+    def pending(self) -> int:
+        """尚未开始渲染的任务数"""
+        return self._queue.qsize()
+
+    def close(self) -> Dict:
+        """等待队列中的报告全部完成，并生成批量汇总"""
+        self._queue.put(None)
+        self._thread.join()
+        summary = self.writer.write_batch_summary() if self.batch_summary and len(self.reports) > 1 else None
+        return {'reports': self.reports, 'summary': summary}
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            # 单个任务失败不能结束渲染线程，否则队列满后 submit 会一直阻塞
+            try:
+                # 后台线程不逐份打印，避免与处理循环的输出交错
+                profile = FrequencyProfile(job['word_frequencies'])
+                path = self.writer.write_document_report(job, verbose=False, profile=profile)
+                if path:
+                    self.reports.append(path)
+                    self.writer.add_to_summary(job, profile)
+            except Exception as e:
+                print(f"❌ 生成分析报告失败 {job.get('filepath')}: {e}")
@@ -77,9 +77,17 @@ class ConfigManager:
     
     def _apply_env_overrides(self):
         """应用环境变量覆盖，支持嵌套键名如 DB_HOST, FILE_MAX_SIZE 等"""
-        # 简单的环境变量覆盖实现
-        # 可以根据需要扩展更复杂的覆盖逻辑
-        pass
+        # 展开配置值中的 ${VAR} 占位符（如 production.yaml 的数据库连接参数），未设置的变量保持原样
+        def expand(value):
+            if isinstance(value, dict):
+                return {key: expand(item) for key, item in value.items()}
+            if isinstance(value, list):
+                return [expand(item) for item in value]
+            if isinstance(value, str) and '$' in value:
+                return os.path.expandvars(value)
+            return value
+        
+        self._config = expand(self._config)
     
     def _get_default_config(self) -> Dict:
         """获取默认配置（当配置文件加载失败时使用）"""
@@ -1,9 +1,52 @@
-
 import os
 
+# 单文件压缩格式（a.txt.gz 按 .txt 处理）
+COMPRESSION_SUFFIXES = ('.gz', '.bz2', '.xz')
+# 归档格式，每个成员作为一个文档（复合后缀需排在单后缀之前匹配）
+ARCHIVE_SUFFIXES = ('.tar.gz', '.tar.bz2', '.tar.xz', '.tgz', '.tbz2', '.txz', '.tar', '.zip')
+# 归档成员的虚拟路径：<归档路径>!/<成员名>
+ARCHIVE_MEMBER_SEPARATOR = '!/'
+
+
+def is_archive(path):
+    """是否为归档文件（.zip / .tar / .tar.gz 等）"""
+    return str(path).lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def split_archive_member(path):
+    """拆分归档成员虚拟路径，返回 (归档路径, 成员名)；普通文件返回 (路径, None)"""
+    path = str(path)
+    archive, separator, member = path.partition(ARCHIVE_MEMBER_SEPARATOR)
+    if separator and member and is_archive(archive):
+        return archive, member
+    return path, None
+
+
+def document_suffix(path):
+    """文档格式后缀：归档成员取成员后缀，单文件压缩格式去掉压缩后缀（a.txt.gz -> .txt）"""
+    archive, member = split_archive_member(path)
+    name = (member or archive).lower()
+    if member is None and is_archive(name):
+        return ''
+    root, extension = os.path.splitext(name)
+    if member is None and extension in COMPRESSION_SUFFIXES:
+        extension = os.path.splitext(root)[1]
+    return extension
+
+
+def is_compressed_input(path):
+    """是否需要解压读取（单文件压缩或归档成员）"""
+    archive, member = split_archive_member(path)
+    return member is not None or os.path.splitext(archive)[1].lower() in COMPRESSION_SUFFIXES
+
+
 # 遍历顶层
-def get_supported_files(directory_path, scan_subdirs=True, supported_formats=None):
-    """获取支持的文件类型的所有文件路径"""
+def get_supported_files(directory_path, scan_subdirs=True, supported_formats=None, include_archives=True):
+    """获取支持的文件类型的所有文件路径
+    
+    支持格式的压缩文件（如 .txt.gz）一并返回；include_archives 时归档文件也返回，
+    由调用方展开为成员
+    """
     supported_extensions = set(supported_formats) if supported_formats else {'.txt', '.pdf'}
     file_paths = []
     
@@ -14,8 +57,7 @@ def get_supported_files(directory_path, scan_subdirs=True, supported_formats=Non
     
     for root, dirs, files in walker:
         for file in files:
-            _, extension = os.path.splitext(file)
-            if extension.lower() in supported_extensions:
+            if document_suffix(file) in supported_extensions or (include_archives and is_archive(file)):
                 full_path = os.path.join(root, file)
                 file_paths.append(full_path)
     
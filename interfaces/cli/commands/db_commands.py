@@ -0,0 +1,91 @@
+# 数据库维护命令模块
+# 路径: interfaces/cli/commands/db_commands.py
+# 项目名称: Word Frequency Analysis
+# 作者: Sherryyue
+
+import click
+
+def _format_bytes(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.1f} {unit}" if unit != 'B' else f"{size} B"
+        size /= 1024
+
+@click.group('db')
+def db():
+    """数据库维护命令"""
+    pass
+
+@db.command()
+@click.option('--vacuum', type=click.Choice(['none', 'incremental', 'full']), default='none',
+              help='空间回收方式 (incremental 要求增量模式；full 重写整个数据库并切换为增量模式)')
+@click.option('--full-check', is_flag=True, help='执行完整 integrity_check (默认 quick_check)')
+@click.option('--index-advice', is_flag=True, help='检查可能无用的索引 (需要扫描候选索引)')
+@click.option('--top', default=15, help='空间报告显示的表/索引数量')
+def maintain(vacuum, full_check, index_advice, top):
+    """维护数据库：ANALYZE/optimize、VACUUM、完整性检查与空间占用报告"""
+    try:
+        from core.engines.database.database_maintenance import DatabaseMaintenance
+        from core.engines.database.database_adapter import unified_adapter
+
+        maintenance = DatabaseMaintenance(unified_adapter.unified_db.require_local_sqlite('数据库维护'))
+        click.echo(f"🔧 维护数据库: {maintenance.db_path}")
+        result = maintenance.maintain(vacuum=vacuum, full_check=full_check, index_advice=index_advice)
+
+        # 完整性
+        integrity = result['integrity']
+        if integrity['ok']:
+            click.secho(f"✅ 完整性检查通过 ({integrity['check']})", fg='green')
+        else:
+            click.secho(f"⚠️  完整性检查发现问题 ({integrity['check']})", fg='yellow')
+            for message in integrity['messages'][:10]:
+                click.echo(f"   {message}")
+            for table, count in integrity['foreign_key_violations'].items():
+                click.echo(f"   {table}: {count} 行外键失效 (可运行 text delete --gc 回收)")
+
+        click.echo(f"📈 已更新统计信息: {result['analyze']['indexes']} 个索引")
+
+        if 'vacuum' in result and result['vacuum']['mode'] == 'none':
+            click.secho("⚠️  数据库未启用增量模式，跳过 VACUUM (运行一次 --vacuum full 以切换)", fg='yellow')
+        elif 'vacuum' in result:
+            info = result['vacuum']
+            click.echo(f"💾 VACUUM ({info['mode']}): 释放 {info['free_pages']} 个空闲页，"
+                       f"{_format_bytes(info['bytes_before'])} → {_format_bytes(info['bytes_after'])}")
+
+        # 空间占用
+        sizes = result['sizes']
+        if sizes is None:
+            click.secho("⚠️  当前 SQLite 未编译 dbstat，无法生成空间报告", fg='yellow')
+        else:
+            total = sum(item['bytes'] for item in sizes) or 1
+            click.echo(f"\n📦 空间占用 (Top {top})")
+            click.echo("-" * 72)
+            click.echo(f"{'名称':<36} {'类型':<6} {'大小':>10} {'占比':>7} {'空闲':>8}")
+            click.echo("-" * 72)
+            for item in sizes[:top]:
+                unused = item['unused_bytes'] / item['bytes'] * 100 if item['bytes'] else 0
+                click.echo(f"{item['name'][:36]:<36} {item['type']:<6} {_format_bytes(item['bytes']):>10} "
+                           f"{item['bytes'] / total * 100:>6.1f}% {unused:>7.1f}%")
+
+        # 索引建议
+        advice = result.get('index_advice')
+        if advice:
+            click.echo("\n🔍 可能无用的索引 (每次写入都需维护):")
+            for item in advice:
+                reason = '低选择性' if item['reason'] == 'low_selectivity' else '被覆盖'
+                click.echo(f"   {item['index']} ({item['table']}) - {reason}: {item['detail']}")
+        elif advice is not None:
+            click.echo("\n✅ 未发现无用索引")
+
+        # 分片存储：逐个维护分片数据库
+        shard_paths = getattr(unified_adapter.unified_db, 'shard_paths', [])
+        if shard_paths:
+            click.echo(f"\n🧩 维护 {len(shard_paths)} 个分片:")
+        for path in shard_paths:
+            shard = DatabaseMaintenance(path).maintain(vacuum=vacuum, full_check=full_check)
+            status = '✅' if shard['integrity']['ok'] else '⚠️ '
+            size = _format_bytes(shard['vacuum']['bytes_after']) if 'vacuum' in shard else ''
+            click.echo(f"   {status} {path} {size}")
+
+    except Exception as e:
+        click.secho(f"❌ 数据库维护失败: {e}", fg='red', err=True)
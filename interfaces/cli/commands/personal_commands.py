@@ -62,13 +62,52 @@ def personal_stats():
         click.secho(f"❌ 获取统计信息失败: {e}", fg='red', err=True)
 
 @personal.command('analyze')
-@click.argument('document_id')
-def analyze_difficulty(document_id):
-    """分析文档的个人难度情况"""
+@click.argument('document_id', required=False)
+@click.option('--all', 'analyze_all', is_flag=True, help='按个人难度排序整个文档库')
+@click.option('--best', 'best_count', type=int, help='推荐最适合接下来阅读的N个文档')
+@click.option('--target', 'target_known', default=95.0, show_default=True,
+              help='推荐时的目标已掌握词汇比例 (%)')
+@click.option('--limit', default=20, show_default=True, help='--all 模式下显示的文档数量')
+def analyze_difficulty(document_id, analyze_all, best_count, target_known, limit):
+    """分析文档的个人难度情况
+
+    \b
+    单文档: personal analyze DOCUMENT_ID
+    文档库排序: personal analyze --all
+    阅读推荐: personal analyze --best 5 --target 95
+    """
     try:
         from core.engines.vocabulary.personal_status_manager import PersonalStatusManager
         
         manager = PersonalStatusManager()
+
+        if best_count or analyze_all:
+            if best_count:
+                analyses = manager.recommend_next_documents(best_count, target_known)
+                click.echo(f"📖 推荐接下来阅读的文档 (目标已掌握比例 {target_known}%):")
+            else:
+                analyses = manager.analyze_library_difficulty()[:limit]
+                click.echo("📊 文档库个人难度排序 (由易到难):")
+
+            if not analyses:
+                click.echo("📚 暂无可分析的文档")
+                return
+
+            for i, analysis in enumerate(analyses, 1):
+                name = analysis['filename'] or analysis['document_id'][:8]
+                click.echo(f"  {i:2d}. {name} (ID: {analysis['document_id'][:8]}...)")
+                click.echo(f"      难度评分: {analysis['overall_difficulty_score']}/100  "
+                           f"已掌握: {analysis['known_percentage']}%  "
+                           f"词汇实例: {analysis['total_word_instances']}")
+                if analysis['recommended_words']:
+                    words = ', '.join(w['word'] for w in analysis['recommended_words'][:5])
+                    click.echo(f"      重点词汇: {words}")
+            return
+
+        if not document_id:
+            click.secho("❌ 请指定文档ID，或使用 --all / --best", fg='red', err=True)
+            return
+
         analysis = manager.analyze_document_difficulty(document_id)
         
         if not analysis:
@@ -113,8 +152,8 @@ def import_personal_vocab(vocab_file, file_format, default_status):
         )
         
         # 导入结果会在导入函数中自动显示详细报告
-        if stats['successfully_imported'] > 0:
-            click.secho(f"✅ 个人词汇表导入完成! 成功导入 {stats['successfully_imported']} 个词汇", fg='green')
+        if stats['imported'] > 0:
+            click.secho(f"✅ 个人词汇表导入完成! 成功导入 {stats['imported']} 个词汇", fg='green')
         else:
             click.secho("❌ 个人词汇表导入失败，没有词汇被成功导入", fg='red')
         
@@ -19,13 +19,15 @@ def text():
 @click.argument('directory', type=click.Path(exists=True))
 @click.option('--move/--no-move', default=True, help='处理完成后是否移动文件到processed目录')
 @click.option('--recursive/--no-recursive', default=True, help='是否递归扫描子目录')
-def process(directory, move, recursive):
+@click.option('--report/--no-report', default=None, help='是否生成分析报告（默认读取配置 reports.enabled）')
+@click.option('--shard', type=int, default=None, help='分片存储时只处理该分片的任务（每个分片一个工作进程并行处理）')
+def process(directory, move, recursive, report, shard):
     """处理指定目录下的文本文件进行词频分析"""
     try:
         from core.engines.input.file_processor import TextProcessor
         
         click.echo(f"📂 开始处理目录: {directory}")
-        processor = TextProcessor(move_processed=move)
+        processor = TextProcessor(move_processed=move, generate_reports=report, shard=shard)
         processor.process_new_texts(directory, scan_subdirs=recursive)
         
         click.secho("✅ 文本处理完成！", fg='green')
@@ -33,6 +35,61 @@ def process(directory, move, recursive):
     except Exception as e:
         click.secho(f"❌ 处理失败: {e}", fg='red', err=True)
 
+@text.command()
+@click.argument('directory', type=click.Path(file_okay=False), default='data/files/new')
+@click.option('--move/--no-move', default=True, help='处理完成后是否移动文件到processed目录')
+@click.option('--recursive/--no-recursive', default=True, help='是否递归监听子目录')
+@click.option('--report/--no-report', default=None, help='是否生成分析报告（默认读取配置 reports.enabled）')
+@click.option('--backend', type=click.Choice(['auto', 'inotify', 'polling']), default=None,
+              help='监听方式（默认读取配置 watch.backend）')
+def watch(directory, move, recursive, report, backend):
+    """持续监听目录，自动处理新增或修改的文件"""
+    try:
+        from core.engines.input.file_processor import TextProcessor
+        
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        processor = TextProcessor(move_processed=move, generate_reports=report)
+        batches = processor.watch(directory, scan_subdirs=recursive, backend=backend)
+        click.secho(f"✅ 监听结束，共处理 {batches} 批文件", fg='green')
+        
+    except Exception as e:
+        click.secho(f"❌ 监听失败: {e}", fg='red', err=True)
+
+@text.command()
+@click.option('--move/--no-move', default=True, help='处理完成后是否移动文件到processed目录')
+@click.option('--report/--no-report', default=None, help='是否生成分析报告（默认读取配置 reports.enabled）')
+@click.option('--retry-failed', is_flag=True, help='重新排队已放弃的失败任务')
+@click.option('--reclaim', is_flag=True, help='立即回收处理中的任务（确认没有其他工作进程运行时使用）')
+@click.option('--wait/--no-wait', default=True, help='是否等待退避中的失败任务重试')
+@click.option('--status', 'show_status', is_flag=True, help='只显示队列状态')
+@click.option('--shard', type=int, default=None, help='分片存储时只处理该分片的任务')
+def resume(move, report, retry_failed, reclaim, wait, show_status, shard):
+    """继续处理入库队列中未完成的文件（中断或失败后恢复）"""
+    try:
+        from core.engines.input.file_processor import TextProcessor
+        
+        processor = TextProcessor(move_processed=move, generate_reports=report, shard=shard)
+        ingest_queue = processor._get_ingest_queue()
+        if ingest_queue is None:
+            click.secho("⚠️  入库队列目前只支持 SQLite 存储（单库或分片）", fg='yellow')
+            return
+        
+        if not show_status:
+            stats = processor.resume(retry_failed=retry_failed, reclaim=reclaim, wait_for_retries=wait)
+            click.secho(f"✅ 完成 {stats['completed']} 个，待重试 {stats['retrying']} 个，"
+                        f"放弃 {stats['failed']} 个", fg='green')
+        
+        counts = ingest_queue.status()
+        click.echo(f"📋 队列状态: 待处理 {counts['pending']} | 处理中 {counts['processing']} | "
+                   f"已完成 {counts['completed']} | 失败 {counts['failed']}")
+        for job in ingest_queue.failed_jobs():
+            click.echo(f"   ❌ {job['file_path']} ({job['attempts']} 次): {job['last_error']}")
+        if counts['failed']:
+            click.echo("   使用 text resume --retry-failed 重新处理失败的文件")
+        
+    except Exception as e:
+        click.secho(f"❌ 恢复处理失败: {e}", fg='red', err=True)
+
 @text.command()
 @click.option('--limit', default=20, help='显示记录数量')
 @click.option('--format', 'output_format', type=click.Choice(['table', 'json']), default='table', help='输出格式')
@@ -72,24 +129,181 @@ def query(limit, output_format):
     except Exception as e:
         click.secho(f"❌ 查询失败: {e}", fg='red', err=True)
 
+@text.command()
+@click.argument('text_id')
+@click.option('--top', default=20, help='显示高频词数量')
+@click.option('--format', 'output_format', type=click.Choice(['table', 'json']), default='table', help='输出格式')
+def profile(text_id, top, output_format):
+    """显示文本的词频概况（高频词、词长/频率分布、单次词汇）"""
+    try:
+        from core.engines.database.database_adapter import unified_adapter
+        
+        result = unified_adapter.get_frequency_profile(text_id, top_n=top)
+        if result is None:
+            click.secho(f"❌ 未找到文本: {text_id}", fg='red', err=True)
+            return
+        doc, freq_profile = result
+        
+        if output_format == 'json':
+            import json
+            data = {'id': doc['id'], 'filename': doc['filename'], **freq_profile.to_dict()}
+            click.echo(json.dumps(data, ensure_ascii=False, indent=2))
+            return
+        
+        click.echo(f"📄 {doc['filename']} ({doc['id'][:8]}...)")
+        click.echo("-" * 60)
+        click.echo(f"总词数: {freq_profile.total}    独特词汇: {freq_profile.unique}    "
+                   f"平均词长: {freq_profile.avg_word_length:.1f}    最高频率: {freq_profile.max_frequency}")
+        click.echo(f"单次出现词汇: {freq_profile.hapax_count} 个")
+        
+        click.echo(f"\n📈 高频词汇 (Top {top})")
+        for i, (word, freq) in enumerate(freq_profile.top_words, 1):
+            percentage = freq / freq_profile.total * 100 if freq_profile.total else 0
+            click.echo(f"{i:2d}. {word:<15} {freq:>6} 次 ({percentage:.2f}%)")
+        
+        click.echo("\n📊 频率分布")
+        for bucket in freq_profile.buckets():
+            click.echo(f"{bucket['label']:<10}: {bucket['count']:>6} 词 ({bucket['percentage']:.1f}%)")
+        
+        click.echo("\n📏 词长分布")
+        for length in sorted(freq_profile.length_histogram)[:15]:
+            click.echo(f"{length:2d} 字符: {freq_profile.length_histogram[length]:>6} 词")
+        
+    except Exception as e:
+        click.secho(f"❌ 获取词频概况失败: {e}", fg='red', err=True)
+
 @text.command()
 @click.option('-o', '--output', type=click.Path(), help='输出文件路径')
-@click.option('--format', 'output_format', type=click.Choice(['txt', 'csv', 'json', 'excel']), default='txt', help='导出格式')
-@click.option('-t', '--text-id', help='导出特定文本(可选)')
-def export(output, output_format, text_id):
-    """导出文本分析结果"""
+@click.option('--format', 'output_format',
+              type=click.Choice(['txt', 'csv', 'jsonl', 'json', 'excel', 'parquet', 'arrow']),
+              default='csv', help='导出格式')
+@click.option('-t', '--text-id', help='导出特定文本(可选，支持ID前缀)')
+@click.option('--wordlist', help='只导出属于指定词汇表的词汇')
+@click.option('--min-frequency', type=int, help='最低出现次数')
+@click.option('--compress', 'compression',
+              type=click.Choice(['gzip', 'bz2', 'xz', 'snappy', 'zstd', 'lz4']),
+              help='压缩方式 (文本格式: gzip/bz2/xz; parquet/arrow: 列内压缩)')
+def export(output, output_format, text_id, wordlist, min_frequency, compression):
+    """导出文本分析结果（文档×词汇频率，流式写出）"""
     try:
         from core.engines.database.database_adapter import unified_adapter
+        from core.services.export_service import FrequencyExporter
+        from core.utils.config_manager import get_config
         
         if not output:
-            output = f"text_analysis_export.{output_format}"
+            output_dir = Path(get_config().get('export.output_directory', 'data/exports/'))
+            output = str(output_dir / "text_analysis_export")
         
-        # 导出逻辑...
-        click.secho(f"✅ 导出完成: {output}", fg='green')
+        exporter = FrequencyExporter(unified_adapter.unified_db.require_local_sqlite('词频导出'),
+                                     storage=unified_adapter.unified_db)
+        if text_id:
+            doc_id = unified_adapter.resolve_document_id(text_id)
+            if doc_id is None:
+                click.secho(f"⚠️  未找到文本: {text_id}", fg='yellow')
+                return
+            text_id = doc_id
+        click.echo(f"📤 开始导出 ({output_format})...")
+        result = exporter.export(output, output_format, document_id=text_id,
+                                 wordlist=wordlist, min_frequency=min_frequency,
+                                 compression=compression)
+        
+        if result['rows'] == 0:
+            click.secho("⚠️  没有符合条件的数据", fg='yellow')
+        click.secho(f"✅ 导出完成: {result['output']} ({result['rows']} 行)", fg='green')
         
     except Exception as e:
         click.secho(f"❌ 导出失败: {e}", fg='red', err=True)
 
+@text.command()
+@click.option('--threshold', type=float, help='Jaccard 相似度阈值 (默认使用配置 dedup.threshold)')
+@click.option('--backfill/--no-backfill', default=True, help='先为缺少签名的已有文档计算签名')
+def duplicates(threshold, backfill):
+    """列出语料中的近似重复文档簇 (MinHash/LSH)"""
+    try:
+        from core.engines.database.near_duplicate_index import NearDuplicateIndex
+        
+        index = NearDuplicateIndex(threshold=threshold)
+        if backfill:
+            added = index.backfill()
+            if added:
+                click.echo(f"🔏 已为 {added} 个文档补算签名")
+        
+        clusters = index.clusters()
+        if not clusters:
+            click.echo(f"✅ 未发现近似重复文档 (阈值 {index.threshold})")
+            return
+        
+        click.echo(f"🔍 发现 {len(clusters)} 组近似重复文档 (阈值 {index.threshold}):")
+        for number, cluster in enumerate(clusters, 1):
+            click.echo(f"\n[{number}] {len(cluster)} 个文档")
+            for item in cluster:
+                click.echo(f"   {item['document_id'][:8]}...  {item['filename']:<40} "
+                           f"相似度 {item['similarity']:.2f}")
+        
+    except Exception as e:
+        click.secho(f"❌ 重复检测失败: {e}", fg='red', err=True)
+
+@text.command()
+@click.argument('text_ids', nargs=-1)
+@click.option('--type', 'document_type', help='删除指定类型的全部文档 (如 text)')
+@click.option('--gc/--no-gc', 'collect_garbage', default=False,
+              help='回收没有出现记录且无学习状态的词汇（全库扫描，避免与入库同时运行）')
+@click.option('--vacuum', type=click.Choice(['none', 'incremental', 'full']), default='none',
+              help='删除后回收磁盘空间')
+@click.option('--yes', '-y', is_flag=True, help='跳过确认')
+def delete(text_ids, document_type, collect_garbage, vacuum, yes):
+    """删除文本及其词频数据（支持ID前缀，分批删除，--gc 回收孤立词汇）"""
+    try:
+        from core.engines.database.database_adapter import unified_adapter
+        from core.utils.config_manager import get_config
+        
+        if document_type:
+            doc_ids = [doc['id'] for doc in unified_adapter.unified_db.get_all_documents(document_type=document_type)]
+        else:
+            doc_ids = []
+            for text_id in text_ids:
+                doc_id = unified_adapter.resolve_document_id(text_id)
+                if doc_id is None:
+                    click.secho(f"⚠️  未找到文本: {text_id}", fg='yellow')
+                else:
+                    doc_ids.append(doc_id)
+        
+        if not doc_ids:
+            click.echo("📚 没有需要删除的文本")
+            return
+        if not yes and not click.confirm(f"确定删除 {len(doc_ids)} 个文本及其词频数据？"):
+            return
+        
+        bar = None
+        
+        def show_progress(done, total):
+            nonlocal bar
+            if bar is None:
+                bar = click.progressbar(length=total, label='🗑️  删除词频记录')
+                bar.__enter__()
+            bar.update(done - bar.pos)
+        
+        show_bar = get_config().get('cli.enable_progress_bar', True)
+        try:
+            stats = unified_adapter.unified_db.delete_documents(
+                doc_ids, collect_garbage=collect_garbage, vacuum=vacuum,
+                progress=show_progress if show_bar else None
+            )
+        finally:
+            if bar is not None:
+                bar.__exit__(None, None, None)
+        
+        click.secho(f"✅ 已删除 {stats['documents']} 个文本，{stats['occurrences']} 条词频记录", fg='green')
+        if collect_garbage:
+            click.echo(f"🧹 回收孤立词频记录 {stats['orphan_occurrences']} 条，孤立词汇 {stats['words']} 个")
+        if stats.get('vacuum') == 'none':
+            click.secho("⚠️  数据库未启用增量模式，跳过 VACUUM (可运行 db maintain --vacuum full)", fg='yellow')
+        elif 'vacuum' in stats:
+            click.echo(f"💾 已执行 {stats['vacuum']} VACUUM")
+        
+    except Exception as e:
+        click.secho(f"❌ 删除失败: {e}", fg='red', err=True)
+
 @text.command()
 def organize():
     """整理已分析的文本文件：将数据库中已存在的文件移动到processed目录"""
@@ -154,15 +154,85 @@ def variants(word, doc_id):
     except Exception as e:
         click.secho(f"❌ 查询失败: {e}", fg='red', err=True)
 
+def _load_snapshot():
+    """加载列式快照，快照过期时给出提示"""
+    from core.engines.database.corpus_snapshot import CorpusSnapshot
+    from core.engines.database.database_adapter import unified_adapter
+    
+    snapshot = CorpusSnapshot(db_path=unified_adapter.unified_db.require_local_sqlite('列式快照'),
+                              storage=unified_adapter.unified_db)
+    if not snapshot.exists():
+        raise click.ClickException("快照不存在，请先运行: vocab snapshot")
+    if snapshot.is_stale():
+        click.secho("⚠️  快照已过期（数据库在快照后有变化），可运行 vocab snapshot 重建", fg='yellow')
+    return snapshot
+
+@vocab.command()
+@click.option('-o', '--output', 'snapshot_dir', type=click.Path(), help='快照目录 (默认使用配置 performance.snapshot_directory)')
+def snapshot(snapshot_dir):
+    """构建语料列式快照 (Arrow)，供分析命令的 --snapshot 选项使用"""
+    try:
+        from core.engines.database.corpus_snapshot import CorpusSnapshot
+        from core.engines.database.database_adapter import unified_adapter
+        
+        corpus_snapshot = CorpusSnapshot(snapshot_dir, unified_adapter.unified_db.require_local_sqlite('列式快照'),
+                                         storage=unified_adapter.unified_db)
+        click.echo(f"📸 正在构建列式快照: {corpus_snapshot.snapshot_dir}")
+        manifest = corpus_snapshot.build()
+        
+        rows = manifest['rows']
+        click.secho("✅ 快照构建完成", fg='green')
+        click.echo(f"   文档: {rows['documents']}  词汇: {rows['words']}  "
+                   f"频率记录: {rows['occurrences']}  字典词条: {rows['common_dictionary']}")
+        
+    except Exception as e:
+        click.secho(f"❌ 快照构建失败: {e}", fg='red', err=True)
+
+@vocab.command()
+@click.argument('words', nargs=-1)
+@click.option('--doc-id', help='查看指定文档的草图（默认语料级草图）')
+@click.option('--top', 'top_n', default=20, help='显示高频词数量')
+def sketch(words, doc_id, top_n):
+    """查看词频概率草图：不同词汇数、高频词及指定词汇的频率估计"""
+    try:
+        from core.engines.database.sketch_store import SketchStore
+        
+        store = SketchStore()
+        frequency_sketch = store.load(doc_id or SketchStore.CORPUS_SCOPE)
+        if frequency_sketch is None:
+            click.echo("📭 没有找到草图数据（需要在草图模式 analysis.sketch.enabled 下处理文本）")
+            return
+        
+        scope_name = f"文档 {doc_id[:8]}..." if doc_id else "语料"
+        click.echo(f"📐 {scope_name}草图")
+        click.echo(f"   文档数: {frequency_sketch.documents}  总词数: {frequency_sketch.total}  "
+                   f"不同词汇(估计): {frequency_sketch.distinct()}")
+        
+        click.echo(f"\n🔝 高频词 (Space-Saving, 前{top_n}):")
+        for word, count, error in frequency_sketch.top(top_n):
+            click.echo(f"   {word:<20} {count:>8}  (误差 ≤ {error})")
+        
+        if words:
+            click.echo("\n🔎 频率估计 (Count-Min, 不低于真实值):")
+            for word, estimate in frequency_sketch.estimate([w.lower() for w in words]).items():
+                click.echo(f"   {word:<20} ≈ {estimate}")
+        
+    except Exception as e:
+        click.secho(f"❌ 读取草图失败: {e}", fg='red', err=True)
+
 @vocab.command()
 @click.option('--doc-id', help='指定文档ID进行词根分析')
 @click.option('--limit', default=20, help='显示数量限制')
-def lemmas(doc_id, limit):
+@click.option('--snapshot', 'use_snapshot', is_flag=True, help='基于列式快照向量化计算')
+def lemmas(doc_id, limit, use_snapshot):
     """词根级别的统计分析"""
     try:
         from core.engines.database.database_adapter import unified_adapter
         
-        result = unified_adapter.get_lemma_analysis_data(doc_id)
+        if use_snapshot:
+            result = _load_snapshot().get_lemma_analysis(doc_id)
+        else:
+            result = unified_adapter.get_lemma_analysis_data(doc_id)
         
         click.echo("🌱 词根分析报告")
         click.echo("=" * 50)
@@ -271,14 +341,20 @@ def pos(word):
 @vocab.command()
 @click.option('--type', 'pos_type', help='词性类型 (noun, verb, adjective, 等)')
 @click.option('--limit', default=20, help='显示数量限制')
-def by_pos(pos_type, limit):
+@click.option('--snapshot', 'use_snapshot', is_flag=True, help='基于列式快照向量化计算')
+def by_pos(pos_type, limit, use_snapshot):
     """按词性类型查询词汇"""
     try:
         from core.engines.database.database_adapter import unified_adapter
         
+        corpus_snapshot = _load_snapshot() if use_snapshot else None
+        
         if pos_type:
             # 查询特定词性的词汇
-            results = unified_adapter.get_words_by_pos(pos_type, limit)
+            if corpus_snapshot:
+                results = corpus_snapshot.get_words_by_pos_type(pos_type, limit)
+            else:
+                results = unified_adapter.get_words_by_pos(pos_type, limit)
             
             click.echo(f"📚 词性类型: {pos_type}")
             click.echo("=" * 50)
@@ -316,7 +392,10 @@ def by_pos(pos_type, limit):
                 click.secho(f"❌ 未找到词性为 \"{pos_type}\" 的词汇", fg='yellow')
         else:
             # 显示词性分布统计
-            stats = unified_adapter.get_pos_statistics()
+            if corpus_snapshot:
+                stats = corpus_snapshot.get_pos_distribution()
+            else:
+                stats = unified_adapter.get_pos_statistics()
             
             click.echo("📊 词性分布统计")
             click.echo("=" * 50)
@@ -360,12 +439,16 @@ def by_pos(pos_type, limit):
         click.secho(f"❌ 查询失败: {e}", fg='red', err=True)
 
 @vocab.command()
-def morphology():
+@click.option('--snapshot', 'use_snapshot', is_flag=True, help='基于列式快照向量化计算')
+def morphology(use_snapshot):
     """形态学分析 - 显示有前缀和后缀的词汇"""
     try:
         from core.engines.database.database_adapter import unified_adapter
         
-        analysis = unified_adapter.get_morphology_analysis()
+        if use_snapshot:
+            analysis = _load_snapshot().get_complex_words_analysis()
+        else:
+            analysis = unified_adapter.get_morphology_analysis()
         
         click.echo("🔧 形态学分析报告")
         click.echo("=" * 60)
@@ -97,4 +97,40 @@ def list_wordlists(output_format):
             click.echo(f"总计 {len(wordlists)} 个词汇表")
             
     except Exception as e:
-        click.secho(f"❌ 查询失败: {e}", fg='red', err=True) 
\ No newline at end of file
+        click.secho(f"❌ 查询失败: {e}", fg='red', err=True) 
+
+
+@wordlist.command('coverage')
+@click.option('--refresh', is_flag=True, help='忽略缓存，重新计算覆盖度矩阵')
+@click.option('-o', '--output', type=click.Path(), help='导出完整矩阵的文件路径')
+@click.option('--format', 'export_format', type=click.Choice(['csv', 'parquet']), default='csv', help='导出格式')
+def coverage(refresh, output, export_format):
+    """所有文档 × 所有词汇表的覆盖度矩阵"""
+    try:
+        from core.engines.database.database_adapter import unified_adapter
+        from core.engines.database.coverage_engine import BatchCoverageEngine
+        
+        engine = BatchCoverageEngine(unified_adapter.unified_db.require_local_sqlite('覆盖度矩阵'),
+                                     storage=unified_adapter.unified_db)
+        matrix = engine.get_matrix(refresh=refresh)
+        
+        if not matrix['rows']:
+            click.echo("📚 暂无文档或词汇表，无法计算覆盖度")
+            return
+        
+        source = "缓存" if matrix.get('cached') else "实时计算"
+        click.echo(f"📊 词汇表覆盖度矩阵 ({matrix['documents_count']} 个文档 × {matrix['wordlists_count']} 个词汇表, {source})")
+        click.echo("-" * 60)
+        click.echo(f"{'词汇表':<20} {'文档数':>8} {'平均覆盖率':>12} {'平均频率覆盖':>14}")
+        click.echo("-" * 60)
+        for item in engine.summarize(matrix):
+            click.echo(f"{item['wordlist_name']:<20} {item['documents']:>8} "
+                       f"{item['avg_coverage_percentage']:>11.1f}% {item['avg_frequency_coverage_percentage']:>13.1f}%")
+        click.echo("-" * 60)
+        
+        if output:
+            path = engine.export(matrix, output, export_format)
+            click.secho(f"✅ 覆盖度矩阵已导出: {path}", fg='green')
+            
+    except Exception as e:
+        click.secho(f"❌ 覆盖度分析失败: {e}", fg='red', err=True)
@@ -51,6 +51,7 @@ def register_commands():
     from .commands.vocab_commands import vocab
     from .commands.personal_commands import personal
     from .commands.config_commands import config_cmd
+    from .commands.db_commands import db
     
     # 注册命令组
     cli.add_command(text)
@@ -58,6 +59,7 @@ def register_commands():
     cli.add_command(vocab)
     cli.add_command(personal)
     cli.add_command(config_cmd)
+    cli.add_command(db)
 
 def main():
     """CLI主程序入口函数"""
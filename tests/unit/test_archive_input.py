@@ -0,0 +1,86 @@
+import bz2
+import gzip
+import os
+import sys
+import tarfile
+import zipfile
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.engines.database.database_adapter import UnifiedDatabaseAdapter
+from core.engines.input.file_processor import TextProcessor
+from core.engines.input.file_reader import TextReader
+from core.engines.input.stream_counter import StreamingTextCounter
+from core.engines.vocabulary.word_analyzer import analyze_document
+from core.utils.helpers import get_supported_files
+
+TEXT = 'Alpha beta. Gamma!\n\nDelta alpha\n'
+CSV = 'id,text\n1,"hello there, world"\n2,second row\n'
+
+
+def _make_inputs(directory):
+    directory.mkdir()
+    (directory / 'plain.txt').write_text(TEXT, encoding='utf-8')
+    with gzip.open(directory / 'a.txt.gz', 'wt', encoding='utf-8') as f:
+        f.write(TEXT)
+    with bz2.open(directory / 'posts.csv.bz2', 'wt', encoding='utf-8') as f:
+        f.write(CSV)
+    (directory / 'ignored.bin.gz').write_bytes(gzip.compress(b'binary'))
+    with zipfile.ZipFile(directory / 'bundle.zip', 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('docs/a.txt', TEXT)
+        archive.writestr('docs/posts.csv', CSV)
+        archive.writestr('image.png', b'not text')
+    with tarfile.open(directory / 'bundle.tar.gz', 'w:gz') as archive:
+        for index in range(3):
+            path = directory / f'member{index}.txt'
+            path.write_text(f'member {index} words here', encoding='utf-8')
+            archive.add(path, arcname=f'member{index}.txt')
+            path.unlink()
+
+
+def test_compressed_files_and_archive_members_are_read_lazily(tmp_path):
+    input_dir = tmp_path / 'in'
+    _make_inputs(input_dir)
+    reader = TextReader()
+
+    files = [os.path.basename(path) for path in get_supported_files(str(input_dir), supported_formats=['.txt', '.csv'])]
+    assert files == ['a.txt.gz', 'bundle.tar.gz', 'bundle.zip', 'plain.txt', 'posts.csv.bz2']
+
+    members = reader.archive_reader.list_members(str(input_dir / 'bundle.zip'), reader.supported_formats)
+    assert [member.split('!/')[1] for member in members] == ['docs/a.txt', 'docs/posts.csv']
+
+    assert reader.read_file(input_dir / 'a.txt.gz') == TEXT
+    assert reader.read_file(members[0]) == TEXT
+    assert list(reader.iter_text(members[1])) == ['hello there, world', 'second row']
+    assert list(reader.iter_text(input_dir / 'posts.csv.bz2')) == ['hello there, world', 'second row']
+
+    # 解压后内容的哈希与未压缩文件一致，计数与整段文本分析一致
+    counter = StreamingTextCounter(reader)
+    basic_info, word_frequencies, content_hash = counter.count_and_hash(members[0])
+    assert content_hash == counter.content_hash(input_dir / 'plain.txt')
+    expected_info, expected_frequencies = analyze_document(TEXT, reader)
+    assert word_frequencies == expected_frequencies
+    assert basic_info.pop('char_count') == len(TEXT)
+    assert basic_info == expected_info
+
+
+def test_archive_members_are_ingested_as_documents(tmp_path):
+    input_dir = tmp_path / 'in'
+    _make_inputs(input_dir)
+    (input_dir / 'plain.txt').unlink()
+    adapter = UnifiedDatabaseAdapter(str(tmp_path / 'corpus.db'))
+
+    processor = TextProcessor(storage_manager=adapter, move_processed=True, generate_reports=False)
+    processor.process_new_texts(str(input_dir))
+
+    # a.txt.gz 与 zip 中的 docs/a.txt、posts.csv.bz2 与 docs/posts.csv 内容相同
+    filenames = sorted(text['filename'] for text in adapter.get_all_texts())
+    assert filenames == ['a.txt.gz', 'member0.txt', 'member1.txt', 'member2.txt', 'posts.csv']
+    assert processor._get_ingest_queue().status()['completed'] == 7
+
+    # 全部成员完成后归档整体移入 processed
+    assert sorted(os.listdir(input_dir / 'processed')) == [
+        'a.txt.gz', 'bundle.tar.gz', 'bundle.zip', 'posts.csv.bz2']
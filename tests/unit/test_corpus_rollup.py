@@ -0,0 +1,83 @@
+import math
+import os
+import sys
+import sqlite3
+
+import pytest
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.engines.database.unified_database import UnifiedDatabase
+
+
+def _rollup(db_path):
+    with sqlite3.connect(db_path) as conn:
+        expected = conn.execute("""
+            SELECT word_id, SUM(frequency), COUNT(*) FROM occurrences GROUP BY word_id ORDER BY word_id
+        """).fetchall()
+        actual = conn.execute("""
+            SELECT word_id, total_frequency, document_frequency FROM corpus_word_stats ORDER BY word_id
+        """).fetchall()
+    return expected, actual
+
+
+def _populate(db_path):
+    db = UnifiedDatabase(db_path)
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany("INSERT INTO words (id, surface_form, lemma) VALUES (?, ?, ?)",
+                         [('w1', 'apple', 'apple'), ('w2', 'run', 'run'), ('w3', 'zebra', 'zebra')])
+        conn.executemany("INSERT INTO documents (id, filename, content_hash) VALUES (?, ?, ?)",
+                         [('d1', 'a.txt', 'h1'), ('d2', 'b.txt', 'h2')])
+        conn.executemany("INSERT INTO occurrences (document_id, word_id, frequency) VALUES (?, ?, ?)",
+                         [('d1', 'w1', 3), ('d1', 'w2', 1), ('d2', 'w2', 4), ('d2', 'w3', 2)])
+    return db
+
+
+def test_rollup_tracks_writes_and_deletes(tmp_path):
+    db_path = str(tmp_path / "rollup.db")
+    db = _populate(db_path)
+
+    expected, actual = _rollup(db_path)
+    assert actual == expected
+
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE occurrences SET frequency = 10 WHERE document_id = 'd1' AND word_id = 'w1'")
+    expected, actual = _rollup(db_path)
+    assert actual == expected
+
+    assert db.delete_document('d2')
+    expected, actual = _rollup(db_path)
+    assert actual == expected
+    assert [row['surface_form'] for row in db.get_corpus_top_words()] == ['apple', 'run']
+
+
+def test_rollup_backfilled_for_existing_database(tmp_path):
+    db_path = str(tmp_path / "rollup.db")
+    _populate(db_path)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DROP TABLE corpus_word_stats")
+
+    db = UnifiedDatabase(db_path)
+    expected, actual = _rollup(db_path)
+    assert actual == expected
+
+    top = db.get_corpus_top_words(order_by='document_frequency')
+    assert top[0]['surface_form'] == 'run'
+    assert top[0]['idf'] == 0.0
+
+
+def test_idf_reflects_completed_documents_without_refresh(tmp_path):
+    db = UnifiedDatabase(str(tmp_path / "idf.db"))
+    for filename, frequencies in [('a.txt', {'apple': 1, 'fig': 2}), ('b.txt', {'apple': 1, 'pear': 3})]:
+        doc_id = db.add_document(filename, filename)
+        db.store_word_frequencies(doc_id, frequencies)
+        db.update_document_status(doc_id, 'completed')
+
+    # 写入时不重算整张汇总表，IDF 在查询时按已完成的文档数计算
+    idf = {row['surface_form']: row['idf'] for row in db.get_corpus_top_words()}
+    assert idf['apple'] == 0.0
+    assert idf['fig'] == pytest.approx(math.log(2))
+    assert idf['pear'] == pytest.approx(math.log(2))
@@ -0,0 +1,88 @@
+import os
+import sys
+import json
+import sqlite3
+
+import pytest
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+pytest.importorskip('pyarrow')
+
+from core.engines.database.unified_database import UnifiedDatabase
+from core.engines.database.corpus_snapshot import CorpusSnapshot
+from core.models.schema import ModernSchema
+
+
+def _features(pos_tag, pos_type, prefix=None, suffix=None):
+    complexity = 'complex' if prefix and suffix else 'prefixed' if prefix else 'suffixed' if suffix else 'simple'
+    morphology = {'prefix': prefix, 'suffix': suffix, 'complexity': complexity}
+    if suffix:
+        morphology['suffix_meaning'] = 'meaning'
+    return json.dumps({'pos_tag': pos_tag, 'pos_type': pos_type,
+                       'pos_description': f'{pos_type} desc', 'morphology': morphology})
+
+
+def _populate(db_path):
+    db = UnifiedDatabase(db_path)
+    words = [
+        ('w1', 'running', 'run', _features('VBG', 'verb', suffix='ing')),
+        ('w2', 'runs', 'run', _features('VBZ', 'verb', suffix='s')),
+        ('w3', 'undo', 'undo', _features('VB', 'verb', prefix='un')),
+        ('w4', 'apple', 'apple', _features('NN', 'noun')),
+        ('w5', 'plain', 'plain', None),
+    ]
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany("""
+            INSERT INTO words (id, surface_form, lemma, linguistic_features) VALUES (?, ?, ?, ?)
+        """, words)
+        ModernSchema(db_path).backfill_linguistic_columns(conn)
+    d1 = db.add_document('a.txt', 'first')
+    d2 = db.add_document('b.txt', 'second')
+    for doc_id in (d1, d2):
+        db.update_document_status(doc_id, 'completed')
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany("INSERT INTO occurrences (document_id, word_id, frequency) VALUES (?, ?, ?)", [
+            (d1, 'w1', 5), (d1, 'w2', 2), (d1, 'w4', 7),
+            (d2, 'w1', 1), (d2, 'w3', 3), (d2, 'w5', 4),
+        ])
+    return db, d1
+
+
+def test_snapshot_matches_live_sql(tmp_path):
+    db_path = str(tmp_path / "corpus.db")
+    db, d1 = _populate(db_path)
+
+    snapshot = CorpusSnapshot(str(tmp_path / "snapshot"), db_path)
+    manifest = snapshot.build()
+    assert manifest['rows']['occurrences'] == 6
+    assert not snapshot.is_stale()
+
+    # 表保持为内存映射的 Arrow 表，不转换为 pandas
+    import pyarrow as pa
+    occurrences = snapshot.table('occurrences')
+    assert isinstance(occurrences, pa.Table) and snapshot.table('occurrences') is occurrences
+
+    def by_lemma(result):
+        return {item['lemma']: item for item in result['lemma_analysis']}
+
+    assert by_lemma(snapshot.get_lemma_analysis()) == by_lemma(db.get_lemma_analysis())
+    live = by_lemma(db.get_lemma_analysis(d1))
+    fast = by_lemma(snapshot.get_lemma_analysis(d1))
+    assert {k: (v['total_frequency'], v['variant_count']) for k, v in fast.items()} == \
+        {k: (v['total_frequency'], v['variant_count']) for k, v in live.items()}
+    assert sorted(fast['run']['variants_detail'].split(',')) == ['running:5', 'runs:2']
+
+    live_pos, fast_pos = db.get_pos_distribution(), snapshot.get_pos_distribution()
+    assert fast_pos['pos_type_distribution'] == live_pos['pos_type_distribution']
+    assert fast_pos['morphology_distribution'] == live_pos['morphology_distribution']
+    assert fast_pos['total_analyzed_words'] == 4
+
+    assert snapshot.get_complex_words_analysis() == db.get_complex_words_analysis()
+    assert [w['surface_form'] for w in snapshot.get_words_by_pos_type('verb')] == ['running', 'undo', 'runs']
+
+    db.add_document('c.txt', 'third')
+    assert snapshot.is_stale()
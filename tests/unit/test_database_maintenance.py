@@ -0,0 +1,86 @@
+import os
+import sys
+import sqlite3
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.engines.database.unified_database import UnifiedDatabase
+from core.engines.database.database_maintenance import DatabaseMaintenance
+
+
+def test_maintain_reports_integrity_sizes_and_index_advice(tmp_path):
+    db_path = str(tmp_path / 'test.db')
+    db = UnifiedDatabase(db_path)
+    doc_id = db.add_document('a.txt', 'apple pear', document_type='text')
+    db.store_word_frequencies(doc_id, {'apple': 2, 'pear': 1})
+
+    result = DatabaseMaintenance(db_path).maintain(vacuum='incremental', index_advice=True)
+
+    assert result['integrity']['ok']
+    assert result['analyze']['indexes'] > 0
+    if result['sizes'] is not None:
+        assert 'occurrences' in {item['name'] for item in result['sizes']}
+
+    advice = {item['index']: item['reason'] for item in result['index_advice']}
+    # surface_form 是 UNIQUE(surface_form, lemma) 的前缀
+    assert advice.get('idx_words_surface_form') == 'redundant'
+
+    assert result['vacuum']['mode'] == 'incremental'
+    with sqlite3.connect(db_path) as conn:
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_schema WHERE type = 'index'")}
+    assert 'idx_occurrences_tf_score' not in indexes
+
+
+def test_integrity_reports_foreign_key_violations(tmp_path):
+    db_path = str(tmp_path / 'test.db')
+    db = UnifiedDatabase(db_path)
+    doc_id = db.add_document('a.txt', 'apple', document_type='text')
+    db.store_word_frequencies(doc_id, {'apple': 1})
+
+    # 未启用外键时删除文档，留下孤立的词频记录
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+
+    integrity = DatabaseMaintenance(db_path).integrity()
+    assert not integrity['ok']
+    assert integrity['foreign_key_violations'].get('occurrences') == 1
+
+
+def test_incremental_vacuum_does_not_rewrite_legacy_database(tmp_path):
+    db_path = str(tmp_path / 'legacy.db')
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE t (x TEXT)")
+        conn.executemany("INSERT INTO t VALUES (?)", [('x' * 100,)] * 200)
+
+    maintenance = DatabaseMaintenance(db_path)
+    assert 'vacuum' not in maintenance.maintain()
+
+    # 非增量模式下 incremental 不做完整 VACUUM，也不切换模式
+    assert maintenance.vacuum('incremental')['mode'] == 'none'
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+
+    assert maintenance.vacuum('full')['mode'] == 'full'
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == DatabaseMaintenance.AUTO_VACUUM_INCREMENTAL
+    assert maintenance.vacuum('incremental')['mode'] == 'incremental'
+
+
+
+def test_index_advice_runs_only_on_request(tmp_path):
+    db_path = str(tmp_path / 'test.db')
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, flag INTEGER, name TEXT)")
+        conn.execute("CREATE INDEX idx_t_flag ON t(flag)")
+        conn.execute("CREATE INDEX idx_t_name ON t(name)")
+        conn.executemany("INSERT INTO t (flag, name) VALUES (?, ?)",
+                         [(i % 2, f'name{i}') for i in range(2000)])
+
+    maintenance = DatabaseMaintenance(db_path)
+    assert 'index_advice' not in maintenance.maintain()
+
+    advice = maintenance.maintain(index_advice=True)['index_advice']
+    assert [(item['index'], item['reason']) for item in advice] == [('idx_t_flag', 'low_selectivity')]
@@ -0,0 +1,107 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.engines.database.database_adapter import UnifiedDatabaseAdapter
+from core.engines.input.directory_watcher import DirectoryWatcher, InotifyBackend
+from core.engines.input.file_processor import TextProcessor
+
+
+def _fast(watcher):
+    if watcher.backend_name == 'polling':
+        watcher._backend.interval = 0.05
+    watcher.settle_seconds = 0.2
+    watcher.batch_window = 0.3
+    return watcher
+
+
+def _collect(watcher, stop_event):
+    batches = []
+
+    def run():
+        for batch in watcher.batches(stop_event):
+            batches.append(batch)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return batches, thread
+
+
+def _inotify_available():
+    try:
+        InotifyBackend(os.getcwd(), recursive=False).close()
+        return True
+    except (OSError, AttributeError, TypeError):
+        return False
+
+
+@pytest.mark.parametrize('backend', [
+    'polling',
+    pytest.param('inotify', marks=pytest.mark.skipif(not _inotify_available(), reason='inotify 不可用')),
+])
+def test_watcher_debounces_and_batches(tmp_path, backend):
+    (tmp_path / 'existing.txt').write_text('already here', encoding='utf-8')
+    (tmp_path / 'processed').mkdir()
+    watcher = _fast(DirectoryWatcher(str(tmp_path), ignore_dirs=['processed'], backend=backend))
+    stop = threading.Event()
+    batches, thread = _collect(watcher, stop)
+
+    # 分多次写入的文件在写入完成并稳定后才产出
+    with open(tmp_path / 'growing.txt', 'w', encoding='utf-8') as handle:
+        for _ in range(3):
+            handle.write('partial ')
+            handle.flush()
+            time.sleep(0.1)
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'sub' / 'nested.txt').write_text('nested', encoding='utf-8')
+    (tmp_path / 'processed' / 'done.txt').write_text('ignored', encoding='utf-8')
+    (tmp_path / 'notes.md').write_text('ignored', encoding='utf-8')
+
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline and sum(len(batch) for batch in batches) < 3:
+        time.sleep(0.05)
+    stop.set()
+    thread.join(timeout=5)
+
+    files = [os.path.relpath(path, tmp_path) for batch in batches for path in batch]
+    assert sorted(files) == ['existing.txt', 'growing.txt', os.path.join('sub', 'nested.txt')]
+    assert (tmp_path / 'growing.txt').read_text(encoding='utf-8') == 'partial ' * 3
+
+
+def test_processor_watch_ingests_new_files(tmp_path):
+    adapter = UnifiedDatabaseAdapter(str(tmp_path / 'corpus.db'))
+    input_dir = tmp_path / 'new'
+    input_dir.mkdir()
+    processor = TextProcessor(storage_manager=adapter, move_processed=False, generate_reports=False)
+    stop = threading.Event()
+
+    from core.utils.config_manager import get_config
+    config = get_config()
+    previous = dict(config._config.get('watch', {}))
+    config._config['watch'] = dict(previous, backend='polling', poll_interval=0.05,
+                                   settle_seconds=0.2, batch_window=0.3)
+    try:
+        thread = threading.Thread(target=processor.watch, args=(str(input_dir),),
+                                  kwargs={'stop_event': stop}, daemon=True)
+        thread.start()
+        for index in range(3):
+            (input_dir / f'{index}.txt').write_text(f'apple pear plum text {index}', encoding='utf-8')
+
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline and len(adapter.get_all_texts()) < 3:
+            time.sleep(0.1)
+        stop.set()
+        thread.join(timeout=10)
+    finally:
+        config._config['watch'] = previous
+
+    assert len(adapter.get_all_texts()) == 3
+    assert processor._get_ingest_queue().status()['completed'] == 3
@@ -0,0 +1,103 @@
+import os
+import sys
+import sqlite3
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.engines.database.unified_database import UnifiedDatabase
+from core.engines.database.document_deleter import DocumentDeleter
+from core.engines.database.sketch_store import SketchStore
+
+
+def _setup(tmp_path):
+    db_path = str(tmp_path / 'test.db')
+    db = UnifiedDatabase(db_path)
+    d1 = db.add_document('a.txt', 'apple pear plum', document_type='text')
+    db.store_word_frequencies(d1, {'apple': 3, 'pear': 1, 'plum': 2})
+    d2 = db.add_document('b.txt', 'apple fig', document_type='text')
+    db.store_word_frequencies(d2, {'apple': 1, 'fig': 4})
+    return db_path, db, d1, d2
+
+
+def _rollup_matches_occurrences(conn):
+    rollup = conn.execute("""
+        SELECT word_id, total_frequency, document_frequency FROM corpus_word_stats ORDER BY word_id
+    """).fetchall()
+    expected = conn.execute("""
+        SELECT word_id, SUM(frequency), COUNT(*) FROM occurrences GROUP BY word_id ORDER BY word_id
+    """).fetchall()
+    return rollup == expected
+
+
+def test_delete_documents_batches_and_collects_orphan_words(tmp_path):
+    db_path, db, d1, d2 = _setup(tmp_path)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE words SET personal_status = 'learn' WHERE surface_form = 'plum'")
+
+    progress = []
+    stats = DocumentDeleter(db_path, batch_size=1).delete_documents(
+        [d1], collect_garbage=True, progress=lambda done, total: progress.append((done, total))
+    )
+
+    assert stats['documents'] == 1 and stats['occurrences'] == 3
+    assert progress[-1] == (3, 3) and len(progress) == 3
+
+    with sqlite3.connect(db_path) as conn:
+        words = {row[0] for row in conn.execute("SELECT surface_form FROM words")}
+        # pear 没有出现且无学习状态被回收；plum 有学习状态保留；apple 仍出现在 b.txt
+        assert words == {'apple', 'fig', 'plum'}
+        assert conn.execute("SELECT COUNT(*) FROM occurrences WHERE document_id = ?", (d1,)).fetchone()[0] == 0
+        assert _rollup_matches_occurrences(conn)
+
+
+def test_collect_garbage_removes_occurrences_left_without_documents(tmp_path):
+    db_path, db, d1, d2 = _setup(tmp_path)
+
+    # 外键未启用时直接删除文档会留下孤立的词频记录
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DELETE FROM documents WHERE id = ?", (d2,))
+
+    stats = DocumentDeleter(db_path).collect_garbage()
+    assert stats['orphan_occurrences'] == 2
+    assert stats['words'] == 1  # fig
+
+    with sqlite3.connect(db_path) as conn:
+        assert _rollup_matches_occurrences(conn)
+        total = conn.execute("""
+            SELECT s.total_frequency FROM corpus_word_stats s JOIN words w ON w.id = s.word_id
+            WHERE w.surface_form = 'apple'
+        """).fetchone()[0]
+        assert total == 3
+
+
+def test_delete_documents_keeps_words_unless_gc_requested(tmp_path):
+    db_path, db, d1, d2 = _setup(tmp_path)
+
+    stats = DocumentDeleter(db_path).delete_documents([d1])
+    assert stats['documents'] == 1 and stats['words'] == 0
+
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM words").fetchone()[0] == 4
+        assert _rollup_matches_occurrences(conn)
+
+
+def test_delete_documents_subtracts_from_corpus_sketch(tmp_path):
+    db_path, db, d1, d2 = _setup(tmp_path)
+    store = SketchStore(db_path)
+    store.record_document(d1, {'apple': 3, 'pear': 1, 'plum': 2})
+    store.record_document(d2, {'apple': 1, 'fig': 4})
+
+    db.delete_documents([d1])
+
+    # Count-Min 计数、总词数与文档数与只记录 d2 时相同
+    corpus = store.load()
+    expected = SketchStore(str(tmp_path / 'expected.db'))
+    UnifiedDatabase(expected.db_path)
+    expected.record_document(d2, {'apple': 1, 'fig': 4})
+    assert (corpus.count_min.table == expected.load().count_min.table).all()
+    assert (corpus.total, corpus.documents) == (5, 1)
+    assert corpus.estimate(['pear', 'fig']) == {'pear': 0, 'fig': 4}
+    assert store.load(d1) is None and store.load(d2) is not None
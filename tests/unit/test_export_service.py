@@ -0,0 +1,107 @@
+import csv
+import gzip
+import json
+import os
+import sys
+import sqlite3
+
+import pytest
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.engines.database.unified_database import UnifiedDatabase
+from core.services.export_service import FrequencyExporter
+
+
+def _populate(db_path):
+    db = UnifiedDatabase(db_path)
+    with sqlite3.connect(db_path) as conn:
+        for i, word in enumerate(['apple', 'fig', 'pear']):
+            conn.execute("""
+                INSERT INTO common_dictionary (id, word, lemma, pos_primary, frequency_rank, difficulty_level)
+                VALUES (?, ?, ?, 'noun', ?, 1)
+            """, (f'd{i}', word, word, i + 1))
+    db.add_words_to_wordlist(db.create_wordlist('FRUIT'), ['apple', 'fig'])
+
+    ids = {}
+    for filename, frequencies in [('a.txt', {'apple': 3, 'pear': 1, 'plum': 2}),
+                                  ('b.txt', {'apple': 1, 'fig': 4})]:
+        doc_id = db.add_document(filename, ' '.join(frequencies), document_type='text')
+        db.store_word_frequencies(doc_id, frequencies)
+        db.update_document_status(doc_id, 'completed')
+        ids[filename] = doc_id
+    return ids
+
+
+def _expected(db_path):
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("""
+            SELECT d.id, d.filename, w.surface_form, w.lemma, o.frequency, o.tf_score,
+                   w.dictionary_rank, w.difficulty_level, COALESCE(w.personal_status, 'new')
+            FROM occurrences o
+            JOIN documents d ON o.document_id = d.id
+            JOIN words w ON o.word_id = w.id
+        """).fetchall()
+    return _sorted(dict(zip(FrequencyExporter.COLUMNS, row)) for row in rows)
+
+
+def _sorted(rows):
+    return sorted(rows, key=lambda row: (row['document_id'], row['word']))
+
+
+def test_csv_and_json_round_trip(tmp_path):
+    db_path = str(tmp_path / 'test.db')
+    _populate(db_path)
+    exporter = FrequencyExporter(db_path, batch_size=2)
+    expected = _expected(db_path)
+
+    result = exporter.export(str(tmp_path / 'out'), 'csv')
+    assert result['rows'] == 5 and result['output'].endswith('out.csv')
+    with open(result['output'], encoding='utf-8', newline='') as f:
+        rows = list(csv.DictReader(f))
+    # CSV 中的值均为字符串，空值为空串
+    stringified = [{key: '' if value is None else str(value) for key, value in row.items()} for row in expected]
+    assert _sorted(rows) == stringified
+
+    result = exporter.export(str(tmp_path / 'out'), 'json', compression='gzip')
+    assert result['output'].endswith('out.json.gz')
+    with gzip.open(result['output'], 'rt', encoding='utf-8') as f:
+        assert _sorted(json.load(f)) == expected
+
+    result = exporter.export(str(tmp_path / 'out'), 'jsonl')
+    with open(result['output'], encoding='utf-8') as f:
+        assert _sorted(json.loads(line) for line in f) == expected
+
+
+def test_parquet_round_trip(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    db_path = str(tmp_path / 'test.db')
+    _populate(db_path)
+
+    result = FrequencyExporter(db_path, batch_size=2).export(str(tmp_path / 'out'), 'parquet', compression='zstd')
+    table = pq.read_table(result['output'])
+    assert table.schema.names == FrequencyExporter.COLUMNS
+    assert _sorted(table.to_pylist()) == _expected(db_path)
+
+
+def test_filters_limit_exported_rows(tmp_path):
+    db_path = str(tmp_path / 'test.db')
+    ids = _populate(db_path)
+    exporter = FrequencyExporter(db_path)
+
+    def words(**filters):
+        return sorted((row[0], row[2]) for batch in exporter.iter_batches(**filters) for row in batch)
+
+    assert words(document_id=ids['b.txt']) == [(ids['b.txt'], 'apple'), (ids['b.txt'], 'fig')]
+    assert words(min_frequency=3) == sorted([(ids['a.txt'], 'apple'), (ids['b.txt'], 'fig')])
+    assert words(wordlist='FRUIT') == sorted([(ids['a.txt'], 'apple'), (ids['b.txt'], 'apple'),
+                                              (ids['b.txt'], 'fig')])
+    assert words(document_id=ids['a.txt'], wordlist='FRUIT', min_frequency=2) == [(ids['a.txt'], 'apple')]
+
+    # 未完成的文档不在语料中，不导出
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE documents SET status = 'processing' WHERE id = ?", (ids['a.txt'],))
+    assert words() == [(ids['b.txt'], 'apple'), (ids['b.txt'], 'fig')]
@@ -0,0 +1,52 @@
+import os
+import sys
+import json
+from collections import Counter
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.engines.vocabulary.frequency_profile import FrequencyProfile
+
+
+def _frequencies(seed=3, tokens=20000):
+    ids = np.random.default_rng(seed).zipf(1.4, tokens)
+    return dict(Counter(f"w{'x' * (i % 7)}{i}" for i in ids[ids < 3000]))
+
+
+def test_profile_matches_full_sort_and_scans():
+    frequencies = _frequencies()
+    profile = FrequencyProfile(frequencies, top_n=20)
+
+    assert profile.top_words == sorted(frequencies.items(), key=lambda x: x[1], reverse=True)[:20]
+    assert profile.total == sum(frequencies.values())
+    assert profile.unique == len(frequencies)
+    assert profile.max_frequency == max(frequencies.values())
+    assert profile.length_histogram == dict(Counter(len(word) for word in frequencies))
+    assert profile.frequency_histogram == dict(Counter(frequencies.values()))
+    assert sorted(profile.hapaxes) == sorted(word for word, count in frequencies.items() if count == 1)
+    assert profile.hapax_sample(100) == sorted(profile.hapaxes)[:100]
+
+    values = list(frequencies.values())
+    expected = [sum(1 for f in values if f == 1),
+                sum(1 for f in values if 2 <= f <= 5),
+                sum(1 for f in values if 6 <= f <= 10),
+                sum(1 for f in values if 11 <= f <= 20),
+                sum(1 for f in values if 21 <= f <= 50),
+                sum(1 for f in values if f >= 51)]
+    assert [bucket['count'] for bucket in profile.buckets()] == expected
+
+
+def test_profile_empty_and_json_serializable():
+    empty = FrequencyProfile({})
+    assert empty.top_words == [] and empty.top_word == ('', 0)
+    assert empty.hapax_lengths() is None
+
+    data = json.loads(json.dumps(FrequencyProfile({'apple': 3, 'pear': 1}).to_dict()))
+    assert data['top_words'][0] == {'word': 'apple', 'frequency': 3}
+    assert data['hapaxes'] == ['pear']
+    assert data['frequency_buckets'][0]['label'] == '1 次'
@@ -0,0 +1,85 @@
+import os
+import sys
+import sqlite3
+import threading
+from collections import Counter
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.engines.vocabulary.frequency_sketch import FrequencySketch
+from core.engines.database.unified_database import UnifiedDatabase
+from core.engines.database.sketch_store import SketchStore
+
+
+def _documents(count=20, seed=0):
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        ids = rng.zipf(1.5, 5000)
+        yield Counter(f"w{i}" for i in ids[ids < 20000])
+
+
+def test_sketch_estimates_and_merge():
+    exact = Counter()
+    left, right = FrequencySketch(width=8192), FrequencySketch(width=8192)
+    for i, freq in enumerate(_documents()):
+        exact.update(freq)
+        (left if i % 2 else right).update(freq)
+    left.merge(right)
+
+    assert left.total == sum(exact.values())
+    assert left.documents == 20
+    assert abs(left.distinct() - len(exact)) / len(exact) < 0.05
+
+    heads = [word for word, _ in exact.most_common(10)]
+    assert [word for word, _, _ in left.top(10)] == heads
+
+    estimates = left.estimate(heads)
+    assert all(estimates[word] >= exact[word] for word in heads)
+
+
+def test_sketch_store_round_trip(tmp_path):
+    db_path = str(tmp_path / "sketch.db")
+    UnifiedDatabase(db_path)
+    store = SketchStore(db_path)
+
+    store.record_document('d1', {'apple': 3, 'pear': 1})
+    store.record_document('d2', {'apple': 1, 'fig': 2})
+
+    corpus = store.load()
+    assert corpus.documents == 2
+    assert corpus.estimate(['apple'])['apple'] >= 4
+    assert corpus.top(1)[0][:2] == ('apple', 4)
+
+    merged = store.load_merged(['d1', 'd2'])
+    assert merged.distinct() == 3
+    assert store.exact_head({'apple': 3, 'pear': 1}) == {'apple': 3}
+
+    assert store.delete('d1')
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM frequency_sketches").fetchone()[0] == 2
+
+
+def test_concurrent_writers_keep_every_document_in_corpus_sketch(tmp_path):
+    db_path = str(tmp_path / "sketch.db")
+    UnifiedDatabase(db_path)
+
+    def worker(index):
+        store = SketchStore(db_path)
+        for i in range(10):
+            store.record_document(f'd{index}-{i}', {'apple': 1, f'w{index}': 2})
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    corpus = SketchStore(db_path).load()
+    assert corpus.documents == 40
+    assert corpus.total == 120
+    assert corpus.top(1)[0][:2] == ('apple', 40)
@@ -0,0 +1,143 @@
+import math
+import os
+import sqlite3
+import sys
+
+import pytest
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.engines.database.coverage_engine import BatchCoverageEngine
+from core.engines.database.database_adapter import UnifiedDatabaseAdapter
+from core.engines.database.ingest_queue import IngestQueue
+from core.engines.database.unified_database import UnifiedDatabase
+from core.engines.input.file_processor import TextProcessor
+
+
+def _make_files(directory, count):
+    directory.mkdir()
+    paths = []
+    for index in range(count):
+        path = directory / f'f{index}.txt'
+        path.write_text(f'apple pear plum document {index}', encoding='utf-8')
+        paths.append(path)
+    return paths
+
+
+def test_enqueue_claim_and_retry(tmp_path):
+    db_path = str(tmp_path / 'queue.db')
+    UnifiedDatabase(db_path)
+    paths = _make_files(tmp_path / 'in', 2)
+
+    queue = IngestQueue(db_path, worker_id='w1')
+    queue.max_attempts = 2
+    assert queue.enqueue(paths) == {'queued': 2, 'skipped': 0}
+    # 未变化的文件不会重复入队
+    assert queue.enqueue(paths) == {'queued': 0, 'skipped': 2}
+
+    first, second = queue.claim(), IngestQueue(db_path, worker_id='w2').claim()
+    assert first['id'] != second['id']
+    assert queue.claim() is None
+
+    # 第一次失败进入退避等待，达到最大次数后标记为 failed
+    assert queue.fail(first['id'], 'boom') == 'pending'
+    assert queue.claim() is None and queue.seconds_until_retry() > 0
+
+    # 模拟进程崩溃：处理中任务被回收
+    assert queue.requeue_stale(0) == 1
+    reclaimed = queue.claim()
+    assert reclaimed['id'] == second['id']
+    queue.finish(reclaimed['id'])
+
+    queue.backoff_seconds = 0
+    assert queue.fail(first['id'], 'boom') == 'pending'
+    assert queue.claim()['attempts'] == 2
+    assert queue.fail(first['id'], 'boom again') == 'failed'
+    assert queue.status() == {'pending': 0, 'processing': 0, 'completed': 1, 'failed': 1}
+    assert queue.failed_jobs()[0]['last_error'] == 'boom again'
+
+    assert queue.retry_failed() == 1
+    assert queue.claim()['attempts'] == 1
+
+
+def test_processor_resumes_from_queue(tmp_path):
+    adapter = UnifiedDatabaseAdapter(str(tmp_path / 'corpus.db'))
+    input_dir = tmp_path / 'in'
+    _make_files(input_dir, 3)
+
+    processor = TextProcessor(storage_manager=adapter, move_processed=False, generate_reports=False)
+    processor.process_new_texts(str(input_dir))
+
+    queue = processor._get_ingest_queue()
+    assert queue.status()['completed'] == 3
+    assert len(adapter.get_all_texts()) == 3
+
+    # 再次处理同一目录时已完成的文件被跳过
+    processor.process_new_texts(str(input_dir))
+    assert queue.status()['completed'] == 3
+    assert processor.resume() == {'completed': 0, 'retrying': 0, 'failed': 0}
+
+
+def test_duplicate_content_is_merged_and_jobs_stay_out_of_corpus(tmp_path):
+    adapter = UnifiedDatabaseAdapter(str(tmp_path / 'corpus.db'))
+    input_dir = tmp_path / 'in'
+    input_dir.mkdir()
+    (input_dir / 'a.txt').write_text('apple pear', encoding='utf-8')
+    (input_dir / 'b.txt').write_text('apple pear', encoding='utf-8')
+    (input_dir / 'c.txt').write_text('apple kiwi', encoding='utf-8')
+
+    processor = TextProcessor(storage_manager=adapter, move_processed=False, generate_reports=False)
+    processor.process_new_texts(str(input_dir))
+
+    # b.txt 合并到 a.txt 的文档，文档表中不保留重复任务
+    with sqlite3.connect(adapter.unified_db.db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0] == 2
+        assert conn.execute("SELECT COUNT(*) FROM duplicate_sources").fetchone()[0] == 1
+    queue = processor._get_ingest_queue()
+    assert queue.status()['completed'] == 3
+    assert queue.enqueue([input_dir / 'b.txt']) == {'queued': 0, 'skipped': 1}
+
+    # 尚未处理的任务不计入文档数与 IDF
+    (input_dir / 'd.txt').write_text('plum', encoding='utf-8')
+    queue.enqueue([input_dir / 'd.txt'])
+    adapter.unified_db.refresh_corpus_stats()
+
+    assert len(adapter.get_all_texts()) == 2
+    assert adapter.unified_db.get_database_stats()['documents_count'] == 2
+    with sqlite3.connect(adapter.unified_db.db_path) as conn:
+        idf = conn.execute("""
+            SELECT s.idf FROM corpus_word_stats s JOIN words w ON w.id = s.word_id
+            WHERE w.surface_form = 'kiwi'
+        """).fetchone()[0]
+    assert idf == pytest.approx(math.log(2))
+    matrix = BatchCoverageEngine(adapter.unified_db.db_path).compute()
+    assert matrix['documents_count'] == 2
+
+
+def test_skipped_near_duplicate_job_is_merged(tmp_path):
+    adapter = UnifiedDatabaseAdapter(str(tmp_path / 'corpus.db'))
+    adapter.duplicate_index.enabled = True
+    adapter.duplicate_index.skip_duplicates = True
+    input_dir = tmp_path / 'in'
+    input_dir.mkdir()
+    words = ' '.join(f'{first}{second}ing' for first in 'bcdfghjk' for second in 'aeiou')
+    (input_dir / 'a.txt').write_text(words, encoding='utf-8')
+    (input_dir / 'b.txt').write_text(words + ' extra', encoding='utf-8')
+
+    processor = TextProcessor(storage_manager=adapter, move_processed=False, generate_reports=False)
+    processor.process_new_texts(str(input_dir))
+
+    # b.txt 与 a.txt 近似重复：与内容相同的任务一样合并，不留下空的任务文档
+    with sqlite3.connect(adapter.unified_db.db_path) as conn:
+        documents = conn.execute("SELECT filename, content_hash FROM documents").fetchall()
+        sources = conn.execute("SELECT file_path FROM duplicate_sources").fetchall()
+    assert [filename for filename, _ in documents] == ['a.txt']
+    assert not documents[0][1].startswith('job:')
+    assert [os.path.basename(path) for path, in sources] == ['b.txt']
+
+    queue = processor._get_ingest_queue()
+    assert queue.status()['completed'] == 2
+    assert queue.enqueue([input_dir / 'b.txt']) == {'queued': 0, 'skipped': 1}
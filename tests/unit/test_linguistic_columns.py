@@ -0,0 +1,108 @@
+import os
+import sys
+import json
+import sqlite3
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.engines.database.unified_database import UnifiedDatabase
+from core.models.schema import ModernSchema
+
+COLUMNS = ', '.join(ModernSchema.LINGUISTIC_COLUMNS)
+
+FEATURES = {
+    'w1': {'pos_tag': 'VBG', 'pos_type': 'verb', 'pos_description': 'verb desc',
+           'morphology': {'prefix': None, 'suffix': 'ing', 'complexity': 'suffixed'}},
+    'w2': {'pos_tag': 'NN', 'pos_type': 'noun', 'pos_description': 'noun desc',
+           'morphology': {'prefix': 'un', 'suffix': None, 'complexity': 'prefixed'}},
+    # 旧版分析结果中没有 pos_type 与 morphology
+    'w3': {'pos_tag': 'FW'},
+}
+
+
+def _create_legacy_database(db_path):
+    """类型化列出现之前的 words 表"""
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("""
+            CREATE TABLE words (
+                id TEXT PRIMARY KEY,
+                surface_form TEXT NOT NULL,
+                lemma TEXT NOT NULL,
+                stem TEXT,
+                normalized_form TEXT,
+                idf_score REAL DEFAULT 0.0,
+                linguistic_features JSON,
+                dictionary_id TEXT,
+                dictionary_found BOOLEAN DEFAULT FALSE,
+                dictionary_rank INTEGER,
+                difficulty_level INTEGER,
+                personal_status TEXT CHECK (personal_status IN ('new', 'learn', 'know', 'master')) DEFAULT 'new',
+                personal_notes TEXT,
+                status_updated_at TIMESTAMP,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(surface_form, lemma)
+            )
+        """)
+        conn.executemany("INSERT INTO words (id, surface_form, lemma, linguistic_features) VALUES (?, ?, ?, ?)", [
+            ('w1', 'running', 'run', json.dumps(FEATURES['w1'])),
+            ('w2', 'undo', 'undo', json.dumps(FEATURES['w2'])),
+            ('w3', 'etc', 'etc', json.dumps(FEATURES['w3'])),
+            ('w4', 'plain', 'plain', None),
+        ])
+
+
+def _typed_columns(db_path, word_id):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(f"SELECT {COLUMNS} FROM words WHERE id = ?", (word_id,)).fetchone()
+
+
+def test_legacy_database_is_migrated_and_backfilled(tmp_path):
+    db_path = str(tmp_path / "legacy.db")
+    _create_legacy_database(db_path)
+
+    db = UnifiedDatabase(db_path)
+
+    with sqlite3.connect(db_path) as conn:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(words)")}
+        indexes = {row[1] for row in conn.execute("PRAGMA index_list(words)")}
+    assert set(ModernSchema.LINGUISTIC_COLUMNS) <= columns
+    assert 'idx_words_pos_type' in indexes
+
+    assert _typed_columns(db_path, 'w1') == ('VBG', 'verb', 'suffixed', None, 'ing')
+    assert _typed_columns(db_path, 'w2') == ('NN', 'noun', 'prefixed', 'un', None)
+    assert _typed_columns(db_path, 'w3') == ('FW', None, None, None, None)
+    assert _typed_columns(db_path, 'w4') == (None,) * 5
+    for word_id, features in FEATURES.items():
+        assert _typed_columns(db_path, word_id) == ModernSchema.linguistic_column_values(features)
+
+    # 统计范围与旧版一致：有特征的词汇都计入，缺少 pos_type 的计入 None
+    distribution = db.get_pos_distribution()
+    assert distribution['pos_type_distribution'] == {'verb': 1, 'noun': 1, None: 1}
+    assert distribution['total_analyzed_words'] == 3
+    assert {item['pos_tag'] for item in distribution['pos_tag_distribution']} == {'VBG', 'NN', 'FW'}
+    assert distribution['morphology_distribution'] == {'suffixed': 1, 'prefixed': 1}
+    assert [w['surface_form'] for w in db.get_words_by_pos_type('noun')] == ['undo']
+
+    # 再次打开不重复迁移，已有值保持不变
+    UnifiedDatabase(db_path)
+    assert _typed_columns(db_path, 'w1') == ('VBG', 'verb', 'suffixed', None, 'ing')
+
+
+def test_insert_paths_fill_typed_columns(tmp_path):
+    db_path = str(tmp_path / "corpus.db")
+    db = UnifiedDatabase(db_path)
+
+    word_id = db.add_or_get_word('running', 'run', FEATURES['w1'])
+    assert _typed_columns(db_path, word_id) == ('VBG', 'verb', 'suffixed', None, 'ing')
+    assert _typed_columns(db_path, db.add_or_get_word('plain', 'plain')) == (None,) * 5
+
+    word_ids = db.batch_add_words_detailed(['unhappiness', 'quickly'], 'Unhappiness passed quickly.')
+    with sqlite3.connect(db_path) as conn:
+        for word_id in word_ids.values():
+            features = conn.execute("SELECT linguistic_features FROM words WHERE id = ?", (word_id,)).fetchone()[0]
+            expected = ModernSchema.linguistic_column_values(json.loads(features))
+            assert expected[1] is not None
+            assert _typed_columns(db_path, word_id) == expected
@@ -0,0 +1,148 @@
+import hashlib
+import os
+import random
+import sys
+import pytest
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.engines.database.database_adapter import UnifiedDatabaseAdapter
+from core.engines.database.unified_database import UnifiedDatabase
+from core.engines.input.file_processor import TextProcessor
+from core.engines.input.file_reader import TextReader
+from core.engines.input.mmap_counter import MappedTextCounter
+from core.engines.input.stream_counter import StreamingTextCounter
+from core.engines.vocabulary.vocabulary_interner import get_interner
+from core.engines.vocabulary.word_analyzer import WordAnalyzer
+
+
+SAMPLE = (
+    "\n\nThe Quick brown fox -- don't panic! It's a well-known fact.\n"
+    "Café naïve résumé: the fox's den, 42 foxes and x2y.\n\n\n"
+    "  Second paragraph?! Rock-'n-roll “quoted” words… THE end.\n"
+    "\n \n"
+    "Third_part www.example.com i I a A\n\n"
+)
+
+
+@pytest.mark.parametrize("chunk_bytes", [None, 16, 7])
+def test_mmap_counts_match_text_path(tmp_path, chunk_bytes):
+    path = tmp_path / "sample.txt"
+    path.write_bytes(SAMPLE.encode('utf-8'))
+
+    reader = TextReader()
+    expected_info, expected_freq = WordAnalyzer().analyze_document(SAMPLE, reader)
+    info, freq = MappedTextCounter(reader, chunk_bytes=chunk_bytes).count(path)
+
+    assert freq == expected_freq
+    for key in ('total_words', 'unique_words', 'sentences', 'paragraphs'):
+        assert info[key] == expected_info[key], key
+    assert info['paragraphs'] == 3
+
+
+@pytest.mark.parametrize("chunk_bytes", [None, 5, 1])
+def test_paragraphs_treat_unicode_whitespace_as_blank(tmp_path, chunk_bytes):
+    reader = TextReader()
+    counter = MappedTextCounter(reader, chunk_bytes=chunk_bytes)
+    spaces = [' ', '\t', '\r', '\x1c', '\xa0', '\x85', '\u2003', '\u3000', '\u2028']
+    texts = ["one\n\xa0\ntwo", "one\n\n\xa0\n\ntwo", "\u3000\n\u2003\none\n\xa0\n\u202f\n",
+             "one\xa0two\n\x1f\nthree"]
+    rng = random.Random(7)
+    for _ in range(100):
+        texts.append(''.join(rng.choice(spaces + ['\n', '\n', 'word', 'x.']) for _ in range(rng.randint(1, 12))))
+
+    path = tmp_path / "sample.txt"
+    for text in texts:
+        path.write_bytes(text.encode('utf-8'))
+        expected_info, _ = WordAnalyzer().analyze_document(text, reader)
+        if not path.stat().st_size:
+            continue
+        info, _ = counter.count(path)
+        assert info['paragraphs'] == expected_info['paragraphs'], repr(text)
+
+
+def test_mmap_rejects_non_utf8(tmp_path):
+    path = tmp_path / "latin1.txt"
+    path.write_bytes("café au lait".encode('latin-1'))
+
+    assert MappedTextCounter.supports(path)
+    with pytest.raises(UnicodeDecodeError):
+        MappedTextCounter().count(path)
+
+    utf16 = tmp_path / "utf16.txt"
+    utf16.write_text("hello", encoding='utf-16')
+    assert not MappedTextCounter.supports(utf16)
+
+
+@pytest.mark.parametrize("chunk_bytes", [None, 16, 7, 1])
+def test_content_hash_matches_preprocessed_text_hash(tmp_path, chunk_bytes):
+    # BOM、CRLF、块边界处的 Unicode 空白与首尾空白都不改变哈希的含义
+    text = "\ufeff  " + SAMPLE.replace("\n", "\r\n") + " tail\u00a0\u00a0 Word\u2003end \n\n"
+    path = tmp_path / "sample.txt"
+    path.write_bytes(text.encode('utf-8'))
+
+    reader = TextReader()
+    expected = hashlib.sha256(reader.preprocess_text(reader.read_file(path)).encode('utf-8')).hexdigest()
+    assert MappedTextCounter(chunk_bytes=chunk_bytes).content_hash(path) == expected
+    assert StreamingTextCounter(reader).content_hash(path) == expected
+
+
+def test_file_stored_by_regular_path_is_deduplicated(tmp_path, monkeypatch):
+    adapter = UnifiedDatabaseAdapter(str(tmp_path / 'corpus.db'))
+    processor = TextProcessor(storage_manager=adapter, move_processed=False, generate_reports=False)
+
+    # 先经常规读取路径入库（如非 UTF-8 回退或内存映射路径之前的数据库）
+    first = tmp_path / 'first'
+    first.mkdir()
+    (first / 'a.txt').write_bytes(SAMPLE.encode('utf-8'))
+    with monkeypatch.context() as patch:
+        patch.setattr(MappedTextCounter, 'supports', classmethod(lambda cls, path: False))
+        patch.setattr(StreamingTextCounter, 'supports', classmethod(lambda cls, path: False))
+        processor.process_new_texts(str(first))
+
+    # 相同内容经内存映射路径再次入库时合并到已有文档
+    second = tmp_path / 'second'
+    second.mkdir()
+    (second / 'b.txt').write_bytes(SAMPLE.encode('utf-8'))
+    processor.process_new_texts(str(second))
+
+    assert [doc['filename'] for doc in adapter.unified_db.get_all_documents()] == ['a.txt']
+
+
+@pytest.mark.parametrize("workers", [2, 3, 8])
+def test_parallel_counts_match_serial(tmp_path, workers):
+    path = tmp_path / "large.txt"
+    path.write_bytes((SAMPLE * 50).encode('utf-8'))
+
+    serial_info, serial_freq = MappedTextCounter(workers=1).count(path)
+    info, freq = MappedTextCounter(parallel_threshold=0, workers=workers).count(path)
+
+    assert freq == serial_freq
+    for key in ('total_words', 'unique_words', 'sentences', 'paragraphs'):
+        assert info[key] == serial_info[key], key
+    assert info['paragraphs'] == 3 * 50
+
+
+def test_mapped_ingest_stores_vector_and_resets_interner(tmp_path):
+    input_dir = tmp_path / 'in'
+    input_dir.mkdir()
+    (input_dir / 'sample.txt').write_bytes(SAMPLE.encode('utf-8'))
+    _, expected_freq = WordAnalyzer().analyze_document(SAMPLE, TextReader())
+
+    adapter = UnifiedDatabaseAdapter(str(tmp_path / 'corpus.db'))
+    interner = get_interner()
+    TextProcessor(storage_manager=adapter, move_processed=False, generate_reports=False).process_new_texts(str(input_dir))
+
+    # 与字典入口写入的结果一致（同词根的表面形式合并到同一词汇记录）
+    reference = UnifiedDatabase(str(tmp_path / 'reference.db'))
+    reference_id = reference.add_document('sample.txt', SAMPLE, document_type='text')
+    reference.store_word_frequencies(reference_id, expected_freq)
+
+    doc = adapter.unified_db.get_all_documents()[0]
+    assert adapter.unified_db.get_document_word_frequencies(doc['id']) == \
+        reference.get_document_word_frequencies(reference_id)
+    # 每批结束后换用新的驻留表
+    assert get_interner() is not interner and len(get_interner()) == 0
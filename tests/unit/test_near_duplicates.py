@@ -0,0 +1,60 @@
+import os
+import sys
+import sqlite3
+from collections import Counter
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.engines.database.unified_database import UnifiedDatabase
+from core.engines.database.near_duplicate_index import NearDuplicateIndex
+from core.engines.vocabulary.minhash import MinHasher
+
+
+def _book(seed, tokens=20000):
+    ids = np.random.default_rng(seed).zipf(1.3, tokens)
+    return Counter(f"w{i}" for i in ids[ids < 5000])
+
+
+def test_signature_separates_editions_from_other_books():
+    hasher = MinHasher()
+    book = _book(1)
+    edition = Counter(book)
+    for word in list(edition)[:20]:
+        edition[word] += 1
+
+    signature = hasher.signature(book)
+    assert signature.dtype == np.uint64
+    assert MinHasher.jaccard(signature, MinHasher.from_bytes(MinHasher.to_bytes(signature))) == 1.0
+    assert MinHasher.jaccard(signature, hasher.signature(edition)) > 0.9
+    assert MinHasher.jaccard(signature, hasher.signature(_book(2))) < 0.7
+
+
+def test_index_backfill_and_clusters(tmp_path):
+    db_path = str(tmp_path / "dedup.db")
+    UnifiedDatabase(db_path)
+    books = {'d1': _book(1, 3000), 'd2': _book(1, 3000), 'd3': _book(7, 3000)}
+
+    with sqlite3.connect(db_path) as conn:
+        words = sorted(set().union(*books.values()))
+        conn.executemany("INSERT INTO words (id, surface_form, lemma) VALUES (?, ?, ?)",
+                         [(word, word, word) for word in words])
+        for doc_id, frequencies in books.items():
+            conn.execute("INSERT INTO documents (id, filename, content_hash) VALUES (?, ?, ?)",
+                         (doc_id, f"{doc_id}.txt", doc_id))
+            conn.executemany("INSERT INTO occurrences (document_id, word_id, frequency) VALUES (?, ?, ?)",
+                             [(doc_id, word, count) for word, count in frequencies.items()])
+
+    index = NearDuplicateIndex(db_path, threshold=0.8)
+    assert index.backfill() == 3
+    assert index.backfill() == 0
+
+    clusters = index.clusters()
+    assert [sorted(item['document_id'] for item in cluster) for cluster in clusters] == [['d1', 'd2']]
+
+    matches = index.find_duplicates(index.signature(books['d1']), exclude='d1')
+    assert [item['document_id'] for item in matches] == ['d2']
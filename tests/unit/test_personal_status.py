@@ -0,0 +1,82 @@
+import os
+import sys
+import sqlite3
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.engines.database.unified_database import UnifiedDatabase
+from core.engines.vocabulary.personal_status_manager import PersonalStatusManager
+
+
+def test_batch_set_status_counts_and_applies_in_one_pass(tmp_path):
+    db_path = str(tmp_path / "status.db")
+    db = UnifiedDatabase(db_path)
+    db.add_or_get_word('running', 'run')
+    db.add_or_get_word('apple', 'apple')
+
+    manager = PersonalStatusManager(db_path)
+    stats = manager.batch_set_status([
+        ('running', 'learn'),
+        ('apple', 'know', 'fruit'),
+        ('zebra', 'master'),
+        ('apple', 'master'),        # 重复，以最后一次为准
+        ('', 'know'),               # 空词汇
+        ('pear', 'unknown'),        # 无效状态
+    ])
+
+    assert stats == {'updated': 2, 'created': 1, 'failed': 2, 'duplicates': 1}
+    assert manager.get_word_status('running') == 'learn'
+    assert manager.get_word_status('apple') == 'master'
+    assert manager.get_word_status('zebra') == 'master'
+    # 按 lemma 解析到已有词汇
+    assert manager.batch_set_status([('run', 'know')])['updated'] == 1
+    assert manager.get_word_status('running') == 'know'
+
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM words").fetchone()[0] == 3
+
+
+def test_batch_set_status_without_creation(tmp_path):
+    db_path = str(tmp_path / "status.db")
+    UnifiedDatabase(db_path)
+    manager = PersonalStatusManager(db_path)
+
+    stats = manager.batch_set_status([('ghost', 'know')], create_if_missing=False)
+    assert stats['failed'] == 1 and stats['created'] == 0
+    assert manager.get_word_status('ghost') is None
+
+
+def test_library_difficulty_matches_per_document_analysis(tmp_path):
+    db_path = str(tmp_path / "status.db")
+    db = UnifiedDatabase(db_path)
+    documents = {
+        'a.txt': {'apple': 9, 'pear': 5, 'plum': 4, 'fig': 1},
+        'b.txt': {'apple': 2, 'grape': 7, 'kiwi': 3},
+        'empty.txt': {},
+    }
+    ids = {}
+    for filename, word_frequencies in documents.items():
+        ids[filename] = db.add_document(filename, filename, document_type='text')
+        db.store_word_frequencies(ids[filename], word_frequencies)
+        db.update_document_status(ids[filename], 'completed')
+
+    manager = PersonalStatusManager(db_path)
+    manager.batch_set_status([('apple', 'master'), ('pear', 'learn'), ('grape', 'know'), ('kiwi', 'learn')])
+
+    results = {result['document_id']: result for result in manager.analyze_library_difficulty()}
+    # 没有词频的文档同样返回
+    assert set(results) == set(ids.values())
+    assert results[ids['empty.txt']]['total_word_instances'] == 0
+
+    for doc_id in ids.values():
+        expected = manager.analyze_document_difficulty(doc_id)
+        result = results[doc_id]
+        for key in ('total_word_instances', 'status_distribution', 'difficulty_percentage',
+                    'overall_difficulty_score', 'recommended_words'):
+            assert result[key] == expected[key], key
+
+    only = manager.analyze_library_difficulty(document_ids=[ids['b.txt']])
+    assert [result['document_id'] for result in only] == [ids['b.txt']]
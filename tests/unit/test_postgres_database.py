@@ -0,0 +1,117 @@
+import math
+import os
+import sys
+import threading
+import uuid
+
+import pytest
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+pytest.importorskip("psycopg")
+pytest.importorskip("psycopg_pool")
+
+from core.engines.database.postgres_database import PostgresDatabase
+
+
+@pytest.fixture(scope='module')
+def postgres_dsn(tmp_path_factory):
+    """WFA_TEST_POSTGRES_DSN 指定测试库；否则尝试用 pgserver 启动临时 PostgreSQL"""
+    dsn = os.environ.get('WFA_TEST_POSTGRES_DSN')
+    if dsn:
+        yield dsn
+        return
+
+    pgserver = pytest.importorskip("pgserver")
+    server = pgserver.get_server(str(tmp_path_factory.mktemp('pgdata')), cleanup_mode='stop')
+    yield server.get_uri()
+    server.cleanup()
+
+
+@pytest.fixture
+def db(postgres_dsn):
+    schema = f"wfa_test_{uuid.uuid4().hex[:8]}"
+    database = PostgresDatabase(postgres_dsn, schema=schema, max_size=4)
+    yield database
+    with database.pool.connection() as conn:
+        conn.execute(f"DROP SCHEMA {schema} CASCADE")
+    database.close()
+
+
+def test_store_and_query_round_trip(db):
+    doc_id = db.add_document('a.txt', 'apple pear plum', document_type='text')
+    assert db.add_document('copy.txt', 'apple pear plum') == doc_id
+
+    db.store_word_frequencies(doc_id, {'apple': 2, 'pear': 1})
+    # 重新存储替换旧数据
+    db.store_word_frequencies(doc_id, {'apple': 3, 'plum': 1})
+    db.update_document_status(doc_id, 'completed', {'total_words': 4})
+
+    assert db.get_document_word_frequencies(doc_id) == {'apple': 3, 'plum': 1}
+    doc = db.get_document_by_hash(db._calculate_content_hash('apple pear plum'))
+    assert doc['status'] == 'completed' and '"total_words": 4' in doc['metadata']
+
+    top = db.get_corpus_top_words(limit=1)
+    assert top[0]['surface_form'] == 'apple' and top[0]['total_frequency'] == 3
+
+    stats = db.delete_documents([doc_id], collect_garbage=True)
+    assert stats['documents'] == 1 and stats['occurrences'] == 2
+    assert db.get_database_stats()['words_count'] == 0
+    assert db.get_corpus_top_words() == []
+
+
+def test_idf_counts_only_completed_documents(db):
+    for name, frequencies, status in [('a.txt', {'apple': 1, 'fig': 2}, 'completed'),
+                                      ('b.txt', {'apple': 1}, 'completed'),
+                                      ('c.txt', {'apple': 1, 'pear': 1}, 'failed')]:
+        doc_id = db.add_document(name, name)
+        db.store_word_frequencies(doc_id, frequencies)
+        db.update_document_status(doc_id, status)
+
+    idf = {row['surface_form']: row['idf'] for row in db.get_corpus_top_words()}
+    assert idf['fig'] == pytest.approx(math.log(2))
+    assert idf['apple'] == pytest.approx(0.0)
+
+
+def test_concurrent_writers_share_word_records(db):
+    words = {f'word{i}': i + 1 for i in range(200)}
+    errors = []
+
+    def ingest(index):
+        try:
+            doc_id = db.add_document(f'{index}.txt', f'document {index}')
+            db.store_word_frequencies(doc_id, words)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=ingest, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    stats = db.get_database_stats()
+    assert stats['documents_count'] == 8
+    assert stats['words_count'] == 200
+    assert stats['occurrences_count'] == 1600
+
+    top = db.get_corpus_top_words(limit=1, order_by='document_frequency')
+    assert top[0]['document_frequency'] == 8
+
+
+def test_adapter_reports_sqlite_only_features(db, monkeypatch):
+    from core.engines.database import database_adapter
+
+    monkeypatch.setattr(database_adapter, 'create_storage_backend', lambda db_path: db)
+    adapter = database_adapter.UnifiedDatabaseAdapter()
+    assert not (adapter.result_cache.enabled or adapter.sketch_store.enabled or adapter.duplicate_index.enabled)
+    assert adapter.result_cache.db_path is None
+
+    for call in (adapter.get_all_wordlists, adapter.get_coverage_matrix, adapter.get_dictionary_stats,
+                 lambda: adapter.get_frequency_profile('abc')):
+        with pytest.raises(NotImplementedError, match='postgresql'):
+            call()
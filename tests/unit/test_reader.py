@@ -4,11 +4,11 @@ import pytest
 from pathlib import Path
 
 # 添加项目根目录到 Python 路径
-project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from core.engines.file_reader import TextReader
+from core.engines.input.file_reader import TextReader
 
 def test_txt_reader():
     reader = TextReader()
@@ -47,4 +47,25 @@ def test_unsupported_format():
             reader.read_file(test_file)
     finally:
         # 清理测试文件
-        test_file.unlink()
\ No newline at end of file
+        test_file.unlink()
+
+def test_txt_encoding_tiers(tmp_path):
+    reader = TextReader()
+    text = "café naïve résumé"
+
+    bom_file = tmp_path / "bom.txt"
+    bom_file.write_bytes(text.encode('utf-16'))
+    assert reader.read_file(bom_file) == text
+    assert reader.metadata['encoding'] == 'utf-16'
+
+    utf8_file = tmp_path / "utf8.txt"
+    utf8_file.write_bytes(text.encode('utf-8'))
+    assert reader.read_file(utf8_file) == text
+    assert reader.metadata['encoding'] == 'utf-8'
+
+    # 非ASCII字节只出现在采样窗口之外，仍能正确解码
+    legacy_file = tmp_path / "legacy.txt"
+    padding = "plain ascii text " * 20000
+    legacy_file.write_bytes((padding + text + padding).encode('cp1252'))
+    assert text in reader.read_file(legacy_file)
+    assert TextReader._encoding_cache[reader._fingerprint(legacy_file)] == reader.metadata['encoding']
@@ -0,0 +1,66 @@
+import os
+import sys
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.engines.database.unified_database import UnifiedDatabase
+from core.services.report_service import AnalysisReportWriter, ReportQueue
+
+
+def _job(tmp_path, name, frequencies):
+    source = tmp_path / name
+    source.write_text(' '.join(word for word, count in frequencies.items() for _ in range(count)))
+    basic_info = {'filename': name, 'total_words': sum(frequencies.values()),
+                  'unique_words': len(frequencies), 'sentences': 1, 'paragraphs': 1}
+    return AnalysisReportWriter.make_job(str(source), basic_info, frequencies, name)
+
+
+def test_queue_writes_document_reports_and_batch_summary(tmp_path):
+    db_path = str(tmp_path / 'test.db')
+    UnifiedDatabase(db_path)
+    exports = tmp_path / 'exports'
+
+    report_queue = ReportQueue(AnalysisReportWriter(db_path, exports_dir=str(exports)))
+    report_queue.submit(_job(tmp_path, 'a.txt', {'apple': 3, 'pear': 1}))
+    report_queue.submit(_job(tmp_path, 'b.txt', {'apple': 2, 'plum': 4}))
+    result = report_queue.close()
+
+    assert len(result['reports']) == 2
+    assert all(os.path.exists(path) for path in result['reports'])
+
+    summary = open(result['summary'], encoding='utf-8').read()
+    assert '文档数: 2' in summary
+    assert 'apple' in summary and 'b.txt' in summary
+    # 本批高频词按合计频率排序
+    assert summary.index('apple') < summary.index('plum') < summary.index('pear')
+
+
+def test_single_document_has_no_batch_summary(tmp_path):
+    db_path = str(tmp_path / 'test.db')
+    UnifiedDatabase(db_path)
+
+    report_queue = ReportQueue(AnalysisReportWriter(db_path, exports_dir=str(tmp_path / 'exports')))
+    report_queue.submit(_job(tmp_path, 'a.txt', {'apple': 3}))
+    result = report_queue.close()
+
+    assert len(result['reports']) == 1
+    assert result['summary'] is None
+
+
+def test_failed_job_does_not_stop_the_worker(tmp_path):
+    db_path = str(tmp_path / 'test.db')
+    UnifiedDatabase(db_path)
+
+    report_queue = ReportQueue(AnalysisReportWriter(db_path, exports_dir=str(tmp_path / 'exports')), queue_size=1)
+    broken = _job(tmp_path, 'broken.txt', {'apple': 1})
+    broken['word_frequencies'] = None
+    # 队列容量为 1：渲染线程若因失败退出，后续 submit 会一直阻塞
+    for job in (broken, broken, _job(tmp_path, 'a.txt', {'apple': 3}), _job(tmp_path, 'b.txt', {'pear': 2})):
+        report_queue.submit(job)
+    result = report_queue.close()
+
+    assert len(result['reports']) == 2
+    assert result['summary'] is not None
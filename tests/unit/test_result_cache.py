@@ -0,0 +1,49 @@
+import os
+import sys
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.engines.database.unified_database import UnifiedDatabase
+from core.engines.database.result_cache import ResultCache
+
+
+def test_cache_hit_and_invalidation_on_document_change(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    db = UnifiedDatabase(db_path)
+    cache = ResultCache(db_path, ttl=60, max_entries=10, enabled=True)
+
+    calls = []
+    def compute():
+        calls.append(1)
+        return {'value': len(calls)}
+
+    assert cache.get_or_compute('lemma_analysis', compute, params={'doc_id': None}) == {'value': 1}
+    assert cache.get_or_compute('lemma_analysis', compute, params={'doc_id': None}) == {'value': 1}
+    assert len(calls) == 1
+
+    # 不同参数使用不同的键
+    cache.get_or_compute('lemma_analysis', compute, params={'doc_id': 'x'})
+    assert len(calls) == 2
+
+    # 文档变化后旧结果失效
+    db.add_document('a.txt', 'some content')
+    assert cache.get_or_compute('lemma_analysis', compute, params={'doc_id': None}) == {'value': 3}
+
+
+def test_cache_ttl_and_size_bound(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    UnifiedDatabase(db_path)
+
+    expired = ResultCache(db_path, ttl=-1, max_entries=10, enabled=True)
+    expired.set('similarity', {'score': 1})
+    assert expired.get('similarity') == (False, None)
+
+    bounded = ResultCache(db_path, ttl=60, max_entries=3, enabled=True)
+    for i in range(5):
+        bounded.set('similarity', {'score': i}, params={'i': i})
+    assert bounded.get_stats()['entries'] == 3
+    assert bounded.get('similarity', params={'i': 0}) == (False, None)
+    assert bounded.get('similarity', params={'i': 4}) == (True, {'score': 4})
@@ -0,0 +1,163 @@
+import os
+import sys
+import sqlite3
+
+import pytest
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.engines.database import database_adapter
+from core.engines.database.coverage_engine import BatchCoverageEngine
+from core.engines.database.ingest_queue import ShardedIngestQueue
+from core.engines.database.unified_database import UnifiedDatabase
+from core.engines.database.sharded_database import ShardedDatabase
+from core.engines.input.file_processor import TextProcessor
+from core.engines.vocabulary.personal_status_manager import PersonalStatusManager
+from core.services.export_service import FrequencyExporter
+
+DOCUMENTS = {
+    'a.txt': {'apple': 3, 'pear': 1},
+    'b.txt': {'apple': 1, 'fig': 4},
+    'c.txt': {'plum': 2, 'fig': 1},
+    'd.txt': {'apple': 2, 'kiwi': 5},
+    'e.txt': {'pear': 2, 'lime': 1},
+}
+
+
+def _load(db):
+    doc_ids = {}
+    for name, frequencies in DOCUMENTS.items():
+        doc_ids[name] = db.add_document(name, f'content of {name}')
+        db.store_word_frequencies(doc_ids[name], frequencies)
+    return doc_ids
+
+
+def _top_words(db):
+    return sorted((row['surface_form'], row['total_frequency'], row['document_frequency'], round(row['idf'], 6))
+                  for row in db.get_corpus_top_words(limit=100))
+
+
+def test_sharded_queries_match_single_database(tmp_path):
+    sharded = ShardedDatabase(str(tmp_path / 'catalog.db'), shard_count=3)
+    single = UnifiedDatabase(str(tmp_path / 'single.db'))
+    sharded_ids, single_ids = _load(sharded), _load(single)
+
+    # 文档分布在多个分片，词汇只在主库
+    counts = [sqlite3.connect(path).execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+              for path in sharded.shard_paths]
+    assert sum(counts) == len(DOCUMENTS) and max(counts) < len(DOCUMENTS)
+
+    assert _top_words(sharded) == _top_words(single)
+    assert sharded.get_document_word_frequencies(sharded_ids['b.txt']) == {'apple': 1, 'fig': 4}
+    assert sharded.get_database_stats()['occurrences_count'] == single.get_database_stats()['occurrences_count']
+    assert sharded.get_lemma_analysis()['total_lemmas'] == single.get_lemma_analysis()['total_lemmas']
+
+    removed = [sharded_ids['c.txt'], sharded_ids['e.txt']]
+    stats = sharded.delete_documents(removed, collect_garbage=True)
+    single.delete_documents([single_ids['c.txt'], single_ids['e.txt']], collect_garbage=True)
+
+    # plum 与 lime 不再出现在任何分片中，从共享词汇目录回收
+    assert stats['documents'] == 2 and stats['words'] == 2
+    assert _top_words(sharded) == _top_words(single)
+
+
+def test_corpus_engines_read_across_shards(tmp_path):
+    sharded = ShardedDatabase(str(tmp_path / 'catalog.db'), shard_count=3)
+    single = UnifiedDatabase(str(tmp_path / 'single.db'))
+    for db in (sharded, single):
+        for doc_id in _load(db).values():
+            db.update_document_status(doc_id, 'completed')
+
+    def read(db):
+        exporter = FrequencyExporter(db.db_path, storage=db)
+        exported = sorted((row[1], row[2], row[4]) for batch in exporter.iter_batches() for row in batch)
+        matrix = BatchCoverageEngine(db.db_path, storage=db).compute()
+        library = PersonalStatusManager(db.db_path, storage=db).analyze_library_difficulty()
+        return exported, matrix['documents_count'], sorted(doc['filename'] for doc in library)
+
+    # 分片模式下主库的 documents / occurrences 为空，读取必须经由 connect_corpus
+    assert read(sharded) == read(single)
+    assert read(sharded)[1] == len(DOCUMENTS)
+
+
+def test_shard_count_is_fixed_once_created(tmp_path):
+    ShardedDatabase(str(tmp_path / 'catalog.db'), shard_count=2)
+    with pytest.raises(ValueError):
+        ShardedDatabase(str(tmp_path / 'catalog.db'), shard_count=4)
+
+
+def _sharded_adapter(tmp_path, monkeypatch):
+    monkeypatch.setattr(database_adapter, 'create_storage_backend',
+                        lambda db_path: ShardedDatabase(db_path, shard_count=3))
+    return database_adapter.UnifiedDatabaseAdapter(str(tmp_path / 'catalog.db'))
+
+
+def _job_shards(db):
+    """source_key -> 任务文档所在分片"""
+    shards = {}
+    for index, path in enumerate(db.shard_paths):
+        with sqlite3.connect(path) as conn:
+            for (key,) in conn.execute("SELECT source_key FROM documents WHERE source_key IS NOT NULL"):
+                shards[key] = index
+    return shards
+
+
+def test_queue_jobs_are_processed_by_per_shard_workers(tmp_path, monkeypatch):
+    adapter = _sharded_adapter(tmp_path, monkeypatch)
+    db = adapter.unified_db
+    input_dir = tmp_path / 'in'
+    input_dir.mkdir()
+    words = ['apple', 'pear', 'plum', 'fig', 'kiwi', 'lime', 'grape', 'melon']
+    paths = []
+    for index, word in enumerate(words):
+        path = input_dir / f'{word}.txt'
+        path.write_text(f'{word} {word} orange {words[index - 1]}', encoding='utf-8')
+        paths.append(path)
+
+    queue = ShardedIngestQueue(db.shard_paths)
+    # 与 apple.txt 内容相同、但分配到另一个分片的文件
+    original_shard = queue.shard_of(paths[0])
+    for index in range(50):
+        duplicate = input_dir / f'copy{index}.txt'
+        duplicate.write_text(paths[0].read_text(encoding='utf-8'), encoding='utf-8')
+        if queue.shard_of(duplicate) != original_shard:
+            break
+        duplicate.unlink()
+    paths.append(duplicate)
+
+    assert queue.enqueue(paths) == {'queued': 9, 'skipped': 0}
+    job_shards = _job_shards(db)
+    assert job_shards == {queue.queues[0].source_key(path): queue.shard_of(path) for path in paths}
+
+    # 每个工作进程只领取自己分片的任务
+    for shard in range(3):
+        worker = TextProcessor(storage_manager=adapter, move_processed=False, generate_reports=False, shard=shard)
+        expected = sum(1 for index in job_shards.values() if index == shard)
+        assert worker.resume()['completed'] == expected
+        for other in range(3):
+            pending = ShardedIngestQueue(db.shard_paths, shard=other).status()['pending']
+            assert pending == (0 if other <= shard else sum(1 for i in job_shards.values() if i == other))
+
+    # 跨分片的相同内容合并到已有文档，文档与词频可跨分片读取
+    assert queue.status() == {'pending': 0, 'processing': 0, 'completed': 9, 'failed': 0}
+    texts = adapter.get_all_texts()
+    assert len(texts) == 8
+    documents = {text['filename']: text['id'] for text in texts}
+    assert db.get_document_word_frequencies(documents['pear.txt'])['orange'] == 1
+    assert queue.enqueue(paths) == {'queued': 0, 'skipped': 9}
+
+    # 删除已有文档后，其他分片中的合并记录一并删除，相同内容的文件可以重新入库
+    kept = documents['apple.txt'] if 'apple.txt' in documents else documents[duplicate.name]
+    db.delete_documents([kept])
+    assert queue.enqueue(paths) == {'queued': 2, 'skipped': 7}
+
+
+def test_shard_worker_requires_sharded_storage(tmp_path):
+    adapter = database_adapter.UnifiedDatabaseAdapter(str(tmp_path / 'corpus.db'))
+    with pytest.raises(ValueError):
+        TextProcessor(storage_manager=adapter, generate_reports=False, shard=0)._get_ingest_queue()
+    with pytest.raises(ValueError):
+        ShardedIngestQueue([str(tmp_path / 'a.db')], shard=1)
@@ -0,0 +1,84 @@
+import csv
+import os
+import sys
+import zipfile
+
+import pytest
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.engines.input.file_reader import TextReader
+from core.engines.input.stream_counter import StreamingTextCounter
+from core.engines.vocabulary.word_analyzer import analyze_document
+
+DOCUMENT_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
+  <w:body>
+    <w:p><w:r><w:t>Hello world.</w:t><w:tab/><w:t xml:space="preserve"> Tabbed text!</w:t></w:r></w:p>
+    <w:p><w:r><w:t>Line one</w:t><w:br/><w:t>line two?</w:t></w:r></w:p>
+    <w:p/>
+    <w:tbl><w:tr><w:tc><w:p><w:r><w:t>cell text</w:t></w:r></w:p></w:tc></w:tr></w:tbl>
+    <w:p><w:r><w:t>Before box </w:t></w:r>
+      <w:r><w:txbxContent><w:p><w:r><w:t>inside box</w:t></w:r></w:p></w:txbxContent></w:r>
+      <w:r><w:t>after box</w:t></w:r></w:p>
+    <w:p><w:r><w:delText>deleted</w:delText><w:t>kept</w:t></w:r></w:p>
+  </w:body>
+</w:document>
+"""
+
+
+def _write_docx(path):
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('word/document.xml', DOCUMENT_XML)
+    return path
+
+
+def test_docx_paragraphs_are_streamed_in_order(tmp_path):
+    reader = TextReader()
+    path = _write_docx(tmp_path / 'sample.docx')
+
+    assert list(reader.iter_text(path)) == [
+        'Hello world.\t Tabbed text!',
+        'Line one\nline two?',
+        '',
+        'cell text',
+        'inside box',
+        'Before box after box',
+        'kept',
+    ]
+    assert reader.read_file(path) == '\n'.join(reader.iter_text(path))
+
+
+def test_csv_rows_are_streamed(tmp_path):
+    path = tmp_path / 'posts.csv'
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['id', 'text'])
+        writer.writerow([1, 'First post, with a comma'])
+        writer.writerow([2, ''])
+        writer.writerow([3, 'Multi-line\n\npost'])
+        writer.writerow([4])
+
+    reader = TextReader()
+    assert list(reader.iter_text(path)) == ['First post, with a comma', 'Multi-line\n\npost']
+    assert reader.metadata['encoding'] == 'utf-8'
+
+    with pytest.raises(ValueError):
+        list(reader.iter_text(path, text_column='body'))
+
+
+@pytest.mark.parametrize('batch_chars', [1, 16, 1024 * 1024])
+def test_streamed_counts_match_full_text_analysis(tmp_path, batch_chars):
+    reader = TextReader()
+    path = _write_docx(tmp_path / 'sample.docx')
+    text = reader.read_file(path)
+
+    basic_info, word_frequencies = StreamingTextCounter(reader, batch_chars=batch_chars).count(path)
+    expected_info, expected_frequencies = analyze_document(text, reader)
+
+    assert word_frequencies == expected_frequencies
+    assert basic_info.pop('char_count') == len(text)
+    assert basic_info == expected_info
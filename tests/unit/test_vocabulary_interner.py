@@ -0,0 +1,46 @@
+import os
+import sys
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.engines.vocabulary.vocabulary_interner import VocabularyInterner, get_interner, reset_interner
+
+
+def test_intern_is_stable_and_dense():
+    interner = VocabularyInterner()
+    ids = interner.intern_many(['the', 'fox', 'the', 'den'])
+
+    assert ids.dtype == np.int32
+    assert ids.tolist() == [0, 1, 0, 2]
+    assert interner.intern('fox') == 1
+    assert interner.lookup([2, 0]) == ['den', 'the']
+
+    counts = interner.count_ids(ids)
+    assert interner.to_dict(counts) == {'the': 2, 'fox': 1, 'den': 1}
+
+
+def test_merge_across_id_spaces():
+    parent, worker = VocabularyInterner(), VocabularyInterner()
+    total = parent.vector({'apple': 2, 'banana': 1})
+    part = worker.vector({'cherry': 4, 'apple': 3})
+
+    words, counts = worker.export(part)
+    total = parent.merge(total, words, counts)
+
+    assert parent.to_dict(total) == {'apple': 5, 'banana': 1, 'cherry': 4}
+    assert VocabularyInterner.add(np.array([1, 2]), np.array([1, 1, 1])).tolist() == [2, 3, 1]
+
+
+def test_reset_interner_starts_a_new_table():
+    interner = get_interner()
+    counts = interner.vector({'apple': 2})
+
+    reset_interner()
+    assert get_interner() is not interner and len(get_interner()) == 0
+    # 已有向量仍可通过原驻留表解析
+    assert interner.to_dict(counts) == {'apple': 2}
@@ -0,0 +1,81 @@
+import os
+import sys
+import sqlite3
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.engines.database.unified_database import UnifiedDatabase
+from core.engines.database.wordlist_index import WordlistIndex
+from core.engines.database.coverage_engine import BatchCoverageEngine
+
+
+def _populate(db_path):
+    db = UnifiedDatabase(str(db_path))
+    with sqlite3.connect(str(db_path)) as conn:
+        for i, word in enumerate(['apple', 'banana', 'cherry', 'date', 'elder', 'fig', 'grape', 'honey', 'iris']):
+            conn.execute("""
+                INSERT INTO common_dictionary (id, word, lemma, pos_primary, frequency_rank, difficulty_level)
+                VALUES (?, ?, ?, 'noun', ?, 1)
+            """, (f'd{i}', word, word, i + 1))
+    fruit = db.create_wordlist('FRUIT')
+    late = db.create_wordlist('LATE')
+    db.add_words_to_wordlist(fruit, ['apple', 'banana', 'cherry', 'fig', 'grape'])
+    db.add_words_to_wordlist(late, ['honey', 'iris'])
+    return db
+
+
+def test_coverage_matches_set_intersection(tmp_path):
+    db_path = tmp_path / "index.db"
+    _populate(db_path)
+    index = WordlistIndex(str(db_path))
+
+    word_frequencies = {'apple': 5, 'fig': 1, 'iris': 2, 'zebra': 7, 'grape': 3}
+    coverage = {c['wordlist_name']: c for c in index.coverage(word_frequencies)}
+
+    assert coverage['FRUIT']['match_count'] == 3
+    assert coverage['FRUIT']['matched_frequency'] == 9
+    assert coverage['FRUIT']['sample_words'] == ['apple', 'grape', 'fig']
+    assert coverage['LATE']['match_count'] == 1
+    assert coverage['LATE']['sample_words'] == ['iris']
+    assert round(coverage['LATE']['frequency_percentage'], 2) == round(2 / 18 * 100, 2)
+
+
+def test_index_detects_wordlist_changes(tmp_path):
+    db_path = tmp_path / "index.db"
+    db = _populate(db_path)
+    index = WordlistIndex(str(db_path))
+    assert not index.is_stale()
+
+    db.add_words_to_wordlist(db.get_wordlist_by_name('LATE')['id'], ['date'])
+    assert index.refresh_if_stale()
+    coverage = {c['wordlist_name']: c for c in index.coverage({'date': 1})}
+    assert coverage['LATE']['match_count'] == 1
+
+
+def test_coverage_matrix_matches_wordlist_index(tmp_path):
+    db_path = tmp_path / "index.db"
+    db = _populate(db_path)
+    documents = {
+        'a.txt': {'apple': 5, 'fig': 1, 'iris': 2, 'zebra': 7},
+        'b.txt': {'banana': 2, 'grape': 3, 'honey': 1, 'iris': 4},
+    }
+    for filename, word_frequencies in documents.items():
+        doc_id = db.add_document(filename, ' '.join(word_frequencies), document_type='text')
+        db.store_word_frequencies(doc_id, word_frequencies)
+        db.update_document_status(doc_id, 'completed')
+
+    matrix = BatchCoverageEngine(str(db_path)).compute()
+    assert matrix['documents_count'] == 2 and matrix['wordlists'] == ['FRUIT', 'LATE']
+
+    index = WordlistIndex(str(db_path))
+    cells = {(row['filename'], row['wordlist_name']): row for row in matrix['rows']}
+    assert len(cells) == 4
+    for filename, word_frequencies in documents.items():
+        for expected in index.coverage(word_frequencies):
+            row = cells[(filename, expected['wordlist_name'])]
+            assert row['covered_words'] == expected['match_count']
+            assert row['covered_frequency'] == expected['matched_frequency']
+            assert row['document_total_frequency'] == sum(word_frequencies.values())